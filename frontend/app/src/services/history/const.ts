@@ -3,6 +3,19 @@ import { z } from 'zod';
 export const tradeNumericKeys = ['fee', 'amount', 'rate'];
 export const movementNumericKeys = ['fee', 'amount'];
 export const transactionNumericKeys = ['value', 'gas', 'gas_price', 'gas_used'];
+export const pnlEventNumericKeys = [
+  'paid_in_asset',
+  'taxable_amount',
+  'paid_in_profit_currency',
+  'taxable_bought_cost_in_profit_currency',
+  'taxable_received_in_profit_currency',
+  'received_in_asset',
+  'net_profit_or_loss',
+  'used_amount',
+  'amount',
+  'rate',
+  'fee_rate'
+];
 
 export const IgnoredActions = z
   .object({
@@ -18,7 +18,11 @@ import {
   balanceAxiosTransformer,
   basicAxiosTransformer
 } from '@/services/consts';
-import { IgnoredActions, tradeNumericKeys } from '@/services/history/const';
+import {
+  IgnoredActions,
+  pnlEventNumericKeys,
+  tradeNumericKeys
+} from '@/services/history/const';
 import {
   LedgerActionResult,
   NewTrade,
@@ -39,7 +43,7 @@ import {
   validWithSessionStatus
 } from '@/services/utils';
 import { LedgerAction } from '@/store/history/types';
-import { ReportProgress } from '@/store/reports/types';
+import { ProfitLossEvents, ReportProgress } from '@/store/reports/types';
 
 export class HistoryApi {
   private readonly axios: AxiosInstance;
@@ -223,6 +227,24 @@ export class HistoryApi {
       .then(handleResponse);
   }
 
+  async processedHistoryEvents(
+    offset: number,
+    limit: number
+  ): Promise<ProfitLossEvents> {
+    return this.axios
+      .get<ActionResult<ProfitLossEvents>>(`/history/events`, {
+        params: axiosSnakeCaseTransformer({
+          offset,
+          limit,
+          orderByAttribute: 'identifier',
+          ascending: true
+        }),
+        validateStatus: validWithSessionStatus,
+        transformResponse: setupTransformer(pnlEventNumericKeys)
+      })
+      .then(handleResponse);
+  }
+
   async getProgress(): Promise<ReportProgress> {
     return this.axios
       .get<ActionResult<ReportProgress>>(`/history/status`, {
@@ -30,20 +30,22 @@ class WebsocketService {
       logger.debug(`preparing to connect to ${url}`);
       this._connection = new WebSocket(url);
       this._connection.onmessage = async event => {
-        const message: WebsocketMessage<SocketMessageType> = JSON.parse(
+        const messages: WebsocketMessage<SocketMessageType>[] = JSON.parse(
           event.data
         );
 
-        if (message.type === SocketMessageType.BALANCES_SNAPSHOT_ERROR) {
-          await handleSnapshotError(message);
-        } else if (message.type === SocketMessageType.LEGACY) {
-          const data = LegacyMessageData.parse(message.data);
-          await handleLegacyMessage(
-            data.value,
-            data.verbosity === MESSAGE_WARNING
-          );
-        } else {
-          logger.warn(`Unsupported socket message received: ${message}`);
+        for (const message of messages) {
+          if (message.type === SocketMessageType.BALANCES_SNAPSHOT_ERROR) {
+            await handleSnapshotError(message);
+          } else if (message.type === SocketMessageType.LEGACY) {
+            const data = LegacyMessageData.parse(message.data);
+            await handleLegacyMessage(
+              data.value,
+              data.verbosity === MESSAGE_WARNING
+            );
+          } else {
+            logger.warn(`Unsupported socket message received: ${message}`);
+          }
         }
       };
       this._connection.onopen = () => {
@@ -4,10 +4,13 @@ import { api } from '@/services/rotkehlchen-api';
 import {
   emptyError,
   MUTATION_PROGRESS,
-  MUTATION_REPORT_ERROR
+  MUTATION_REPORT_ERROR,
+  REPORT_EVENTS_PAGE_SIZE
 } from '@/store/reports/const';
 import { ReportState } from '@/store/reports/state';
 import {
+  ProfitLossEvent,
+  ProfitLossEvents,
   ReportError,
   ReportProgress,
   TradeHistory
@@ -39,13 +42,6 @@ export const actions: ActionTree<ReportState, RotkehlchenState> = {
       const task = createTask(taskId, TaskType.TRADE_HISTORY, {
         title: i18n.t('actions.reports.generate.task.title').toString(),
         numericKeys: [
-          'paid_in_asset',
-          'taxable_amount',
-          'paid_in_profit_currency',
-          'taxable_bought_cost_in_profit_currency',
-          'taxable_received_in_profit_currency',
-          'received_in_asset',
-          'net_profit_or_loss',
           'loan_profit',
           'defi_profit_loss',
           'margin_positions_profit_loss',
@@ -56,11 +52,7 @@ export const actions: ActionTree<ReportState, RotkehlchenState> = {
           'general_trade_profit_loss',
           'taxable_trade_profit_loss',
           'total_taxable_profit_loss',
-          'total_profit_loss',
-          'used_amount',
-          'amount',
-          'rate',
-          'fee_rate'
+          'total_profit_loss'
         ],
         ignoreResult: false
       });
@@ -70,7 +62,7 @@ export const actions: ActionTree<ReportState, RotkehlchenState> = {
         TaskType.TRADE_HISTORY
       );
 
-      if (!result || !result.overview || !result.allEvents) {
+      if (!result || !result.overview) {
         commit(MUTATION_REPORT_ERROR, {
           error: '',
           message: i18n
@@ -82,15 +74,25 @@ export const actions: ActionTree<ReportState, RotkehlchenState> = {
 
       const {
         overview,
-        allEvents,
         eventsLimit,
         eventsProcessed,
         firstProcessedTimestamp
       } = result;
 
+      // the events of the report are stored in the backend and requested in pages
+      const events: ProfitLossEvent[] = [];
+      let page: ProfitLossEvents;
+      do {
+        page = await api.history.processedHistoryEvents(
+          events.length,
+          REPORT_EVENTS_PAGE_SIZE
+        );
+        events.push(...page.entries);
+      } while (page.entries.length > 0 && events.length < page.entriesTotal);
+
       const report = {
         overview: overview,
-        events: allEvents,
+        events,
         limit: eventsLimit,
         processed: eventsProcessed,
         firstProcessedTimestamp
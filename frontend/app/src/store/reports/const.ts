@@ -7,6 +7,8 @@ import { Zero } from '@/utils/bignumbers';
 
 export const MUTATION_PROGRESS = 'progress' as const;
 export const MUTATION_REPORT_ERROR = 'reportError' as const;
+// How many events of the report are requested at once after it is generated
+export const REPORT_EVENTS_PAGE_SIZE = 1000;
 
 export const emptyPeriod: () => ReportPeriod = () => ({
   start: 0,
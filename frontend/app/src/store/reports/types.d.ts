@@ -19,7 +19,12 @@ export interface TradeHistory {
   readonly eventsLimit: number;
   readonly firstProcessedTimestamp: number;
   readonly overview: ProfitLossOverviewData;
-  readonly allEvents: ProfitLossEvent[];
+}
+
+export interface ProfitLossEvents {
+  readonly entries: ProfitLossEvent[];
+  readonly entriesFound: number;
+  readonly entriesTotal: number;
 }
 
 export interface ProfitLossOverviewData {
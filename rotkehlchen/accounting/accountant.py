@@ -1,12 +1,27 @@
 import logging
+import time
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Collection,
+    Dict,
+    FrozenSet,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 import gevent
 
 from rotkehlchen.accounting.events import TaxableEvents
 from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.accounting.structures import ActionType, DefiEvent
+from rotkehlchen.assets.asset import Asset
 from rotkehlchen.chain.ethereum.trades import AMMTrade
 from rotkehlchen.constants.assets import A_BTC, A_ETH
 from rotkehlchen.constants.misc import ZERO
@@ -52,6 +67,14 @@ log = RotkehlchenLogsAdapter(logger)
 FREE_PNL_EVENTS_LIMIT = 1000
 
 
+class ProcessingContext(NamedTuple):
+    """Snapshot of the user's settings and ignore lists taken at the start of history
+    processing, so that they are the same through the entire run"""
+    db_settings: DBSettings
+    ignored_assets: FrozenSet[Asset]
+    ignored_actionids_mapping: Dict[ActionType, FrozenSet[str]]
+
+
 class Accountant():
 
     def __init__(
@@ -70,13 +93,19 @@ class Accountant():
             user_directory=user_directory,
             create_csv=create_csv,
         )
-        self.events = TaxableEvents(self.csvexporter, profit_currency, msg_aggregator)
+        self.events = TaxableEvents(
+            csv_exporter=self.csvexporter,
+            profit_currency=profit_currency,
+            msg_aggregator=msg_aggregator,
+        )
 
         self.asset_movement_fees = FVal(0)
         self.last_gas_price = 0
         self.currently_processing_timestamp = -1
         self.first_processed_timestamp = -1
         self.premium = premium
+        # Seconds each stage of the last history processing took
+        self.last_run_timings: Dict[str, float] = {}
 
     def __del__(self) -> None:
         del self.events
@@ -113,12 +142,14 @@ class Accountant():
 
         self.profit_currency = settings.main_currency
         self.events.profit_currency = settings.main_currency
-        self.events.taxable_ledger_actions = settings.taxable_ledger_actions
+        self.events.taxable_ledger_actions = frozenset(settings.taxable_ledger_actions)
         self.csvexporter.profit_currency = settings.main_currency
 
         if settings.account_for_assets_movements is not None:
             self.events.account_for_assets_movements = settings.account_for_assets_movements
 
+        self.events.cost_basis.fixed_point = settings.cost_basis_fixed_point
+
     def get_fee_in_profit_currency(self, trade: Trade) -> Fee:
         """Get the profit_currency rate of the fee of the given trade
 
@@ -304,7 +335,33 @@ class Accountant():
         start_ts here is the timestamp at which to start taking trades and other
         taxable events into account. Not where processing starts from. Processing
         always starts from the very first event we find in the history.
+
+        The report is locked during processing so that it is not exported half done
+        and a new run waits for an export of the previous report to finish.
         """
+        with self.csvexporter.report_lock:
+            return self._process_history(
+                start_ts=start_ts,
+                end_ts=end_ts,
+                trade_history=trade_history,
+                loan_history=loan_history,
+                asset_movements=asset_movements,
+                eth_transactions=eth_transactions,
+                defi_events=defi_events,
+                ledger_actions=ledger_actions,
+            )
+
+    def _process_history(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+            trade_history: List[Union[Trade, MarginPosition, AMMTrade]],
+            loan_history: List[Loan],
+            asset_movements: List[AssetMovement],
+            eth_transactions: List[EthereumTransaction],
+            defi_events: List[DefiEvent],
+            ledger_actions: List[LedgerAction],
+    ) -> Dict[str, Any]:
         active_premium = self.premium and self.premium.is_active()
         log.info(
             'Start of history processing',
@@ -319,13 +376,14 @@ class Accountant():
         self.start_ts = start_ts
         self.eth_transactions_gas_costs = FVal(0)
         self.asset_movement_fees = FVal(0)
-        self.csvexporter.reset()
+        self.csvexporter.new_report()
 
-        # Ask the DB for the settings once at the start of processing so we got the
-        # same settings through the entire task
-        db_settings = self.db.get_settings()
-        self._customize(db_settings)
+        stage_start = time.monotonic()
+        context = self._create_processing_context()
+        self._customize(context.db_settings)
+        self.last_run_timings = {'snapshot': time.monotonic() - stage_start}
 
+        stage_start = time.monotonic()
         actions: List[TaxableAction] = list(trade_history)
         # If we got loans, we need to interleave them with the full history and re-sort
         if len(loan_history) != 0:
@@ -348,10 +406,15 @@ class Accountant():
         first_ts = Timestamp(0) if len(actions) == 0 else action_get_timestamp(actions[0])
         self.currently_processing_timestamp = first_ts
         self.first_processed_timestamp = first_ts
+        self.last_run_timings['sort'] = time.monotonic() - stage_start
+
+        stage_start = time.monotonic()
+        actions = self._filter_ignored_actions(actions=actions, context=context)
+        self.last_run_timings['filter'] = time.monotonic() - stage_start
 
+        stage_start = time.monotonic()
         prev_time = Timestamp(0)
         count = 0
-        ignored_actionids_mapping = self.db.get_ignored_action_ids(action_type=None)
         for action in actions:
             try:
                 (
@@ -362,8 +425,7 @@ class Accountant():
                     start_ts=start_ts,
                     end_ts=end_ts,
                     prev_time=prev_time,
-                    db_settings=db_settings,
-                    ignored_actionids_mapping=ignored_actionids_mapping,
+                    db_settings=context.db_settings,
                 )
             except PriceQueryUnsupportedAsset as e:
                 ts = action_get_timestamp(action)
@@ -422,6 +484,9 @@ class Accountant():
                 )
                 break
 
+        self.last_run_timings['replay'] = time.monotonic() - stage_start
+
+        stage_start = time.monotonic()
         sum_other_actions = (
             self.events.margin_positions_profit_loss +
             self.events.defi_profit_loss +
@@ -432,6 +497,7 @@ class Accountant():
             self.eth_transactions_gas_costs
         )
         total_taxable_pl = self.events.taxable_trade_profit_loss + sum_other_actions
+        self.csvexporter.flush_events()
         self.events.csv_exporter.maybe_add_summary(
             ledger_actions_profit_loss=self.events.ledger_actions_profit_loss,
             defi_profit_loss=self.events.defi_profit_loss,
@@ -443,6 +509,12 @@ class Accountant():
             taxable_trade_profit_loss=self.events.taxable_trade_profit_loss,
             total_taxable_profit_loss=total_taxable_pl,
         )
+        self.last_run_timings['summary'] = time.monotonic() - stage_start
+        log.info(
+            'End of history processing',
+            events_processed=count,
+            stage_seconds={stage: round(x, 3) for stage, x in self.last_run_timings.items()},
+        )
         return {
             'overview': {
                 'ledger_actions_profit_loss': str(self.events.ledger_actions_profit_loss),
@@ -463,14 +535,68 @@ class Accountant():
             'first_processed_timestamp': self.first_processed_timestamp,
             'events_processed': count,
             'events_limit': events_limit,
-            'all_events': self.csvexporter.all_events,
         }
 
+    def _create_processing_context(self) -> ProcessingContext:
+        """Ask the DB for the settings and ignore lists once at the start of processing
+        so we got the same ones through the entire task"""
+        return ProcessingContext(
+            db_settings=self.db.get_settings(),
+            ignored_assets=frozenset(self.db.get_ignored_assets()),
+            ignored_actionids_mapping={
+                action_type: frozenset(identifiers) for action_type, identifiers
+                in self.db.get_ignored_action_ids(action_type=None).items()
+            },
+        )
+
+    def _filter_ignored_actions(
+            self,
+            actions: List[TaxableAction],
+            context: ProcessingContext,
+    ) -> List[TaxableAction]:
+        """Drops the actions that involve an ignored asset or that the user asked to ignore
+
+        Actions whose assets can't be determined are kept so that processing
+        them warns the user.
+        """
+        if len(context.ignored_assets) == 0 and len(context.ignored_actionids_mapping) == 0:
+            return actions
+
+        filtered_actions = []
+        ignored_assets_num, ignored_actions_num = 0, 0
+        for action in actions:
+            try:
+                action_assets = action_get_assets(action)
+            except (UnknownAsset, UnsupportedAsset, UnprocessableTradePair):
+                filtered_actions.append(action)
+                continue
+
+            if not context.ignored_assets.isdisjoint(action_assets):
+                ignored_assets_num += 1
+                continue
+
+            should_ignore, _ = self._should_ignore_action(
+                action=action,
+                action_type=action_get_type(action),
+                ignored_actionids_mapping=context.ignored_actionids_mapping,
+            )
+            if should_ignore:
+                ignored_actions_num += 1
+                continue
+
+            filtered_actions.append(action)
+
+        log.debug(
+            f'Ignoring {ignored_assets_num} actions with ignored assets and '
+            f'{ignored_actions_num} actions the user asked to ignore',
+        )
+        return filtered_actions
+
     @staticmethod
     def _should_ignore_action(
             action: TaxableAction,
             action_type: str,
-            ignored_actionids_mapping: Dict[ActionType, List[str]],
+            ignored_actionids_mapping: Mapping[ActionType, Collection[str]],
     ) -> Tuple[bool, Optional[str]]:
         # TODO: These ifs/mappings of action type str to the enum
         # are only due to mix of new and old code. They should be removed and only
@@ -514,11 +640,12 @@ class Accountant():
             end_ts: Timestamp,
             prev_time: Timestamp,
             db_settings: DBSettings,
-            ignored_actionids_mapping: Dict[ActionType, List[str]],
     ) -> Tuple[bool, Timestamp]:
         """Processes each individual action and returns whether we should continue
         looping through the rest of the actions or not
 
+        Ignored actions should have already been filtered out by the caller.
+
         May raise:
         - PriceQueryUnsupportedAsset if from/to asset is missing from price oracles
         - NoPriceForGivenTimestamp if we can't find a price for the asset in the given
@@ -526,8 +653,6 @@ class Accountant():
         - RemoteError if there is a problem reaching the price oracle server
         or with reading the response returned by the server
         """
-        ignored_assets = self.db.get_ignored_assets()
-
         # Assert we are sorted in ascending time order.
         timestamp = action_get_timestamp(action)
         assert timestamp >= prev_time, (
@@ -546,8 +671,8 @@ class Accountant():
         self.currently_processing_timestamp = timestamp
         action_type = action_get_type(action)
 
-        try:
-            action_assets = action_get_assets(action)
+        try:  # make sure all assets of the action can be processed
+            action_get_assets(action)
         except UnknownAsset as e:
             self.msg_aggregator.add_warning(
                 f'At history processing found trade with unknown asset {e.asset_name}. '
@@ -567,26 +692,6 @@ class Accountant():
             )
             return True, prev_time
 
-        if any(x in ignored_assets for x in action_assets):
-            log.debug(
-                'Ignoring action with ignored asset',
-                action_type=action_type,
-                assets=[x.identifier for x in action_assets],
-            )
-            return True, prev_time
-
-        should_ignore, identifier = self._should_ignore_action(
-            action=action,
-            action_type=action_type,
-            ignored_actionids_mapping=ignored_actionids_mapping,
-        )
-        if should_ignore:
-            log.info(
-                f'Ignoring {action_type} action with identifier {identifier} '
-                f'at {timestamp} since the user asked to ignore it',
-            )
-            return True, prev_time
-
         if action_type == 'loan':
             action = cast(Loan, action)
             self.events.add_loan_gain(
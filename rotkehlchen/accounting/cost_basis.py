@@ -1,17 +1,19 @@
 import logging
 from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import Any, Callable, DefaultDict, Dict, List, NamedTuple, Optional
+from typing import TYPE_CHECKING, Any, Callable, DefaultDict, Dict, List, NamedTuple, Optional
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants.assets import A_ETH, A_WETH
 from rotkehlchen.constants.misc import ZERO
-from rotkehlchen.csv_exporter import CSVExporter
-from rotkehlchen.fval import FVal
+from rotkehlchen.fval import FIXED_POINT_DECIMALS, FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.typing import Location, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 
+if TYPE_CHECKING:
+    from rotkehlchen.csv_exporter import CSVExporter
+
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
@@ -26,6 +28,20 @@ class AssetAcquisitionEvent:
     rate: FVal  # Rate in profit currency for which we buy 1 unit of the buying asset
     # Fee rate in profit currency which we paid for each unit of the buying asset
     fee_rate: FVal
+    # remaining_amount and rate + fee_rate as fixed point integers. Only set and used
+    # if the calculator runs in fixed point mode
+    remaining_fixed: Optional[int] = field(
+        default=None,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    unit_cost_fixed: Optional[int] = field(
+        default=None,
+        init=False,
+        repr=False,
+        compare=False,
+    )
 
     def __post_init__(self) -> None:
         self.remaining_amount = self.amount
@@ -95,12 +111,6 @@ class MatchedAcquisition(NamedTuple):
         serialized_acquisition['used_amount'] = str(self.amount)
         return serialized_acquisition
 
-    def to_string(self, converter: Callable[[Timestamp], str]) -> str:
-        return (
-            f'{self.amount} / {self.event.amount} acquired in {str(self.event.location)}'
-            f' at {converter(self.event.timestamp)}'
-        )
-
 
 class CostBasisInfo(NamedTuple):
     """Information on the cost basis of a spend event
@@ -130,28 +140,54 @@ class CostBasisInfo(NamedTuple):
 
     def to_string(self, converter: Callable[[Timestamp], str]) -> str:
         """Turn to a string to be shown in exported files such as CSV"""
+        return self.serialized_to_string(self.serialize(), converter)
+
+    @staticmethod
+    def serialized_to_string(
+            serialized: Dict[str, Any],
+            converter: Callable[[Timestamp], str],
+    ) -> str:
+        """Turn the serialized form of a CostBasisInfo to the string of to_string()
+
+        Used to export the PnL report events which are stored serialized in the DB
+        """
         value = ''
-        if not self.is_complete:
+        if not serialized['is_complete']:
             value += 'Incomplete cost basis information for spend. '
 
-        if len(self.matched_acquisitions) == 0:
+        if len(serialized['matched_acquisitions']) == 0:
             return value
 
-        value += f'Used: {"|".join([x.to_string(converter) for x in self.matched_acquisitions])}'
+        acquisitions = '|'.join([
+            f'{x["used_amount"]} / {x["amount"]} acquired in {x["location"]}'
+            f' at {converter(x["time"])}'
+            for x in serialized['matched_acquisitions']
+        ])
+        value += f'Used: {acquisitions}'
         return value
 
 
 class CostBasisCalculator():
+    """Matches spends to acquisitions with the first-in-first-out rule
+
+    In fixed point mode the amounts of the acquisitions are matched as integers
+    scaled by 10**FIXED_POINT_DECIMALS and the costs are summed up with twice the
+    decimals, so that they are exact. FVals are only created for what is returned.
+    Results are the same as with FVals up to FIXED_POINT_DECIMALS decimals of the
+    amounts and of the rates.
+    """
 
     def __init__(
             self,
-            csv_exporter: CSVExporter,
+            csv_exporter: 'CSVExporter',
             profit_currency: Asset,
             msg_aggregator: MessagesAggregator,
+            fixed_point: bool = False,
     ) -> None:
         self._taxfree_after_period: Optional[int] = None
         self.csv_exporter = csv_exporter
         self.msg_aggregator = msg_aggregator
+        self.fixed_point = fixed_point
         self.reset(profit_currency)
 
     def reset(self, profit_currency: Asset) -> None:
@@ -211,6 +247,9 @@ class CostBasisCalculator():
         if len(asset_events.acquisitions) == 0:
             return False
 
+        if self.fixed_point:
+            return self._reduce_asset_amount_fixed_point(asset_events, amount)
+
         remaining_amount_from_last_buy = FVal('-1')
         remaining_amount = amount
         for idx, acquisition_event in enumerate(asset_events.acquisitions):
@@ -303,6 +342,13 @@ class CostBasisCalculator():
         Returns the information in a CostBasisInfo object if enough acquisitions have
         been found.
         """
+        if self.fixed_point:
+            return self._calculate_spend_cost_basis_fixed_point(
+                spending_amount=spending_amount,
+                spending_asset=spending_asset,
+                timestamp=timestamp,
+            )
+
         remaining_sold_amount = spending_amount
         stop_index = -1
         taxfree_bought_cost = ZERO
@@ -423,6 +469,149 @@ class CostBasisCalculator():
             is_complete=is_complete,
         )
 
+    @staticmethod
+    def _fixed_point_remaining(event: AssetAcquisitionEvent) -> int:
+        """Returns the remaining amount of the acquisition as a fixed point integer"""
+        if event.remaining_fixed is None:
+            event.remaining_fixed = event.remaining_amount.to_fixed_point()
+            event.unit_cost_fixed = (event.rate + event.fee_rate).to_fixed_point()
+        return event.remaining_fixed
+
+    @staticmethod
+    def _set_fixed_point_remaining(event: AssetAcquisitionEvent, value: int) -> None:
+        event.remaining_fixed = value
+        event.remaining_amount = FVal.from_fixed_point(value)
+
+    def _reduce_asset_amount_fixed_point(
+            self,
+            asset_events: CostBasisEvents,
+            amount: FVal,
+    ) -> bool:
+        """Same as reduce_asset_amount() but with fixed point integers"""
+        acquisitions = asset_events.acquisitions
+        remaining_amount = amount.to_fixed_point()
+        stop_index = len(acquisitions)
+        remaining_amount_from_last_buy = None
+        for idx, acquisition_event in enumerate(acquisitions):
+            acquisition_remaining = self._fixed_point_remaining(acquisition_event)
+            if remaining_amount < acquisition_remaining:
+                stop_index = idx
+                remaining_amount_from_last_buy = acquisition_remaining - remaining_amount
+                break
+
+            remaining_amount -= acquisition_remaining
+
+        del acquisitions[:stop_index]
+        if remaining_amount_from_last_buy is not None:
+            self._set_fixed_point_remaining(acquisitions[0], remaining_amount_from_last_buy)
+        elif remaining_amount != 0:
+            return False
+
+        return True
+
+    def _calculate_spend_cost_basis_fixed_point(
+            self,
+            spending_amount: FVal,
+            spending_asset: Asset,
+            timestamp: Timestamp,
+    ) -> CostBasisInfo:
+        """Same as calculate_spend_cost_basis() but with fixed point integers"""
+        asset_events = self.get_events(spending_asset)
+        acquisitions = asset_events.acquisitions
+        if len(acquisitions) == 0:
+            self.inform_user_missing_acquisition(spending_asset, timestamp)
+            return CostBasisInfo(
+                taxable_amount=spending_amount,
+                taxable_bought_cost=ZERO,
+                taxfree_bought_cost=ZERO,
+                matched_acquisitions=[],
+                is_complete=False,
+            )
+
+        remaining_sold_amount = spending_amount.to_fixed_point()
+        stop_index = len(acquisitions)
+        taxfree_bought_cost, taxable_bought_cost = 0, 0
+        taxfree_amount, taxable_amount = 0, 0
+        remaining_amount_from_last_buy = None
+        matched_acquisitions = []
+        for idx, acquisition_event in enumerate(acquisitions):
+            at_taxfree_period = (
+                self.taxfree_after_period is not None and
+                acquisition_event.timestamp + self.taxfree_after_period < timestamp
+            )
+            acquisition_remaining = self._fixed_point_remaining(acquisition_event)
+            used_amount = min(remaining_sold_amount, acquisition_remaining)
+            # unit cost is set along with the remaining amount
+            buying_cost = used_amount * acquisition_event.unit_cost_fixed  # type: ignore
+            if at_taxfree_period:
+                taxfree_amount += used_amount
+                taxfree_bought_cost += buying_cost
+            else:
+                taxable_amount += used_amount
+                taxable_bought_cost += buying_cost
+
+            if used_amount == acquisition_remaining:
+                matched_amount = acquisition_event.remaining_amount
+            else:
+                matched_amount = FVal.from_fixed_point(used_amount)
+            matched_acquisitions.append(MatchedAcquisition(
+                amount=matched_amount,
+                event=acquisition_event,
+            ))
+            log.debug(
+                'Spend uses up historical acquisition',
+                tax_status='TAX-FREE' if at_taxfree_period else 'TAXABLE',
+                used_amount=matched_amount,
+                from_amount=acquisition_event.amount,
+                asset=spending_asset,
+                acquisition_rate=acquisition_event.rate,
+                profit_currency=self.profit_currency,
+                time=acquisition_event.timestamp,
+            )
+            if remaining_sold_amount < acquisition_remaining:
+                stop_index = idx
+                remaining_amount_from_last_buy = acquisition_remaining - remaining_sold_amount
+                # stop iterating since we found all acquisitions to satisfy this spend
+                break
+
+            remaining_sold_amount -= acquisition_remaining
+            # and since this events is going to be removed, reduce its remaining to zero
+            acquisition_event.remaining_fixed = 0
+            acquisition_event.remaining_amount = ZERO
+
+        is_complete = True
+        asset_events.used_acquisitions.extend(acquisitions[:stop_index])
+        del acquisitions[:stop_index]
+        if remaining_amount_from_last_buy is not None:
+            self._set_fixed_point_remaining(acquisitions[0], remaining_amount_from_last_buy)
+            taxable_amount_result = FVal.from_fixed_point(taxable_amount)
+        elif remaining_sold_amount != 0:
+            # we only found acquisitions to partially satisfy the sell
+            self.inform_user_missing_acquisition(
+                asset=spending_asset,
+                time=timestamp,
+                found_amount=FVal.from_fixed_point(taxable_amount + taxfree_amount),
+                missing_amount=FVal.from_fixed_point(remaining_sold_amount),
+            )
+            taxable_amount_result = spending_amount - FVal.from_fixed_point(taxfree_amount)
+            is_complete = False
+        else:
+            taxable_amount_result = FVal.from_fixed_point(taxable_amount)
+
+        return CostBasisInfo(
+            taxable_amount=taxable_amount_result,
+            taxable_bought_cost=FVal.from_fixed_point(
+                taxable_bought_cost,
+                decimals=2 * FIXED_POINT_DECIMALS,
+            ),
+            taxfree_bought_cost=FVal.from_fixed_point(
+                taxfree_bought_cost,
+                decimals=2 * FIXED_POINT_DECIMALS,
+            ),
+            matched_acquisitions=matched_acquisitions,
+            is_complete=is_complete,
+        )
+
     def get_calculated_asset_amount(self, asset: Asset) -> Optional[FVal]:
         """Get the amount of asset accounting has calculated we should have after
         the history has been processed
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Optional
+from typing import FrozenSet, Optional
 
 from rotkehlchen.accounting.cost_basis import CostBasisCalculator
 from rotkehlchen.accounting.ledger_actions import LedgerAction, LedgerActionType
@@ -33,8 +33,12 @@ class TaxableEvents():
         self.msg_aggregator = msg_aggregator
         self.profit_currency = profit_currency
         # later customized via accountant._customize()
-        self.taxable_ledger_actions: List[LedgerActionType] = []
-        self.cost_basis = CostBasisCalculator(csv_exporter, profit_currency, msg_aggregator)
+        self.taxable_ledger_actions: FrozenSet[LedgerActionType] = frozenset()
+        self.cost_basis = CostBasisCalculator(
+            csv_exporter=csv_exporter,
+            profit_currency=profit_currency,
+            msg_aggregator=msg_aggregator,
+        )
 
         # If this flag is True when your asset is being forcefully sold as a
         # loan/margin settlement then profit/loss is also calculated before the entire
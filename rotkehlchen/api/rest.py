@@ -24,13 +24,13 @@ from uuid import uuid4
 import gevent
 from flask import Response, make_response, send_file
 from gevent.event import Event
-from gevent.lock import Semaphore
 from pysqlcipher3 import dbapi2 as sqlcipher
 from typing_extensions import Literal
 from web3.exceptions import BadFunctionCallOutput
 
 from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.accounting.structures import ActionType, Balance, BalanceType
+from rotkehlchen.api.tasks import AsyncTasksRegistry
 from rotkehlchen.api.v1.encoding import TradeSchema
 from rotkehlchen.assets.asset import Asset, EthereumToken
 from rotkehlchen.assets.resolver import AssetResolver
@@ -53,9 +53,10 @@ from rotkehlchen.constants.assets import A_ETH
 from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.constants.resolver import ethaddress_to_identifier
 from rotkehlchen.db.ethtx import DBEthTx
-from rotkehlchen.db.filtering import ETHTransactionsFilterQuery
+from rotkehlchen.db.filtering import ETHTransactionsFilterQuery, PnlEventsFilterQuery
 from rotkehlchen.db.ledger_actions import DBLedgerActions
 from rotkehlchen.db.queried_addresses import QueriedAddresses
+from rotkehlchen.db.reports import DBReports
 from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.db.utils import DBAssetBalance, LocationData
 from rotkehlchen.errors import (
@@ -115,13 +116,15 @@ from rotkehlchen.typing import (
     Timestamp,
     TradeType,
 )
+from rotkehlchen.utils.metrics import Counter, Gauge, Metric, metrics_registry, run_timed_task
 from rotkehlchen.utils.misc import combine_dicts
+from rotkehlchen.utils.rate_limit import rate_limiter
 from rotkehlchen.utils.version_check import check_if_version_up_to_date
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.bitcoin.xpub import XpubData
     from rotkehlchen.db.dbhandler import DBHandler
-    from rotkehlchen.exchanges.kraken import KrakenAccountType
+    from rotkehlchen.exchanges.data_structures import KrakenAccountType
 
 
 logger = logging.getLogger(__name__)
@@ -231,23 +234,14 @@ class RestAPI():
         mainloop_greenlet.link_exception(self._handle_killed_greenlets)
         # Greenlets that will be waited for when we shutdown (just main loop)
         self.waited_greenlets = [mainloop_greenlet]
-        self.task_lock = Semaphore()
-        self.task_id = 0
-        self.task_results: Dict[int, Any] = {}
+        self.tasks = AsyncTasksRegistry(
+            greenlets=self.rotkehlchen.api_task_greenlets,
+            spill_to_disk=True,
+        )
 
         self.trade_schema = TradeSchema()
 
     # - Private functions not exposed to the API
-    def _new_task_id(self) -> int:
-        with self.task_lock:
-            task_id = self.task_id
-            self.task_id += 1
-        return task_id
-
-    def _write_task_result(self, task_id: int, result: Any) -> None:
-        with self.task_lock:
-            self.task_results[task_id] = result
-
     def _handle_killed_greenlets(self, greenlet: gevent.Greenlet) -> None:
         if not greenlet.exception:
             log.warning('handle_killed_greenlets without an exception')
@@ -276,15 +270,15 @@ class RestAPI():
                 'result': None,
                 'message': f'The backend query task died unexpectedly: {str(greenlet.exception)}',
             }
-            self._write_task_result(task_id, result)
+            self.tasks.set_result(task_id, result)
 
     def _do_query_async(self, command: str, task_id: int, **kwargs: Any) -> None:
         log.debug(f'Async task with task id {task_id} started')
-        result = getattr(self, command)(**kwargs)
-        self._write_task_result(task_id, result)
+        result = run_timed_task(getattr(self, command), **kwargs)
+        self.tasks.set_result(task_id, result)
 
     def _query_async(self, command: str, **kwargs: Any) -> Response:
-        task_id = self._new_task_id()
+        task_id = self.tasks.new_task_id()
         greenlet = gevent.spawn(
             self._do_query_async,
             command,
@@ -293,7 +287,7 @@ class RestAPI():
         )
         greenlet.task_id = task_id
         greenlet.link_exception(self._handle_killed_greenlets)
-        self.rotkehlchen.api_task_greenlets.append(greenlet)
+        self.tasks.add(task_id=task_id, command=command, greenlet=greenlet)
         return api_response(_wrap_in_ok_result({'task_id': task_id}), status_code=HTTPStatus.OK)
 
     # - Public functions not exposed via the rest api
@@ -302,7 +296,7 @@ class RestAPI():
         log.debug('Waiting for greenlets')
         gevent.wait(self.waited_greenlets)
         log.debug('Waited for greenlets. Killing all other greenlets')
-        gevent.killall(self.rotkehlchen.api_task_greenlets)
+        self.tasks.clear()
         log.debug('Greenlets killed. Killing zerorpc greenlet')
         log.debug('Shutdown completed')
         logging.shutdown()
@@ -329,49 +323,25 @@ class RestAPI():
     def query_tasks_outcome(self, task_id: Optional[int]) -> Response:
         if task_id is None:
             # If no task id is given return list of all pending and completed tasks
-            completed = []
-            pending = []
-            for greenlet in self.rotkehlchen.api_task_greenlets:
-                task_id = greenlet.task_id
-                if task_id in self.task_results:
-                    completed.append(task_id)
-                else:
-                    pending.append(task_id)
-
+            pending, completed = self.tasks.list_tasks()
             result = _wrap_in_ok_result({'pending': pending, 'completed': completed})
             return api_response(result=result, status_code=HTTPStatus.OK)
 
-        with self.task_lock:
-            for idx, greenlet in enumerate(self.rotkehlchen.api_task_greenlets):
-                if greenlet.task_id == task_id:
-                    if task_id in self.task_results:
-                        # Task has completed and we just got the outcome
-                        function_response = self.task_results.pop(int(task_id), None)
-                        # The result of the original request
-                        result = function_response['result']
-                        # The message of the original request
-                        message = function_response['message']
-                        status_code = function_response.get('status_code')
-                        ret = {'result': result, 'message': message}
-                        returned_task_result = {
-                            'status': 'completed',
-                            'outcome': process_result(ret),
-                        }
-                        if status_code:
-                            returned_task_result['status_code'] = status_code
-                        result_dict = {
-                            'result': returned_task_result,
-                            'message': '',
-                        }
-                        # Also remove the greenlet from the api tasks
-                        self.rotkehlchen.api_task_greenlets.pop(idx)
-                        return api_response(result=result_dict, status_code=HTTPStatus.OK)
-                    # else task is still pending and the greenlet is running
-                    result_dict = {
-                        'result': {'status': 'pending', 'outcome': None},
-                        'message': f'The task with id {task_id} is still pending',
-                    }
-                    return api_response(result=result_dict, status_code=HTTPStatus.OK)
+        status, outcome, status_code = self.tasks.pop_result(task_id)
+        if status == 'completed':
+            # Task has completed and we just got the outcome
+            returned_task_result: Dict[str, Any] = {'status': 'completed', 'outcome': outcome}
+            if status_code:
+                returned_task_result['status_code'] = status_code
+            result_dict = {'result': returned_task_result, 'message': ''}
+            return api_response(result=result_dict, status_code=HTTPStatus.OK)
+
+        if status == 'pending':
+            result_dict = {
+                'result': {'status': 'pending', 'outcome': None},
+                'message': f'The task with id {task_id} is still pending',
+            }
+            return api_response(result=result_dict, status_code=HTTPStatus.OK)
 
         # The task has not been found
         result_dict = {
@@ -380,6 +350,16 @@ class RestAPI():
         }
         return api_response(result=result_dict, status_code=HTTPStatus.NOT_FOUND)
 
+    @require_loggedin_user()
+    def cancel_task(self, task_id: int) -> Response:
+        if self.tasks.cancel(task_id) is False:
+            return api_response(
+                wrap_in_fail_result(f'No task with id {task_id} found'),
+                status_code=HTTPStatus.NOT_FOUND,
+            )
+
+        return api_response(_wrap_in_ok_result(True), status_code=HTTPStatus.OK)
+
     def _get_exchange_rates(self, given_currencies: List[Asset]) -> Dict[str, Any]:
         currencies = given_currencies
         fiat_currencies = []
@@ -1248,9 +1228,7 @@ class RestAPI():
         #    All results would be discarded anyway since we are logging out.
         # 2. Have an intricate stop() notification system for each greenlet, but
         #   that is going to get complicated fast.
-        gevent.killall(self.rotkehlchen.api_task_greenlets)
-        with self.task_lock:
-            self.task_results = {}
+        self.tasks.clear()
         self.rotkehlchen.logout()
         result_dict['result'] = True
         return api_response(result_dict, status_code=HTTPStatus.OK)
@@ -1633,9 +1611,26 @@ class RestAPI():
         result_dict = _wrap_in_result(result=process_result(result), message=msg)
         return api_response(result_dict, status_code=status_code)
 
+    @require_loggedin_user()
+    def get_processed_history_events(self, filter_query: PnlEventsFilterQuery) -> Response:
+        dbreports = DBReports(self.rotkehlchen.data.db)
+        try:
+            entries, entries_found = dbreports.get_pnl_events(filter_query=filter_query)
+        except sqlcipher.OperationalError as e:  # pylint: disable=no-member
+            return api_response(wrap_in_fail_result(str(e)), status_code=HTTPStatus.BAD_REQUEST)
+
+        result = {
+            'entries': entries,
+            'entries_found': entries_found,
+            'entries_total': self.rotkehlchen.data.db.get_entries_count(
+                entries_table='pnl_events',
+            ),
+        }
+        return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
+
     @require_loggedin_user()
     def export_processed_history_csv(self, directory_path: Path) -> Response:
-        if len(self.rotkehlchen.accountant.csvexporter.all_events_csv) == 0:
+        if self.rotkehlchen.accountant.csvexporter.all_events_num == 0:
             result_dict = wrap_in_fail_result('No history processed in order to perform an export')
             return api_response(result_dict, status_code=HTTPStatus.CONFLICT)
 
@@ -1650,28 +1645,21 @@ class RestAPI():
 
     @require_loggedin_user()
     def download_processed_history_csv(self) -> Response:
-        if len(self.rotkehlchen.accountant.csvexporter.all_events_csv) == 0:
+        if self.rotkehlchen.accountant.csvexporter.all_events_num == 0:
             result_dict = wrap_in_fail_result('No history processed in order to perform an export')
             return api_response(result_dict, status_code=HTTPStatus.CONFLICT)
 
-        try:
-            zipfile = self.rotkehlchen.accountant.csvexporter.create_zip()
-            if zipfile is None:
-                return api_response(
-                    wrap_in_fail_result('Could not create a zip archive'),
-                    status_code=HTTPStatus.NOT_FOUND,
-                )
-            return send_file(
-                path_or_file=zipfile,
-                mimetype='application/zip',
-                as_attachment=True,
-                download_name='report.zip',
-            )
-        except FileNotFoundError:
+        zip_stream = self.rotkehlchen.accountant.csvexporter.create_zip()
+        if zip_stream is None:
             return api_response(
-                wrap_in_fail_result('No file was found'),
+                wrap_in_fail_result('Could not create a zip archive'),
                 status_code=HTTPStatus.NOT_FOUND,
             )
+        return Response(
+            zip_stream,
+            mimetype='application/zip',
+            headers={'Content-Disposition': 'attachment; filename=report.zip'},
+        )
 
     @require_loggedin_user()
     def get_history_status(self) -> Response:
@@ -2090,6 +2078,102 @@ class RestAPI():
     def ping() -> Response:
         return api_response(_wrap_in_ok_result(True), status_code=HTTPStatus.OK)
 
+    def _collect_runtime_metrics(self) -> List[Metric]:
+        """Metrics of the state of the backend, read at the time of the scrape"""
+        async_tasks = Gauge('rotki_async_tasks', 'Async tasks of the API', ('status',))
+        tasks_metrics = self.tasks.metrics()
+        for status in ('pending', 'completed'):
+            async_tasks.set(
+                len([x for x in tasks_metrics['tasks'] if x['status'] == status]),
+                status=status,
+            )
+        results_memory = Gauge(
+            'rotki_async_tasks_results_memory_bytes',
+            'Bytes of the async task results kept in memory',
+        )
+        results_memory.set(tasks_metrics['results_memory_bytes'])
+        dropped_results = Counter(
+            'rotki_async_tasks_dropped_results_total',
+            'Async task results dropped before being queried',
+            ('reason',),
+        )
+        dropped_results.inc(tasks_metrics['expired_results'], reason='expired')
+        dropped_results.inc(tasks_metrics['evicted_results'], reason='evicted')
+        greenlets = Gauge('rotki_tracked_greenlets', 'Running greenlets of background tasks')
+        greenlets.set(len([x for x in self.rotkehlchen.greenlet_manager.greenlets if not x.dead]))
+        metrics: List[Metric] = [async_tasks, results_memory, dropped_results, greenlets]
+
+        notifier_stats = self.rotkehlchen.rotki_notifier.stats()
+        ws_queued = Gauge('rotki_websocket_queued_messages', 'Messages waiting to be sent')
+        ws_queued.set(notifier_stats['queued'])
+        ws_messages = Counter(
+            'rotki_websocket_messages_total',
+            'Messages handled by the websocket senders',
+            ('outcome',),
+        )
+        for outcome in ('sent', 'coalesced', 'dropped'):
+            ws_messages.inc(notifier_stats[outcome], outcome=outcome)
+        metrics.extend([ws_queued, ws_messages])
+
+        if AssetResolver.last_warmup_duration is not None:
+            warmup = Gauge(
+                'rotki_assets_cache_warmup_seconds',
+                'Duration of the last warmup of the assets cache',
+            )
+            warmup.set(AssetResolver.last_warmup_duration)
+            metrics.append(warmup)
+
+        limiter_requests = Counter(
+            'rotki_rate_limited_requests_total',
+            'Requests paced by the rate limiter',
+            ('key',),
+        )
+        limiter_throttled = Counter(
+            'rotki_rate_limited_throttled_requests_total',
+            'Requests that had to wait for the rate limiter',
+            ('key',),
+        )
+        limiter_waited = Counter(
+            'rotki_rate_limited_waited_seconds_total',
+            'Seconds requests waited for the rate limiter',
+            ('key',),
+        )
+        for key, stats in rate_limiter.stats().items():
+            limiter_requests.inc(stats['requests'], key=key)
+            limiter_throttled.inc(stats['throttled'], key=key)
+            limiter_waited.inc(stats['waited_secs'], key=key)
+        metrics.extend([limiter_requests, limiter_throttled, limiter_waited])
+
+        if self.rotkehlchen.user_is_logged_in:
+            node_requests = Counter(
+                'rotki_ethereum_node_requests_total',
+                'Requests made to each ethereum node',
+                ('node', 'outcome'),
+            )
+            node_latency = Gauge(
+                'rotki_ethereum_node_latency_seconds',
+                'Moving average of the latency of each ethereum node',
+                ('node',),
+            )
+            for node, stats in self.rotkehlchen.chain_manager.ethereum.get_nodes_stats().items():
+                node_requests.inc(stats['requests'] - stats['failures'], node=node, outcome='success')  # noqa: E501
+                node_requests.inc(stats['failures'], node=node, outcome='failure')
+                if stats['latency'] is not None:
+                    node_latency.set(stats['latency'], node=node)
+            metrics.extend([node_requests, node_latency])
+
+        return metrics
+
+    def get_metrics(self) -> Response:
+        data = metrics_registry.render(extra_metrics=self._collect_runtime_metrics())
+        return make_response(
+            (
+                data,
+                HTTPStatus.OK,
+                {"mimetype": "text/plain", "Content-Type": "text/plain; version=0.0.4"},
+            ),
+        )
+
     @require_loggedin_user()
     def import_data(
             self,
@@ -2360,6 +2444,11 @@ class RestAPI():
         result_dict = _wrap_in_result(result, msg)
         return api_response(result_dict, status_code=status_code)
 
+    @require_loggedin_user()
+    def get_ethereum_nodes_stats(self) -> Response:
+        result = self.rotkehlchen.chain_manager.ethereum.get_nodes_stats()
+        return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
+
     @require_loggedin_user()
     def purge_module_data(self, module_name: Optional[ModuleName]) -> Response:
         self.rotkehlchen.data.db.purge_module_data(module_name)
@@ -1,10 +1,11 @@
 import json
 import logging
+import time
 from http import HTTPStatus
 from typing import Any, Dict, List, Optional, Tuple, Union
 
 import werkzeug
-from flask import Flask, Response
+from flask import Flask, Response, g, request
 from flask_cors import CORS
 from flask_restful import Api, Resource, abort
 from gevent.pywsgi import WSGIServer
@@ -54,6 +55,7 @@ from rotkehlchen.api.v1.resources import (
     EthereumAssetsResource,
     EthereumModuleDataResource,
     EthereumModuleResource,
+    EthereumNodesStatsResource,
     EthereumTransactionsResource,
     ExchangeBalancesResource,
     ExchangeRatesResource,
@@ -64,6 +66,7 @@ from rotkehlchen.api.v1.resources import (
     GitcoinReportResource,
     HistoricalAssetsPriceResource,
     HistoryDownloadingResource,
+    HistoryEventsResource,
     HistoryExportingResource,
     HistoryProcessingResource,
     HistoryStatusResource,
@@ -83,6 +86,7 @@ from rotkehlchen.api.v1.resources import (
     MakerdaoVaultsResource,
     ManuallyTrackedBalancesResource,
     MessagesResource,
+    MetricsResource,
     NamedEthereumModuleDataResource,
     NamedOracleCacheResource,
     NFTSBalanceResource,
@@ -120,6 +124,7 @@ from rotkehlchen.api.v1.resources import (
 )
 from rotkehlchen.api.websockets.notifier import RotkiNotifier, RotkiWSApp
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.utils.metrics import API_REQUEST_DURATION
 
 URLS = List[
     Union[
@@ -175,6 +180,7 @@ URLS_V1: URLS = [
     ('/periodic/', PeriodicDataResource),
     ('/history/', HistoryProcessingResource),
     ('/history/status', HistoryStatusResource),
+    ('/history/events', HistoryEventsResource),
     ('/history/export/', HistoryExportingResource),
     ('/history/download/', HistoryDownloadingResource),
     ('/queried_addresses', QueriedAddressesResource),
@@ -189,6 +195,7 @@ URLS_V1: URLS = [
     ('/blockchains/ETH2/stake/details', Eth2StakeDetailsResource),
     ('/blockchains/ETH/defi', DefiBalancesResource),
     ('/blockchains/ETH/airdrops', EthereumAirdropsResource),
+    ('/blockchains/ETH/nodes/stats', EthereumNodesStatsResource),
     ('/blockchains/ETH/erc20details/', ERC20TokenInfo),
     ('/blockchains/ETH/modules/<string:module_name>/data', NamedEthereumModuleDataResource),
     ('/blockchains/ETH/modules/data', EthereumModuleDataResource),
@@ -243,6 +250,7 @@ URLS_V1: URLS = [
     ('/actions/ignored', IgnoredActionsResource),
     ('/info', InfoResource),
     ('/ping', PingResource),
+    ('/metrics', MetricsResource),
     ('/import', DataImportResource),
     ('/gitcoin/events', GitcoinEventsResource),
     ('/gitcoin/report', GitcoinReportResource),
@@ -278,6 +286,24 @@ def setup_urls(
         )
 
 
+def start_request_timer() -> None:
+    g.request_start = time.perf_counter()
+
+
+def record_request_duration(response: Response) -> Response:
+    """Records the duration of each request per route, so that URL arguments such
+    as addresses don't make a separate series"""
+    start = g.get('request_start')
+    if start is not None:
+        API_REQUEST_DURATION.observe(
+            time.perf_counter() - start,
+            endpoint=request.url_rule.rule if request.url_rule is not None else 'unknown',
+            method=request.method,
+            status=response.status_code,
+        )
+    return response
+
+
 def endpoint_not_found(e: NotFound) -> Response:
     msg = 'invalid endpoint'
     # The isinstance check is because I am not sure if `e` is always going to
@@ -340,6 +366,8 @@ class APIServer():
         self.flask_app.register_blueprint(self.blueprint)
         self.ws_server: Optional[WebSocketServer] = None
 
+        self.flask_app.before_request(start_request_timer)
+        self.flask_app.after_request(record_request_duration)
         self.flask_app.errorhandler(HTTPStatus.NOT_FOUND)(endpoint_not_found)  # type: ignore
         self.flask_app.register_error_handler(Exception, self.unhandled_exception)  # type: ignore
 
@@ -0,0 +1,277 @@
+import json
+import logging
+import shutil
+import time
+from pathlib import Path
+from tempfile import mkdtemp
+from typing import Any, Dict, List, Optional, Tuple
+
+import gevent
+from gevent.lock import Semaphore
+from typing_extensions import Literal
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.serialization.serialize import process_result
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# Seconds for which the result of a finished task is kept if nobody queries it
+ASYNC_TASK_RESULT_TTL_SECS = 1800
+# Maximum bytes of serialized task results kept in memory. Above it the oldest are evicted
+ASYNC_TASKS_MAX_MEMORY_BYTES = 200 * 1024 * 1024
+# Serialized task results of at least that many bytes are written to disk if spilling is on
+ASYNC_TASK_SPILL_THRESHOLD_BYTES = 10 * 1024 * 1024
+
+TaskStatus = Literal['pending', 'completed', 'not-found']
+
+
+class AsyncTask():
+
+    def __init__(self, task_id: int, command: str, greenlet: gevent.Greenlet) -> None:
+        self.task_id = task_id
+        self.command = command
+        self.greenlet = greenlet
+        self.started_at = time.monotonic()
+        self.finished_at: Optional[float] = None
+        self.status_code: Optional[int] = None
+        self.result_size = 0
+        self.result_data: Optional[bytes] = None
+        self.result_path: Optional[Path] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def runtime(self) -> float:
+        end = time.monotonic() if self.finished_at is None else self.finished_at
+        return end - self.started_at
+
+    def serialize_metrics(self) -> Dict[str, Any]:
+        return {
+            'task_id': self.task_id,
+            'command': self.command,
+            'status': 'completed' if self.finished else 'pending',
+            'runtime': round(self.runtime, 3),
+            'result_size': self.result_size,
+            'spilled_to_disk': self.result_path is not None,
+        }
+
+
+class AsyncTasksRegistry():
+    """Keeps track of the async tasks of the API and their results until they are queried
+
+    Results are serialized as soon as a task finishes so that their size is known.
+    Results that nobody queried for ASYNC_TASK_RESULT_TTL_SECS are dropped and if
+    the results in memory exceed the memory budget the oldest ones are evicted.
+    If spilling to disk is enabled, big results are kept in a temporary directory
+    instead of in memory.
+    """
+
+    def __init__(
+            self,
+            greenlets: List[gevent.Greenlet],
+            spill_to_disk: bool = False,
+            ttl_secs: int = ASYNC_TASK_RESULT_TTL_SECS,
+            max_memory_bytes: int = ASYNC_TASKS_MAX_MEMORY_BYTES,
+            spill_threshold_bytes: int = ASYNC_TASK_SPILL_THRESHOLD_BYTES,
+    ) -> None:
+        # The list of running greenlets is shared with the task manager
+        self.greenlets = greenlets
+        self.spill_to_disk = spill_to_disk
+        self.ttl_secs = ttl_secs
+        self.max_memory_bytes = max_memory_bytes
+        self.spill_threshold_bytes = spill_threshold_bytes
+        self.lock = Semaphore()
+        self.next_task_id = 0
+        self.tasks: Dict[int, AsyncTask] = {}
+        self.memory_bytes = 0
+        self.spill_dir: Optional[Path] = None
+        self.expired_num = 0
+        self.evicted_num = 0
+
+    def new_task_id(self) -> int:
+        with self.lock:
+            task_id = self.next_task_id
+            self.next_task_id += 1
+        return task_id
+
+    def add(self, task_id: int, command: str, greenlet: gevent.Greenlet) -> None:
+        with self.lock:
+            self._expire()
+            self.tasks[task_id] = AsyncTask(task_id=task_id, command=command, greenlet=greenlet)
+            self.greenlets.append(greenlet)
+
+    def _remove(self, task: AsyncTask) -> None:
+        """Forgets a task and frees its result. Lock should be held by the caller"""
+        self.tasks.pop(task.task_id, None)
+        if task.result_data is not None:
+            self.memory_bytes -= task.result_size
+            task.result_data = None
+        if task.result_path is not None:
+            try:
+                task.result_path.unlink()
+            except FileNotFoundError:
+                pass
+            task.result_path = None
+        try:
+            self.greenlets.remove(task.greenlet)
+        except ValueError:
+            pass
+
+    def _expire(self) -> None:
+        """Drops the results that were not queried in time. Lock should be held by the caller"""
+        now = time.monotonic()
+        expired = [
+            x for x in self.tasks.values()
+            if x.finished_at is not None and now - x.finished_at > self.ttl_secs
+        ]
+        for task in expired:
+            log.warning(
+                f'Dropping result of async task {task.task_id} for {task.command} since it '
+                f'was not queried for {self.ttl_secs} seconds',
+            )
+            self._remove(task)
+            self.expired_num += 1
+
+    def _evict(self, keep_task_id: int) -> None:
+        """Evicts the oldest results in memory until they fit the memory budget
+
+        The result of the task with keep_task_id is never evicted. Lock should be
+        held by the caller.
+        """
+        in_memory = sorted(
+            (x for x in self.tasks.values() if x.result_data is not None and x.task_id != keep_task_id),  # noqa: E501
+            key=lambda x: x.finished_at,  # type: ignore  # only finished have result data
+        )
+        for task in in_memory:
+            if self.memory_bytes <= self.max_memory_bytes:
+                break
+            log.warning(
+                f'Evicting result of async task {task.task_id} for {task.command} of '
+                f'{task.result_size} bytes since task results exceed the memory budget',
+            )
+            self._remove(task)
+            self.evicted_num += 1
+
+    def _spill(self, task: AsyncTask, data: bytes) -> bool:
+        """Writes the serialized result of a task to disk. Returns False if it failed"""
+        try:
+            if self.spill_dir is None:
+                self.spill_dir = Path(mkdtemp(prefix='rotki_tasks_'))
+            path = self.spill_dir / f'task_{task.task_id}.json'
+            path.write_bytes(data)
+        except OSError as e:
+            log.error(f'Could not write result of async task {task.task_id} to disk: {str(e)}')
+            return False
+
+        task.result_path = path
+        return True
+
+    def set_result(self, task_id: int, result: Dict[str, Any]) -> None:
+        """Serializes and stores the result of a task
+
+        The result is the response dict of the original endpoint, with result, message
+        and an optional status_code.
+        """
+        data = json.dumps(process_result({
+            'result': result['result'],
+            'message': result['message'],
+        })).encode()
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is None:  # task got cancelled
+                return
+
+            task.finished_at = time.monotonic()
+            task.status_code = result.get('status_code')
+            task.result_size = len(data)
+            try:
+                self.greenlets.remove(task.greenlet)
+            except ValueError:
+                pass
+
+            spilled = (
+                self.spill_to_disk and
+                task.result_size >= self.spill_threshold_bytes and
+                self._spill(task, data)
+            )
+            if not spilled:
+                task.result_data = data
+                self.memory_bytes += task.result_size
+                self._evict(keep_task_id=task_id)
+
+            log.debug(
+                f'Async task {task_id} for {task.command} finished',
+                runtime=round(task.runtime, 3),
+                result_size=task.result_size,
+                spilled_to_disk=task.result_path is not None,
+            )
+            self._expire()
+
+    def pop_result(self, task_id: int) -> Tuple[TaskStatus, Optional[Dict[str, Any]], Optional[int]]:  # noqa: E501
+        """Returns the status of a task, and if completed its outcome and status code
+
+        A completed task is forgotten once its outcome is returned.
+        """
+        with self.lock:
+            self._expire()
+            task = self.tasks.get(task_id)
+            if task is None:
+                return 'not-found', None, None
+            if not task.finished:
+                return 'pending', None, None
+
+            if task.result_path is not None:
+                data = task.result_path.read_bytes()
+            else:
+                data = task.result_data  # type: ignore  # finished tasks have one of the two
+            self._remove(task)
+
+        return 'completed', json.loads(data), task.status_code
+
+    def list_tasks(self) -> Tuple[List[int], List[int]]:
+        """Returns the lists of pending and of completed task ids"""
+        with self.lock:
+            self._expire()
+            pending = [x.task_id for x in self.tasks.values() if not x.finished]
+            completed = [x.task_id for x in self.tasks.values() if x.finished]
+        return pending, completed
+
+    def cancel(self, task_id: int) -> bool:
+        """Kills a pending task or drops the result of a completed one
+
+        Returns False if the task is not found.
+        """
+        with self.lock:
+            task = self.tasks.get(task_id)
+            if task is None:
+                return False
+            self._remove(task)
+
+        if not task.finished:
+            log.debug(f'Cancelling async task {task_id} for {task.command}')
+            task.greenlet.kill(block=False)
+        return True
+
+    def metrics(self) -> Dict[str, Any]:
+        """Per task runtime and result size along with totals of the registry"""
+        with self.lock:
+            return {
+                'tasks': [x.serialize_metrics() for x in self.tasks.values()],
+                'results_memory_bytes': self.memory_bytes,
+                'expired_results': self.expired_num,
+                'evicted_results': self.evicted_num,
+            }
+
+    def clear(self) -> None:
+        """Kills all running tasks and drops all results. For logout and shutdown"""
+        gevent.killall(self.greenlets)
+        with self.lock:
+            self.greenlets.clear()
+            self.tasks = {}
+            self.memory_bytes = 0
+            if self.spill_dir is not None:
+                shutil.rmtree(self.spill_dir, ignore_errors=True)
+                self.spill_dir = None
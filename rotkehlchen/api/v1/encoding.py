@@ -44,8 +44,19 @@ from rotkehlchen.chain.substrate.utils import (
     is_valid_kusama_address,
     is_valid_polkadot_address,
 )
-from rotkehlchen.constants.misc import ZERO
-from rotkehlchen.db.filtering import ETHTransactionsFilterQuery
+from rotkehlchen.constants.misc import (
+    EV_ASSET_MOVE,
+    EV_BUY,
+    EV_DEFI,
+    EV_INTEREST_PAYMENT,
+    EV_LEDGER_ACTION,
+    EV_LOAN_SETTLE,
+    EV_MARGIN_CLOSE,
+    EV_SELL,
+    EV_TX_GAS_COST,
+    ZERO,
+)
+from rotkehlchen.db.filtering import ETHTransactionsFilterQuery, PnlEventsFilterQuery
 from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.errors import (
     DeserializationError,
@@ -55,7 +66,7 @@ from rotkehlchen.errors import (
     UnknownAsset,
     XPUBError,
 )
-from rotkehlchen.exchanges.kraken import KrakenAccountType
+from rotkehlchen.exchanges.data_structures import KrakenAccountType
 from rotkehlchen.exchanges.manager import ALL_SUPPORTED_EXCHANGES, SUPPORTED_EXCHANGES
 from rotkehlchen.fval import FVal
 from rotkehlchen.history.deserialization import deserialize_price
@@ -890,6 +901,10 @@ class AsyncTasksQuerySchema(Schema):
     task_id = fields.Integer(strict=True, load_default=None)
 
 
+class AsyncTaskCancelSchema(Schema):
+    task_id = fields.Integer(strict=True, required=True)
+
+
 class OnlyCacheQuerySchema(Schema):
     only_cache = fields.Boolean(load_default=False)
 
@@ -1179,6 +1194,16 @@ class ModifiableSettingsSchema(Schema):
         ),
         load_default=None,
     )
+    current_price_staleness = fields.Integer(
+        strict=True,
+        validate=webargs.validate.Range(
+            min=0,
+            error='The current price staleness should be >= 0',
+        ),
+        load_default=None,
+    )
+    eth_rpc_hedge_requests = fields.Bool(load_default=None)
+    cost_basis_fixed_point = fields.Bool(load_default=None)
 
     @validates_schema
     def validate_settings_schema(  # pylint: disable=no-self-use
@@ -1225,6 +1250,9 @@ class ModifiableSettingsSchema(Schema):
             pnl_csv_with_formulas=data['pnl_csv_with_formulas'],
             pnl_csv_have_summary=data['pnl_csv_have_summary'],
             ssf_0graph_multiplier=data['ssf_0graph_multiplier'],
+            current_price_staleness=data['current_price_staleness'],
+            eth_rpc_hedge_requests=data['eth_rpc_hedge_requests'],
+            cost_basis_fixed_point=data['cost_basis_fixed_point'],
         )
 
 
@@ -1380,6 +1408,49 @@ class HistoryProcessingSchema(Schema):
     async_query = fields.Boolean(load_default=False)
 
 
+class HistoryEventsQuerySchema(DBPaginationSchema, DBOrderBySchema):
+    order_by_attribute = fields.String(
+        load_default='identifier',
+        validate=webargs.validate.OneOf(choices=('identifier', 'timestamp', 'type', 'location')),
+    )
+    ascending = fields.Boolean(load_default=True)
+    from_timestamp = TimestampField(load_default=Timestamp(0))
+    to_timestamp = TimestampField(load_default=ts_now)
+    event_types = DelimitedOrNormalList(
+        fields.String(validate=webargs.validate.OneOf(choices=(
+            EV_BUY,
+            EV_SELL,
+            EV_TX_GAS_COST,
+            EV_ASSET_MOVE,
+            EV_LOAN_SETTLE,
+            EV_INTEREST_PAYMENT,
+            EV_MARGIN_CLOSE,
+            EV_DEFI,
+            EV_LEDGER_ACTION,
+        ))),
+        load_default=None,
+    )
+    location = LocationField(load_default=None)
+
+    @post_load
+    def make_history_events_query(  # pylint: disable=no-self-use
+            self,
+            data: Dict[str, Any],
+            **_kwargs: Any,
+    ) -> Dict[str, Any]:
+        filter_query = PnlEventsFilterQuery.make(
+            order_by_attribute=data['order_by_attribute'],
+            order_ascending=data['ascending'],
+            limit=data['limit'],
+            offset=data['offset'],
+            from_ts=data['from_timestamp'],
+            to_ts=data['to_timestamp'],
+            event_types=data['event_types'],
+            location=data['location'],
+        )
+        return {'filter_query': filter_query}
+
+
 class HistoryExportingSchema(Schema):
     directory_path = DirectoryField(required=True)
 
@@ -25,6 +25,7 @@ from rotkehlchen.api.v1.encoding import (
     AsyncHistoricalQuerySchema,
     AsyncIgnoreCacheQueryArgumentSchema,
     AsyncQueryArgumentSchema,
+    AsyncTaskCancelSchema,
     AsyncTasksQuerySchema,
     AvalancheTransactionQuerySchema,
     BaseXpubSchema,
@@ -53,6 +54,7 @@ from rotkehlchen.api.v1.encoding import (
     GitcoinEventsQuerySchema,
     GitcoinReportSchema,
     HistoricalAssetsPriceSchema,
+    HistoryEventsQuerySchema,
     HistoryExportingSchema,
     HistoryProcessingSchema,
     IgnoredActionsGetSchema,
@@ -104,7 +106,7 @@ from rotkehlchen.assets.asset import Asset, EthereumToken
 from rotkehlchen.assets.typing import AssetType
 from rotkehlchen.balances.manual import ManuallyTrackedBalance
 from rotkehlchen.chain.bitcoin.xpub import XpubData
-from rotkehlchen.db.filtering import ETHTransactionsFilterQuery
+from rotkehlchen.db.filtering import ETHTransactionsFilterQuery, PnlEventsFilterQuery
 from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.history.typing import HistoricalPriceOracle
 from rotkehlchen.typing import (
@@ -130,7 +132,7 @@ from rotkehlchen.typing import (
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.bitcoin.hdkey import HDKey
-    from rotkehlchen.exchanges.kraken import KrakenAccountType
+    from rotkehlchen.exchanges.data_structures import KrakenAccountType
 
 
 def _combine_parser_data(
@@ -235,11 +237,16 @@ class SettingsResource(BaseResource):
 class AsyncTasksResource(BaseResource):
 
     get_schema = AsyncTasksQuerySchema()
+    delete_schema = AsyncTaskCancelSchema()
 
     @use_kwargs(get_schema, location='view_args')
     def get(self, task_id: Optional[int]) -> Response:
         return self.rest_api.query_tasks_outcome(task_id=task_id)
 
+    @use_kwargs(delete_schema, location='view_args')
+    def delete(self, task_id: int) -> Response:
+        return self.rest_api.cancel_task(task_id=task_id)
+
 
 class ExchangeRatesResource(BaseResource):
 
@@ -351,6 +358,12 @@ class EthereumAirdropsResource(BaseResource):
         return self.rest_api.get_ethereum_airdrops(async_query)
 
 
+class EthereumNodesStatsResource(BaseResource):
+
+    def get(self) -> Response:
+        return self.rest_api.get_ethereum_nodes_stats()
+
+
 class ExternalServicesResource(BaseResource):
 
     put_schema = ExternalServicesResourceAddSchema()
@@ -955,6 +968,15 @@ class HistoryProcessingResource(BaseResource):
         )
 
 
+class HistoryEventsResource(BaseResource):
+
+    get_schema = HistoryEventsQuerySchema()
+
+    @use_kwargs(get_schema, location='json_and_query')
+    def get(self, filter_query: PnlEventsFilterQuery) -> Response:
+        return self.rest_api.get_processed_history_events(filter_query=filter_query)
+
+
 class HistoryExportingResource(BaseResource):
 
     get_schema = HistoryExportingSchema()
@@ -1176,6 +1198,12 @@ class PingResource(BaseResource):
         return self.rest_api.ping()
 
 
+class MetricsResource(BaseResource):
+
+    def get(self) -> Response:
+        return self.rest_api.get_metrics()
+
+
 class DataImportResource(BaseResource):
 
     upload_schema = DataImportSchema()
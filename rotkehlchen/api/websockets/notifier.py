@@ -1,7 +1,10 @@
 import json
 import logging
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional
 
+import gevent
+from gevent.event import Event
 from geventwebsocket import WebSocketApplication
 from geventwebsocket.exceptions import WebSocketError
 from geventwebsocket.websocket import WebSocket
@@ -15,28 +18,121 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Seconds the sender of a websocket waits after being woken up so that messages
+# broadcasted in a burst end up in the same frame
+WS_SEND_TICK_SECS = 0.1
+# Maximum number of distinct messages waiting to be sent to a single websocket.
+# Anything broadcasted while the queue is full is dropped and its failure callback called.
+WS_QUEUE_MAX_SIZE = 1000
+# Maximum number of messages sent in a single frame
+WS_FRAME_MAX_MESSAGES = 100
 
-def _ws_send_impl(
-        websocket: WebSocket,
-        to_send_msg: str,
-        success_callback: Optional[Callable] = None,
-        success_callback_args: Optional[Dict[str, Any]] = None,
-        failure_callback: Optional[Callable] = None,
-        failure_callback_args: Optional[Dict[str, Any]] = None,
-) -> None:
-    try:
-        websocket.send(to_send_msg)
-    except WebSocketError as e:
-        log.error(f'Websocket send with message {to_send_msg} failed due to {str(e)}')
 
-        if failure_callback:
-            failure_callback_args = {} if failure_callback_args is None else failure_callback_args  # noqa: E501
-            failure_callback(**failure_callback_args)
-        return
+def _call_callback(callback: Optional[Callable], callback_args: Optional[Dict[str, Any]]) -> None:
+    if callback:
+        callback_args = {} if callback_args is None else callback_args
+        callback(**callback_args)
 
-    if success_callback:  # send success
-        success_callback_args = {} if success_callback_args is None else success_callback_args  # noqa: E501
-        success_callback(**success_callback_args)
+
+class QueuedMessage(NamedTuple):
+    message: str
+    success_callback: Optional[Callable]
+    success_callback_args: Optional[Dict[str, Any]]
+    failure_callback: Optional[Callable]
+    failure_callback_args: Optional[Dict[str, Any]]
+
+
+class WebsocketSender():
+    """Sends the messages broadcasted to a single websocket
+
+    Messages are kept in a bounded queue and a single loop sends everything that has
+    been queued since the last tick in one frame, which is a json list of messages.
+    A message identical to one that is still waiting in the queue is coalesced into it.
+    """
+
+    def __init__(self, websocket: WebSocket) -> None:
+        self.websocket = websocket
+        # Ordered by insertion and keyed by the serialized message, which coalesces duplicates
+        self.queue: Dict[str, QueuedMessage] = {}
+        self.wakeup = Event()
+        self.stopped = False
+        self.greenlet: Optional[gevent.Greenlet] = None
+        self.sent_num = 0
+        self.frames_num = 0
+        self.coalesced_num = 0
+        self.dropped_num = 0
+
+    def enqueue(self, queued_message: QueuedMessage) -> None:
+        """Adds a message to the queue unless an identical one is already there
+
+        If the queue is full the message is dropped and its failure callback is called,
+        as when sending it fails.
+        """
+        if queued_message.message in self.queue:
+            self.coalesced_num += 1
+            return
+        if len(self.queue) >= WS_QUEUE_MAX_SIZE:
+            self.dropped_num += 1
+            if self.dropped_num % WS_QUEUE_MAX_SIZE == 1:
+                log.warning(
+                    f'Websocket with hash id {hash(self.websocket)} queue is full. '
+                    f'Dropped {self.dropped_num} messages so far',
+                )
+            self._fail([queued_message])
+            return
+
+        self.queue[queued_message.message] = queued_message
+        self.wakeup.set()
+
+    def stop(self) -> None:
+        """Stops the sender loop and fails whatever was still queued"""
+        self.stopped = True
+        self.wakeup.set()
+        self._fail(self._pop_batch(len(self.queue)))
+
+    def _pop_batch(self, size: int) -> List[QueuedMessage]:
+        batch = list(islice(self.queue.values(), size))
+        for entry in batch:
+            del self.queue[entry.message]
+        return batch
+
+    @staticmethod
+    def _fail(batch: List[QueuedMessage]) -> None:
+        for entry in batch:
+            _call_callback(entry.failure_callback, entry.failure_callback_args)
+
+    def send_queued(self) -> None:
+        """Sends all queued messages in frames of at most WS_FRAME_MAX_MESSAGES"""
+        while len(self.queue) != 0 and self.stopped is False:
+            batch = self._pop_batch(WS_FRAME_MAX_MESSAGES)
+            frame = '[' + ','.join(x.message for x in batch) + ']'
+            try:
+                self.websocket.send(frame)
+            except WebSocketError as e:
+                log.error(
+                    f'Websocket send of a frame with {len(batch)} messages failed '
+                    f'due to {str(e)}',
+                )
+                self._fail(batch)
+                continue
+
+            self.frames_num += 1
+            self.sent_num += len(batch)
+            for entry in batch:
+                _call_callback(entry.success_callback, entry.success_callback_args)
+
+    def run(self) -> None:
+        while True:
+            self.wakeup.wait()
+            if self.stopped:
+                break
+            gevent.sleep(WS_SEND_TICK_SECS)
+            self.wakeup.clear()
+            self.send_queued()
+
+    @property
+    def alive(self) -> bool:
+        return self.greenlet is not None and not self.greenlet.dead
 
 
 class RotkiNotifier():
@@ -47,18 +143,59 @@ class RotkiNotifier():
     ) -> None:
         self.greenlet_manager = greenlet_manager
         self.subscribers: List[WebSocket] = []
+        self.senders: Dict[WebSocket, WebsocketSender] = {}
+
+    def _get_sender(self, websocket: WebSocket) -> WebsocketSender:
+        """Returns the sender of the websocket, (re)starting its loop if it is not running
+
+        The loop can be killed along with all other tracked greenlets at logout while
+        the websocket stays subscribed, so it is restarted lazily.
+        """
+        sender = self.senders.get(websocket)
+        if sender is None:
+            sender = WebsocketSender(websocket)
+            self.senders[websocket] = sender
+        if not sender.alive:
+            sender.stopped = False
+            sender.greenlet = gevent.spawn(sender.run)
+            self.greenlet_manager.add(
+                task_name=f'Websocket sender for {hash(websocket)}',
+                greenlet=sender.greenlet,
+                exception_is_error=True,
+            )
+            if len(sender.queue) != 0:
+                sender.wakeup.set()
+        return sender
 
     def subscribe(self, websocket: WebSocket) -> None:
         log.info(f'Websocket with hash id {hash(websocket)} subscribed to rotki notifier')
         self.subscribers.append(websocket)
+        self._get_sender(websocket)
+
+    def _remove_sender(self, websocket: WebSocket) -> None:
+        sender = self.senders.pop(websocket, None)
+        if sender is not None:
+            sender.stop()
 
     def unsubscribe(self, websocket: WebSocket) -> None:
+        self._remove_sender(websocket)
         try:
             self.subscribers.remove(websocket)
             log.info(f'Websocket with hash id {hash(websocket)} unsubscribed from rotki notifier')  # noqa: E501
         except ValueError:
             pass
 
+    def stats(self) -> Dict[str, int]:
+        """Counters of the messages handled by the senders of the subscribed websockets"""
+        result = {'queued': 0, 'sent': 0, 'frames': 0, 'coalesced': 0, 'dropped': 0}
+        for sender in self.senders.values():
+            result['queued'] += len(sender.queue)
+            result['sent'] += sender.sent_num
+            result['frames'] += sender.frames_num
+            result['coalesced'] += sender.coalesced_num
+            result['dropped'] += sender.dropped_num
+        return result
+
     def broadcast(
             self,
             message_type: 'WSMessageType',
@@ -68,36 +205,34 @@ class RotkiNotifier():
             failure_callback: Optional[Callable] = None,
             failure_callback_args: Optional[Dict[str, Any]] = None,
     ) -> None:
+        """Queues a message to all subscribed websockets
+
+        The failure callback is called if there is no open websocket to queue the message
+        to or if sending it fails.
+        """
         message_data = {'type': str(message_type), 'data': to_send_data}
         message = json.dumps(message_data)  # TODO: Check for dumps error
-        to_remove_indices = set()
-        spawned_one_broadcast = False
-        for idx, websocket in enumerate(self.subscribers):
+        queued_message = QueuedMessage(
+            message=message,
+            success_callback=success_callback,
+            success_callback_args=success_callback_args,
+            failure_callback=failure_callback,
+            failure_callback_args=failure_callback_args,
+        )
+        closed_websockets = []
+        queued_one_broadcast = False
+        for websocket in self.subscribers:
             if websocket.closed is True:
-                to_remove_indices.add(idx)
+                closed_websockets.append(websocket)
                 continue
 
-            self.greenlet_manager.spawn_and_track(
-                after_seconds=None,
-                task_name=f'Websocket send for {str(message_type)}',
-                exception_is_error=True,
-                method=_ws_send_impl,
-                websocket=websocket,
-                to_send_msg=message,
-                success_callback=success_callback,
-                success_callback_args=success_callback_args,
-                failure_callback=failure_callback,
-                failure_callback_args=failure_callback_args,
-            )
-            spawned_one_broadcast = True
-
-        if len(to_remove_indices) != 0:  # removed closed websockets from the list
-            self.subscribers = [
-                i for j, i in enumerate(self.subscribers) if j not in to_remove_indices
-            ]
-        if spawned_one_broadcast is False and failure_callback is not None:
-            failure_callback_args = {} if failure_callback_args is None else failure_callback_args  # noqa: E501
-            failure_callback(**failure_callback_args)
+            self._get_sender(websocket).enqueue(queued_message)
+            queued_one_broadcast = True
+
+        for websocket in closed_websockets:  # remove closed websockets and their senders
+            self.unsubscribe(websocket)
+        if queued_one_broadcast is False:
+            _call_callback(failure_callback, failure_callback_args)
 
 
 class RotkiWSApp(WebSocketApplication):
@@ -1,15 +1,26 @@
-from typing import Dict, Optional
+import logging
+import time
+from typing import Dict, List, Optional, Set
 
 from rotkehlchen.errors import UnknownAsset
 from rotkehlchen.globaldb import GlobalDBHandler
+from rotkehlchen.logging import RotkehlchenLogsAdapter
 
-from .typing import AssetData
+from .typing import AssetData, AssetType
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# The asset data query binds each identifier twice so keep well below sqlite's variable limit
+WARMUP_QUERY_CHUNK_SIZE = 400
 
 
 class AssetResolver():
     __instance: Optional['AssetResolver'] = None
     # A cache so that the DB is not hit every time
     assets_cache: Dict[str, AssetData] = {}
+    # Seconds the last cache warmup took. None if no warmup ran yet
+    last_warmup_duration: Optional[float] = None
 
     def __new__(cls) -> 'AssetResolver':
         """Lazily initializes AssetResolver
@@ -32,6 +43,59 @@ class AssetResolver():
         else:
             AssetResolver.__instance.assets_cache.pop(identifier.lower(), None)
 
+    @staticmethod
+    def warmup_cache(identifiers: Optional[List[str]] = None) -> None:
+        """Bulk load the data of many assets into the memory cache
+
+        Also loads the assets they were forked from or swapped for, since those get resolved
+        as soon as an Asset is initialized. If no identifiers are given then all assets owned
+        by local users are loaded. Is meant to run in a background greenlet after login so
+        that the first history or PnL query does not resolve thousands of assets one by one.
+        """
+        start = time.monotonic()
+        instance = AssetResolver()
+        globaldb = GlobalDBHandler()
+        if identifiers is None:
+            identifiers = globaldb.get_user_owned_asset_ids()
+
+        queried: Set[str] = set()
+        to_query = {x.lower() for x in identifiers} - instance.assets_cache.keys()
+        loaded_num = 0
+        while len(to_query) != 0:
+            queried |= to_query
+            ids = list(to_query)
+            to_query = set()
+            for idx in range(0, len(ids), WARMUP_QUERY_CHUNK_SIZE):
+                assets_data = globaldb.get_all_asset_data(
+                    mapping=False,
+                    serialized=False,
+                    specific_ids=ids[idx:idx + WARMUP_QUERY_CHUNK_SIZE],
+                )
+                for asset_data in assets_data:
+                    missing_basic_data = (
+                        asset_data.name is None or
+                        asset_data.symbol is None or
+                        asset_data.decimals is None
+                    )
+                    if asset_data.asset_type == AssetType.ETHEREUM_TOKEN and missing_basic_data:
+                        continue  # get_asset_data would also not form it so leave it out
+
+                    instance.assets_cache[asset_data.identifier.lower()] = asset_data
+                    loaded_num += 1
+                    for related_id in (asset_data.forked, asset_data.swapped_for):
+                        if related_id is None:
+                            continue
+                        related_id = related_id.lower()
+                        if related_id in queried or related_id in instance.assets_cache:
+                            continue
+                        to_query.add(related_id)
+
+        AssetResolver.last_warmup_duration = time.monotonic() - start
+        log.debug(
+            f'Warmed up the assets cache with {loaded_num} assets in '
+            f'{AssetResolver.last_warmup_duration:.3f} seconds',
+        )
+
     @staticmethod
     def get_asset_data(
             asset_identifier: str,
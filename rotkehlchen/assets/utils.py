@@ -80,11 +80,11 @@ def get_asset_by_symbol(symbol: str, asset_type: Optional[AssetType] = None) ->
     if symbol == 'ETH':
         return A_ETH  # ETH can be ETH and ETH2 in the DB
 
-    assets_data = GlobalDBHandler().get_assets_with_symbol(symbol, asset_type)
-    if len(assets_data) != 1:
+    identifiers = GlobalDBHandler().get_asset_identifiers_with_symbol(symbol, asset_type)
+    if len(identifiers) != 1:
         return None
 
-    return Asset(assets_data[0].identifier)
+    return Asset(identifiers[0])
 
 
 def symbol_to_asset_or_token(symbol: str) -> Asset:
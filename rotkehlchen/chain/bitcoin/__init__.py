@@ -1,52 +1,135 @@
-from typing import Dict, List, Tuple
+import time
+from typing import Any, Dict, List, Optional, Tuple
 
 import requests
+from gevent.pool import Pool
+from requests.adapters import HTTPAdapter
 
 from rotkehlchen.errors import RemoteError, UnableToDecryptRemoteData
 from rotkehlchen.fval import FVal
 from rotkehlchen.typing import BTCAddress
-from rotkehlchen.utils.misc import satoshis_to_btc
-from rotkehlchen.utils.network import request_get_dict
+from rotkehlchen.utils.misc import get_chunks, satoshis_to_btc
+from rotkehlchen.utils.network import create_session, request_get_dict
 
+# Blockstream has no endpoint for multiple addresses so each address is a request.
+# Those are sent concurrently but capped so that blockstream does not rate limit us.
+BLOCKSTREAM_MAX_CONCURRENT_REQUESTS = 5
+# Seconds for which the blockstream stats of an address are reused for balances
+BLOCKSTREAM_STATS_CACHE_TTL_SECS = 60
+# split the list of accounts into sublists of 80 addresses per list to overcome:
+# https://github.com/rotki/rotki/issues/3037
+BLOCKCHAININFO_MAX_ADDRESSES_PER_QUERY = 80
 
-def _have_bc1_accounts(accounts: List[BTCAddress]) -> bool:
-    return any(account.lower()[0:3] == 'bc1' for account in accounts)
+# Keep the connections to blockstream open and reuse them across the address requests
+_blockstream_session = create_session()
+_blockstream_session.mount(
+    'https://',
+    HTTPAdapter(pool_maxsize=BLOCKSTREAM_MAX_CONCURRENT_REQUESTS),
+)
 
 
-def get_bitcoin_addresses_balances(accounts: List[BTCAddress]) -> Dict[BTCAddress, FVal]:
+def _is_bech32_address(account: BTCAddress) -> bool:
+    """blockchain.info can't handle bech32 addresses so those go to blockstream"""
+    return account.lower()[0:3] == 'bc1'
+
+
+class BlockstreamStatsCache():
+    """Short lived cache of the chain stats blockstream returns per address
+
+    So that querying balances again soon after, for example when an account is
+    added, does not send a request for each of the other addresses again.
+    """
+
+    def __init__(self, ttl_secs: int = BLOCKSTREAM_STATS_CACHE_TTL_SECS) -> None:
+        self.ttl_secs = ttl_secs
+        self.entries: Dict[BTCAddress, Tuple[float, Dict[str, Any]]] = {}
+
+    def get(self, address: BTCAddress) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(address)
+        if entry is None or time.monotonic() - entry[0] > self.ttl_secs:
+            return None
+        return entry[1]
+
+    def add(self, address: BTCAddress, stats: Dict[str, Any]) -> None:
+        self.entries[address] = (time.monotonic(), stats)
+
+    def clear(self) -> None:
+        self.entries = {}
+
+
+def _query_blockstream_stats(
+        accounts: List[BTCAddress],
+        stats_cache: Optional[BlockstreamStatsCache],
+) -> Dict[BTCAddress, Dict[str, Any]]:
+    """Queries blockstream for the chain stats of each address, concurrently
+
+    May raise connection errors or KeyError
+    """
+    stats: Dict[BTCAddress, Dict[str, Any]] = {}
+    to_query = []
+    for account in accounts:
+        cached_stats = stats_cache.get(account) if stats_cache is not None else None
+        if cached_stats is None:
+            to_query.append(account)
+        else:
+            stats[account] = cached_stats
+
+    def query_account_stats(account: BTCAddress) -> Tuple[BTCAddress, Dict[str, Any]]:
+        response_data = request_get_dict(
+            url=f'https://blockstream.info/api/address/{account}',
+            handle_429=True,
+            backoff_in_seconds=4,
+            session=_blockstream_session,
+        )
+        return account, response_data['chain_stats']
+
+    pool = Pool(size=BLOCKSTREAM_MAX_CONCURRENT_REQUESTS)
+    for account, account_stats in pool.imap_unordered(query_account_stats, to_query):
+        stats[account] = account_stats
+        if stats_cache is not None:
+            stats_cache.add(account, account_stats)
+
+    return stats
+
+
+def get_bitcoin_addresses_balances(
+        accounts: List[BTCAddress],
+        stats_cache: Optional[BlockstreamStatsCache] = None,
+) -> Dict[BTCAddress, FVal]:
     """Queries blockchain.info or blockstream for the balances of accounts
 
+    Bech32 addresses are queried from blockstream, using the stats cache if given,
+    and all others in batches from blockchain.info.
+
     May raise:
     - RemotError if there is a problem querying blockchain.info or blockstream
     """
-    source = 'blockchain.info'
     balances: Dict[BTCAddress, FVal] = {}
+    bech32_accounts = [x for x in accounts if _is_bech32_address(x)]
+    other_accounts = [x for x in accounts if not _is_bech32_address(x)]
+    source = 'blockstream'
     try:
-        if _have_bc1_accounts(accounts):
-            # if 1 account is bech32 we have to query blockstream. blockchaininfo won't work
-            source = 'blockstream'
-            balances = {}
-            for account in accounts:
-                url = f'https://blockstream.info/api/address/{account}'
-                response_data = request_get_dict(url=url, handle_429=True, backoff_in_seconds=4)
-                stats = response_data['chain_stats']
+        if len(bech32_accounts) != 0:
+            all_stats = _query_blockstream_stats(bech32_accounts, stats_cache)
+            for account, stats in all_stats.items():
                 balance = int(stats['funded_txo_sum']) - int(stats['spent_txo_sum'])
                 balances[account] = satoshis_to_btc(balance)
-        else:
-            # split the list of accounts into sublists of 80 addresses per list to overcome:
-            # https://github.com/rotki/rotki/issues/3037
-            accounts_chunks = [accounts[x:x + 80] for x in range(0, len(accounts), 80)]
-            for accounts_chunk in accounts_chunks:
-                params = '|'.join(accounts_chunk)
-                btc_resp = request_get_dict(
-                    url=f'https://blockchain.info/multiaddr?active={params}',
-                    handle_429=True,
-                    # If we get a 429 then their docs suggest 10 seconds
-                    # https://blockchain.info/q
-                    backoff_in_seconds=10,
-                )
-                for entry in btc_resp['addresses']:
-                    balances[entry['address']] = satoshis_to_btc(FVal(entry['final_balance']))
+
+        source = 'blockchain.info'
+        for accounts_chunk in get_chunks(
+                other_accounts,
+                n=BLOCKCHAININFO_MAX_ADDRESSES_PER_QUERY,
+        ):
+            params = '|'.join(accounts_chunk)
+            btc_resp = request_get_dict(
+                url=f'https://blockchain.info/multiaddr?active={params}',
+                handle_429=True,
+                # If we get a 429 then their docs suggest 10 seconds
+                # https://blockchain.info/q
+                backoff_in_seconds=10,
+            )
+            for entry in btc_resp['addresses']:
+                balances[entry['address']] = satoshis_to_btc(FVal(entry['final_balance']))
     except (
             requests.exceptions.RequestException,
             UnableToDecryptRemoteData,
@@ -67,10 +150,7 @@ def _check_blockstream_for_transactions(
 ) -> Dict[BTCAddress, Tuple[bool, FVal]]:
     """May raise connection errors or KeyError"""
     have_transactions = {}
-    for account in accounts:
-        url = f'https://blockstream.info/api/address/{account}'
-        response_data = request_get_dict(url=url, handle_429=True, backoff_in_seconds=4)
-        stats = response_data['chain_stats']
+    for account, stats in _query_blockstream_stats(accounts, stats_cache=None).items():
         balance = satoshis_to_btc(int(stats['funded_txo_sum']) - int(stats['spent_txo_sum']))
         have_txs = stats['tx_count'] != 0
         have_transactions[account] = (have_txs, balance)
@@ -106,13 +186,16 @@ def have_bitcoin_transactions(accounts: List[BTCAddress]) -> Dict[BTCAddress, Tu
     May raise:
     - RemoteError if any of the queried websites fail to be queried
     """
+    have_transactions = {}
+    bech32_accounts = [x for x in accounts if _is_bech32_address(x)]
+    other_accounts = [x for x in accounts if not _is_bech32_address(x)]
+    source = 'blockstream'
     try:
-        if _have_bc1_accounts(accounts):
-            source = 'blockstream'
-            have_transactions = _check_blockstream_for_transactions(accounts)
-        else:
-            source = 'blockchain.info'
-            have_transactions = _check_blockchaininfo_for_transactions(accounts)
+        if len(bech32_accounts) != 0:
+            have_transactions.update(_check_blockstream_for_transactions(bech32_accounts))
+        source = 'blockchain.info'
+        if len(other_accounts) != 0:
+            have_transactions.update(_check_blockchaininfo_for_transactions(other_accounts))
     except (
             requests.exceptions.RequestException,
             UnableToDecryptRemoteData,
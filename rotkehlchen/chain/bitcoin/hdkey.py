@@ -5,7 +5,7 @@ import hashlib
 import hmac
 from dataclasses import dataclass
 from enum import Enum
-from typing import List, NamedTuple, Optional, Union, cast
+from typing import List, NamedTuple, Optional, Tuple, Union, cast
 
 from base58check import b58decode, b58encode
 from coincurve import PrivateKey, PublicKey
@@ -333,18 +333,16 @@ class HDKey():
             current_node = current_node.derive_child(path_nodes[i])
         return current_node
 
-    def derive_child(self, idx: Union[int, str]) -> 'HDKey':
+    def _derive_child_key(self, index: int) -> Tuple[int, PublicKey, bytes]:
         """
-        Derives a bip32 child node from the current node
+        Derives the public key and chain code of a bip32 child of the current node
         Args:
-            idx (int or str): the index of the child
+            index (int): the normalized index of the child
         Returns:
-            (HDKey): the child
+            (int, PublicKey, bytes): the index actually derived, which is the next one
+                if the given index leads to an impossible key, the child public key
+                and the child chain code
         """
-        # TODO: Break up this function
-
-        # normalize the index, error if we can't derive the child
-        index: int = self._normalize_index(idx)
         if index >= BIP32_HARDEN and not self.privkey:
             raise XPUBError('Need private key to derive XPUB hardened children')
 
@@ -388,23 +386,47 @@ class HDKey():
             # NB: it is possible to derive an "impossible" key.
             #     e.g. the privkey is too high, or is 0
             #     if that happens, the spec says to derive at the next index
-            return self.derive_child(index + 1)
+            return self._derive_child_key(index + 1)
 
+        return index, child_pubkey, chain_code
+
+    def derive_child(self, idx: Union[int, str]) -> 'HDKey':
+        """
+        Derives a bip32 child node from the current node
+        Args:
+            idx (int or str): the index of the child
+        Returns:
+            (HDKey): the child
+        """
+        # normalize the index, error if we can't derive the child
+        index, child_pubkey, chain_code = self._derive_child_key(self._normalize_index(idx))
         # no privkey here so make a new public child
         child_xpub = self._make_child_xpub(
             child_pubkey, index=index, chain_code=chain_code,
         )
         return self._child_from_xpub(index=index, child_xpub=child_xpub)
 
-    def address(self) -> BTCAddress:
+    def derive_child_address(self, idx: int) -> BTCAddress:
+        """
+        Derives the address of a bip32 child of the current node. Same as
+        derive_child(idx).address() but skips creating the child's xpub and
+        node which is most of the work when deriving many addresses.
+        """
+        _, child_pubkey, _ = self._derive_child_key(idx)
+        return self._pubkey_address(child_pubkey)
+
+    def _pubkey_address(self, pubkey: PublicKey) -> BTCAddress:
         if self.hint == 'xpub':
-            return pubkey_to_base58_address(self.pubkey.format(COMPRESSED_PUBKEY))
+            return pubkey_to_base58_address(pubkey.format(COMPRESSED_PUBKEY))
         if self.hint == 'ypub':
-            return pubkey_to_p2sh_p2wpkh_address(self.pubkey.format(COMPRESSED_PUBKEY))
+            return pubkey_to_p2sh_p2wpkh_address(pubkey.format(COMPRESSED_PUBKEY))
         if self.hint == 'zpub':
             return pubkey_to_bech32_address(
-                data=self.pubkey.format(COMPRESSED_PUBKEY),
+                data=pubkey.format(COMPRESSED_PUBKEY),
                 witver=0,
             )
         # else
         raise AssertionError(f'Unknown hint {self.hint} ended up in an HDKey')
+
+    def address(self) -> BTCAddress:
+        return self._pubkey_address(self.pubkey)
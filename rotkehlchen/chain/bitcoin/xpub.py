@@ -1,6 +1,7 @@
 import logging
 from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple
 
+import gevent
 from gevent.lock import Semaphore
 
 from rotkehlchen.chain.bitcoin import have_bitcoin_transactions
@@ -64,25 +65,64 @@ class XpubDerivedAddressData(NamedTuple):
     balance: FVal
 
 
+class XpubChainDeriver():
+    """Derives the addresses of one chain, receiving or change, of an xpub
+
+    Addresses derived in the past are taken from the given cache and the newly
+    derived ones are kept in new_addresses so that they can be cached in turn.
+    """
+
+    def __init__(
+            self,
+            root: HDKey,
+            account_index: int,
+            cached_addresses: Optional[Dict[int, BTCAddress]] = None,
+    ) -> None:
+        self.root = root
+        self.account_index = account_index
+        self.cached_addresses = cached_addresses if cached_addresses is not None else {}
+        self.new_addresses: List[Tuple[int, int, BTCAddress]] = []
+
+    def derive(self, start_index: int, end_index: int) -> List[Tuple[int, BTCAddress]]:
+        """Returns the index and address of all children from start to end index"""
+        addresses = []
+        for idx in range(start_index, end_index):
+            address = self.cached_addresses.get(idx)
+            if address is None:
+                address = self.root.derive_child_address(idx)
+                self.cached_addresses[idx] = address
+                self.new_addresses.append((self.account_index, idx, address))
+            addresses.append((idx, address))
+
+        return addresses
+
+
 def _derive_addresses_loop(
-        account_index: int,
+        deriver: XpubChainDeriver,
         start_index: int,
-        root: HDKey,
         gap_limit: int,
 ) -> List[XpubDerivedAddressData]:
     """May raise:
     - RemoteError: if blockstream/blockchain.info can't be reached
     """
+    account_index = deriver.account_index
     step_index = start_index
     addresses: List[XpubDerivedAddressData] = []
     should_continue = True
+    batch_addresses = deriver.derive(step_index, step_index + gap_limit)
     while should_continue:
-        batch_addresses: List[Tuple[int, BTCAddress]] = []
-        for idx in range(step_index, step_index + gap_limit):
-            child = root.derive_child(idx)
-            batch_addresses.append((idx, child.address()))
-
-        have_tx_mapping = have_bitcoin_transactions([x[1] for x in batch_addresses])
+        # Check the batch for transactions in the background and meanwhile derive
+        # the next batch, which will be needed if any of this batch's addresses was used
+        check_greenlet = gevent.spawn(
+            have_bitcoin_transactions,
+            [x[1] for x in batch_addresses],
+        )
+        gevent.sleep(0)  # let the check send its query before starting to derive
+        next_batch_addresses = deriver.derive(
+            step_index + gap_limit,
+            step_index + 2 * gap_limit,
+        )
+        have_tx_mapping = check_greenlet.get()
         should_continue = False
         for idx, address in batch_addresses:
             have_tx, balance = have_tx_mapping[address]
@@ -109,6 +149,7 @@ def _derive_addresses_loop(
                         balance=balance,
                     ))
 
+        batch_addresses = next_batch_addresses
         step_index += gap_limit
 
     return addresses
@@ -119,11 +160,19 @@ def _derive_addresses_from_xpub_data(
         start_receiving_index: int,
         start_change_index: int,
         gap_limit: int,
-) -> List[XpubDerivedAddressData]:
+        cached_addresses: Optional[Dict[int, Dict[int, BTCAddress]]] = None,
+) -> Tuple[List[XpubDerivedAddressData], List[Tuple[int, int, BTCAddress]]]:
     """Derive all addresses from the xpub that have had transactions. Also includes
     any addresses until the biggest index derived addresses that have had no transactions.
     This is to make it easier to later derive and check more addresses
 
+    The receiving and change chains are checked concurrently. Addresses are taken
+    from cached_addresses, a mapping of account index to derived index to address,
+    if they are in it.
+
+    Returns the derived addresses data and the account index, derived index and
+    address of all addresses that were not in the cache and had to be derived.
+
     May raise:
     - RemoteError: if blockstream/blockchain.info and others can't be reached
     """
@@ -132,26 +181,31 @@ def _derive_addresses_from_xpub_data(
     else:
         account_xpub = xpub_data.xpub
 
-    addresses = []
-    receiving_xpub = account_xpub.derive_child(0)
-    addresses.extend(
-        _derive_addresses_loop(
-            account_index=0,
-            start_index=start_receiving_index,
-            root=receiving_xpub,
-            gap_limit=gap_limit,
-        ),
-    )
-    change_xpub = account_xpub.derive_child(1)
-    addresses.extend(
-        _derive_addresses_loop(
-            account_index=1,
-            start_index=start_change_index,
-            root=change_xpub,
+    cached_addresses = cached_addresses if cached_addresses is not None else {}
+    derivers = []
+    greenlets = []
+    for account_index, start_index in ((0, start_receiving_index), (1, start_change_index)):
+        deriver = XpubChainDeriver(
+            root=account_xpub.derive_child(account_index),
+            account_index=account_index,
+            cached_addresses=cached_addresses.get(account_index),
+        )
+        derivers.append(deriver)
+        greenlets.append(gevent.spawn(
+            _derive_addresses_loop,
+            deriver=deriver,
+            start_index=start_index,
             gap_limit=gap_limit,
-        ),
-    )
-    return addresses
+        ))
+
+    gevent.joinall(greenlets)
+    addresses = []
+    new_addresses = []
+    for greenlet, deriver in zip(greenlets, derivers):
+        addresses.extend(greenlet.get())  # raises the loop's exception, if any
+        new_addresses.extend(deriver.new_addresses)
+
+    return addresses, new_addresses
 
 
 class XpubManager():
@@ -171,12 +225,14 @@ class XpubManager():
         - RemoteError: if blockstream/blockchain.info and others can't be reached
         """
         last_receiving_idx, last_change_idx = self.db.get_last_consecutive_xpub_derived_indices(xpub_data)  # noqa: E501
-        derived_addresses_data = _derive_addresses_from_xpub_data(
+        derived_addresses_data, new_derived_addresses = _derive_addresses_from_xpub_data(
             xpub_data=xpub_data,
             start_receiving_index=last_receiving_idx,
             start_change_index=last_change_idx,
             gap_limit=self.chain_manager.btc_derivation_gap_limit,
+            cached_addresses=self.db.get_xpub_derived_addresses(xpub_data),
         )
+        self.db.add_xpub_derived_addresses(xpub_data, new_derived_addresses)
         known_btc_addresses = self.db.get_blockchain_accounts().btc
 
         new_addresses = []
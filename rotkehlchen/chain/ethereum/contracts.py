@@ -24,6 +24,7 @@ class EthereumContract(NamedTuple):
             method_name: str,
             arguments: Optional[List[Any]] = None,
             call_order: Optional[Sequence['NodeName']] = None,
+            block_identifier: Optional[int] = None,
     ) -> Any:
         return ethereum.call_contract(
             contract_address=self.address,
@@ -31,6 +32,7 @@ class EthereumContract(NamedTuple):
             method_name=method_name,
             arguments=arguments,
             call_order=call_order,
+            block_identifier=block_identifier,
         )
 
     def get_logs(
@@ -28,6 +28,7 @@ from rotkehlchen.serialization.deserialize import (
 )
 from rotkehlchen.typing import AssetAmount, Location, Price, Timestamp
 from rotkehlchen.utils.misc import timestamp_to_date, ts_now
+from rotkehlchen.utils.network import create_session
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 GITCOIN_START_TS = Timestamp(1506297600)  # 25/09/2017 -- date of first blog post. Too early?
@@ -139,7 +140,7 @@ class GitcoinAPI():
     def __init__(self, db: DBHandler) -> None:
         self.db = db
         self.db_ledger = DBLedgerActions(self.db, self.db.msg_aggregator)
-        self.session = requests.session()
+        self.session = create_session()
         self.clr_payouts: Optional[List[Dict[str, Any]]] = None
 
     def _single_grant_api_query(self, query_str: str) -> Dict[str, Any]:
@@ -1,10 +1,11 @@
 import json
 import logging
-import random
+import time
 from collections import defaultdict
 from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union, overload
 from urllib.parse import urlparse
 
+import gevent
 import requests
 from ens import ENS
 from ens.abis import ENS as ENS_ABI, RESOLVER as ENS_RESOLVER_ABI
@@ -53,9 +54,10 @@ from rotkehlchen.typing import (
     Timestamp,
 )
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import from_wei, hex_or_bytes_to_str
+from rotkehlchen.utils.misc import from_wei, get_chunks, hex_or_bytes_to_str
 from rotkehlchen.utils.network import request_get_dict
 
+from .node_stats import NodeStats, order_nodes_by_score
 from .typing import NodeName
 from .utils import ENS_RESOLVER_ABI_MULTICHAIN_ADDRESS
 
@@ -200,6 +202,14 @@ OPEN_NODES_WEIGHT_MAP = {  # Probability with which to select each node
     NodeName.CLOUDFLARE_ETH: 0.1,
 }
 
+# Maximum number of addresses given as arguments to a single contract call. For etherscan
+# the limit is the request URI length and for the nodes the gas. Same as the token chunks
+# in chain/ethereum/tokens.py which have the benchmarks behind these numbers.
+ETHERSCAN_MAX_CALL_ARGUMENTS = 120
+NODE_MAX_CALL_ARGUMENTS = 590
+# Maximum number of nodes queried at the same time for a request in hedged requests mode
+MAX_HEDGED_REQUESTS = 2
+
 
 class EthereumManager():
     def __init__(
@@ -210,10 +220,14 @@ class EthereumManager():
             greenlet_manager: GreenletManager,
             connect_at_start: Sequence[NodeName],
             eth_rpc_timeout: int = DEFAULT_EVM_RPC_TIMEOUT,
+            hedge_requests: bool = False,
     ) -> None:
         log.debug(f'Initializing Ethereum Manager with own rpc endpoint: {ethrpc_endpoint}')
         self.greenlet_manager = greenlet_manager
         self.web3_mapping: Dict[NodeName, Web3] = {}
+        self.nodes_stats: Dict[NodeName, NodeStats] = defaultdict(NodeStats)
+        # If true a request slower than usual for a node is also sent to the next node
+        self.hedge_requests = hedge_requests
         self.own_rpc_endpoint = ethrpc_endpoint
         self.etherscan = etherscan
         self.msg_aggregator = msg_aggregator
@@ -250,7 +264,8 @@ class EthereumManager():
         """Default call order for ethereum nodes
 
         Own node always has preference. Then all other node types are randomly queried
-        in sequence depending on a weighted probability.
+        in sequence depending on a weighted probability, adjusted by the latency and
+        error rate seen for each node. Nodes that keep failing go last.
 
 
         Some benchmarks on weighted probability based random selection when compared
@@ -272,16 +287,36 @@ class EthereumManager():
         if skip_etherscan:
             selection.remove(NodeName.ETHERSCAN)
 
-        ordered_list = []
-        while len(selection) != 0:
-            weights = []
-            for entry in selection:
-                weights.append(OPEN_NODES_WEIGHT_MAP[entry])
-            node = random.choices(selection, weights, k=1)
-            ordered_list.append(node[0])
-            selection.remove(node[0])
+        return self._order_by_health(result + self.order_nodes_by_score(selection))
+
+    def order_nodes_by_score(self, nodes: Sequence[NodeName]) -> List[NodeName]:
+        """Randomly orders the given open nodes depending on their weight and health"""
+        return order_nodes_by_score(
+            nodes=nodes,
+            weights=OPEN_NODES_WEIGHT_MAP,
+            nodes_stats=self.nodes_stats,
+        )
 
-        return result + ordered_list
+    def _order_by_health(self, call_order: Sequence[NodeName]) -> List[NodeName]:
+        """Moves the nodes whose circuit is open to the end of the call order"""
+        healthy, broken = [], []
+        for node in call_order:
+            stats = self.nodes_stats.get(node)
+            if stats is not None and stats.circuit_open():
+                broken.append(node)
+            else:
+                healthy.append(node)
+        return healthy + broken
+
+    def get_nodes_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Health and latency of each node, for the connected and the queried ones"""
+        nodes = set(self.web3_mapping.keys()) | set(self.nodes_stats.keys())
+        result = {}
+        for node in sorted(nodes, key=str):
+            stats = self.nodes_stats.get(node, NodeStats()).serialize()
+            stats['connected'] = node in self.web3_mapping or node == NodeName.ETHERSCAN
+            result[str(node)] = stats
+        return result
 
     def attempt_connect(
             self,
@@ -398,27 +433,25 @@ class EthereumManager():
         """Queries ethereum related data by performing the provided method to all given nodes
 
         The first node in the call order that gets a succcesful response returns.
+        Nodes that keep failing are tried last. In hedged requests mode if a node
+        takes longer than usual the request is also sent to the next node and the
+        first successful response returns.
         If none get a result then a remote error is raised
         """
-        for node in call_order:
-            web3 = self.web3_mapping.get(node, None)
-            if web3 is None and node != NodeName.ETHERSCAN:
-                continue
-
-            try:
-                result = method(web3, **kwargs)
-            except (
-                    RemoteError,
-                    requests.exceptions.RequestException,
-                    BlockchainQueryError,
-                    TransactionNotFound,
-                    KeyError,  # saw this happen inside web3.py if resulting json contains unexpected key. Probably fixed as written below, but no risking it. # noqa: E501
-                    BadResponseFormat,  # should replace the above KeyError after https://github.com/ethereum/web3.py/pull/2188  # noqa: E501
-            ) as e:
-                log.warning(f'Failed to query {node} for {str(method)} due to {str(e)}')
-                # Catch all possible errors here and just try next node call
-                continue
+        nodes = [
+            x for x in self._order_by_health(call_order)
+            if x in self.web3_mapping or x == NodeName.ETHERSCAN
+        ]
+        if self.hedge_requests:
+            success, result = self._query_hedged(method, nodes, **kwargs)
+        else:
+            success, result = False, None
+            for node in nodes:
+                success, result = self._query_node(node, method, **kwargs)
+                if success:
+                    break
 
+        if success:
             return result
 
         # no node in the call order list was succesfully queried
@@ -427,6 +460,79 @@ class EthereumManager():
             f'nodes: {[str(x) for x in call_order]}. Check logs for details.',
         )
 
+    def _query_node(self, node: NodeName, method: Callable, **kwargs: Any) -> Tuple[bool, Any]:
+        """Performs the method for a single node and records how it went in its stats
+
+        Returns whether the query succeeded and its result
+        """
+        web3 = self.web3_mapping.get(node, None)
+        if web3 is None and node != NodeName.ETHERSCAN:
+            return False, None
+
+        stats = self.nodes_stats[node]
+        start = time.monotonic()
+        try:
+            result = method(web3, **kwargs)
+        except (
+                RemoteError,
+                requests.exceptions.RequestException,
+                BlockchainQueryError,
+                TransactionNotFound,
+                KeyError,  # saw this happen inside web3.py if resulting json contains unexpected key. Probably fixed as written below, but no risking it. # noqa: E501
+                BadResponseFormat,  # should replace the above KeyError after https://github.com/ethereum/web3.py/pull/2188  # noqa: E501
+        ) as e:
+            log.warning(f'Failed to query {node} for {str(method)} due to {str(e)}')
+            # Catch all possible errors here and just try next node call
+            stats.record_failure()
+            return False, None
+
+        stats.record_success(time.monotonic() - start)
+        return True, result
+
+    def _query_hedged(
+            self,
+            method: Callable,
+            nodes: List[NodeName],
+            **kwargs: Any,
+    ) -> Tuple[bool, Any]:
+        """Queries the nodes in order, but if a node does not respond within its usual
+        latency the request is also sent to the next node. Returns the first success."""
+        remaining = list(nodes)
+        running: Dict[gevent.Greenlet, NodeName] = {}
+        last_node = None
+
+        def query_next_node() -> NodeName:
+            node = remaining.pop(0)
+            running[gevent.spawn(self._query_node, node, method, **kwargs)] = node
+            return node
+
+        try:
+            while len(remaining) != 0 or len(running) != 0:
+                if len(running) == 0:
+                    last_node = query_next_node()
+
+                timeout = None
+                if len(remaining) != 0 and len(running) < MAX_HEDGED_REQUESTS:
+                    timeout = self.nodes_stats[last_node].hedge_delay()  # type: ignore
+                done = gevent.wait(list(running.keys()), timeout=timeout, count=1)
+                if len(done) == 0:
+                    log.debug(
+                        f'{str(last_node)} did not respond within {timeout:.3f} seconds '
+                        f'for {str(method)}. Also querying {str(remaining[0])}',
+                    )
+                    last_node = query_next_node()
+                    continue
+
+                for greenlet in done:
+                    running.pop(greenlet)
+                    success, result = greenlet.get()  # re-raises unexpected errors
+                    if success:
+                        return True, result
+        finally:
+            gevent.killall(list(running.keys()), block=False)
+
+        return False, None
+
     def _get_latest_block_number(self, web3: Optional[Web3]) -> int:
         if web3 is not None:
             return web3.eth.block_number
@@ -521,31 +627,47 @@ class EthereumManager():
         result = self.get_multieth_balance([account])
         return result[account]
 
+    def max_call_arguments(self) -> int:
+        """How many addresses can be given as arguments in a single contract call
+
+        Etherscan is limited by the length of the request URI while for the nodes it's
+        the gas that limits it.
+        """
+        if self.connected_to_any_web3():
+            return NODE_MAX_CALL_ARGUMENTS
+        return ETHERSCAN_MAX_CALL_ARGUMENTS
+
     def get_multieth_balance(
             self,
             accounts: List[ChecksumEthAddress],
             call_order: Optional[Sequence[NodeName]] = None,
+            block_identifier: Optional[int] = None,
     ) -> Dict[ChecksumEthAddress, FVal]:
         """Returns a dict with keys being accounts and balances in ETH
 
+        The accounts are queried in as few calls as the call limits allow. If a block
+        number is given the balances are queried at that block.
+
         May raise:
         - RemoteError if an external service such as Etherscan is queried and
           there is a problem with its query.
         """
-        balances: Dict[ChecksumEthAddress, FVal] = {}
         log.debug(
             'Querying ethereum chain for ETH balance',
             eth_addresses=accounts,
+            block_identifier=block_identifier,
         )
-        result = ETH_SCAN.call(
-            ethereum=self,
-            method_name='etherBalances',
-            arguments=[accounts],
-            call_order=call_order if call_order is not None else self.default_call_order(),
-        )
-        balances = {}
-        for idx, account in enumerate(accounts):
-            balances[account] = from_wei(result[idx])
+        balances: Dict[ChecksumEthAddress, FVal] = {}
+        for accounts_chunk in get_chunks(accounts, n=self.max_call_arguments()):
+            result = ETH_SCAN.call(
+                ethereum=self,
+                method_name='etherBalances',
+                arguments=[accounts_chunk],
+                call_order=call_order if call_order is not None else self.default_call_order(),
+                block_identifier=block_identifier,
+            )
+            for idx, account in enumerate(accounts_chunk):
+                balances[account] = from_wei(result[idx])
         return balances
 
     def get_block_by_number(
@@ -729,6 +851,7 @@ class EthereumManager():
             abi: List,
             method_name: str,
             arguments: Optional[List[Any]] = None,
+            block_identifier: Optional[int] = None,
     ) -> Any:
         """Performs an eth_call to an ethereum contract via etherscan
 
@@ -742,6 +865,7 @@ class EthereumManager():
         result = self.etherscan.eth_call(
             to_address=contract_address,
             input_data=input_data,
+            block_identifier=block_identifier,
         )
         if result == '0x':
             raise BlockchainQueryError(
@@ -842,7 +966,9 @@ class EthereumManager():
             method_name: str,
             arguments: Optional[List[Any]] = None,
             call_order: Optional[Sequence[NodeName]] = None,
+            block_identifier: Optional[int] = None,
     ) -> Any:
+        """Calls a contract method at the given block number or at the latest block"""
         return self.query(
             method=self._call_contract,
             call_order=call_order if call_order is not None else self.default_call_order(),
@@ -850,6 +976,7 @@ class EthereumManager():
             abi=abi,
             method_name=method_name,
             arguments=arguments,
+            block_identifier=block_identifier,
         )
 
     def _call_contract(
@@ -859,6 +986,7 @@ class EthereumManager():
             abi: List,
             method_name: str,
             arguments: Optional[List[Any]] = None,
+            block_identifier: Optional[int] = None,
     ) -> Any:
         """Performs an eth_call to an ethereum contract
 
@@ -873,11 +1001,15 @@ class EthereumManager():
                 abi=abi,
                 method_name=method_name,
                 arguments=arguments,
+                block_identifier=block_identifier,
             )
 
         contract = web3.eth.contract(address=contract_address, abi=abi)
         try:
-            method = getattr(contract.caller, method_name)
+            caller = contract.caller(
+                block_identifier=block_identifier if block_identifier is not None else 'latest',
+            )
+            method = getattr(caller, method_name)
             result = method(*arguments if arguments else [])
         except (ValueError, BadFunctionCallOutput) as e:
             raise BlockchainQueryError(
@@ -1,3 +1,6 @@
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 __all__ = [
     'Aave',
     'Adex',
@@ -16,18 +19,47 @@ __all__ = [
     'Nfts',
 ]
 
-from .aave.aave import Aave
-from .adex.adex import Adex
-from .balancer.balancer import Balancer
-from .compound import Compound
-from .eth2 import Eth2
-from .l2.loopring import Loopring
-from .liquity.trove import Liquity
-from .makerdao.dsr import MakerdaoDsr
-from .makerdao.vaults import MakerdaoVaults
-from .nfts import Nfts
-from .pickle import PickleFinance
-from .sushiswap.sushiswap import Sushiswap
-from .uniswap.uniswap import Uniswap
-from .yearn.vaults import YearnVaults
-from .yearn.vaultsv2 import YearnVaultsV2
+if TYPE_CHECKING:
+    from .aave.aave import Aave
+    from .adex.adex import Adex
+    from .balancer.balancer import Balancer
+    from .compound import Compound
+    from .eth2 import Eth2
+    from .l2.loopring import Loopring
+    from .liquity.trove import Liquity
+    from .makerdao.dsr import MakerdaoDsr
+    from .makerdao.vaults import MakerdaoVaults
+    from .nfts import Nfts
+    from .pickle import PickleFinance
+    from .sushiswap.sushiswap import Sushiswap
+    from .uniswap.uniswap import Uniswap
+    from .yearn.vaults import YearnVaults
+    from .yearn.vaultsv2 import YearnVaultsV2
+
+# Module classes are only imported when first accessed, which normally happens when
+# the ChainManager activates a module. That way startup does not import all of them.
+_LAZY_MODULE_CLASSES = {
+    'Aave': '.aave.aave',
+    'Adex': '.adex.adex',
+    'Balancer': '.balancer.balancer',
+    'Compound': '.compound',
+    'Eth2': '.eth2',
+    'Loopring': '.l2.loopring',
+    'Liquity': '.liquity.trove',
+    'MakerdaoDsr': '.makerdao.dsr',
+    'MakerdaoVaults': '.makerdao.vaults',
+    'Nfts': '.nfts',
+    'PickleFinance': '.pickle',
+    'Sushiswap': '.sushiswap.sushiswap',
+    'Uniswap': '.uniswap.uniswap',
+    'YearnVaults': '.yearn.vaults',
+    'YearnVaultsV2': '.yearn.vaultsv2',
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_path = _LAZY_MODULE_CLASSES.get(name)
+    if module_path is None:
+        raise AttributeError(f'module {__name__} has no attribute {name}')
+
+    return getattr(import_module(module_path, __name__), name)
@@ -2,7 +2,6 @@ import logging
 from collections import defaultdict
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Union, cast, overload
 
-import requests
 from eth_typing import ChecksumAddress
 from typing_extensions import Literal
 from web3 import Web3
@@ -36,6 +35,7 @@ from rotkehlchen.typing import ChecksumEthAddress, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.interfaces import EthereumModule
 from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.network import create_session
 
 from .graph import BONDS_QUERY, CHANNEL_WITHDRAWS_QUERY, UNBOND_REQUESTS_QUERY, UNBONDS_QUERY
 from .typing import (
@@ -86,7 +86,7 @@ class Adex(EthereumModule):
         self.database = database
         self.premium = premium
         self.msg_aggregator = msg_aggregator
-        self.session = requests.session()
+        self.session = create_session()
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         self.staking_pool = EthereumConstants().contract('ADEX_STAKING_POOL')
 
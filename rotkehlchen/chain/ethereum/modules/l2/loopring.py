@@ -130,6 +130,7 @@ from rotkehlchen.typing import ChecksumEthAddress, ExternalService
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.interfaces import EthereumModule
 from rotkehlchen.utils.mixins.lockable import LockableQueryMixIn, protect_with_lock
+from rotkehlchen.utils.network import create_session
 
 if TYPE_CHECKING:
     from rotkehlchen.accounting.structures import AssetBalance
@@ -297,7 +298,7 @@ class Loopring(ExternalServiceWithApiKey, EthereumModule, LockableQueryMixIn):
         super().__init__(database=database, service_name=ExternalService.LOOPRING)
         api_key = self._get_api_key()
         self.msg_aggregator = msg_aggregator
-        self.session = requests.session()
+        self.session = create_session()
         if api_key:
             self.session.headers.update({'X-API-KEY': api_key})
         self.base_url = 'https://api3.loopring.io/api/v3/'
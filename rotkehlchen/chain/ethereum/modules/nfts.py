@@ -69,25 +69,26 @@ class Nfts(CacheableMixIn, LockableQueryMixIn):  # lgtm [py/missing-call-to-init
         """May raise RemoteError"""
         result = {}
         total_nfts_num = 0
+        if self.premium is not None:
+            accounts_nfts = self.opensea.get_accounts_nfts(addresses)
+            for address in addresses:
+                nfts = accounts_nfts[address]
+                if len(nfts) != 0:
+                    result[address] = nfts
+                    total_nfts_num += len(nfts)
+
+            return result, total_nfts_num
+
+        # else query one account at a time so no account is queried after the free limit
         for address in addresses:
             nfts = self.opensea.get_account_nfts(address)
-            nfts_num = len(nfts)
-            if nfts_num != 0:
-                if self.premium is None:
-                    if nfts_num + total_nfts_num > FREE_NFT_LIMIT:
-                        remaining_size = FREE_NFT_LIMIT - total_nfts_num
-                    else:
-                        remaining_size = nfts_num
-
-                    if remaining_size != 0:
-                        result[address] = nfts[:remaining_size]
-                        total_nfts_num += remaining_size
-                        continue
-
-                    break  # else we hit the nft limit so break
-
-                result[address] = nfts
-                total_nfts_num += nfts_num
+            remaining_size = min(len(nfts), FREE_NFT_LIMIT - total_nfts_num)
+            if remaining_size != 0:
+                result[address] = nfts[:remaining_size]
+                total_nfts_num += remaining_size
+
+            if total_nfts_num >= FREE_NFT_LIMIT:
+                break  # we hit the nft limit
 
         return result, total_nfts_num
 
@@ -0,0 +1,131 @@
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Mapping, Optional, Sequence
+
+from .typing import NodeName
+
+# Weight of the latest request in the moving averages of latency and error rate
+NODE_LATENCY_SMOOTHING = 0.3
+NODE_ERROR_RATE_SMOOTHING = 0.2
+# Number of latest request durations kept per node to calculate latency percentiles
+NODE_LATENCY_SAMPLES = 50
+# Consecutive failures after which a node is only queried if all other nodes fail
+CIRCUIT_BREAKER_FAILURES = 3
+# Seconds after which a node with an open circuit is given another chance
+CIRCUIT_BREAKER_COOLDOWN_SECS = 60
+# Percentile of a node's latency after which a hedged request is sent to the next node
+HEDGE_LATENCY_PERCENTILE = 0.9
+# Seconds to wait before hedging for nodes without enough latency samples
+HEDGE_DEFAULT_DELAY_SECS = 2.0
+HEDGE_MIN_SAMPLES = 5
+# Minimum weight so that even the worst node has a chance to show it got better
+MIN_NODE_WEIGHT = 0.01
+
+
+class NodeStats():
+    """Health of an ethereum node as seen by the queries made to it"""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.failures = 0
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.circuit_open_until: Optional[float] = None
+        self.latency_samples: Deque[float] = deque(maxlen=NODE_LATENCY_SAMPLES)
+
+    def record_success(self, seconds: float) -> None:
+        self.requests += 1
+        self.consecutive_failures = 0
+        self.circuit_open_until = None
+        self.error_rate *= 1 - NODE_ERROR_RATE_SMOOTHING
+        self.latency_samples.append(seconds)
+        if self.latency is None:
+            self.latency = seconds
+        else:
+            self.latency = (
+                NODE_LATENCY_SMOOTHING * seconds + (1 - NODE_LATENCY_SMOOTHING) * self.latency
+            )
+
+    def record_failure(self) -> None:
+        self.requests += 1
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.error_rate = (
+            NODE_ERROR_RATE_SMOOTHING + (1 - NODE_ERROR_RATE_SMOOTHING) * self.error_rate
+        )
+        if self.consecutive_failures >= CIRCUIT_BREAKER_FAILURES:
+            self.circuit_open_until = time.monotonic() + CIRCUIT_BREAKER_COOLDOWN_SECS
+
+    def circuit_open(self) -> bool:
+        """A node's circuit is open after too many consecutive failures and until the
+        cooldown passes. After that a single failure opens it again."""
+        return (
+            self.circuit_open_until is not None and
+            time.monotonic() < self.circuit_open_until
+        )
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if len(self.latency_samples) == 0:
+            return None
+        samples = sorted(self.latency_samples)
+        return samples[min(int(percentile * len(samples)), len(samples) - 1)]
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for this node before sending the same request to another one"""
+        if len(self.latency_samples) < HEDGE_MIN_SAMPLES:
+            return HEDGE_DEFAULT_DELAY_SECS
+        return self.latency_percentile(HEDGE_LATENCY_PERCENTILE)  # type: ignore  # has samples
+
+    def serialize(self) -> Dict[str, Any]:
+        p90_latency = self.latency_percentile(0.9)
+        return {
+            'requests': self.requests,
+            'failures': self.failures,
+            'error_rate': round(self.error_rate, 3),
+            'latency': None if self.latency is None else round(self.latency, 3),
+            'p90_latency': None if p90_latency is None else round(p90_latency, 3),
+            'circuit_open': self.circuit_open(),
+        }
+
+
+def order_nodes_by_score(
+        nodes: Sequence[NodeName],
+        weights: Mapping[NodeName, float],
+        nodes_stats: Mapping[NodeName, NodeStats],
+) -> List[NodeName]:
+    """Orders the given nodes randomly with a probability depending on their score
+
+    The score of a node is its weight, lowered by its error rate and by how slower
+    than the median node it is. Nodes without stats get the median latency.
+    Nodes with an open circuit go last, those that failed most recently at the end.
+    """
+    latencies = sorted(
+        nodes_stats[x].latency for x in nodes  # type: ignore  # checked below
+        if x in nodes_stats and nodes_stats[x].latency is not None
+    )
+    median_latency = latencies[len(latencies) // 2] if len(latencies) != 0 else None
+    selection, scores, broken = [], [], []
+    for node in nodes:
+        stats = nodes_stats.get(node)
+        if stats is not None and stats.circuit_open():
+            broken.append(node)
+            continue
+
+        score = weights.get(node, MIN_NODE_WEIGHT)
+        if stats is not None:
+            score *= 1 - stats.error_rate
+            if stats.latency is not None and median_latency:
+                score *= median_latency / max(stats.latency, 0.001)
+        selection.append(node)
+        scores.append(max(score, MIN_NODE_WEIGHT))
+
+    ordered_list = []
+    while len(selection) != 0:
+        idx = random.choices(range(len(selection)), scores, k=1)[0]
+        ordered_list.append(selection.pop(idx))
+        scores.pop(idx)
+
+    broken.sort(key=lambda x: nodes_stats[x].circuit_open_until)  # type: ignore  # is open
+    return ordered_list + broken
@@ -1,5 +1,4 @@
 import logging
-import random
 from collections import defaultdict
 from typing import Dict, List, Optional, Sequence, Tuple
 
@@ -8,7 +7,6 @@ from rotkehlchen.chain.ethereum.manager import EthereumManager, NodeName
 from rotkehlchen.chain.ethereum.typing import string_to_ethereum_address
 from rotkehlchen.chain.ethereum.utils import token_normalized_value
 from rotkehlchen.constants.ethereum import ETH_SCAN
-from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.errors import RemoteError
 from rotkehlchen.fval import FVal
@@ -57,6 +55,43 @@ ETHERSCAN_MAX_TOKEN_CHUNK_LENGTH = 120
 OTHER_MAX_TOKEN_CHUNK_LENGTH = 590
 
 
+def _pack_addresses_batches(
+        address_tokens: List[Tuple[ChecksumEthAddress, List[EthereumToken]]],
+        max_arguments: int,
+        max_balance_queries: int,
+) -> List[Tuple[List[ChecksumEthAddress], List[EthereumToken]]]:
+    """Packs addresses along with their known tokens into batches that can each be
+    queried with a single tokensBalances call
+
+    A batch's addresses and the union of their tokens should fit in max_arguments
+    (the URI length for etherscan) and the balances queried in the contract, which is
+    addresses times tokens, should not go over max_balance_queries (the gas).
+    Addresses that fit in no batch on their own end up in a batch by themselves.
+    """
+    batches: List[Tuple[List[ChecksumEthAddress], List[EthereumToken]]] = []
+    batch_addresses: List[ChecksumEthAddress] = []
+    batch_tokens: Dict[EthereumToken, None] = {}  # dict to keep the order of the tokens
+    for address, tokens in address_tokens:
+        new_tokens = dict(batch_tokens)
+        new_tokens.update((x, None) for x in tokens)
+        fits = (
+            len(batch_addresses) + 1 + len(new_tokens) <= max_arguments and
+            (len(batch_addresses) + 1) * len(new_tokens) <= max_balance_queries
+        )
+        if fits or len(batch_addresses) == 0:
+            batch_addresses.append(address)
+            batch_tokens = new_tokens
+            continue
+
+        batches.append((batch_addresses, list(batch_tokens)))
+        batch_addresses = [address]
+        batch_tokens = dict.fromkeys(tokens)
+
+    if len(batch_addresses) != 0:
+        batches.append((batch_addresses, list(batch_tokens)))
+    return batches
+
+
 class EthTokens():
 
     def __init__(self, database: DBHandler, ethereum: EthereumManager):
@@ -66,9 +101,9 @@ class EthTokens():
     def detect_tokens_for_address(
             self,
             address: ChecksumEthAddress,
-            token_usd_price: Dict[EthereumToken, Price],
             etherscan_chunks: List[List[EthereumToken]],
             other_chunks: List[List[EthereumToken]],
+            block_identifier: Optional[int] = None,
     ) -> Dict[EthereumToken, FVal]:
         balances: Dict[EthereumToken, FVal] = defaultdict(FVal)
         if self.ethereum.connected_to_any_web3():
@@ -76,24 +111,23 @@ class EthTokens():
             if NodeName.OWN in self.ethereum.web3_mapping:
                 call_order = [NodeName.OWN]
             for chunk in other_chunks:
-                self._get_tokens_balance_and_price(
+                self._get_tokens_balance(
                     address=address,
                     tokens=chunk,
                     balances=balances,
-                    token_usd_price=token_usd_price,
-                    call_order=call_order + random.sample(
+                    call_order=call_order + self.ethereum.order_nodes_by_score(
                         (NodeName.MYCRYPTO, NodeName.BLOCKSCOUT, NodeName.AVADO_POOL),
-                        3,
                     ),
+                    block_identifier=block_identifier,
                 )
         else:
             for chunk in etherscan_chunks:
-                self._get_tokens_balance_and_price(
+                self._get_tokens_balance(
                     address=address,
                     tokens=chunk,
                     balances=balances,
-                    token_usd_price=token_usd_price,
                     call_order=(NodeName.ETHERSCAN,),
+                    block_identifier=block_identifier,
                 )
 
         # now that detection happened we also have to save it in the DB for the address
@@ -105,17 +139,20 @@ class EthTokens():
             self,
             addresses: List[ChecksumEthAddress],
             force_detection: bool,
+            block_identifier: Optional[int] = None,
     ) -> TokensReturn:
         """Queries/detects token balances for a list of addresses
 
         If an address's tokens were recently autodetected they are not detected again but the
-        balances are simply queried. Unless force_detection is True.
+        balances are simply queried, for many addresses at once. Unless force_detection is True.
+        If a block number is given all balances are queried at that block.
 
         Returns the token balances of each address and the usd prices of the tokens
         """
         log.debug(
             'Querying/detecting token balances for all addresses',
             force_detection=force_detection,
+            block_identifier=block_identifier,
         )
         ignored_assets = self.db.get_ignored_assets()
         exceptions = [
@@ -149,47 +186,127 @@ class EthTokens():
         etherscan_chunks = list(get_chunks(all_tokens, n=ETHERSCAN_MAX_TOKEN_CHUNK_LENGTH))
         other_chunks = list(get_chunks(all_tokens, n=OTHER_MAX_TOKEN_CHUNK_LENGTH))
         now = ts_now()
-        token_usd_price: Dict[EthereumToken, Price] = {}
         result = {}
+        known_tokens = []
 
         for address in addresses:
             saved_list = self.db.get_tokens_for_address_if_time(address=address, current_time=now)
             if force_detection or saved_list is None:
                 balances = self.detect_tokens_for_address(
                     address=address,
-                    token_usd_price=token_usd_price,
                     etherscan_chunks=etherscan_chunks,
                     other_chunks=other_chunks,
+                    block_identifier=block_identifier,
                 )
-            else:
-                if len(saved_list) == 0:
-                    continue  # Do not query if we know the address has no tokens
+                result[address] = balances
+            elif len(saved_list) != 0:  # Do not query if we know the address has no tokens
+                known_tokens.append((address, saved_list))
 
-                balances = defaultdict(FVal)
-                self._get_tokens_balance_and_price(
-                    address=address,
-                    tokens=saved_list,
+        if self.ethereum.connected_to_any_web3():
+            max_arguments = OTHER_MAX_TOKEN_CHUNK_LENGTH
+        else:
+            # With etherscan the limit is the request uri length
+            max_arguments = ETHERSCAN_MAX_TOKEN_CHUNK_LENGTH
+        for batch_addresses, batch_tokens in _pack_addresses_batches(
+                address_tokens=known_tokens,
+                max_arguments=max_arguments,
+                max_balance_queries=OTHER_MAX_TOKEN_CHUNK_LENGTH,
+        ):
+            self._get_addresses_tokens_balance(
+                addresses=batch_addresses,
+                tokens=batch_tokens,
+                result=result,
+                max_arguments=max_arguments,
+                block_identifier=block_identifier,
+            )
+
+        # Price all found tokens at once so that oracles are queried for many of them together
+        found_tokens = {token for balances in result.values() for token in balances}
+        prices = Inquirer().find_usd_prices(found_tokens)
+        return result, {token: prices[token] for token in found_tokens}
+
+    def _get_addresses_tokens_balance(
+            self,
+            addresses: List[ChecksumEthAddress],
+            tokens: List[EthereumToken],
+            result: Dict[ChecksumEthAddress, Dict[EthereumToken, FVal]],
+            max_arguments: int,
+            block_identifier: Optional[int],
+    ) -> None:
+        """Queries the balances of the given tokens for multiple addresses in one call
+
+        If the call fails, for example due to running out of gas, the addresses are
+        split in half and each half is queried separately. A single address that
+        does not fit in one call is queried in chunks of its tokens.
+
+        May raise:
+        - RemoteError if an external service such as Etherscan is queried and
+          there is a problem with its query.
+        """
+        if len(addresses) == 1 and len(tokens) > max_arguments:
+            balances = result.setdefault(addresses[0], defaultdict(FVal))
+            for chunk in get_chunks(tokens, n=max_arguments):
+                self._get_tokens_balance(
+                    address=addresses[0],
+                    tokens=chunk,
                     balances=balances,
-                    token_usd_price=token_usd_price,
                     call_order=None,  # use defaults
+                    block_identifier=block_identifier,
                 )
+            return
 
-            result[address] = balances
+        log.debug(
+            'Querying ethereum chain for multi token multi account balances',
+            eth_addresses=addresses,
+            tokens_num=len(tokens),
+        )
+        try:
+            token_amounts = ETH_SCAN.call(
+                ethereum=self.ethereum,
+                method_name='tokensBalances',
+                arguments=[addresses, [x.ethereum_address for x in tokens]],
+                block_identifier=block_identifier,
+            )
+        except RemoteError as e:
+            if len(addresses) == 1:
+                raise
 
-        return result, token_usd_price
+            half = len(addresses) // 2
+            log.debug(
+                f'Multi account token balances query failed with {str(e)}. '
+                f'Retrying with half the addresses per call',
+            )
+            for addresses_half in (addresses[:half], addresses[half:]):
+                self._get_addresses_tokens_balance(
+                    addresses=addresses_half,
+                    tokens=tokens,
+                    result=result,
+                    max_arguments=max_arguments,
+                    block_identifier=block_identifier,
+                )
+            return
+
+        for address, address_amounts in zip(addresses, token_amounts):
+            balances = result.setdefault(address, defaultdict(FVal))
+            for tk_idx, token in enumerate(tokens):
+                token_amount = address_amounts[tk_idx]
+                if token_amount == 0:
+                    continue
+                balances[token] += token_normalized_value(token_amount, token)
 
-    def _get_tokens_balance_and_price(
+    def _get_tokens_balance(
             self,
             address: ChecksumEthAddress,
             tokens: List[EthereumToken],
             balances: Dict[EthereumToken, FVal],
-            token_usd_price: Dict[EthereumToken, Price],
             call_order: Optional[Sequence[NodeName]],
+            block_identifier: Optional[int] = None,
     ) -> None:
         ret = self._get_multitoken_account_balance(
             tokens=tokens,
             account=address,
             call_order=call_order,
+            block_identifier=block_identifier,
         )
         for token_identifier, value in ret.items():
             token = EthereumToken.from_identifier(token_identifier)
@@ -200,20 +317,13 @@ class EthTokens():
                 )
                 continue
             balances[token] += value
-            if token in token_usd_price:
-                continue
-            # else get the price
-            try:
-                usd_price = Inquirer().find_usd_price(token)
-            except RemoteError:
-                usd_price = Price(ZERO)
-            token_usd_price[token] = usd_price
 
     def _get_multitoken_account_balance(
             self,
             tokens: List[EthereumToken],
             account: ChecksumEthAddress,
             call_order: Optional[Sequence[NodeName]],
+            block_identifier: Optional[int] = None,
     ) -> Dict[str, FVal]:
         """Queries balances of multiple tokens for an account
 
@@ -237,6 +347,7 @@ class EthTokens():
             method_name='tokensBalance',
             arguments=[account, [x.ethereum_address for x in tokens]],
             call_order=call_order,
+            block_identifier=block_identifier,
         )
         for tk_idx, token in enumerate(tokens):
             token_amount = result[tk_idx]
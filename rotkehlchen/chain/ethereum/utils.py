@@ -97,16 +97,19 @@ def multicall_2(
         calls: List[Tuple[ChecksumEthAddress, str]],
         require_success: bool,
         call_order: Optional[Sequence['NodeName']] = None,
+        block_identifier: Optional[int] = None,
 ) -> List[Tuple[bool, bytes]]:
     """
     Use a MULTICALL_2 contract for an aggregated query. If require_success
     is set to False any call in the list of calls is allowed to fail.
+    If a block number is given all calls are performed at that block.
     """
     return ETH_MULTICALL_2.call(
         ethereum=ethereum,
         method_name='tryAggregate',
         arguments=[require_success, calls],
         call_order=call_order,
+        block_identifier=block_identifier,
     )
 
 
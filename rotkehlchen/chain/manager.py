@@ -32,25 +32,9 @@ from rotkehlchen.accounting.structures import (
     DefiEventType,
 )
 from rotkehlchen.assets.asset import Asset, EthereumToken
-from rotkehlchen.chain.bitcoin import get_bitcoin_addresses_balances
+from rotkehlchen.chain.bitcoin import BlockstreamStatsCache, get_bitcoin_addresses_balances
 from rotkehlchen.chain.ethereum.defi.chad import DefiChad
 from rotkehlchen.chain.ethereum.defi.structures import DefiProtocolBalances
-from rotkehlchen.chain.ethereum.modules import (
-    Aave,
-    Adex,
-    Balancer,
-    Compound,
-    Eth2,
-    Liquity,
-    Loopring,
-    MakerdaoDsr,
-    MakerdaoVaults,
-    PickleFinance,
-    Sushiswap,
-    Uniswap,
-    YearnVaults,
-    YearnVaultsV2,
-)
 from rotkehlchen.chain.ethereum.structures import Eth2Validator
 from rotkehlchen.chain.ethereum.tokens import EthTokens
 from rotkehlchen.chain.ethereum.typing import string_to_ethereum_address
@@ -107,7 +91,23 @@ from rotkehlchen.utils.mixins.lockable import LockableQueryMixIn, protect_with_l
 if TYPE_CHECKING:
     from rotkehlchen.chain.avalanche.manager import AvalancheManager
     from rotkehlchen.chain.ethereum.manager import EthereumManager
-    from rotkehlchen.chain.ethereum.modules.nfts import Nfts
+    from rotkehlchen.chain.ethereum.modules import (
+        Aave,
+        Adex,
+        Balancer,
+        Compound,
+        Eth2,
+        Liquity,
+        Loopring,
+        MakerdaoDsr,
+        MakerdaoVaults,
+        Nfts,
+        PickleFinance,
+        Sushiswap,
+        Uniswap,
+        YearnVaults,
+        YearnVaultsV2,
+    )
     from rotkehlchen.chain.ethereum.typing import Eth2Deposit, ValidatorDetails
     from rotkehlchen.chain.substrate.manager import SubstrateManager
     from rotkehlchen.db.dbhandler import DBHandler
@@ -345,6 +345,7 @@ class ChainManager(CacheableMixIn, LockableQueryMixIn):
         self.data_directory = data_directory
         self.beaconchain = beaconchain
         self.btc_derivation_gap_limit = btc_derivation_gap_limit
+        self.blockstream_stats_cache = BlockstreamStatsCache()
         self.defi_balances_last_query_ts = Timestamp(0)
         self.defi_balances: Dict[ChecksumEthAddress, List[DefiProtocolBalances]] = {}
 
@@ -469,59 +470,59 @@ class ChainManager(CacheableMixIn, LockableQueryMixIn):
         return
 
     @overload
-    def get_module(self, module_name: Literal['aave']) -> Optional[Aave]:
+    def get_module(self, module_name: Literal['aave']) -> Optional['Aave']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['adex']) -> Optional[Adex]:
+    def get_module(self, module_name: Literal['adex']) -> Optional['Adex']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['balancer']) -> Optional[Balancer]:
+    def get_module(self, module_name: Literal['balancer']) -> Optional['Balancer']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['compound']) -> Optional[Compound]:
+    def get_module(self, module_name: Literal['compound']) -> Optional['Compound']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['eth2']) -> Optional[Eth2]:
+    def get_module(self, module_name: Literal['eth2']) -> Optional['Eth2']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['loopring']) -> Optional[Loopring]:
+    def get_module(self, module_name: Literal['loopring']) -> Optional['Loopring']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['makerdao_dsr']) -> Optional[MakerdaoDsr]:
+    def get_module(self, module_name: Literal['makerdao_dsr']) -> Optional['MakerdaoDsr']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['makerdao_vaults']) -> Optional[MakerdaoVaults]:
+    def get_module(self, module_name: Literal['makerdao_vaults']) -> Optional['MakerdaoVaults']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['uniswap']) -> Optional[Uniswap]:
+    def get_module(self, module_name: Literal['uniswap']) -> Optional['Uniswap']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['sushiswap']) -> Optional[Sushiswap]:
+    def get_module(self, module_name: Literal['sushiswap']) -> Optional['Sushiswap']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['yearn_vaults']) -> Optional[YearnVaults]:
+    def get_module(self, module_name: Literal['yearn_vaults']) -> Optional['YearnVaults']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['yearn_vaults_v2']) -> Optional[YearnVaultsV2]:
+    def get_module(self, module_name: Literal['yearn_vaults_v2']) -> Optional['YearnVaultsV2']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['liquity']) -> Optional[Liquity]:
+    def get_module(self, module_name: Literal['liquity']) -> Optional['Liquity']:
         ...
 
     @overload
-    def get_module(self, module_name: Literal['pickle_finance']) -> Optional[PickleFinance]:
+    def get_module(self, module_name: Literal['pickle_finance']) -> Optional['PickleFinance']:
         ...
 
     @overload
@@ -604,24 +605,27 @@ class ChainManager(CacheableMixIn, LockableQueryMixIn):
         return self.get_balances_update()
 
     @protect_with_lock()
-    @cache_response_timewise()
-    def query_btc_balances(
-            self,  # pylint: disable=unused-argument
-            # Kwargs here is so linters don't complain when the "magic" ignore_cache kwarg is given
-            **kwargs: Any,
-    ) -> None:
+    @cache_response_timewise(forward_ignore_cache=True)
+    def query_btc_balances(self, ignore_cache: bool = False) -> None:
         """Queries blockchain.info/blockstream for the balance of all BTC accounts
 
+        If ignore_cache is True the short lived blockstream stats cache is cleared first
+
         May raise:
         - RemotError if there is a problem querying any remote
         """
         if len(self.accounts.btc) == 0:
             return
 
+        if ignore_cache is True:
+            self.blockstream_stats_cache.clear()
         self.balances.btc = {}
         btc_usd_price = Inquirer().find_usd_price(A_BTC)
         total = FVal(0)
-        balances = get_bitcoin_addresses_balances(self.accounts.btc)
+        balances = get_bitcoin_addresses_balances(
+            accounts=self.accounts.btc,
+            stats_cache=self.blockstream_stats_cache,
+        )
         for account, balance in balances.items():
             total += balance
             self.balances.btc[account] = Balance(
@@ -1314,11 +1318,12 @@ class ChainManager(CacheableMixIn, LockableQueryMixIn):
             action: AccountAction,
             given_accounts: Optional[List[ChecksumEthAddress]] = None,
             force_detection: bool = False,
+            block_identifier: Optional[int] = None,
     ) -> None:
         """Queries ethereum token balance via either etherscan or ethereum node
 
         By default queries all accounts but can also be given a specific list of
-        accounts to query.
+        accounts to query. If a block number is given the balances are queried at it.
 
         Should come here during addition of a new account or querying of all token
         balances.
@@ -1339,6 +1344,7 @@ class ChainManager(CacheableMixIn, LockableQueryMixIn):
             balance_result, token_usd_price = ethtokens.query_tokens_for_addresses(
                 addresses=accounts,
                 force_detection=force_detection,
+                block_identifier=block_identifier,
             )
         except BadFunctionCallOutput as e:
             log.error(
@@ -1352,9 +1358,15 @@ class ChainManager(CacheableMixIn, LockableQueryMixIn):
 
         self._update_balances_after_token_query(action, balance_result, token_usd_price)  # noqa: E501
 
-    def query_ethereum_tokens(self, force_detection: bool) -> None:
+    def query_ethereum_tokens(
+            self,
+            force_detection: bool,
+            block_identifier: Optional[int] = None,
+    ) -> None:
         """Queries the ethereum token balances and populates the state
 
+        If a block number is given the balances are queried at that block.
+
         May raise:
         - RemoteError if an external service such as Etherscan or cryptocompare
         is queried and there is a problem with its query.
@@ -1367,7 +1379,11 @@ class ChainManager(CacheableMixIn, LockableQueryMixIn):
         for token in [x for x, _ in self.totals.liabilities.items() if x.is_eth_token()]:
             del self.totals.liabilities[token]
 
-        self._query_ethereum_tokens(action=AccountAction.QUERY, force_detection=force_detection)
+        self._query_ethereum_tokens(
+            action=AccountAction.QUERY,
+            force_detection=force_detection,
+            block_identifier=block_identifier,
+        )
 
     def query_defi_balances(self) -> Dict[ChecksumEthAddress, List[DefiProtocolBalances]]:
         """Queries DeFi balances from Zerion contract and updates the state
@@ -1405,10 +1421,21 @@ class ChainManager(CacheableMixIn, LockableQueryMixIn):
         if len(self.accounts.eth) == 0:
             return
 
+        # Pin the ETH and token balances to the same block so that they are consistent
+        # with each other even if a new block comes in the middle of the queries
+        try:
+            block_identifier: Optional[int] = self.ethereum.get_latest_block_number()
+        except RemoteError as e:
+            log.warning(f'Could not get the latest block to query balances at: {str(e)}')
+            block_identifier = None
+
         # Query ethereum ETH balances
         eth_accounts = self.accounts.eth
         eth_usd_price = Inquirer().find_usd_price(A_ETH)
-        balances = self.ethereum.get_multieth_balance(eth_accounts)
+        balances = self.ethereum.get_multieth_balance(
+            accounts=eth_accounts,
+            block_identifier=block_identifier,
+        )
         eth_total = FVal(0)
         for account, balance in balances.items():
             eth_total += balance
@@ -1419,7 +1446,10 @@ class ChainManager(CacheableMixIn, LockableQueryMixIn):
         self.totals.assets[A_ETH] = Balance(amount=eth_total, usd_value=eth_total * eth_usd_price)
 
         self.query_defi_balances()
-        self.query_ethereum_tokens(force_token_detection)
+        self.query_ethereum_tokens(
+            force_detection=force_token_detection,
+            block_identifier=block_identifier,
+        )
         self._add_protocol_balances()
 
     def _add_protocol_balances(self) -> None:
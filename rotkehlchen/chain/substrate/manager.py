@@ -1,4 +1,5 @@
 import logging
+import time
 from functools import wraps
 from http import HTTPStatus
 from json.decoder import JSONDecodeError
@@ -9,7 +10,11 @@ import gevent
 import requests
 from requests.adapters import Response
 from substrateinterface import SubstrateInterface
-from substrateinterface.exceptions import BlockNotFound, SubstrateRequestException
+from substrateinterface.exceptions import (
+    BlockNotFound,
+    StorageFunctionNotFound,
+    SubstrateRequestException,
+)
 from typing_extensions import Literal
 from websocket import WebSocketException
 
@@ -22,6 +27,7 @@ from rotkehlchen.greenlets import GreenletManager
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import deserialize_int_from_str
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.misc import get_chunks
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 from .typing import (
@@ -39,6 +45,11 @@ from .utils import KUSAMA_NODE_CONNECTION_TIMEOUT
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Maximum number of accounts whose balances are queried in a single storage query
+SUBSTRATE_MAX_ACCOUNTS_PER_QUERY = 100
+# Weight of the latest request duration in the moving average latency of a node
+NODE_LATENCY_SMOOTHING = 0.3
+
 
 class SubstrateChainProperties(NamedTuple):
     """These properties are populated straight from the blockchain.
@@ -86,9 +97,12 @@ def request_available_nodes(func: Callable) -> Callable:
         requested_nodes = []
         for node, node_attributes in manager.available_nodes_call_order:
             kwargs_.update({'node_interface': node_attributes.node_interface})
+            start_ts = time.monotonic()
             try:
                 result = func(manager, *args_, **kwargs_)
             except RemoteError as e:
+                # A failure counts as a request that took as long as the timeout
+                manager.record_node_latency(node, KUSAMA_NODE_CONNECTION_TIMEOUT)
                 requested_nodes.append(str(node))
                 endpoint = node_attributes.node_interface.url
                 log.warning(
@@ -99,6 +113,7 @@ def request_available_nodes(func: Callable) -> Callable:
                 )
                 continue
 
+            manager.record_node_latency(node, time.monotonic() - start_ts)
             return result
 
         raise RemoteError(
@@ -152,6 +167,8 @@ class SubstrateManager():
         self.own_rpc_endpoint = own_rpc_endpoint
         self.available_node_attributes_map: DictNodeNameNodeAttributes = {}
         self.available_nodes_call_order: NodesCallOrder = []
+        # Moving average of the seconds requests to each node take
+        self.node_latencies: Dict[NodeName, float] = {}
         self.chain_properties: SubstrateChainProperties
         if connect_on_startup and len(connect_at_start) != 0:
             self.attempt_connections()
@@ -315,10 +332,13 @@ class SubstrateManager():
             account=account,
             result=result,
         )
+        return self._deserialize_account_balance(None if result is None else result.value)
 
+    def _deserialize_account_balance(self, account_info: Optional[Dict[str, Any]]) -> FVal:
+        """Amount of native token of the AccountInfo storage entry of an account"""
         balance = ZERO
-        if result is not None:
-            account_data = result.value['data']
+        if account_info is not None:
+            account_data = account_info['data']
             balance = (
                 FVal(account_data['free'] + account_data['reserved']) /
                 FVal('10') ** self.chain_properties.token_decimals
@@ -326,6 +346,96 @@ class SubstrateManager():
 
         return balance
 
+    def _get_accounts_balance(
+            self,
+            accounts: List[SubstrateAddress],
+            node_interface: SubstrateInterface,
+    ) -> Dict[SubstrateAddress, FVal]:
+        """Given a list of accounts get their amount of chain native token with a
+        single storage query (state_queryStorageAt) for all of them.
+
+        The storage keys are generated the same way `SubstrateInterface.query()` does
+        for each account separately.
+        """
+        log.debug(
+            f'{self.chain} querying {self.chain_properties.token.identifier} balances',
+            url=node_interface.url,
+            accounts=accounts,
+        )
+        try:
+            with gevent.Timeout(KUSAMA_NODE_CONNECTION_TIMEOUT):
+                block_hash = node_interface.get_chain_head()
+                node_interface.init_runtime(block_hash=block_hash)
+                metadata_module = node_interface.get_metadata_module(
+                    'System',
+                    block_hash=block_hash,
+                )
+                storage_item = node_interface.get_metadata_storage_function(
+                    'System',
+                    'Account',
+                    block_hash=block_hash,
+                )
+                if not metadata_module or not storage_item:
+                    raise StorageFunctionNotFound('Storage function "System.Account" not found')
+
+                param_type = storage_item.get_params_type_string()[0]
+                storage_key_to_account = {}
+                for account in accounts:
+                    param = node_interface.convert_storage_parameter(param_type, account)
+                    param_obj = node_interface.runtime_config.create_scale_object(
+                        type_string=param_type,
+                    )
+                    storage_key = node_interface.generate_storage_hash(
+                        storage_module=metadata_module.value['storage']['prefix'],
+                        storage_function='Account',
+                        params=[param_obj.encode(param)],
+                        hashers=storage_item.get_param_hashers(),
+                    )
+                    storage_key_to_account[storage_key] = account
+
+                response = node_interface.rpc_request(
+                    method='state_queryStorageAt',
+                    params=[list(storage_key_to_account.keys()), block_hash],
+                )
+                if 'error' in response:
+                    raise SubstrateRequestException(response['error']['message'])
+
+                balances = {account: ZERO for account in accounts}
+                value_type = storage_item.get_value_type_string()
+                for result_group in response['result']:
+                    for storage_key, data in result_group['changes']:
+                        account_info = None
+                        if data is not None:
+                            account_info = node_interface.decode_scale(
+                                type_string=value_type,
+                                scale_bytes=data,
+                                block_hash=block_hash,
+                            )
+                        balances[storage_key_to_account[storage_key]] = (
+                            self._deserialize_account_balance(account_info)
+                        )
+        except (
+                requests.exceptions.RequestException,
+                SubstrateRequestException,
+                StorageFunctionNotFound,
+                ValueError,
+                KeyError,
+                WebSocketException,
+                gevent.Timeout,
+                BlockNotFound,
+        ) as e:
+            msg = str(e)
+            if isinstance(e, gevent.Timeout):
+                msg = f'a timeout of {msg}'
+            message = (
+                f'{self.chain} failed to request {self.chain_properties.token.identifier} '
+                f'accounts balance at endpoint {node_interface.url} due to: {msg}'
+            )
+            log.error(message, accounts=accounts)
+            raise RemoteError(message) from e
+
+        return balances
+
     def _get_chain_id(self, node_interface: SubstrateInterface) -> SubstrateChainId:
         """Return the chain identifier.
         """
@@ -498,21 +608,39 @@ class SubstrateManager():
     def _set_available_nodes_call_order(self) -> None:
         """Set `available_nodes_call_order` with a list of items (tuple of node
         and its attributes) sorted by this criteria: own node always has
-        preference, then are ordered depending on how close they are to the
-        chain height; the higher 'weight_block' the better.
+        preference, then nodes not requested yet, so that their latency gets
+        measured, ordered depending on how close they are to the chain height;
+        the higher 'weight_block' the better. Then the rest from the fastest
+        to the slowest.
         """
         own_node = self.chain.node_name_type().OWN
         node_attributes_map = self.available_node_attributes_map.copy()
         own_node_attributes = node_attributes_map.pop(own_node, None)
         available_nodes_call_order = sorted(
             cast(Iterable, node_attributes_map.items()),
-            key=lambda item: -item[1].weight_block,
+            key=lambda item: (
+                item[0] in self.node_latencies,
+                self.node_latencies.get(item[0], 0),
+                -item[1].weight_block,
+            ),
         )
         if own_node_attributes is not None:
             available_nodes_call_order.insert(0, (own_node, own_node_attributes))
 
         self.available_nodes_call_order = available_nodes_call_order
 
+    def record_node_latency(self, node: NodeName, seconds: float) -> None:
+        """Adds the duration of a request to the node's moving average latency and
+        reorders the nodes accordingly"""
+        latency = self.node_latencies.get(node)
+        if latency is None:
+            self.node_latencies[node] = seconds
+        else:
+            self.node_latencies[node] = (
+                NODE_LATENCY_SMOOTHING * seconds + (1 - NODE_LATENCY_SMOOTHING) * latency
+            )
+        self._set_available_nodes_call_order()
+
     def _set_chain_properties(self, node_interface: SubstrateInterface) -> None:
         """Return the properties of the chain connected to (e.g. native token,
         addresses format).
@@ -565,19 +693,35 @@ class SubstrateManager():
     ) -> Dict[SubstrateAddress, FVal]:
         """Given a list of accounts get their amount of chain native token.
 
+        The accounts are queried in batches, each with a single storage query.
         This method is not decorated with `request_available_nodes` on purpose,
-        so each request can use all available nodes.
+        so each batch request can use all available nodes.
 
         May raise:
         - RemoteError: `request_available_nodes()` fails to request after
         trying with all the available nodes.
         """
         balances: Dict[SubstrateAddress, FVal] = {}
-        for account in accounts:
-            balances[account] = self.get_account_balance(account)
+        for accounts_chunk in get_chunks(accounts, n=SUBSTRATE_MAX_ACCOUNTS_PER_QUERY):
+            balances.update(self.get_accounts_balance_batch(accounts_chunk))
 
         return balances
 
+    @request_available_nodes
+    def get_accounts_balance_batch(
+            self,
+            accounts: List[SubstrateAddress],
+            node_interface: Optional[SubstrateInterface] = None,
+    ) -> Dict[SubstrateAddress, FVal]:
+        """Given a list of accounts get their amount of chain native token with
+        a single storage query.
+
+        May raise:
+        - RemoteError: `request_available_nodes()` fails to request after
+        trying with all the available nodes.
+        """
+        return self._get_accounts_balance(accounts=accounts, node_interface=node_interface)
+
     @request_available_nodes
     def get_chain_id(
             self,
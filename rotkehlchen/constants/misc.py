@@ -21,6 +21,13 @@ NFT_DIRECTIVE = '_nft_'
 # API URLS
 KRAKEN_BASE_URL = 'https://api.kraken.com'
 KRAKEN_API_VERSION = '0'
+BINANCE_BASE_URL = 'binance.com/'
+BINANCEUS_BASE_URL = 'binance.us/'
 # KRAKEN_BASE_URL = 'http://localhost:5001/kraken'
 # KRAKEN_API_VERSION = 'mock'
 # BINANCE_BASE_URL = 'http://localhost:5001/binance/api/'
+
+# Exchange specific keys of the user_credentials_mappings table. Kept here and not
+# in the exchange modules so that the DB does not need to import them
+BINANCE_MARKETS_KEY = 'PAIRS'
+FTX_SUBACCOUNT_DB_SETTING = 'ftx_subaccount'
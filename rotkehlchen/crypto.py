@@ -1,4 +1,5 @@
 import base64
+from typing import Iterable, Iterator
 
 from Crypto import Random
 from Crypto.Cipher import AES
@@ -20,6 +21,37 @@ def encrypt(key: bytes, source: bytes) -> str:
     return base64.b64encode(data).decode("latin-1")
 
 
+def encrypt_stream(key: bytes, source: Iterable[bytes]) -> Iterator[bytes]:
+    """Encrypts the given source chunks in the same way as encrypt() does but without
+    ever holding the entire source in memory
+
+    Yields the base64 encoded encrypted data in pieces. Joined together they can be
+    given to decrypt().
+    """
+    assert isinstance(key, bytes), 'key should be given in bytes'
+    key = SHA256.new(key).digest()
+    iv = Random.new().read(AES.block_size)
+    encryptor = AES.new(key, AES.MODE_CBC, iv)
+    unencrypted = b''
+    encrypted = iv
+    for chunk in source:
+        assert isinstance(chunk, bytes), 'source should be given in bytes'
+        unencrypted += chunk
+        # CBC can only encrypt whole blocks so keep the remainder for the next chunk
+        cutoff = len(unencrypted) - len(unencrypted) % AES.block_size
+        encrypted += encryptor.encrypt(unencrypted[:cutoff])
+        unencrypted = unencrypted[cutoff:]
+        # base64 encode in multiples of 3 bytes so that no padding ends up in the middle
+        cutoff = len(encrypted) - len(encrypted) % 3
+        if cutoff != 0:
+            yield base64.b64encode(encrypted[:cutoff])
+            encrypted = encrypted[cutoff:]
+
+    padding = AES.block_size - len(unencrypted) % AES.block_size
+    encrypted += encryptor.encrypt(unencrypted + bytes([padding]) * padding)
+    yield base64.b64encode(encrypted)
+
+
 def decrypt(key: bytes, given_source: str) -> bytes:
     """
     Decrypts the given source data we with the given key.
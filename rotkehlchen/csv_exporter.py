@@ -1,11 +1,16 @@
 import csv
+import io
 import json
 import logging
+import shutil
 from pathlib import Path
 from tempfile import mkdtemp
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
-from zipfile import ZipFile
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, TextIO, Tuple
+from zipfile import ZIP_DEFLATED, ZipFile
 
+from gevent.lock import Semaphore
+
+from rotkehlchen.accounting.cost_basis import CostBasisInfo
 from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.accounting.structures import DefiEvent
 from rotkehlchen.assets.asset import Asset
@@ -22,6 +27,7 @@ from rotkehlchen.constants import (
     ZERO,
 )
 from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.db.reports import DBReports
 from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.typing import (
@@ -36,7 +42,6 @@ from rotkehlchen.utils.misc import taxable_gain_for_sell, timestamp_to_date
 from rotkehlchen.utils.version_check import check_if_version_up_to_date
 
 if TYPE_CHECKING:
-    from rotkehlchen.accounting.cost_basis import CostBasisInfo
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.settings import DBSettings
 
@@ -52,6 +57,10 @@ FILENAME_LOAN_SETTLEMENTS_CSV = 'loan_settlements.csv'
 FILENAME_DEFI_EVENTS_CSV = 'defi_events.csv'
 FILENAME_LEDGER_ACTIONS_CSV = 'ledger_actions.csv'
 FILENAME_ALL_CSV = 'all_events.csv'
+# How many PnL report events to gather in memory before writing them to the DB
+PNL_EVENTS_WRITE_BATCH_SIZE = 500
+# Size of the chunks in which the CSV files are read when creating a zip
+ZIP_READ_CHUNK_SIZE = 64 * 1024
 ETH_EXPLORER = 'https://etherscan.io/tx/'
 
 ACCOUNTING_SETTINGS = (
@@ -67,26 +76,72 @@ class CSVWriteError(Exception):
     pass
 
 
-def _dict_to_csv_file(path: Path, dictionary_list: List) -> None:
-    """Takes a filepath and a list of dictionaries representing the rows and writes them
-    into the file as a CSV
+class CSVStream():
+    """A CSV file to which rows are appended as they are produced
 
-    May raise:
-    - CSVWriteError if DictWriter.writerow() tried to write a dict contains
-    fields not in fieldnames
+    The file is only created once the first row comes and its header is taken
+    from the keys of that row.
     """
-    if len(dictionary_list) == 0:
-        log.debug('Skipping writting empty CSV for {}'.format(path))
-        return
 
-    with open(path, 'w', newline='') as f:
-        w = csv.DictWriter(f, fieldnames=dictionary_list[0].keys())
-        w.writeheader()
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.rows_num = 0
+        self.error: Optional[str] = None
+        self._file: Optional[TextIO] = None
+        self._writer: Optional[csv.DictWriter] = None
+
+    def append(self, row: Dict[str, Any]) -> None:
+        """Writes the given row to the CSV file
+
+        Values can also be functions that take the spreadsheet row number and return the
+        value. Those are used for formulas so that they are only generated at write time.
+        """
+        row_number = self.rows_num + 2  # the header is the first spreadsheet row
+        row = {k: v(row_number) if callable(v) else v for k, v in row.items()}
+        if self._writer is None:
+            self._file = open(self.path, 'w', newline='')
+            self._writer = csv.DictWriter(self._file, fieldnames=list(row.keys()))
+            self._writer.writeheader()
+
         try:
-            for dic in dictionary_list:
-                w.writerow(dic)
+            self._writer.writerow(row)
         except ValueError as e:
-            raise CSVWriteError(f'Failed to write {path} CSV due to {str(e)}') from e
+            # Remember the error so that it's returned when the files are requested
+            self.error = f'Failed to write {self.path.name} CSV due to {str(e)}'
+            log.error(self.error)
+            return
+        self.rows_num += 1
+
+    def flush(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+
+class _ZipStreamBuffer(io.RawIOBase):
+    """An unseekable file object in which ZipFile writes and whose contents are
+    popped as soon as they are written, so that a zip can be streamed"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: bytes) -> int:  # type: ignore
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def pop(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
 
 
 class CSVExporter():
@@ -100,7 +155,10 @@ class CSVExporter():
         self.user_directory = user_directory
         self.database = database
         self.create_csv = create_csv
-        self.all_events: List[Dict[str, Any]] = []
+        self.dbreports = DBReports(database)
+        self.csv_dir: Optional[Path] = None
+        # Held by a PnL run and while the report is exported so that they don't overlap
+        self.report_lock = Semaphore()
         self.reset()
 
         # get setting for prefered eth explorer
@@ -128,16 +186,54 @@ class CSVExporter():
         self.should_export_formulas = db_settings.pnl_csv_with_formulas
         self.should_have_summary = db_settings.pnl_csv_have_summary
         if self.create_csv:
-            self.trades_csv: List[Dict[str, Any]] = []
-            self.loan_profits_csv: List[Dict[str, Any]] = []
-            self.asset_movements_csv: List[Dict[str, Any]] = []
-            self.tx_gas_costs_csv: List[Dict[str, Any]] = []
-            self.margin_positions_csv: List[Dict[str, Any]] = []
-            self.loan_settlements_csv: List[Dict[str, Any]] = []
-            self.defi_events_csv: List[Dict[str, Any]] = []
-            self.ledger_actions_csv: List[Dict[str, Any]] = []
-            self.all_events_csv: List[Dict[str, Any]] = []
-            self.all_events = []
+            self._remove_csv_dir()
+            # The CSV of each category is written in a temporary directory as rows come
+            self.csv_dir = Path(mkdtemp())
+            self.trades_csv = CSVStream(self.csv_dir / FILENAME_TRADES_CSV)
+            self.loan_profits_csv = CSVStream(self.csv_dir / FILENAME_LOAN_PROFITS_CSV)
+            self.asset_movements_csv = CSVStream(self.csv_dir / FILENAME_ASSET_MOVEMENTS_CSV)
+            self.tx_gas_costs_csv = CSVStream(self.csv_dir / FILENAME_GAS_CSV)
+            self.margin_positions_csv = CSVStream(self.csv_dir / FILENAME_MARGIN_CSV)
+            self.loan_settlements_csv = CSVStream(self.csv_dir / FILENAME_LOAN_SETTLEMENTS_CSV)
+            self.defi_events_csv = CSVStream(self.csv_dir / FILENAME_DEFI_EVENTS_CSV)
+            self.ledger_actions_csv = CSVStream(self.csv_dir / FILENAME_LEDGER_ACTIONS_CSV)
+            # The all events are written in the DB as they come. Only the pending
+            # ones and the summary lines are kept in memory
+            self.all_events_num = 0
+            self.pending_events: List[Tuple[EventType, Location, Timestamp, Dict[str, Any], FVal, FVal]] = []  # noqa: E501
+            self.all_events_summary_csv: List[Dict[str, Any]] = []
+
+    def new_report(self) -> None:
+        """Prepares the CSVExporter for a new profit/loss run and deletes the events of
+        the last report. Until then they stay in the DB, also after a new login."""
+        self.reset()
+        self.dbreports.purge_pnl_events()
+
+    def __del__(self) -> None:
+        self._remove_csv_dir()
+
+    @property
+    def category_csvs(self) -> Tuple[CSVStream, ...]:
+        return (
+            self.trades_csv,
+            self.loan_profits_csv,
+            self.asset_movements_csv,
+            self.tx_gas_costs_csv,
+            self.margin_positions_csv,
+            self.loan_settlements_csv,
+            self.defi_events_csv,
+            self.ledger_actions_csv,
+        )
+
+    def _remove_csv_dir(self) -> None:
+        """Closes the CSV files of the last run and deletes their directory"""
+        if getattr(self, 'csv_dir', None) is None:
+            return
+
+        for csv_stream in self.category_csvs:
+            csv_stream.close()
+        shutil.rmtree(self.csv_dir, ignore_errors=True)  # type: ignore  # checked above
+        self.csv_dir = None
 
     def timestamp_to_date(self, timestamp: Timestamp) -> str:
         return timestamp_to_date(
@@ -181,7 +277,7 @@ class CSVExporter():
             entry = template.copy()
             entry['received_in_asset'] = setting
             entry['net_profit_or_loss'] = str(getattr(db_settings, setting))
-            self.all_events_csv.append(entry)
+            self.all_events_summary_csv.append(entry)
 
     def maybe_add_summary(
             self,
@@ -200,7 +296,7 @@ class CSVExporter():
         if self.should_have_summary is False:
             return
 
-        length = len(self.all_events_csv) + 1
+        length = self.all_events_num + 1
         template: Dict[str, Any] = {
             'type': '',
             'location': '',
@@ -219,8 +315,8 @@ class CSVExporter():
             f'total_bought_cost_in_{self.profit_currency.symbol}': '',
             f'total_received_in_{self.profit_currency.symbol}': '',
         }
-        self.all_events_csv.append(template)  # separate with 2 new lines
-        self.all_events_csv.append(template)
+        self.all_events_summary_csv.append(template)  # separate with 2 new lines
+        self.all_events_summary_csv.append(template)
 
         entry = template.copy()
         entry['received_in_asset'] = 'LEDGER ACTIONS PROFIT/LOSS'
@@ -230,7 +326,7 @@ class CSVExporter():
             sum_range=f'H2:H{length}',
             actual_value=ledger_actions_profit_loss,
         )
-        self.all_events_csv.append(entry)
+        self.all_events_summary_csv.append(entry)
 
         entry = template.copy()
         entry['received_in_asset'] = 'DEFI PROFIT/LOSS'
@@ -240,7 +336,7 @@ class CSVExporter():
             sum_range=f'H2:H{length}',
             actual_value=defi_profit_loss,
         )
-        self.all_events_csv.append(entry)
+        self.all_events_summary_csv.append(entry)
 
         entry = template.copy()
         entry['received_in_asset'] = 'LOAN PROFIT/LOSS'
@@ -250,7 +346,7 @@ class CSVExporter():
             sum_range=f'H2:H{length}',
             actual_value=loan_profit,
         )
-        self.all_events_csv.append(entry)
+        self.all_events_summary_csv.append(entry)
 
         entry = template.copy()
         entry['received_in_asset'] = 'MARGIN POSITIONS PROFIT/LOSS'
@@ -260,7 +356,7 @@ class CSVExporter():
             sum_range=f'H2:H{length}',
             actual_value=margin_position_profit_loss,
         )
-        self.all_events_csv.append(entry)
+        self.all_events_summary_csv.append(entry)
 
         entry = template.copy()
         entry['received_in_asset'] = 'SETTLEMENT LOSS'
@@ -270,7 +366,7 @@ class CSVExporter():
             sum_range=f'H2:H{length}',
             actual_value=settlement_losses,
         )
-        self.all_events_csv.append(entry)
+        self.all_events_summary_csv.append(entry)
 
         entry = template.copy()
         entry['received_in_asset'] = 'ETHEREUM TX GAS COST'
@@ -280,7 +376,7 @@ class CSVExporter():
             sum_range=f'H2:H{length}',
             actual_value=ethereum_transaction_gas_costs,
         )
-        self.all_events_csv.append(entry)
+        self.all_events_summary_csv.append(entry)
 
         entry = template.copy()
         entry['received_in_asset'] = 'ASSET MOVEMENT FEES'
@@ -290,7 +386,7 @@ class CSVExporter():
             sum_range=f'H2:H{length}',
             actual_value=asset_movement_fees,
         )
-        self.all_events_csv.append(entry)
+        self.all_events_summary_csv.append(entry)
 
         entry = template.copy()
         entry['received_in_asset'] = 'TAXABLE TRADE PROFIT/LOSS'
@@ -300,7 +396,7 @@ class CSVExporter():
             sum_range=f'H2:H{length}',
             actual_value=taxable_trade_profit_loss,
         )
-        self.all_events_csv.append(entry)
+        self.all_events_summary_csv.append(entry)
 
         entry = template.copy()
         entry['received_in_asset'] = 'TOTAL TAXABLE PROFIT/LOSS'
@@ -309,20 +405,57 @@ class CSVExporter():
             expression=f'H{start}+H{start + 1}+H{start + 2}+H{start + 3}+H{start + 4}+H{start + 5}+H{start + 6}+H{start + 7}',  # noqa: E501
             actual_value=total_taxable_profit_loss,
         )
-        self.all_events_csv.append(entry)
+        self.all_events_summary_csv.append(entry)
 
-        self.all_events_csv.append(template)  # separate with 2 new lines
-        self.all_events_csv.append(template)
+        self.all_events_summary_csv.append(template)  # separate with 2 new lines
+        self.all_events_summary_csv.append(template)
 
         version_result = check_if_version_up_to_date()
         entry = template.copy()
         entry['received_in_asset'] = 'rotki version'
         entry['net_profit_or_loss'] = version_result.our_version
-        self.all_events_csv.append(entry)
+        self.all_events_summary_csv.append(entry)
 
         db_settings = self.database.get_settings()
         self._add_settings_lines(db_settings, template)
 
+    def _all_events_net_profit_or_loss_csv(
+            self,
+            event_type: EventType,
+            row: int,
+            net_profit_or_loss: FVal,
+    ) -> str:
+        """Returns the net profit or loss entry of the given all events CSV row.
+
+        Formulas are only generated here, when the CSV is written.
+        """
+        if event_type == EV_BUY:
+            return '0'  # no profit by buying
+        if event_type == EV_SELL:
+            return self._add_if_formula(
+                condition=f'E{row}=0',
+                if_true='0',
+                if_false=f'L{row}-M{row}',
+                actual_value=net_profit_or_loss,
+            )
+        if event_type in (EV_TX_GAS_COST, EV_ASSET_MOVE, EV_LOAN_SETTLE):
+            return self._add_equals_formula(
+                expression=f'-K{row}',
+                actual_value=net_profit_or_loss,
+            )
+        if event_type == EV_INTEREST_PAYMENT:
+            return self._add_equals_formula(
+                expression=f'L{row}',
+                actual_value=net_profit_or_loss,
+            )
+        # else EV_MARGIN_CLOSE, EV_DEFI, EV_LEDGER_ACTION
+        return self._add_if_formula(
+            condition=f'P{row}=0',  # total_received_in_profit_currency is 0
+            if_true=f'-K{row}',  # then -paid_in_profit_currency
+            if_false=f'P{row}',  # else use total_received_in_profit_currency
+            actual_value=net_profit_or_loss,
+        )
+
     def add_to_allevents(
             self,
             event_type: EventType,
@@ -339,50 +472,26 @@ class CSVExporter():
             taxable_amount: FVal = ZERO,
             taxable_bought_cost: FVal = ZERO,
             total_bought_cost: FVal = ZERO,
-            cost_basis_info: Optional['CostBasisInfo'] = None,
+            cost_basis_info: Optional[CostBasisInfo] = None,
             link: Optional[str] = '',
             notes: Optional[str] = '',
     ) -> None:
-        row = len(self.all_events_csv) + 2
         if event_type == EV_BUY:
             net_profit_or_loss = ZERO  # no profit by buying
-            net_profit_or_loss_csv = '0'
         elif event_type == EV_SELL:
             if taxable_amount == 0:
                 net_profit_or_loss = ZERO
             else:
                 net_profit_or_loss = taxable_received_in_profit_currency - taxable_bought_cost
-
-            net_profit_or_loss_csv = self._add_if_formula(
-                condition=f'E{row}=0',
-                if_true='0',
-                if_false=f'L{row}-M{row}',
-                actual_value=net_profit_or_loss,
-            )
         elif event_type in (EV_TX_GAS_COST, EV_ASSET_MOVE, EV_LOAN_SETTLE):
             net_profit_or_loss = -paid_in_profit_currency
-            net_profit_or_loss_csv = self._add_equals_formula(
-                expression=f'-K{row}',
-                actual_value=net_profit_or_loss,
-            )
         elif event_type == EV_INTEREST_PAYMENT:
             net_profit_or_loss = taxable_received_in_profit_currency
-            net_profit_or_loss_csv = self._add_equals_formula(
-                expression=f'L{row}',
-                actual_value=net_profit_or_loss,
-            )
         elif event_type in (EV_MARGIN_CLOSE, EV_DEFI, EV_LEDGER_ACTION):
             if total_received_in_profit_currency > ZERO:
                 net_profit_or_loss = total_received_in_profit_currency
             else:
                 net_profit_or_loss = -paid_in_profit_currency
-
-            net_profit_or_loss_csv = self._add_if_formula(
-                condition=f'P{row}=0',  # total_received_in_profit_currency is 0
-                if_true=f'-K{row}',  # then -paid_in_profit_currency
-                if_false=f'P{row}',  # else use total_received_in_profit_currency
-                actual_value=net_profit_or_loss,
-            )
         else:
             raise ValueError('Illegal event type "{}" at add_to_allevents'.format(event_type))
 
@@ -405,33 +514,25 @@ class CSVExporter():
             'notes': notes,
         }
         log.debug('csv event', **entry)
-        self.all_events.append(entry)
-        new_entry = entry.copy()
-        # deleting and read link and notes for them to be at the end
-        del new_entry['link']
-        del new_entry['notes']
-        # for CSV use the str(asset) and not pure identifier
-        new_entry['paid_asset'] = str(paid_asset) if paid_asset else ''
-        new_entry['received_asset'] = str(received_asset) if received_asset else ''
-        new_entry['net_profit_or_loss'] = net_profit_or_loss_csv
-        new_entry['time'] = self.timestamp_to_date(timestamp)
-        new_entry[f'paid_in_{self.profit_currency.symbol}'] = paid_in_profit_currency
-        key = f'taxable_received_in_{self.profit_currency.symbol}'
-        new_entry[key] = taxable_received_in_profit_currency
-        key = f'taxable_bought_cost_in_{self.profit_currency.symbol}'
-        new_entry[key] = taxable_bought_cost
-        del new_entry['cost_basis']  # deleting and re-adding is for appending it to end of dict
-        new_entry['cost_basis'] = cost_basis_info.to_string(self.timestamp_to_date) if cost_basis_info else ''  # noqa: E501
-        key = f'total_bought_cost_in_{self.profit_currency.symbol}'
-        new_entry[key] = total_bought_cost
-        key = f'total_received_in_{self.profit_currency.symbol}'
-        new_entry[key] = total_received_in_profit_currency
-        del new_entry['paid_in_profit_currency']
-        del new_entry['taxable_received_in_profit_currency']
-        del new_entry['taxable_bought_cost_in_profit_currency']
-        new_entry['link'] = link
-        new_entry['notes'] = notes
-        self.all_events_csv.append(new_entry)
+        self.pending_events.append((
+            event_type,
+            location,
+            timestamp,
+            entry,
+            total_bought_cost,
+            total_received_in_profit_currency,
+        ))
+        self.all_events_num += 1
+        if len(self.pending_events) >= PNL_EVENTS_WRITE_BATCH_SIZE:
+            self.flush_events()
+
+    def flush_events(self) -> None:
+        """Writes all pending PnL report events to the DB"""
+        if not self.create_csv or len(self.pending_events) == 0:
+            return
+
+        self.dbreports.add_pnl_events(self.pending_events)
+        self.pending_events = []
 
     def add_buy(
             self,
@@ -505,7 +606,7 @@ class CSVExporter():
             taxable_bought_cost: FVal,
             timestamp: Timestamp,
             is_virtual: bool,
-            cost_basis_info: 'CostBasisInfo',
+            cost_basis_info: CostBasisInfo,
             total_bought_cost: FVal,
             link: Optional[str],
             notes: Optional[str],
@@ -522,13 +623,15 @@ class CSVExporter():
             total_fee_in_profit_currency=total_fee_in_profit_currency,
             selling_amount=selling_amount,
         )
-        row = len(self.trades_csv) + 2
-        taxable_profit_csv = self._add_if_formula(
-            condition=f'H{row}=0',
-            if_true='0',
-            if_false=f'L{row}-K{row}',
-            actual_value=taxable_profit_received,
-        )
+
+        def taxable_profit_csv(row: int) -> str:
+            return self._add_if_formula(
+                condition=f'H{row}=0',
+                if_true='0',
+                if_false=f'L{row}-K{row}',
+                actual_value=taxable_profit_received,
+            )
+
         self.trades_csv.append({
             'type': 'sell',
             'location': str(location),
@@ -579,7 +682,7 @@ class CSVExporter():
             rate_in_profit_currency: FVal,
             total_fee_in_profit_currency: FVal,
             timestamp: Timestamp,
-            cost_basis_info: 'CostBasisInfo',
+            cost_basis_info: CostBasisInfo,
             link: Optional[str],
             notes: Optional[str],
     ) -> None:
@@ -587,11 +690,13 @@ class CSVExporter():
             return
 
         paid_in_profit_currency = amount * rate_in_profit_currency + total_fee_in_profit_currency
-        row = len(self.loan_settlements_csv) + 2
-        loss_csv = self._add_equals_formula(
-            expression=f'C{row}*D{row}+E{row}',
-            actual_value=paid_in_profit_currency,
-        )
+
+        def loss_csv(row: int) -> str:
+            return self._add_equals_formula(
+                expression=f'C{row}*D{row}+E{row}',
+                actual_value=paid_in_profit_currency,
+            )
+
         self.loan_settlements_csv.append({
             'asset': str(asset),
             'location': str(location),
@@ -898,81 +1003,163 @@ class CSVExporter():
             notes=action.notes,
         )
 
+    def _all_events_csv_row(
+            self,
+            entry: Dict[str, Any],
+            total_bought_cost: FVal,
+            total_received_in_profit_currency: FVal,
+            asset_names: Dict[str, str],
+    ) -> Dict[str, Any]:
+        """Creates the all events CSV row of a PnL report event from its data as
+        returned by the API. `asset_names` caches the str() of the seen assets."""
+        row = entry.copy()
+        # deleting and read link and notes for them to be at the end
+        del row['link']
+        del row['notes']
+        # for CSV use the str(asset) and not pure identifier
+        for key in ('paid_asset', 'received_asset'):
+            identifier = row[key]
+            if identifier != '' and identifier not in asset_names:
+                asset_names[identifier] = str(Asset(identifier))
+            row[key] = asset_names.get(identifier, '')
+        row['time'] = self.timestamp_to_date(entry['time'])
+        row[f'paid_in_{self.profit_currency.symbol}'] = entry['paid_in_profit_currency']
+        key = f'taxable_received_in_{self.profit_currency.symbol}'
+        row[key] = entry['taxable_received_in_profit_currency']
+        key = f'taxable_bought_cost_in_{self.profit_currency.symbol}'
+        row[key] = entry['taxable_bought_cost_in_profit_currency']
+        del row['cost_basis']  # deleting and re-adding is for appending it to end of dict
+        cost_basis = entry['cost_basis']
+        row['cost_basis'] = CostBasisInfo.serialized_to_string(cost_basis, self.timestamp_to_date) if cost_basis else ''  # noqa: E501
+        row[f'total_bought_cost_in_{self.profit_currency.symbol}'] = total_bought_cost
+        key = f'total_received_in_{self.profit_currency.symbol}'
+        row[key] = total_received_in_profit_currency
+        del row['paid_in_profit_currency']
+        del row['taxable_received_in_profit_currency']
+        del row['taxable_bought_cost_in_profit_currency']
+        row['link'] = entry['link']
+        row['notes'] = entry['notes']
+        return row
+
+    def _write_all_events_csv(self, f: TextIO) -> Iterator[None]:
+        """Writes the all events CSV in the given file by reading the PnL report events
+        from the DB. Yields after each written row so that the caller can stream the file.
+
+        May raise:
+        - CSVWriteError if DictWriter.writerow() tried to write a dict contains
+        fields not in fieldnames
+        """
+        writer: Optional[csv.DictWriter] = None
+        try:
+            asset_names: Dict[str, str] = {}
+            for idx, event in enumerate(self.dbreports.iterate_pnl_events()):
+                event_type, data, total_bought_cost, total_received = event
+                entry = self._all_events_csv_row(
+                    entry=data,
+                    total_bought_cost=total_bought_cost,
+                    total_received_in_profit_currency=total_received,
+                    asset_names=asset_names,
+                )
+                entry['net_profit_or_loss'] = self._all_events_net_profit_or_loss_csv(
+                    event_type=event_type,
+                    row=idx + 2,
+                    net_profit_or_loss=FVal(entry['net_profit_or_loss']),
+                )
+                if writer is None:
+                    writer = csv.DictWriter(f, fieldnames=list(entry.keys()))
+                    writer.writeheader()
+                writer.writerow(entry)
+                yield None
+
+            if writer is None:
+                return  # no events, so no summary either
+
+            for entry in self.all_events_summary_csv:
+                writer.writerow(entry)
+                yield None
+        except ValueError as e:
+            raise CSVWriteError(f'Failed to write {FILENAME_ALL_CSV} CSV due to {str(e)}') from e
+
+    def _get_csv_error(self) -> Optional[str]:
+        """Returns the first error that happened while writing the category CSVs, if any"""
+        for csv_stream in self.category_csvs:
+            if csv_stream.error is not None:
+                return csv_stream.error
+
+        return None
+
     def create_files(self, dirpath: Path) -> Tuple[bool, str]:
         if not self.create_csv:
             return True, ''
 
-        try:
-            dirpath.mkdir(parents=True, exist_ok=True)
-            _dict_to_csv_file(
-                dirpath / FILENAME_TRADES_CSV,
-                self.trades_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_LOAN_PROFITS_CSV,
-                self.loan_profits_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_ASSET_MOVEMENTS_CSV,
-                self.asset_movements_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_GAS_CSV,
-                self.tx_gas_costs_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_MARGIN_CSV,
-                self.margin_positions_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_LOAN_SETTLEMENTS_CSV,
-                self.loan_settlements_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_DEFI_EVENTS_CSV,
-                self.defi_events_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_LEDGER_ACTIONS_CSV,
-                self.ledger_actions_csv,
-            )
-            _dict_to_csv_file(
-                dirpath / FILENAME_ALL_CSV,
-                self.all_events_csv,
-            )
-        except (CSVWriteError, PermissionError) as e:
-            return False, str(e)
+        with self.report_lock:
+            self.flush_events()
+            error = self._get_csv_error()
+            if error is not None:
+                return False, error
+
+            try:
+                dirpath.mkdir(parents=True, exist_ok=True)
+                for csv_stream in self.category_csvs:
+                    if csv_stream.rows_num == 0:
+                        log.debug(f'Skipping writting empty CSV for {csv_stream.path.name}')
+                        continue
+
+                    csv_stream.flush()
+                    shutil.copyfile(csv_stream.path, dirpath / csv_stream.path.name)
+
+                if self.all_events_num != 0:
+                    with open(dirpath / FILENAME_ALL_CSV, 'w', newline='') as f:
+                        for _ in self._write_all_events_csv(f):
+                            pass
+            except (CSVWriteError, PermissionError) as e:
+                return False, str(e)
 
         return True, ''
 
-    def create_zip(self) -> Optional[str]:
+    def _stream_zip(self) -> Iterator[bytes]:
+        """The report is locked while it is streamed so that a new PnL run waits for
+        the download to finish or be abandoned before it resets the report.
+
+        The entry sizes are not known beforehand and the stream can't be seeked back
+        to fix the headers, so zip64 is forced for entries that may be over 2 GiB.
+        """
+        with self.report_lock:
+            buffer = _ZipStreamBuffer()
+            with ZipFile(buffer, 'w', compression=ZIP_DEFLATED) as csv_zip:
+                for csv_stream in self.category_csvs:
+                    if csv_stream.rows_num == 0:
+                        continue
+
+                    csv_stream.flush()
+                    with open(csv_stream.path, 'rb') as src, csv_zip.open(csv_stream.path.name, 'w', force_zip64=True) as dest:  # noqa: E501
+                        for chunk in iter(lambda: src.read(ZIP_READ_CHUNK_SIZE), b''):  # pylint: disable=cell-var-from-loop  # noqa: E501
+                            dest.write(chunk)
+                            yield buffer.pop()
+
+                if self.all_events_num != 0:
+                    dest = csv_zip.open(FILENAME_ALL_CSV, 'w', force_zip64=True)
+                    with io.TextIOWrapper(dest, newline='', write_through=True) as f:
+                        for _ in self._write_all_events_csv(f):
+                            data = buffer.pop()
+                            if len(data) != 0:
+                                yield data
+
+            yield buffer.pop()  # the zip's central directory is written at close
+
+    def create_zip(self) -> Optional[Iterator[bytes]]:
+        """Returns an iterator over the bytes of a zip archive of all the CSV files
+
+        The archive is created while it is iterated. So it can be streamed to the
+        user without ever being entirely in memory or on the disk.
+        """
         if not self.create_csv:
             return None
 
-        # TODO: Find a way to properly delete the directory after send is complete
-        dirpath = Path(mkdtemp())
-        success, _ = self.create_files(dirpath)
-        if not success:
+        self.flush_events()
+        error = self._get_csv_error()
+        if error is not None:
+            log.error(f'Could not create a zip archive of the CSV files: {error}')
             return None
 
-        files: List[Tuple[Path, str]] = [
-            (dirpath / FILENAME_TRADES_CSV, FILENAME_TRADES_CSV),
-            (dirpath / FILENAME_LOAN_PROFITS_CSV, FILENAME_LOAN_PROFITS_CSV),
-            (dirpath / FILENAME_ASSET_MOVEMENTS_CSV, FILENAME_ASSET_MOVEMENTS_CSV),
-            (dirpath / FILENAME_GAS_CSV, FILENAME_GAS_CSV),
-            (dirpath / FILENAME_MARGIN_CSV, FILENAME_MARGIN_CSV),
-            (dirpath / FILENAME_LOAN_SETTLEMENTS_CSV, FILENAME_LOAN_SETTLEMENTS_CSV),
-            (dirpath / FILENAME_DEFI_EVENTS_CSV, FILENAME_DEFI_EVENTS_CSV),
-            (dirpath / FILENAME_LEDGER_ACTIONS_CSV, FILENAME_LEDGER_ACTIONS_CSV),
-            (dirpath / FILENAME_ALL_CSV, FILENAME_ALL_CSV),
-        ]
-
-        with ZipFile(dirpath / 'csv.zip', 'w') as csv_zip:
-            for path, filename in files:
-                if not path.exists():
-                    continue
-
-                csv_zip.write(path, filename)
-                path.unlink()
-
-        return csv_zip.filename
+        return self._stream_zip()
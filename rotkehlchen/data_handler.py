@@ -6,10 +6,10 @@ import tempfile
 import time
 import zlib
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from rotkehlchen.assets.asset import Asset
-from rotkehlchen.crypto import decrypt, encrypt
+from rotkehlchen.crypto import decrypt, encrypt_stream
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.settings import ModifiableDBSettings
 from rotkehlchen.errors import AuthenticationError, SystemPermissionError
@@ -21,6 +21,8 @@ from rotkehlchen.utils.misc import timestamp_to_date, ts_now
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+DB_READ_CHUNK_SIZE = 1024 * 1024
+
 
 class DataHandler():
 
@@ -183,25 +185,52 @@ class DataHandler():
 
         return users
 
-    def compress_and_encrypt_db(self, password: str) -> Tuple[B64EncodedBytes, str]:
-        """Decrypt the DB, dump in temporary plaintextdb, compress it,
-        and then re-encrypt it
-
-        Returns a b64 encoded binary blob"""
-        log.info('Compress and encrypt DB')
+    def _export_and_read_db(self) -> Iterator[bytes]:
+        """Export the DB in a temporary plaintext DB and yield its contents in chunks"""
         with tempfile.TemporaryDirectory() as tmpdirname:
             tempdb = Path(tmpdirname) / 'temp.db'
             self.db.export_unencrypted(tempdb)
             with open(tempdb, 'rb') as f:
-                data_blob = f.read()
+                for chunk in iter(lambda: f.read(DB_READ_CHUNK_SIZE), b''):
+                    yield chunk
 
-        original_data_hash = base64.b64encode(
-            hashlib.sha256(data_blob).digest(),
-        ).decode()
-        compressed_data = zlib.compress(data_blob, level=9)
-        encrypted_data = encrypt(password.encode(), compressed_data)
+    def get_db_hash(self) -> str:
+        """Get the b64 encoded sha256 hash of the unencrypted DB contents
+
+        The hash is kept in memory until the next DB write so that checking whether
+        we are in sync with the server does not need to export the DB every time.
+        """
+        if self.db.sync_data_hash is not None:
+            return self.db.sync_data_hash
 
-        return B64EncodedBytes(encrypted_data.encode()), original_data_hash
+        data_hash = hashlib.sha256()
+        for chunk in self._export_and_read_db():
+            data_hash.update(chunk)
+        self.db.sync_data_hash = base64.b64encode(data_hash.digest()).decode()
+        return self.db.sync_data_hash
+
+    def compress_and_encrypt_db(self, password: str) -> Tuple[B64EncodedBytes, str]:
+        """Decrypt the DB, dump in temporary plaintextdb, compress it,
+        and then re-encrypt it
+
+        The plaintext DB is streamed through compression and encryption in chunks
+        so it is never entirely held in memory.
+
+        Returns a b64 encoded binary blob"""
+        log.info('Compress and encrypt DB')
+        data_hash = hashlib.sha256()
+        compressor = zlib.compressobj(level=9)
+
+        def compressed_chunks() -> Iterator[bytes]:
+            for chunk in self._export_and_read_db():
+                data_hash.update(chunk)
+                yield compressor.compress(chunk)
+            yield compressor.flush()
+
+        encrypted_data = b''.join(encrypt_stream(password.encode(), compressed_chunks()))
+        original_data_hash = base64.b64encode(data_hash.digest()).decode()
+        self.db.sync_data_hash = original_data_hash
+        return B64EncodedBytes(encrypted_data), original_data_hash
 
     def decompress_and_decrypt_db(self, password: str, encrypted_data: B64EncodedString) -> None:
         """Decrypt and decompress the encrypted data we receive from the server
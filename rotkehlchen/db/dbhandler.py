@@ -8,7 +8,7 @@ import tempfile
 from collections import defaultdict
 from json.decoder import JSONDecodeError
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Type, Union, cast
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Type, Union, cast
 
 from pysqlcipher3 import dbapi2 as sqlcipher
 from typing_extensions import Literal
@@ -54,10 +54,19 @@ from rotkehlchen.chain.ethereum.trades import AMMSwap
 from rotkehlchen.constants.assets import A_USD
 from rotkehlchen.constants.ethereum import YEARN_VAULTS_PREFIX, YEARN_VAULTS_V2_PREFIX
 from rotkehlchen.constants.timing import HOUR_IN_SECONDS
-from rotkehlchen.constants.misc import NFT_DIRECTIVE
+from rotkehlchen.constants.misc import (
+    BINANCE_MARKETS_KEY,
+    FTX_SUBACCOUNT_DB_SETTING,
+    NFT_DIRECTIVE,
+)
 from rotkehlchen.db.eth2 import ETH2_DEPOSITS_PREFIX
 from rotkehlchen.db.loopring import DBLoopring
-from rotkehlchen.db.schema import DB_SCRIPT_CREATE_TABLES
+from rotkehlchen.db.schema import (
+    DB_SCRIPT_CREATE_TABLES,
+    DB_SCRIPT_CREATE_TRANSIENT_TABLES,
+    TABLES_WITH_ASSETS,
+    TABLES_WITH_BALANCE_CATEGORY,
+)
 from rotkehlchen.db.settings import (
     DEFAULT_PREMIUM_SHOULD_SYNC,
     ROTKEHLCHEN_DB_VERSION,
@@ -89,10 +98,12 @@ from rotkehlchen.errors import (
     UnknownAsset,
     UnsupportedAsset,
 )
-from rotkehlchen.exchanges.binance import BINANCE_MARKETS_KEY
-from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
-from rotkehlchen.exchanges.ftx import FTX_SUBACCOUNT_DB_SETTING
-from rotkehlchen.exchanges.kraken import KrakenAccountType
+from rotkehlchen.exchanges.data_structures import (
+    AssetMovement,
+    KrakenAccountType,
+    MarginPosition,
+    Trade,
+)
 from rotkehlchen.exchanges.manager import SUPPORTED_EXCHANGES
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.handler import GlobalDBHandler
@@ -121,6 +132,7 @@ from rotkehlchen.typing import (
 )
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.hashing import file_md5
+from rotkehlchen.utils.metrics import TimedConnectionMixin, TimedCursorMixin
 from rotkehlchen.utils.misc import ts_now
 from rotkehlchen.utils.serialization import jsonloads_dict, rlk_jsondumps
 
@@ -129,6 +141,9 @@ log = RotkehlchenLogsAdapter(logger)
 
 KDF_ITER = 64000
 DBINFO_FILENAME = 'dbinfo.json'
+# The DB with the user data that can be recreated. It is encrypted with the same
+# password, attached to the user DB connection and not exported for premium sync.
+TRANSIENT_DB_FILENAME = 'rotkehlchen_transient.db'
 PASSWORDCHECK_STATEMENT = 'SELECT name FROM sqlite_master WHERE type="table";'
 
 DBTupleType = Literal[
@@ -139,25 +154,16 @@ DBTupleType = Literal[
     'amm_swap',
 ]
 
-# Tuples that contain first the name of a table and then the columns that
-# reference assets ids. This is used to query all assets that a user owns.
-TABLES_WITH_ASSETS = (
-    ('aave_events', 'asset1', 'asset2'),
-    ('yearn_vaults_events', 'from_asset', 'to_asset'),
-    ('manually_tracked_balances', 'asset'),
-    ('trades', 'base_asset', 'quote_asset', 'fee_currency'),
-    ('margin_positions', 'pl_currency', 'fee_currency'),
-    ('asset_movements', 'asset', 'fee_asset'),
-    ('ledger_actions', 'asset', 'rate_asset'),
-    ('amm_swaps', 'token0_identifier', 'token1_identifier'),
-    ('amm_events', 'token0_identifier', 'token1_identifier'),
-    ('adex_events', 'token'),
-    ('balancer_events', 'pool_address_token'),
-    ('timed_balances', 'currency'),
-)
+DB_BACKUP_RE = re.compile(r'(\d+)_rotkehlchen_db_v(\d+).backup')
 
 
-DB_BACKUP_RE = re.compile(r'(\d+)_rotkehlchen_db_v(\d+).backup')
+class DBCursor(TimedCursorMixin, sqlcipher.Cursor):  # pylint: disable=no-member
+    db_name = 'user'
+
+
+class DBConnection(TimedConnectionMixin, sqlcipher.Connection):  # pylint: disable=no-member
+    """Connection to the user DB that records the duration of its statements"""
+    cursor_class = DBCursor
 
 
 def _protect_password_sqlcipher(password: str) -> str:
@@ -243,6 +249,8 @@ class DBHandler:
         self.user_data_dir = user_data_dir
         self.sqlcipher_version = detect_sqlcipher_version()
         self.last_write_ts: Optional[Timestamp] = None
+        # Hash of the unencrypted DB contents as used by premium sync. Reset at each write
+        self.sync_data_hash: Optional[str] = None
         action = self.read_info_at_start()
         if action == DBStartupAction.UPGRADE_3_4:
             result, msg = self.upgrade_db_sqlcipher_3_to_4(password)
@@ -322,6 +330,16 @@ class DBHandler:
         DBUpgradeManager(self).run_upgrades()
         # create tables if needed (first run - or some new tables)
         self.conn.executescript(DB_SCRIPT_CREATE_TABLES)
+        try:
+            self.conn.executescript(DB_SCRIPT_CREATE_TRANSIENT_TABLES)
+        except sqlcipher.DatabaseError as e:  # pylint: disable=no-member
+            # Can happen if the transient DB was left with another password or
+            # sqlcipher version. Its data can be recreated so start with a new one.
+            log.warning(f'Could not open the transient DB due to {str(e)}. Recreating it')
+            self.conn.execute('DETACH DATABASE transient;')
+            (self.user_data_dir / TRANSIENT_DB_FILENAME).unlink()
+            self._attach_transient_db(password)
+            self.conn.executescript(DB_SCRIPT_CREATE_TRANSIENT_TABLES)
 
     def get_md5hash(self) -> str:
         """Get the md5hash of the DB
@@ -410,7 +428,10 @@ class DBHandler:
         """
         fullpath = self.user_data_dir / 'rotkehlchen.db'
         try:
-            self.conn = sqlcipher.connect(str(fullpath))  # pylint: disable=no-member
+            self.conn = sqlcipher.connect(  # pylint: disable=no-member
+                str(fullpath),
+                factory=DBConnection,
+            )
         except sqlcipher.OperationalError as e:  # pylint: disable=no-member
             raise SystemPermissionError(
                 f'Could not open database file: {fullpath}. Permission errors?',
@@ -423,6 +444,15 @@ class DBHandler:
             script += f'PRAGMA kdf_iter={KDF_ITER};'
         self.conn.executescript(script)
         self.conn.execute('PRAGMA foreign_keys=ON')
+        self._attach_transient_db(password)
+
+    def _attach_transient_db(self, password: str) -> None:
+        """Attaches the transient DB to the connection. It is created if missing."""
+        password_for_sqlcipher = _protect_password_sqlcipher(password)
+        self.conn.execute(
+            f'ATTACH DATABASE "{self.user_data_dir / TRANSIENT_DB_FILENAME}" AS transient '
+            f'KEY "{password_for_sqlcipher}";',
+        )
 
     def change_password(self, new_password: str) -> bool:
         """Changes the password for the currently logged in user
@@ -432,6 +462,7 @@ class DBHandler:
         script = f'PRAGMA rekey="{new_password_for_sqlcipher}";'
         if self.sqlcipher_version == 3:
             script += f'PRAGMA kdf_iter={KDF_ITER};'
+        script += f'PRAGMA transient.rekey="{new_password_for_sqlcipher}";'
         try:
             self.conn.executescript(script)
         except sqlcipher.OperationalError as e:  # pylint: disable=no-member
@@ -479,6 +510,7 @@ class DBHandler:
         there is a DB upgrade and there is an error.
         """
         self.disconnect()
+        self.sync_data_hash = None
         rdbpath = self.user_data_dir / 'rotkehlchen.db'
         # Make copy of existing encrypted DB before removing it
         shutil.copy2(
@@ -516,6 +548,7 @@ class DBHandler:
     def update_last_write(self) -> None:
         # Also keep it in memory for faster querying
         self.last_write_ts = ts_now()
+        self.sync_data_hash = None
         cursor = self.conn.cursor()
         cursor.execute(
             'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
@@ -2341,6 +2374,7 @@ class DBHandler:
                 'ethereum_transactions',
                 'amm_swaps',
                 'ledger_actions',
+                'pnl_events',
             ],
             op: Literal['OR', 'AND'] = 'OR',
             **kwargs: Any,
@@ -2768,14 +2802,14 @@ class DBHandler:
         # it starts taking too much time the calling logic needs to change
         cursor = self.conn.cursor()
 
-        results = set()
+        asset_ids: Set[Any] = set()
         for table_entry in TABLES_WITH_ASSETS:
             table_name = table_entry[0]
             columns = table_entry[1:]
             columns_str = ", ".join(columns)
             bindings: Union[Tuple, Tuple[str]] = ()
             condition = ''
-            if table_name in ('manually_tracked_balances', 'timed_balances'):
+            if table_name in TABLES_WITH_BALANCE_CATEGORY:
                 bindings = (BalanceType.LIABILITY.serialize_for_db(),)
                 condition = ' WHERE category!=?'
 
@@ -2789,29 +2823,68 @@ class DBHandler:
                 continue
 
             for result in query:
-                for _, asset_id in enumerate(result):
-                    try:
-                        if asset_id is not None:
-                            results.add(Asset(asset_id))
-                    except UnknownAsset:
-                        self.msg_aggregator.add_warning(
-                            f'Unknown/unsupported asset {asset_id} found in the database. '
-                            f'If you believe this should be supported open an issue in github',
-                        )
-                        continue
-                    except DeserializationError:
-                        self.msg_aggregator.add_error(
-                            f'Asset with non-string type {type(asset_id)} found in the '
-                            f'database. Skipping it.',
-                        )
-                        continue
+                asset_ids.update(result)
+
+        return self._deserialize_owned_assets(asset_ids)
+
+    def _deserialize_owned_assets(self, asset_ids: Iterable[Any]) -> List[Asset]:
+        """Turns asset ids found in the DB into assets, warning for any unknown ones"""
+        assets = set()
+        for asset_id in asset_ids:
+            if asset_id is None:
+                continue
+            try:
+                assets.add(Asset(asset_id))
+            except UnknownAsset:
+                self.msg_aggregator.add_warning(
+                    f'Unknown/unsupported asset {asset_id} found in the database. '
+                    f'If you believe this should be supported open an issue in github',
+                )
+            except DeserializationError:
+                self.msg_aggregator.add_error(
+                    f'Asset with non-string type {type(asset_id)} found in the '
+                    f'database. Skipping it.',
+                )
+
+        return list(assets)
+
+    def _get_globaldb_mirror_state(self, name: str) -> Optional[str]:
+        cursor = self.conn.cursor()
+        result = cursor.execute(
+            'SELECT value FROM globaldb_mirror WHERE name=?;', (name,),
+        ).fetchone()
+        return None if result is None else result[0]
 
-        return list(results)
+    def _set_globaldb_mirror_state(self, name: str, value: str) -> None:
+        """Saves what has been mirrored from/to the global DB. Is not a user data write"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            'INSERT OR REPLACE INTO globaldb_mirror(name, value) VALUES(?, ?);',
+            (name, value),
+        )
+        self.conn.commit()
 
     def update_owned_assets_in_globaldb(self) -> None:
-        """Makes sure all owned assets of the user are in the Global DB"""
-        assets = self.query_owned_assets()
-        GlobalDBHandler().add_user_owned_assets(assets)
+        """Makes sure all owned assets of the user are in the Global DB
+
+        Triggers collect the assets that appear in the user DB in owned_assets_changes,
+        so only those are added. All owned assets are queried only if they were last
+        added to a different global DB, or never.
+        """
+        globaldb = GlobalDBHandler()
+        mirror_id = globaldb.get_assets_mirror_id()
+        cursor = self.conn.cursor()
+        if self._get_globaldb_mirror_state('owned_assets') == mirror_id:
+            query = cursor.execute('SELECT identifier FROM owned_assets_changes;')
+            assets = self._deserialize_owned_assets([x[0] for x in query])
+        else:
+            assets = self.query_owned_assets()
+
+        if globaldb.add_user_owned_assets(assets) is False:
+            return  # keep the changes around to retry next time
+
+        cursor.execute('DELETE FROM owned_assets_changes;')
+        self._set_globaldb_mirror_state('owned_assets', mirror_id)
 
     def add_asset_identifiers(self, asset_identifiers: List[str]) -> None:
         """Adds an asset to the user db asset identifier table"""
@@ -2823,10 +2896,24 @@ class DBHandler:
         self.update_last_write()
 
     def add_globaldb_assetids(self) -> None:
-        """Makes sure that all the GlobalDB asset identifiers are mirrored in the user DB"""
-        cursor = GlobalDBHandler()._conn.cursor()  # after succesfull update add all asset ids
-        query = cursor.execute('SELECT identifier from assets;')
-        self.add_asset_identifiers([x[0] for x in query])
+        """Makes sure that all the GlobalDB asset identifiers are mirrored in the user DB
+
+        Only the identifiers added to the GlobalDB since the last mirroring are added,
+        unless the last mirroring was from a different global DB, or never happened.
+        """
+        globaldb = GlobalDBHandler()
+        mirror_id = globaldb.get_assets_mirror_id()
+        last_change_id = None
+        state = self._get_globaldb_mirror_state('asset_ids')
+        if state is not None:
+            state_mirror_id, state_change_id = state.split(':')
+            if state_mirror_id == mirror_id:
+                last_change_id = int(state_change_id)
+
+        change_id, identifiers = globaldb.get_asset_identifiers_changes(last_change_id)
+        if len(identifiers) != 0:
+            self.add_asset_identifiers(identifiers)
+        self._set_globaldb_mirror_state('asset_ids', f'{mirror_id}:{change_id}')
 
     def delete_asset_identifier(self, asset_id: str) -> None:
         """Deletes an asset identifier from the user db asset identifier table
@@ -3167,6 +3254,11 @@ class DBHandler:
                 xpub_data.serialize_derivation_path_for_db(),
             ),
         )
+        # Delete the cached derived addresses. They are in the transient DB so no cascade
+        cursor.execute(
+            'DELETE FROM xpub_derived_addresses WHERE xpub=? AND derivation_path IS ?;',
+            (xpub_data.xpub.xpub, xpub_data.serialize_derivation_path_for_db()),
+        )
         # And then finally delete the xpub itself
         cursor.execute(
             'DELETE FROM xpubs WHERE xpub=? AND derivation_path IS ?;',
@@ -3311,6 +3403,51 @@ class DBHandler:
 
         self.update_last_write()
 
+    def get_xpub_derived_addresses(
+            self,
+            xpub_data: XpubData,
+    ) -> Dict[int, Dict[int, BTCAddress]]:
+        """Get the cached addresses derived from the xpub
+
+        Returns a mapping of account index to derived index to address
+        """
+        cursor = self.conn.cursor()
+        query = cursor.execute(
+            'SELECT account_index, derived_index, address FROM xpub_derived_addresses '
+            'WHERE xpub=? AND derivation_path IS ?;',
+            (xpub_data.xpub.xpub, xpub_data.serialize_derivation_path_for_db()),
+        )
+        result: Dict[int, Dict[int, BTCAddress]] = defaultdict(dict)
+        for account_index, derived_index, address in query:
+            result[account_index][derived_index] = BTCAddress(address)
+
+        return result
+
+    def add_xpub_derived_addresses(
+            self,
+            xpub_data: XpubData,
+            derived_addresses: List[Tuple[int, int, BTCAddress]],
+    ) -> None:
+        """Caches addresses derived from the xpub. Each entry is a tuple of account
+        index, derived index and address.
+
+        The cache is derived data so writing to it does not update the last write ts
+        """
+        cursor = self.conn.cursor()
+        cursor.executemany(
+            'INSERT OR IGNORE INTO xpub_derived_addresses'
+            '(xpub, derivation_path, account_index, derived_index, address) '
+            'VALUES (?, ?, ?, ?, ?)',
+            [(
+                xpub_data.xpub.xpub,
+                xpub_data.serialize_derivation_path_for_db(),
+                account_index,
+                derived_index,
+                address,
+            ) for account_index, derived_index, address in derived_addresses],
+        )
+        self.conn.commit()
+
     def _ensure_data_integrity(
             self,
             table_name: str,
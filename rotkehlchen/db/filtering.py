@@ -4,7 +4,7 @@ from typing import Any, List, NamedTuple, Optional, Tuple, Union, cast
 
 from rotkehlchen.errors import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
-from rotkehlchen.typing import ChecksumEthAddress, Timestamp
+from rotkehlchen.typing import ChecksumEthAddress, EventType, Location, Timestamp
 from rotkehlchen.utils.misc import hexstring_to_bytes
 
 logger = logging.getLogger(__name__)
@@ -92,6 +92,29 @@ class DBETHTransactionHashFilter(DBFilter):
         return ['tx_hash=?'], [value]
 
 
+@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class DBLocationFilter(DBFilter):
+    location: Optional[Location] = None
+
+    def prepare(self) -> Tuple[List[str], List[Any]]:
+        if self.location is None:
+            return [], []
+
+        return ['location=?'], [self.location.serialize_for_db()]
+
+
+@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class DBEventTypeFilter(DBFilter):
+    event_types: Optional[List[EventType]] = None
+
+    def prepare(self) -> Tuple[List[str], List[Any]]:
+        if self.event_types is None:
+            return [], []
+
+        questionmarks = '?' * len(self.event_types)
+        return [f'type IN ({",".join(questionmarks)})'], list(self.event_types)
+
+
 @dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
 class DBFilterQuery():
     and_op: bool
@@ -238,3 +261,48 @@ class ETHTransactionsFilterQuery(DBFilterQuery):
             )
         filter_query.filters = filters
         return cast('ETHTransactionsFilterQuery', filter_query)
+
+
+@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class PnlEventsFilterQuery(DBFilterQuery):
+
+    @property
+    def timestamp_filter(self) -> DBTimestampFilter:
+        if len(self.filters) >= 1 and isinstance(self.filters[0], DBTimestampFilter):
+            return self.filters[0]
+        return DBTimestampFilter(and_op=True)  # no range specified
+
+    @property
+    def from_ts(self) -> Optional[Timestamp]:
+        return self.timestamp_filter.from_ts
+
+    @property
+    def to_ts(self) -> Optional[Timestamp]:
+        return self.timestamp_filter.to_ts
+
+    @classmethod
+    def make(
+            cls,
+            and_op: bool = True,
+            order_by_attribute: str = 'identifier',
+            order_ascending: bool = True,
+            limit: Optional[int] = None,
+            offset: Optional[int] = None,
+            from_ts: Optional[Timestamp] = None,
+            to_ts: Optional[Timestamp] = None,
+            event_types: Optional[List[EventType]] = None,
+            location: Optional[Location] = None,
+    ) -> 'PnlEventsFilterQuery':
+        filter_query = cls.create(
+            and_op=and_op,
+            limit=limit,
+            offset=offset,
+            order_by_attribute=order_by_attribute,
+            order_ascending=order_ascending,
+        )
+        filter_query.filters = [
+            DBTimestampFilter(and_op=True, from_ts=from_ts, to_ts=to_ts),
+            DBEventTypeFilter(and_op=True, event_types=event_types),
+            DBLocationFilter(and_op=True, location=location),
+        ]
+        return cast('PnlEventsFilterQuery', filter_query)
@@ -0,0 +1,114 @@
+import json
+import logging
+from copy import deepcopy
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Tuple
+
+from rotkehlchen.db.filtering import PnlEventsFilterQuery
+from rotkehlchen.fval import FVal
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.typing import EventType, Location, Timestamp
+from rotkehlchen.utils.serialization import rlk_jsondumps
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.dbhandler import DBHandler
+
+
+class DBReports():
+    """Storage of the events of the last PnL report
+
+    The report is data derived from the rest of the DB so it is kept in the transient
+    DB, which is not part of the premium sync payload. For the same reason writes to it
+    do not update the last write timestamp of the DB, which is what premium sync checks.
+    """
+
+    def __init__(self, database: 'DBHandler') -> None:
+        self.db = database
+
+    def purge_pnl_events(self) -> None:
+        """Deletes all the events of the last PnL report"""
+        cursor = self.db.conn.cursor()
+        cursor.execute('DELETE FROM pnl_events;')
+        self.db.conn.commit()
+
+    def add_pnl_events(
+            self,
+            events: List[Tuple[EventType, Location, Timestamp, Dict[str, Any], FVal, FVal]],
+    ) -> None:
+        """Adds PnL report events to the DB in the order they are given
+
+        Each event is a tuple of type, location, timestamp, the event data as
+        returned by the API, the total bought cost and the total received in
+        profit currency. The last two are only needed for the all events CSV.
+        """
+        cursor = self.db.conn.cursor()
+        cursor.executemany(
+            'INSERT INTO pnl_events(type, location, timestamp, data, total_bought_cost, '
+            'total_received_in_profit_currency) VALUES (?, ?, ?, ?, ?, ?)',
+            [(
+                event_type,
+                location.serialize_for_db(),
+                timestamp,
+                rlk_jsondumps(data),
+                str(total_bought_cost),
+                str(total_received_in_profit_currency),
+            ) for (
+                event_type,
+                location,
+                timestamp,
+                data,
+                total_bought_cost,
+                total_received_in_profit_currency,
+            ) in events],
+        )
+        self.db.conn.commit()
+
+    def get_pnl_events(
+            self,
+            filter_query: PnlEventsFilterQuery,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Returns a tuple with 2 entries.
+        First entry is a list of PnL report events as returned by the API, optionally
+        filtered by time, type and location and paginated.
+        Second is the number of entries found for the current filter ignoring pagination.
+
+        This function can raise:
+        - pysqlcipher3.dbapi2.OperationalError if the SQL query fails due to invalid
+        filtering arguments.
+        """
+        cursor = self.db.conn.cursor()
+        query, bindings = filter_query.prepare()
+        results = cursor.execute('SELECT data FROM pnl_events ' + query, bindings)
+        events = [json.loads(entry[0]) for entry in results]
+
+        if filter_query.pagination is not None:
+            no_pagination_filter = deepcopy(filter_query)
+            no_pagination_filter.pagination = None
+            query, bindings = no_pagination_filter.prepare()
+            query = 'SELECT COUNT(*) FROM pnl_events ' + query
+            total_filter_count = cursor.execute(query, bindings).fetchone()[0]
+        else:
+            total_filter_count = len(events)
+
+        return events, total_filter_count
+
+    def iterate_pnl_events(self) -> Iterator[Tuple[EventType, Dict[str, Any], FVal, FVal]]:
+        """Iterates over the PnL report events in the order they were added, without
+        loading them all in memory
+
+        Yields the event type, the event data as returned by the API, the total bought
+        cost and the total received in profit currency of each event.
+        """
+        cursor = self.db.conn.cursor()
+        for event_type, data, total_bought_cost, total_received in cursor.execute(
+                'SELECT type, data, total_bought_cost, total_received_in_profit_currency '
+                'FROM pnl_events ORDER BY identifier ASC;',
+        ):
+            yield (
+                EventType(event_type),
+                json.loads(data),
+                FVal(total_bought_cost),
+                FVal(total_received),
+            )
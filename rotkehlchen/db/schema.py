@@ -305,6 +305,20 @@ CREATE TABLE IF NOT EXISTS xpub_mappings (
 );
 """  # noqa: E501
 
+# Cache of the addresses derived from an xpub, so they don't have to be derived again.
+# Not all of them are tracked, for that check xpub_mappings. The table lives in the
+# transient DB so it can't reference xpubs and its rows are deleted with the xpub.
+DB_CREATE_XPUB_DERIVED_ADDRESSES = """
+CREATE TABLE IF NOT EXISTS transient.xpub_derived_addresses (
+    xpub TEXT NOT NULL,
+    derivation_path TEXT NOT NULL,
+    account_index INTEGER NOT NULL,
+    derived_index INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    PRIMARY KEY (xpub, derivation_path, account_index, derived_index)
+);
+"""
+
 DB_CREATE_ETHEREUM_ACCOUNTS_DETAILS = """
 CREATE TABLE IF NOT EXISTS ethereum_accounts_details (
     account VARCHAR[42] NOT NULL PRIMARY KEY,
@@ -658,6 +672,88 @@ CREATE TABLE IF NOT EXISTS nfts (
 );
 """  # noqa: E501
 
+# The events of the last PnL report. Data is the serialized event as returned by the API.
+# The row of the all events CSV is created from it and the two totals when exporting.
+# The table lives in the transient DB so location can't reference the location table.
+DB_CREATE_PNL_EVENTS = """
+CREATE TABLE IF NOT EXISTS transient.pnl_events (
+    identifier INTEGER NOT NULL PRIMARY KEY,
+    type TEXT NOT NULL,
+    location CHAR(1) NOT NULL DEFAULT('A'),
+    timestamp INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    total_bought_cost TEXT NOT NULL,
+    total_received_in_profit_currency TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transient.idx_pnl_events_timestamp ON pnl_events(timestamp);
+CREATE INDEX IF NOT EXISTS transient.idx_pnl_events_type ON pnl_events(type);
+CREATE INDEX IF NOT EXISTS transient.idx_pnl_events_location ON pnl_events(location);
+"""
+
+# Tuples that contain first the name of a table and then the columns that
+# reference assets ids. This is used to query all assets that a user owns.
+TABLES_WITH_ASSETS = (
+    ('aave_events', 'asset1', 'asset2'),
+    ('yearn_vaults_events', 'from_asset', 'to_asset'),
+    ('manually_tracked_balances', 'asset'),
+    ('trades', 'base_asset', 'quote_asset', 'fee_currency'),
+    ('margin_positions', 'pl_currency', 'fee_currency'),
+    ('asset_movements', 'asset', 'fee_asset'),
+    ('ledger_actions', 'asset', 'rate_asset'),
+    ('amm_swaps', 'token0_identifier', 'token1_identifier'),
+    ('amm_events', 'token0_identifier', 'token1_identifier'),
+    ('adex_events', 'token'),
+    ('balancer_events', 'pool_address_token'),
+    ('timed_balances', 'currency'),
+)
+# Tables with a balance category column. Liabilities in them are not owned assets.
+TABLES_WITH_BALANCE_CATEGORY = ('manually_tracked_balances', 'timed_balances')
+
+# Assets that appeared in any of the TABLES_WITH_ASSETS since the owned assets
+# were last added to the global DB. Filled by the triggers below.
+DB_CREATE_OWNED_ASSETS_CHANGES = """
+CREATE TABLE IF NOT EXISTS owned_assets_changes (
+    identifier TEXT NOT NULL PRIMARY KEY
+);
+"""
+
+
+def _make_owned_assets_triggers() -> str:
+    triggers = ''
+    for table_name, *columns in TABLES_WITH_ASSETS:
+        inserts = ''.join(
+            f'    INSERT OR IGNORE INTO owned_assets_changes(identifier) '
+            f'SELECT NEW.{column} WHERE NEW.{column} IS NOT NULL;\n'
+            for column in columns
+        )
+        condition = ''
+        update_columns = columns
+        if table_name in TABLES_WITH_BALANCE_CATEGORY:
+            # B is the liability balance category
+            condition = " WHEN NEW.category != 'B'"
+            update_columns = columns + ['category']
+        for event_name, event in (
+                ('insert', 'INSERT'),
+                ('update', f'UPDATE OF {", ".join(update_columns)}'),
+        ):
+            triggers += (
+                f'CREATE TRIGGER IF NOT EXISTS {table_name}_owned_assets_{event_name} '
+                f'AFTER {event} ON {table_name}{condition}\nBEGIN\n{inserts}END;\n'
+            )
+    return triggers
+
+
+DB_CREATE_OWNED_ASSETS_TRIGGERS = _make_owned_assets_triggers()
+
+# State of the data mirrored between the user DB and the global DB. Each entry is
+# keyed to the assets mirror id of the global DB it was mirrored from.
+DB_CREATE_GLOBALDB_MIRROR = """
+CREATE TABLE IF NOT EXISTS globaldb_mirror (
+    name TEXT NOT NULL PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
 DB_SCRIPT_CREATE_TABLES = f"""
 PRAGMA foreign_keys=off;
 BEGIN TRANSACTION;
@@ -705,6 +801,18 @@ BEGIN TRANSACTION;
 {DB_CREATE_GITCOIN_TX_TYPE}
 {DB_CREATE_GITCOIN_GRANT_METADATA}
 {DB_CREATE_NFTS}
+{DB_CREATE_OWNED_ASSETS_CHANGES}
+{DB_CREATE_OWNED_ASSETS_TRIGGERS}
+{DB_CREATE_GLOBALDB_MIRROR}
 COMMIT;
 PRAGMA foreign_keys=on;
 """
+
+# The transient DB is attached to the user DB connection as "transient". It has
+# the data that can be recreated and is not part of the premium sync payload.
+DB_SCRIPT_CREATE_TRANSIENT_TABLES = f"""
+BEGIN TRANSACTION;
+{DB_CREATE_PNL_EVENTS}
+{DB_CREATE_XPUB_DERIVED_ADDRESSES}
+COMMIT;
+"""
@@ -11,7 +11,11 @@ from rotkehlchen.history.typing import (
     DEFAULT_HISTORICAL_PRICE_ORACLES_ORDER,
     HistoricalPriceOracle,
 )
-from rotkehlchen.inquirer import DEFAULT_CURRENT_PRICE_ORACLES_ORDER, CurrentPriceOracle
+from rotkehlchen.inquirer import (
+    DEFAULT_CURRENT_PRICE_ORACLES_ORDER,
+    DEFAULT_CURRENT_PRICE_STALENESS,
+    CurrentPriceOracle,
+)
 from rotkehlchen.typing import AVAILABLE_MODULES_MAP, ModuleName, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 
@@ -43,6 +47,8 @@ DEFAULT_TAXABLE_LEDGER_ACTIONS = [
 DEFAULT_PNL_CSV_WITH_FORMULAS = True
 DEFAULT_PNL_CSV_HAVE_SUMMARY = False
 DEFAULT_SSF_0GRAPH_MULTIPLIER = 0
+DEFAULT_ETH_RPC_HEDGE_REQUESTS = False
+DEFAULT_COST_BASIS_FIXED_POINT = False
 
 JSON_KEYS = ('current_price_oracles', 'historical_price_oracles', 'taxable_ledger_actions')
 BOOLEAN_KEYS = (
@@ -56,6 +62,8 @@ BOOLEAN_KEYS = (
     'display_date_in_localtime',
     'pnl_csv_with_formulas',
     'pnl_csv_have_summary',
+    'eth_rpc_hedge_requests',
+    'cost_basis_fixed_point',
 )
 INTEGER_KEYS = (
     'version',
@@ -63,6 +71,7 @@ INTEGER_KEYS = (
     'balance_save_frequency',
     'btc_derivation_gap_limit',
     'ssf_0graph_multiplier',
+    'current_price_staleness',
 )
 STRING_KEYS = (
     'eth_rpc_endpoint',
@@ -104,6 +113,9 @@ class DBSettings(NamedTuple):
     pnl_csv_with_formulas: bool = DEFAULT_PNL_CSV_WITH_FORMULAS
     pnl_csv_have_summary: bool = DEFAULT_PNL_CSV_HAVE_SUMMARY
     ssf_0graph_multiplier: int = DEFAULT_SSF_0GRAPH_MULTIPLIER
+    current_price_staleness: int = DEFAULT_CURRENT_PRICE_STALENESS
+    eth_rpc_hedge_requests: bool = DEFAULT_ETH_RPC_HEDGE_REQUESTS
+    cost_basis_fixed_point: bool = DEFAULT_COST_BASIS_FIXED_POINT
 
 
 class ModifiableDBSettings(NamedTuple):
@@ -131,6 +143,9 @@ class ModifiableDBSettings(NamedTuple):
     pnl_csv_with_formulas: Optional[bool] = None
     pnl_csv_have_summary: Optional[bool] = None
     ssf_0graph_multiplier: Optional[int] = None
+    current_price_staleness: Optional[int] = None
+    eth_rpc_hedge_requests: Optional[bool] = None
+    cost_basis_fixed_point: Optional[bool] = None
 
     def serialize(self) -> Dict[str, Any]:
         settings_dict = {}
@@ -1,11 +1,40 @@
-from rotkehlchen.exchanges.binance import Binance  # noqa: F401
-from rotkehlchen.exchanges.bitmex import Bitmex  # noqa: F401
-from rotkehlchen.exchanges.bitstamp import Bitstamp  # noqa: F401
-from rotkehlchen.exchanges.bittrex import Bittrex  # noqa: F401
-from rotkehlchen.exchanges.coinbase import Coinbase  # noqa: F401
-from rotkehlchen.exchanges.ftx import Ftx  # noqa: F401
-from rotkehlchen.exchanges.coinbasepro import Coinbasepro  # noqa: F401
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 from rotkehlchen.exchanges.exchange import ExchangeInterface, ExchangeQueryBalances  # noqa: F401
-from rotkehlchen.exchanges.gemini import Gemini  # noqa: F401
-from rotkehlchen.exchanges.kraken import Kraken  # noqa: F401
-from rotkehlchen.exchanges.poloniex import Poloniex  # noqa: F401
+
+if TYPE_CHECKING:
+    from rotkehlchen.exchanges.binance import Binance  # noqa: F401
+    from rotkehlchen.exchanges.bitmex import Bitmex  # noqa: F401
+    from rotkehlchen.exchanges.bitstamp import Bitstamp  # noqa: F401
+    from rotkehlchen.exchanges.bittrex import Bittrex  # noqa: F401
+    from rotkehlchen.exchanges.coinbase import Coinbase  # noqa: F401
+    from rotkehlchen.exchanges.coinbasepro import Coinbasepro  # noqa: F401
+    from rotkehlchen.exchanges.ftx import Ftx  # noqa: F401
+    from rotkehlchen.exchanges.gemini import Gemini  # noqa: F401
+    from rotkehlchen.exchanges.kraken import Kraken  # noqa: F401
+    from rotkehlchen.exchanges.poloniex import Poloniex  # noqa: F401
+
+# Exchange classes are only imported when first accessed so that startup does not
+# pay for importing every exchange module. The ExchangeManager imports the exchange
+# modules it needs by itself when setting up an exchange.
+_LAZY_EXCHANGE_CLASSES = {
+    'Binance': 'binance',
+    'Bitmex': 'bitmex',
+    'Bitstamp': 'bitstamp',
+    'Bittrex': 'bittrex',
+    'Coinbase': 'coinbase',
+    'Coinbasepro': 'coinbasepro',
+    'Ftx': 'ftx',
+    'Gemini': 'gemini',
+    'Kraken': 'kraken',
+    'Poloniex': 'poloniex',
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXCHANGE_CLASSES.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__} has no attribute {name}')
+
+    return getattr(import_module(f'{__name__}.{module_name}'), name)
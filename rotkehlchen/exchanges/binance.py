@@ -18,7 +18,6 @@ from typing import (
 )
 from urllib.parse import urlencode
 
-import gevent
 import requests
 from typing_extensions import Literal
 
@@ -26,7 +25,7 @@ from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.accounting.structures import Balance
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.converters import asset_from_binance
-from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.constants.misc import BINANCE_BASE_URL, BINANCEUS_BASE_URL, ZERO
 from rotkehlchen.constants.timing import DEFAULT_TIMEOUT_TUPLE
 from rotkehlchen.errors import DeserializationError, RemoteError, UnknownAsset, UnsupportedAsset
 from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade, TradeType
@@ -48,6 +47,7 @@ from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import ts_now_in_ms
 from rotkehlchen.utils.mixins.cacheable import cache_response_timewise
 from rotkehlchen.utils.mixins.lockable import protect_with_lock
+from rotkehlchen.utils.rate_limit import rate_limiter
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
@@ -70,6 +70,21 @@ V3_METHODS = (
 PUBLIC_METHODS = ('exchangeInfo', 'time')
 
 RETRY_AFTER_LIMIT = 60
+# Request weight allowed per minute for each api subdomain. We pace ourselves at that
+# rate with a burst of half of it. Limits are per IP so they are shared by all accounts.
+# https://binance-docs.github.io/apidocs/spot/en/#limits
+BINANCE_WEIGHT_LIMITS_PER_MINUTE = {'api': 1200, 'fapi': 2400, 'dapi': 2400}
+# Request weight of the methods we query that weigh more than 1, which is the default.
+# https://binance-docs.github.io/apidocs/spot/en/#market-data-endpoints
+# https://binance-docs.github.io/apidocs/futures/en/#account-information-v2-user_data
+BINANCE_METHOD_WEIGHTS = {
+    'account': 10,
+    'exchangeInfo': 10,
+    'myTrades': 10,
+    'openOrders': 40,
+    'bswap/liquidity': 10,
+    'balance': 5,
+}
 # Binance api error codes we check for (all below apis seem to have the same)
 # https://binance-docs.github.io/apidocs/spot/en/#error-codes-2
 # https://binance-docs.github.io/apidocs/futures/en/#error-codes-2
@@ -79,10 +94,6 @@ REJECTED_MBX_KEY = -2015
 
 BINANCE_API_TYPE = Literal['api', 'sapi', 'dapi', 'fapi']
 
-BINANCE_BASE_URL = 'binance.com/'
-BINANCEUS_BASE_URL = 'binance.us/'
-BINANCE_MARKETS_KEY = 'PAIRS'
-
 
 class BinancePermissionError(RemoteError):
     """Exception raised when a binance permission problem is detected
@@ -227,6 +238,15 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         })
         self.msg_aggregator = msg_aggregator
         self.offset_ms = 0
+        for api_subdomain, weight_limit in BINANCE_WEIGHT_LIMITS_PER_MINUTE.items():
+            rate_limiter.configure(
+                key=self._rate_limit_key(api_subdomain),
+                rate=weight_limit / 60,
+                capacity=weight_limit / 2,
+            )
+
+    def _rate_limit_key(self, api_subdomain: str) -> str:
+        return f'{api_subdomain}.{self.uri}'.rstrip('/')
 
     def first_connection(self) -> None:
         if self.first_connection_made:
@@ -301,6 +321,12 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
 
             is_v3_api_method = api_type == 'api' and method in V3_METHODS
             is_new_futures_api = api_type in ('fapi', 'dapi')
+            api_subdomain = api_type if is_new_futures_api else 'api'
+            # wait before signing so that the timestamp is still in the recvWindow
+            rate_limiter.acquire(
+                key=self._rate_limit_key(api_subdomain),
+                weight=BINANCE_METHOD_WEIGHTS.get(method, 1),
+            )
             api_version = 3  # public methos are v3
             if method not in PUBLIC_METHODS:  # api call needs signature
                 if api_type in ('sapi', 'dapi'):
@@ -325,7 +351,6 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
                 ).hexdigest()
                 call_options['signature'] = signature
 
-            api_subdomain = api_type if is_new_futures_api else 'api'
             request_url = (
                 f'https://{api_subdomain}.{self.uri}{api_type}/v{str(api_version)}/{method}?'
             )
@@ -394,7 +419,7 @@ class Binance(ExchangeInterface):  # lgtm[py/missing-call-to-init]
                             RETRY_AFTER_LIMIT,
                         ))
 
-                gevent.sleep(retry_after)
+                rate_limiter.penalize(key=self._rate_limit_key(api_subdomain), seconds=retry_after)
                 continue
 
             # else success
@@ -26,6 +26,13 @@ from rotkehlchen.typing import (
     TradeType,
 )
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.mixins.serializableenum import SerializableEnumMixin
+
+
+class KrakenAccountType(SerializableEnumMixin):
+    STARTER = 0
+    INTERMEDIATE = 1
+    PRO = 2
 
 
 def hash_id(hashable: str) -> TradeID:
@@ -1,8 +1,6 @@
 import logging
 from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
-import requests
-
 from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.accounting.structures import Balance
 from rotkehlchen.assets.asset import Asset
@@ -14,6 +12,7 @@ from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.typing import ApiKey, ApiSecret, Location, T_ApiKey, T_ApiSecret, Timestamp
 from rotkehlchen.utils.mixins.cacheable import CacheableMixIn
 from rotkehlchen.utils.mixins.lockable import LockableQueryMixIn, protect_with_lock
+from rotkehlchen.utils.network import create_session
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
@@ -54,7 +53,7 @@ class ExchangeInterface(CacheableMixIn, LockableQueryMixIn):
         self.api_key = api_key
         self.secret = secret
         self.first_connection_made = False
-        self.session = requests.session()
+        self.session = create_session()
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         log.info(f'Initialized {str(location)} exchange {name}')
 
@@ -45,8 +45,6 @@ INITIAL_BACKOFF_TIME = 2
 BACKOFF_LIMIT = 60
 PAGINATION_LIMIT = 100
 
-FTX_SUBACCOUNT_DB_SETTING = 'ftx_subaccount'
-
 
 def trade_from_ftx(raw_trade: Dict[str, Any]) -> Optional[Trade]:
     """Turns an FTX transaction into a rotki Trade.
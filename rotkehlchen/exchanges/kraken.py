@@ -10,7 +10,6 @@ from collections import defaultdict
 from typing import TYPE_CHECKING, Any, DefaultDict, Dict, List, Optional, Tuple, Union
 from urllib.parse import urlencode
 
-import gevent
 import requests
 from requests import Response
 
@@ -28,7 +27,12 @@ from rotkehlchen.errors import (
     UnknownAsset,
     UnprocessableTradePair,
 )
-from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
+from rotkehlchen.exchanges.data_structures import (
+    AssetMovement,
+    KrakenAccountType,
+    MarginPosition,
+    Trade,
+)
 from rotkehlchen.exchanges.exchange import ExchangeInterface, ExchangeQueryBalances
 from rotkehlchen.history.deserialization import deserialize_price
 from rotkehlchen.inquirer import Inquirer
@@ -43,10 +47,9 @@ from rotkehlchen.serialization.deserialize import (
 )
 from rotkehlchen.typing import ApiKey, ApiSecret, Location, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import ts_now
 from rotkehlchen.utils.mixins.cacheable import cache_response_timewise
 from rotkehlchen.utils.mixins.lockable import protect_with_lock
-from rotkehlchen.utils.mixins.serializableenum import SerializableEnumMixin
+from rotkehlchen.utils.rate_limit import api_key_limiter_key, rate_limiter
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 if TYPE_CHECKING:
@@ -60,7 +63,9 @@ KRAKEN_DELISTED = ('XDAO', 'XXVN', 'ZKRW', 'XNMC', 'BSV', 'XICN')
 KRAKEN_PUBLIC_METHODS = ('AssetPairs', 'Assets')
 KRAKEN_QUERY_TRIES = 8
 KRAKEN_BACKOFF_DIVIDEND = 15
-MAX_CALL_COUNTER_INCREASE = 2  # Trades and Ledger produce the max increase
+# Kraken methods that increase the call counter by 2 instead of 1
+# https://support.kraken.com/hc/en-us/articles/206548367
+KRAKEN_HEAVY_METHODS = ('Ledgers', 'TradesHistory')
 
 
 def kraken_to_world_pair(pair: str) -> Tuple[Asset, Asset]:
@@ -223,12 +228,6 @@ def _check_and_get_response(response: Response, method: str) -> Union[str, Dict]
     return result
 
 
-class KrakenAccountType(SerializableEnumMixin):
-    STARTER = 0
-    INTERMEDIATE = 1
-    PRO = 2
-
-
 DEFAULT_KRAKEN_ACCOUNT_TYPE = KrakenAccountType.STARTER
 
 
@@ -251,9 +250,8 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         )
         self.msg_aggregator = msg_aggregator
         self.session.headers.update({'API-Key': self.api_key})
+        self.rate_limit_key = api_key_limiter_key(KRAKEN_BASE_URL, self.api_key)
         self.set_account_type(kraken_account_type)
-        self.call_counter = 0
-        self.last_query_ts = 0
 
     def set_account_type(self, account_type: Optional[KrakenAccountType]) -> None:
         if account_type is None:
@@ -269,6 +267,16 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         else:  # Pro
             self.call_limit = 20
             self.reduction_every_secs = 1
+        self._configure_rate_limit()
+
+    def _configure_rate_limit(self) -> None:
+        """The kraken call counter of the key is a bucket of call_limit tokens that
+        refills by one every reduction_every_secs"""
+        rate_limiter.configure(
+            key=self.rate_limit_key,
+            rate=1 / self.reduction_every_secs,
+            capacity=self.call_limit,
+        )
 
     def edit_exchange_credentials(
             self,
@@ -279,6 +287,9 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         changed = super().edit_exchange_credentials(api_key, api_secret, passphrase)
         if api_key is not None:
             self.session.headers.update({'API-Key': self.api_key})
+            rate_limiter.remove(self.rate_limit_key)
+            self.rate_limit_key = api_key_limiter_key(KRAKEN_BASE_URL, self.api_key)
+            self._configure_rate_limit()
 
         return changed
 
@@ -364,13 +375,6 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
     def first_connection(self) -> None:
         self.first_connection_made = True
 
-    def _manage_call_counter(self, method: str) -> None:
-        self.last_query_ts = ts_now()
-        if method in ('Ledgers', 'TradesHistory'):
-            self.call_counter += 2
-        else:
-            self.call_counter += 1
-
     def _query_public(self, method: str, req: Optional[dict] = None) -> Union[Dict, str]:
         """API queries that do not require a valid key/secret pair.
 
@@ -386,7 +390,6 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
         except requests.exceptions.RequestException as e:
             raise RemoteError(f'Kraken API request failed due to {str(e)}') from e
 
-        self._manage_call_counter(method)
         return _check_and_get_response(response, method)
 
     def api_query(self, method: str, req: Optional[dict] = None) -> dict:
@@ -395,32 +398,12 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
             self._query_public if method in KRAKEN_PUBLIC_METHODS else self._query_private
         )
         while tries > 0:
-            if self.call_counter + MAX_CALL_COUNTER_INCREASE > self.call_limit:
-                # If we are close to the limit, check how much our call counter reduced
-                # https://www.kraken.com/features/api#api-call-rate-limit
-                secs_since_last_call = ts_now() - self.last_query_ts
-                self.call_counter = max(
-                    0,
-                    self.call_counter - int(secs_since_last_call / self.reduction_every_secs),
-                )
-                # If still at limit, sleep for an amount big enough for smallest tier reduction
-                if self.call_counter + MAX_CALL_COUNTER_INCREASE > self.call_limit:
-                    backoff_in_seconds = self.reduction_every_secs * 2
-                    log.debug(
-                        f'Doing a Kraken API call would now exceed our call counter limit. '
-                        f'Backing off for {backoff_in_seconds} seconds',
-                        call_counter=self.call_counter,
-                    )
-                    tries -= 1
-                    gevent.sleep(backoff_in_seconds)
-                    continue
-
-            log.debug(
-                'Kraken API query',
-                method=method,
-                data=req,
-                call_counter=self.call_counter,
+            # https://www.kraken.com/features/api#api-call-rate-limit
+            rate_limiter.acquire(
+                key=self.rate_limit_key,
+                weight=2 if method in KRAKEN_HEAVY_METHODS else 1,
             )
+            log.debug('Kraken API query', method=method, data=req)
             result = query_method(method, req)
             if isinstance(result, str):
                 # Got a recoverable error
@@ -430,7 +413,7 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
                     f'for {backoff_in_seconds} seconds',
                 )
                 tries -= 1
-                gevent.sleep(backoff_in_seconds)
+                rate_limiter.penalize(key=self.rate_limit_key, seconds=backoff_in_seconds)
                 continue
 
             # else success
@@ -473,7 +456,6 @@ class Kraken(ExchangeInterface):  # lgtm[py/missing-call-to-init]
             )
         except requests.exceptions.RequestException as e:
             raise RemoteError(f'Kraken API request failed due to {str(e)}') from e
-        self._manage_call_counter(method)
 
         return _check_and_get_response(response, method)
 
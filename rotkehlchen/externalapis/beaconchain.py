@@ -20,6 +20,7 @@ from rotkehlchen.serialization.deserialize import deserialize_ethereum_address
 from rotkehlchen.typing import ChecksumEthAddress, Eth2PubKey, ExternalService
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import from_gwei, get_chunks, hexstring_to_bytes
+from rotkehlchen.utils.network import create_session
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 if TYPE_CHECKING:
@@ -45,7 +46,7 @@ class BeaconChain(ExternalServiceWithApiKey):
     def __init__(self, database: 'DBHandler', msg_aggregator: MessagesAggregator) -> None:
         super().__init__(database=database, service_name=ExternalService.BEACONCHAIN)
         self.msg_aggregator = msg_aggregator
-        self.session = requests.session()
+        self.session = create_session()
         self.warning_given = False
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         self.url = 'https://beaconcha.in/api/v1/'
@@ -1,9 +1,8 @@
 import json
 import logging
-from typing import Any, Dict, List, NamedTuple, Optional, Union, overload
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Union, overload
 from urllib.parse import urlencode
 
-import gevent
 import requests
 from typing_extensions import Literal
 
@@ -17,12 +16,20 @@ from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.history.typing import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.typing import Price, Timestamp
-from rotkehlchen.utils.misc import create_timestamp, timestamp_to_date
+from rotkehlchen.utils.misc import create_timestamp, get_chunks, timestamp_to_date
+from rotkehlchen.utils.network import create_session
+from rotkehlchen.utils.rate_limit import rate_limiter
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 COINGECKO_QUERY_RETRY_TIMES = 4
+COINGECKO_HOST = 'api.coingecko.com'
+# Coingecko allows 100 calls per minute. We pace ourselves at that rate with a small burst
+COINGECKO_CALLS_PER_MINUTE = 100
+COINGECKO_CALLS_BURST = 20
+# Coins queried at once in the simple price endpoint, so that the url stays short enough
+COINGECKO_MAX_IDS_PER_PRICE_QUERY = 100
 
 
 class CoingeckoAssetData(NamedTuple):
@@ -274,9 +281,14 @@ COINGECKO_SIMPLE_VS_CURRENCIES = [
 class Coingecko():
 
     def __init__(self) -> None:
-        self.session = requests.session()
+        self.session = create_session()
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         self.all_coins_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        rate_limiter.configure(
+            key=COINGECKO_HOST,
+            rate=COINGECKO_CALLS_PER_MINUTE / 60,
+            capacity=COINGECKO_CALLS_BURST,
+        )
 
     @overload
     def _query(
@@ -309,13 +321,14 @@ class Coingecko():
         """
         if options is None:
             options = {}
-        url = f'https://api.coingecko.com/api/v3/{module}/'
+        url = f'https://{COINGECKO_HOST}/api/v3/{module}/'
         if subpath:
             url += subpath
 
         log.debug(f'Querying coingecko: {url}?{urlencode(options)}')
         tries = COINGECKO_QUERY_RETRY_TIMES
         while tries >= 0:
+            rate_limiter.acquire(key=COINGECKO_HOST)
             try:
                 response = self.session.get(
                     f'{url}?{urlencode(options)}',
@@ -334,7 +347,7 @@ class Coingecko():
                         f'Got rate limited by coingecko. '
                         f'Backing off for {backoff_seconds}',
                     )
-                    gevent.sleep(backoff_seconds)
+                    rate_limiter.penalize(key=COINGECKO_HOST, seconds=backoff_seconds)
                     tries -= 1
                     continue
 
@@ -480,6 +493,53 @@ class Coingecko():
             )
             return Price(ZERO)
 
+    def query_multiple_current_prices(
+            self,
+            from_assets: Iterable[Asset],
+            to_asset: Asset,
+    ) -> Dict[Asset, Price]:
+        """Returns the simple prices of many assets to to_asset in coingecko
+
+        Uses the simple/price endpoint of coingecko with many ids per query. Assets
+        not supported in coingecko or without a price are not in the result.
+
+        May raise:
+        - RemoteError if there is a problem querying coingecko
+        """
+        vs_currency = to_asset.identifier.lower()
+        if vs_currency not in COINGECKO_SIMPLE_VS_CURRENCIES:
+            log.warning(
+                f'Tried to query coingecko multiple simple prices to {to_asset.identifier}. '
+                f'But to_asset is not supported',
+            )
+            return {}
+
+        id_to_assets: Dict[str, List[Asset]] = {}
+        for from_asset in from_assets:
+            try:
+                from_coingecko_id = from_asset.to_coingecko()
+            except UnsupportedAsset:
+                continue
+            id_to_assets.setdefault(from_coingecko_id, []).append(from_asset)
+
+        prices = {}
+        for ids_chunk in get_chunks(list(id_to_assets), n=COINGECKO_MAX_IDS_PER_PRICE_QUERY):
+            result = self._query(
+                module='simple/price',
+                options={
+                    'ids': ','.join(ids_chunk),
+                    'vs_currencies': vs_currency,
+                })
+            for coingecko_id in ids_chunk:
+                try:
+                    price = Price(FVal(result[coingecko_id][vs_currency]))  # pylint: disable=unsubscriptable-object  # noqa: E501
+                except KeyError:
+                    continue  # not found in coingecko
+                for from_asset in id_to_assets[coingecko_id]:
+                    prices[from_asset] = price
+
+        return prices
+
     def can_query_history(  # pylint: disable=no-self-use
             self,
             from_asset: Asset,  # pylint: disable=unused-argument
@@ -13,6 +13,7 @@ from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.typing import ChecksumEthAddress, CovalentTransaction, ExternalService, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import create_timestamp, ts_now
+from rotkehlchen.utils.network import create_session
 
 COVALENT_QUERY_LIMIT = 1000
 CONST_RETRY = 1
@@ -76,7 +77,7 @@ class Covalent(ExternalServiceWithApiKey):
             chain_id: int,
     ) -> None:
         super().__init__(database=database, service_name=ExternalService.COVALENT)
-        self.session = requests.session()
+        self.session = create_session()
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         self.msg_aggregator = msg_aggregator
         self.chain_id = chain_id
@@ -5,7 +5,6 @@ from json.decoder import JSONDecodeError
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional
 
-import gevent
 import requests
 from typing_extensions import Literal
 
@@ -56,6 +55,8 @@ from rotkehlchen.history.typing import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.typing import ExternalService, Price, Timestamp
 from rotkehlchen.utils.misc import timestamp_to_date, ts_now
+from rotkehlchen.utils.network import create_session
+from rotkehlchen.utils.rate_limit import api_key_limiter_key, rate_limiter
 from rotkehlchen.utils.serialization import jsonloads_dict, rlk_jsondumps
 
 if TYPE_CHECKING:
@@ -68,6 +69,11 @@ log = RotkehlchenLogsAdapter(logger)
 RATE_LIMIT_MSG = 'You are over your rate limit please upgrade your account!'
 CRYPTOCOMPARE_QUERY_RETRY_TIMES = 3
 CRYPTOCOMPARE_RATE_LIMIT_WAIT_TIME = 60
+CRYPTOCOMPARE_HOST = 'min-api.cryptocompare.com'
+# Cryptocompare limits calls per API key, or per IP without one. We pace ourselves at
+# the per minute limit of the free tier with a small burst
+CRYPTOCOMPARE_CALLS_PER_MINUTE = 300
+CRYPTOCOMPARE_CALLS_BURST = 20
 CRYPTOCOMPARE_SPECIAL_CASES_MAPPING = {
     'ADADOWN': A_USDT,
     'ADAUP': A_USDT,
@@ -162,6 +168,8 @@ CRYPTOCOMPARE_SPECIAL_CASES_MAPPING = {
 }
 CRYPTOCOMPARE_SPECIAL_CASES = CRYPTOCOMPARE_SPECIAL_CASES_MAPPING.keys()
 CRYPTOCOMPARE_HOURQUERYLIMIT = 2000
+# Max length of the comma separated symbols given to the pricemulti endpoint
+CRYPTOCOMPARE_PRICEMULTI_MAX_FSYMS_LENGTH = 300
 
 
 class HistoHourAssetData(NamedTuple):
@@ -217,7 +225,7 @@ class Cryptocompare(ExternalServiceWithApiKey):
     def __init__(self, data_directory: Path, database: Optional['DBHandler']) -> None:
         super().__init__(database=database, service_name=ExternalService.CRYPTOCOMPARE)
         self.data_directory = data_directory
-        self.session = requests.session()
+        self.session = create_session()
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         self.last_histohour_query_ts = 0
         self.last_rate_limit = 0
@@ -268,21 +276,36 @@ class Cryptocompare(ExternalServiceWithApiKey):
         assert self.db is not None, msg
         self.db = None
 
+    @staticmethod
+    def _rate_limit_key(api_key: Optional[str]) -> str:
+        key = CRYPTOCOMPARE_HOST
+        if api_key:
+            key = api_key_limiter_key(CRYPTOCOMPARE_HOST, api_key)
+        if key not in rate_limiter.buckets:
+            rate_limiter.configure(
+                key=key,
+                rate=CRYPTOCOMPARE_CALLS_PER_MINUTE / 60,
+                capacity=CRYPTOCOMPARE_CALLS_BURST,
+            )
+        return key
+
     def _api_query(self, path: str) -> Dict[str, Any]:
         """Queries cryptocompare
 
         - May raise RemoteError if there is a problem reaching the cryptocompare server
         or with reading the response returned by the server
         """
-        querystr = f'https://min-api.cryptocompare.com/data/{path}'
+        querystr = f'https://{CRYPTOCOMPARE_HOST}/data/{path}'
         log.debug('Querying cryptocompare', url=querystr)
         api_key = self._get_api_key()
         if api_key:
             querystr += '?' if '?' not in querystr else '&'
             querystr += f'api_key={api_key}'
 
+        rate_limit_key = self._rate_limit_key(api_key)
         tries = CRYPTOCOMPARE_QUERY_RETRY_TIMES
         while tries >= 0:
+            rate_limiter.acquire(key=rate_limit_key)
             try:
                 response = self.session.get(querystr, timeout=DEFAULT_TIMEOUT_TUPLE)
             except requests.exceptions.RequestException as e:
@@ -307,7 +330,7 @@ class Cryptocompare(ExternalServiceWithApiKey):
                             f'Got rate limited by cryptocompare. '
                             f'Backing off for {backoff_seconds}',
                         )
-                        gevent.sleep(backoff_seconds)
+                        rate_limiter.penalize(key=rate_limit_key, seconds=backoff_seconds)
                         tries -= 1
                         continue
 
@@ -479,6 +502,73 @@ class Cryptocompare(ExternalServiceWithApiKey):
 
         return Price(FVal(result[cc_to_asset_symbol]))
 
+    def query_multiple_current_prices(
+            self,
+            from_assets: Iterable[Asset],
+            to_asset: Asset,
+    ) -> Dict[Asset, Price]:
+        """Returns the current prices of many assets compared to another asset
+
+        Uses the pricemulti endpoint with as many symbols per query as it accepts. Assets
+        not known to cryptocompare or without a price are not in the result.
+
+        - May raise RemoteError if there is a problem reaching the cryptocompare server
+        or with reading the response returned by the server
+        - May raise PriceQueryUnsupportedAsset if to_asset is not known to cryptocompare
+        """
+        try:
+            cc_to_asset_symbol = to_asset.to_cryptocompare()
+        except UnsupportedAsset as e:
+            raise PriceQueryUnsupportedAsset(e.asset_name) from e
+
+        prices = {}
+        symbol_to_assets: Dict[str, List[Asset]] = {}
+        for from_asset in from_assets:
+            if from_asset.identifier in CRYPTOCOMPARE_SPECIAL_CASES:
+                try:
+                    price = self.query_current_price(from_asset=from_asset, to_asset=to_asset)
+                except PriceQueryUnsupportedAsset:
+                    continue
+                except RemoteError as e:
+                    log.warning(
+                        f'Failed to query cryptocompare current price of special case asset '
+                        f'{from_asset.identifier} in {to_asset.identifier} due to {str(e)}',
+                    )
+                    continue
+                if price != ZERO:
+                    prices[from_asset] = price
+                continue
+
+            try:
+                cc_from_asset_symbol = from_asset.to_cryptocompare()
+            except UnsupportedAsset:
+                continue
+            symbol_to_assets.setdefault(cc_from_asset_symbol, []).append(from_asset)
+
+        symbol_chunks: List[List[str]] = []
+        chunk_length = CRYPTOCOMPARE_PRICEMULTI_MAX_FSYMS_LENGTH
+        for symbol in symbol_to_assets:
+            if chunk_length + len(symbol) + 1 > CRYPTOCOMPARE_PRICEMULTI_MAX_FSYMS_LENGTH:
+                symbol_chunks.append([])
+                chunk_length = -1  # no comma before the first symbol
+            symbol_chunks[-1].append(symbol)
+            chunk_length += len(symbol) + 1
+
+        for symbols_chunk in symbol_chunks:
+            query_path = f'pricemulti?fsyms={",".join(symbols_chunk)}&tsyms={cc_to_asset_symbol}'  # noqa: E501
+            result = self._api_query(path=query_path)
+            for symbol in symbols_chunk:
+                symbol_prices = result.get(symbol)
+                if not isinstance(symbol_prices, dict) or cc_to_asset_symbol not in symbol_prices:
+                    continue  # not known to cryptocompare
+                price = Price(FVal(symbol_prices[cc_to_asset_symbol]))
+                if price == ZERO:
+                    continue
+                for from_asset in symbol_to_assets[symbol]:
+                    prices[from_asset] = price
+
+        return prices
+
     def query_endpoint_pricehistorical(
             self,
             from_asset: Asset,
@@ -22,6 +22,7 @@ from rotkehlchen.serialization.deserialize import (
 from rotkehlchen.typing import ChecksumEthAddress, EthereumTransaction, ExternalService, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import hex_or_bytes_to_int
+from rotkehlchen.utils.network import create_session
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 ETHERSCAN_TX_QUERY_LIMIT = 10000
@@ -34,7 +35,7 @@ class Etherscan(ExternalServiceWithApiKey):
     def __init__(self, database: DBHandler, msg_aggregator: MessagesAggregator) -> None:
         super().__init__(database=database, service_name=ExternalService.ETHERSCAN)
         self.msg_aggregator = msg_aggregator
-        self.session = requests.session()
+        self.session = create_session()
         self.warning_given = False
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
 
@@ -316,14 +317,19 @@ class Etherscan(ExternalServiceWithApiKey):
             self,
             to_address: ChecksumEthAddress,
             input_data: str,
+            block_identifier: Optional[int] = None,
     ) -> str:
         """Performs an eth_call on the given address and the given input data.
+        If a block number is given the call is performed at that block instead of latest.
 
         May raise:
         - RemoteError if there are any problems with reaching Etherscan or if
         an unexpected response is returned
         """
-        options = {'to': to_address, 'data': input_data}
+        options: Dict[str, str] = {'to': to_address}
+        if block_identifier is not None:
+            options['tag'] = hex(block_identifier)
+        options['data'] = input_data
         result = self._query(
             module='proxy',
             action='eth_call',
@@ -2,11 +2,22 @@ import dataclasses
 import json
 import logging
 from json.decoder import JSONDecodeError
-from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Tuple, Union, overload
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
 
-import gevent
 import requests
 from eth_utils import to_checksum_address
+from gevent.pool import Pool
 from typing_extensions import Literal
 
 from rotkehlchen.assets.asset import EthereumToken
@@ -17,16 +28,28 @@ from rotkehlchen.constants.timing import DEFAULT_TIMEOUT_TUPLE
 from rotkehlchen.errors import DeserializationError, RemoteError, UnknownAsset
 from rotkehlchen.externalapis.interface import ExternalServiceWithApiKey
 from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.serialization.deserialize import deserialize_optional_to_optional_fval
-from rotkehlchen.typing import ChecksumEthAddress, ExternalService
+from rotkehlchen.typing import ChecksumEthAddress, ExternalService, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.network import create_session
+from rotkehlchen.utils.rate_limit import rate_limiter
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
 
 ASSETS_MAX_LIMIT = 50  # according to opensea docs
 CONTRACTS_MAX_LIMIT = 300  # according to opensea docs
+OPENSEA_HOST = 'api.opensea.io'
+# Requests per second we pace ourselves at and burst above that
+OPENSEA_REQUESTS_PER_SEC = 2
+OPENSEA_REQUESTS_BURST = 4
+# Requests to opensea in flight at once. The rate limit paces them further
+OPENSEA_MAX_CONCURRENT_REQUESTS = 4
+# Seconds for which a collection's floor price is taken from the global DB cache
+OPENSEA_FLOOR_PRICE_CACHE_TTL_SECS = 3600
 
 logger = logging.getLogger(__name__)
 
@@ -79,9 +102,14 @@ class Opensea(ExternalServiceWithApiKey):
     def __init__(self, database: 'DBHandler', msg_aggregator: MessagesAggregator) -> None:
         super().__init__(database=database, service_name=ExternalService.OPENSEA)
         self.msg_aggregator = msg_aggregator
-        self.session = requests.session()
+        self.session = create_session()
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         self.collections: Dict[str, Collection] = {}
+        rate_limiter.configure(
+            key=OPENSEA_HOST,
+            rate=OPENSEA_REQUESTS_PER_SEC,
+            capacity=OPENSEA_REQUESTS_BURST,
+        )
 
     @overload
     def _query(  # pylint: disable=no-self-use
@@ -109,13 +137,14 @@ class Opensea(ExternalServiceWithApiKey):
     ) -> Union[List[Dict[str, Any]], Dict[str, Any]]:
         """May raise RemoteError"""
         if endpoint == 'collectionstats':
-            query_str = f'https://api.opensea.io/api/v1/collection/{options["name"]}/stats'  # type: ignore  # noqa: E501
+            query_str = f'https://{OPENSEA_HOST}/api/v1/collection/{options["name"]}/stats'  # type: ignore  # noqa: E501
         else:
-            query_str = f'https://api.opensea.io/api/v1/{endpoint}'
+            query_str = f'https://{OPENSEA_HOST}/api/v1/{endpoint}'
 
         backoff = 1
         backoff_limit = 33
         while backoff < backoff_limit:
+            rate_limiter.acquire(key=OPENSEA_HOST)
             logger.debug(f'Querying opensea: {query_str}')
             try:
                 response = self.session.get(
@@ -132,7 +161,7 @@ class Opensea(ExternalServiceWithApiKey):
                 logger.debug(
                     f'Got 429 from opensea. Will backoff for {backoff} seconds',
                 )
-                gevent.sleep(backoff)
+                rate_limiter.penalize(key=OPENSEA_HOST, seconds=backoff)
                 backoff = backoff * 2
                 if backoff >= backoff_limit:
                     raise RemoteError(
@@ -235,8 +264,8 @@ class Opensea(ExternalServiceWithApiKey):
         except KeyError as e:
             raise DeserializationError(f'Could not find key {str(e)} when processing Opensea NFT data') from e  # noqa: E501
 
-    def gather_account_collections(self, account: ChecksumEthAddress) -> None:
-        """Gathers account collection information and keeps them in memory"""
+    def _query_account_collections(self, account: ChecksumEthAddress) -> List[Dict[str, Any]]:
+        """May raise RemoteError"""
         offset = 0
         options = {'offset': offset, 'limit': CONTRACTS_MAX_LIMIT, 'asset_owner': account}  # noqa: E501
 
@@ -251,34 +280,100 @@ class Opensea(ExternalServiceWithApiKey):
             offset += CONTRACTS_MAX_LIMIT
             options['offset'] = offset
 
-        for entry in raw_result:
-            if len(entry['primary_asset_contracts']) == 0:
-                continue  # skip if no contract (opensea makes everything a collection of 1)
-            name = entry['name']
-            if name in self.collections:
-                continue  # do not requery already queried collection
-
-            # To get the floor price we need to query a different endpoint since opensea are idiots
-            # https://github.com/rotki/rotki/issues/3676
-            stats_result = self._query(endpoint='collectionstats', options={'name': entry['slug']})
-            floor_price = deserialize_optional_to_optional_fval(
-                value=stats_result['stats']['floor_price'],  # pylint: disable=unsubscriptable-object  # noqa: E501
-                name='floor price',
-                location='opensea',
+        return raw_result
+
+    def _query_floor_price(self, slug: str) -> Tuple[str, Optional[FVal], bool]:
+        """Returns the slug, the floor price of the collection and whether it was queried.
+        A failed query is logged and gets no floor price"""
+        # To get the floor price we need to query a different endpoint since opensea are idiots
+        # https://github.com/rotki/rotki/issues/3676
+        try:
+            stats_result = self._query(endpoint='collectionstats', options={'name': slug})
+        except RemoteError as e:
+            logger.warning(f'Failed to query the floor price of collection {slug} due to {str(e)}')
+            return slug, None, False
+
+        floor_price = deserialize_optional_to_optional_fval(
+            value=stats_result['stats']['floor_price'],  # pylint: disable=unsubscriptable-object  # noqa: E501
+            name='floor price',
+            location='opensea',
+        )
+        return slug, floor_price, True
+
+    def _get_floor_prices(self, slugs: Iterable[str]) -> Dict[str, Optional[FVal]]:
+        """Gets the floor prices of the given collections by slug
+
+        Floor prices queried within the cache TTL are taken from the global DB. The rest are
+        queried concurrently, paced by the opensea rate limit, and cached. Collections whose
+        query fails get no floor price and are not cached.
+        """
+        now = ts_now()
+        cached_prices = GlobalDBHandler().get_nft_collection_floor_prices(
+            queried_after_ts=Timestamp(now - OPENSEA_FLOOR_PRICE_CACHE_TTL_SECS),
+        )
+        floor_prices = {}
+        to_query = []
+        for slug in slugs:
+            if slug in cached_prices:
+                floor_prices[slug] = cached_prices[slug]
+            else:
+                to_query.append(slug)
+
+        queried_prices = {}
+        pool = Pool(size=OPENSEA_MAX_CONCURRENT_REQUESTS)
+        for slug, floor_price, queried in pool.imap_unordered(self._query_floor_price, to_query):
+            if queried:
+                queried_prices[slug] = floor_price
+            else:
+                floor_prices[slug] = None
+
+        if len(queried_prices) != 0:
+            GlobalDBHandler().add_nft_collection_floor_prices(
+                floor_prices=queried_prices,
+                queried_ts=now,
             )
+        floor_prices.update(queried_prices)
+        return floor_prices
+
+    def gather_collections(self, accounts: List[ChecksumEthAddress]) -> None:
+        """Gathers collection information of the accounts and keeps them in memory
+
+        The collections of the accounts and the floor prices are queried concurrently.
+
+        May raise RemoteError
+        """
+        pool = Pool(size=OPENSEA_MAX_CONCURRENT_REQUESTS)
+        new_entries: Dict[str, Dict[str, Any]] = {}
+        for raw_result in pool.imap_unordered(self._query_account_collections, accounts):
+            for entry in raw_result:
+                if len(entry['primary_asset_contracts']) == 0:
+                    continue  # skip if no contract (opensea makes everything a collection of 1)
+                name = entry['name']
+                if name in self.collections:
+                    continue  # do not requery already queried collection
+                new_entries[name] = entry
+
+        floor_prices = self._get_floor_prices({x['slug'] for x in new_entries.values()})
+        for name, entry in new_entries.items():
             self.collections[name] = Collection(
                 name=name,
                 banner_image=entry['banner_image_url'],
                 description=entry['description'],
                 large_image=entry['large_image_url'],
-                floor_price=floor_price,
+                floor_price=floor_prices[entry['slug']],
             )
 
-    def get_account_nfts(self, account: ChecksumEthAddress) -> List[NFT]:
+    def gather_account_collections(self, account: ChecksumEthAddress) -> None:
+        """Gathers account collection information and keeps them in memory"""
+        self.gather_collections(accounts=[account])
+
+    def _query_account_assets(
+            self,
+            account: ChecksumEthAddress,
+    ) -> Tuple[ChecksumEthAddress, List[Dict[str, Any]]]:
         """May raise RemoteError"""
         offset = 0
         options = {'order_direction': 'desc', 'offset': offset, 'limit': ASSETS_MAX_LIMIT, 'owner': account}  # noqa: E501
-        eth_usd_price = Inquirer.find_usd_price(A_ETH)
 
         raw_result = []
         while True:
@@ -291,22 +386,57 @@ class Opensea(ExternalServiceWithApiKey):
             offset += ASSETS_MAX_LIMIT
             options['offset'] = offset
 
-        nfts = []
-        for entry in raw_result:
-            try:
-                nfts.append(self._deserialize_nft(
-                    entry=entry,
-                    owner_address=account,
-                    eth_usd_price=eth_usd_price,
-                ))
-            except (UnknownAsset, DeserializationError) as e:
-                self.msg_aggregator.add_warning(
-                    f'Skipping detected NFT for {account} due to {str(e)}. '
-                    f'Check out logs for more details',
-                )
-                logger.warning(
-                    f'Skipping detected NFT for {account} due to {str(e)}. '
-                    f'Problematic entry: {entry} ',
-                )
+        return account, raw_result
+
+    def get_accounts_nfts(
+            self,
+            accounts: List[ChecksumEthAddress],
+    ) -> Dict[ChecksumEthAddress, List[NFT]]:
+        """Gets the NFTs of each of the given accounts
+
+        The accounts are queried concurrently and the collections of all of them
+        are gathered at once, so that each collection's floor price is queried once.
+
+        May raise RemoteError
+        """
+        eth_usd_price = Inquirer.find_usd_price(A_ETH)
+        pool = Pool(size=OPENSEA_MAX_CONCURRENT_REQUESTS)
+        raw_results = dict(pool.imap_unordered(self._query_account_assets, accounts))
+
+        accounts_to_gather = [
+            account for account, raw_result in raw_results.items()
+            if any(
+                'collection' in x and x['collection']['name'] not in self.collections
+                for x in raw_result
+            )
+        ]
+        if len(accounts_to_gather) != 0:
+            self.gather_collections(accounts=accounts_to_gather)
+
+        result = {}
+        for account in accounts:
+            nfts = []
+            for entry in raw_results[account]:
+                try:
+                    nfts.append(self._deserialize_nft(
+                        entry=entry,
+                        owner_address=account,
+                        eth_usd_price=eth_usd_price,
+                    ))
+                except (UnknownAsset, DeserializationError) as e:
+                    self.msg_aggregator.add_warning(
+                        f'Skipping detected NFT for {account} due to {str(e)}. '
+                        f'Check out logs for more details',
+                    )
+                    logger.warning(
+                        f'Skipping detected NFT for {account} due to {str(e)}. '
+                        f'Problematic entry: {entry} ',
+                    )
 
-        return nfts
+            result[account] = nfts
+
+        return result
+
+    def get_account_nfts(self, account: ChecksumEthAddress) -> List[NFT]:
+        """May raise RemoteError"""
+        return self.get_accounts_nfts(accounts=[account])[account]
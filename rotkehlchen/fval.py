@@ -1,8 +1,11 @@
-from decimal import Decimal, InvalidOperation
+from decimal import Decimal, InvalidOperation, localcontext
 from typing import Any, Union
 
 from rotkehlchen.errors import ConversionError
 
+# Decimal digits kept when converting an FVal to a fixed point scaled integer
+FIXED_POINT_DECIMALS = 18
+
 # Here even though we got __future__ annotations using FVal does not seem to work
 AcceptableFValInitInput = Union[float, bytes, Decimal, int, str, 'FVal']
 AcceptableFValOtherInput = Union[int, 'FVal']
@@ -160,6 +163,25 @@ class FVal():
             raise ConversionError(f'Tried to ask for exact int from {self.num}')
         return int(self.num)
 
+    def to_fixed_point(self, decimals: int = FIXED_POINT_DECIMALS) -> int:
+        """Returns the value scaled by 10**decimals as an integer, rounded half to even"""
+        numerator, denominator = self.num.as_integer_ratio()
+        quotient, remainder = divmod(numerator * 10 ** decimals, denominator)
+        if 2 * remainder > denominator or (2 * remainder == denominator and quotient % 2 == 1):
+            quotient += 1
+        return quotient
+
+    @classmethod
+    def from_fixed_point(cls, value: int, decimals: int = FIXED_POINT_DECIMALS) -> 'FVal':
+        """Creates an FVal from an integer scaled by 10**decimals
+
+        The division drops the trailing zeros so that the FVal is the same as the
+        one calculated with Decimals. It's done with enough precision to be exact.
+        """
+        with localcontext() as context:
+            context.prec = max(context.prec, len(str(abs(value))))
+            return cls(Decimal(value) / Decimal(10 ** decimals))
+
     def is_close(self, other: AcceptableFValInitInput, max_diff: str = "1e-6") -> bool:
         evaluated_max_diff = FVal(max_diff)
 
@@ -1,8 +1,10 @@
 import logging
 import shutil
 import sqlite3
+from collections import defaultdict
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union, cast, overload
+from uuid import uuid4
 
 from typing_extensions import Literal
 
@@ -13,12 +15,18 @@ from rotkehlchen.constants.assets import CONSTANT_ASSETS
 from rotkehlchen.constants.misc import NFT_DIRECTIVE
 from rotkehlchen.constants.resolver import ethaddress_to_identifier
 from rotkehlchen.errors import DeserializationError, InputError, UnknownAsset
+from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.upgrades.v1_v2 import upgrade_ethereum_asset_ids
 from rotkehlchen.history.typing import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.logging import RotkehlchenLogsAdapter
-from rotkehlchen.typing import ChecksumEthAddress, Timestamp
+from rotkehlchen.typing import ChecksumEthAddress, Price, Timestamp
+from rotkehlchen.utils.metrics import TimedConnectionMixin, TimedCursorMixin
 
-from .schema import DB_SCRIPT_CREATE_TABLES
+from .schema import (
+    DB_CREATE_ASSETS_CHANGELOG,
+    DB_CREATE_ASSETS_SYMBOL_INDEX,
+    DB_SCRIPT_CREATE_TABLES,
+)
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
@@ -27,6 +35,18 @@ logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 GLOBAL_DB_VERSION = 2
+ASSETS_VERSION_KEY = 'assets_version'
+# Random id of the assets changelog. A new one means user DBs have to mirror everything again
+ASSETS_MIRROR_ID_KEY = 'assets_mirror_id'
+
+
+class GlobalDBCursor(TimedCursorMixin, sqlite3.Cursor):
+    db_name = 'global'
+
+
+class GlobalDBConnection(TimedConnectionMixin, sqlite3.Connection):
+    """Connection to the global DB that records the duration of its statements"""
+    cursor_class = GlobalDBCursor
 
 
 def _get_setting_value(cursor: sqlite3.Cursor, name: str, default_value: int) -> int:
@@ -42,7 +62,7 @@ def _get_setting_value(cursor: sqlite3.Cursor, name: str, default_value: int) ->
 
 
 def initialize_globaldb(dbpath: Path) -> sqlite3.Connection:
-    connection = sqlite3.connect(dbpath)
+    connection = sqlite3.connect(dbpath, factory=GlobalDBConnection)
     connection.executescript(DB_SCRIPT_CREATE_TABLES)
     cursor = connection.cursor()
     db_version = _get_setting_value(cursor, 'version', GLOBAL_DB_VERSION)
@@ -54,6 +74,12 @@ def initialize_globaldb(dbpath: Path) -> sqlite3.Connection:
 
     if db_version == 1:
         upgrade_ethereum_asset_ids(connection)
+    cursor.execute(DB_CREATE_ASSETS_SYMBOL_INDEX)
+    cursor.executescript(DB_CREATE_ASSETS_CHANGELOG)
+    cursor.execute(
+        'INSERT OR IGNORE INTO settings(name, value) VALUES(?, ?)',
+        (ASSETS_MIRROR_ID_KEY, uuid4().hex),
+    )
     cursor.execute(
         'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
         ('version', str(GLOBAL_DB_VERSION)),
@@ -79,6 +105,10 @@ class GlobalDBHandler():
     __instance: Optional['GlobalDBHandler'] = None
     _data_directory: Optional[Path] = None
     _conn: sqlite3.Connection
+    # (lowercase symbol, asset type) -> identifiers. Misses are cached as empty tuples
+    _symbol_cache: Dict[Tuple[str, Optional[AssetType]], Tuple[str, ...]]
+    # (assets version, all ethereum tokens) as read from the DB
+    _ethereum_tokens_cache: Optional[Tuple[int, List[EthereumToken]]]
 
     def __new__(
             cls,
@@ -97,6 +127,8 @@ class GlobalDBHandler():
         GlobalDBHandler.__instance = object.__new__(cls)
         GlobalDBHandler.__instance._data_directory = data_dir
         GlobalDBHandler.__instance._conn = _initialize_global_db_directory(data_dir)
+        GlobalDBHandler.__instance._symbol_cache = {}
+        GlobalDBHandler.__instance._ethereum_tokens_cache = None
         _reload_constant_assets(GlobalDBHandler.__instance)
         return GlobalDBHandler.__instance
 
@@ -112,6 +144,50 @@ class GlobalDBHandler():
         cursor = GlobalDBHandler()._conn.cursor()
         return _get_setting_value(cursor, name, default_value)
 
+    @staticmethod
+    def get_assets_mirror_id() -> str:
+        """Get the id of the assets changelog that user DBs mirror asset identifiers from"""
+        cursor = GlobalDBHandler()._conn.cursor()
+        result = cursor.execute(
+            'SELECT value FROM settings WHERE name=?;', (ASSETS_MIRROR_ID_KEY,),
+        ).fetchone()
+        return result[0]
+
+    @staticmethod
+    def get_asset_identifiers_changes(after_change_id: Optional[int]) -> Tuple[int, List[str]]:
+        """Get the last change id of the assets changelog and the asset identifiers
+        added or renamed after the given change id
+
+        If no change id is given all asset identifiers are returned.
+        """
+        cursor = GlobalDBHandler()._conn.cursor()
+        last_change_id = cursor.execute(
+            'SELECT COALESCE(MAX(change_id), 0) FROM assets_changelog;',
+        ).fetchone()[0]
+        if after_change_id is None:
+            query = cursor.execute('SELECT identifier FROM assets;')
+        else:
+            query = cursor.execute(
+                'SELECT identifier FROM assets_changelog WHERE change_id > ? AND '
+                'identifier IN (SELECT identifier FROM assets);',
+                (after_change_id,),
+            )
+        return last_change_id, [x[0] for x in query]
+
+    @staticmethod
+    def reset_assets_changelog(commit: bool = True) -> None:
+        """Empties the assets changelog and gives it a new id, so that user DBs
+        mirror all assets and owned assets again"""
+        connection = GlobalDBHandler()._conn
+        cursor = connection.cursor()
+        cursor.execute('DELETE FROM assets_changelog;')
+        cursor.execute(
+            'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
+            (ASSETS_MIRROR_ID_KEY, uuid4().hex),
+        )
+        if commit:
+            connection.commit()
+
     @staticmethod
     def add_setting_value(name: str, value: Any, commit: bool = True) -> None:
         """Add the value of a setting"""
@@ -192,6 +268,7 @@ class GlobalDBHandler():
             GlobalDBHandler().add_common_asset_details(asset_data)
 
         connection.commit()  # success
+        GlobalDBHandler().clear_symbol_cache()
 
     @overload
     @staticmethod
@@ -508,52 +585,43 @@ class GlobalDBHandler():
             return None
 
     @staticmethod
-    def get_ethereum_tokens(
-            exceptions: Optional[List[ChecksumEthAddress]] = None,
-            except_protocols: Optional[List[str]] = None,
-            protocol: Optional[str] = None,
-    ) -> List[EthereumToken]:
-        """Gets all ethereum tokens from the DB
+    def _get_all_underlying_tokens(cursor: sqlite3.Cursor) -> Dict[str, List[UnderlyingToken]]:
+        """Fetch all underlying tokens of the DB in one go, grouped by parent token address"""
+        underlying_tokens: Dict[str, List[UnderlyingToken]] = defaultdict(list)
+        query = cursor.execute(
+            'SELECT parent_token_entry, address, weight from underlying_tokens_list;',
+        )
+        for entry in query:
+            underlying_tokens[entry[0]].append(UnderlyingToken.deserialize_from_db(entry[1:]))
 
-        Can also accept filtering parameters.
-        - List of addresses to ignore via exceptions
-        - Protocol for which to return tokens
-        """
-        cursor = GlobalDBHandler()._conn.cursor()
-        querystr = (
+        return underlying_tokens
+
+    @staticmethod
+    def _get_all_ethereum_tokens() -> List[EthereumToken]:
+        """Gets all ethereum tokens from the DB, served from memory if already queried
+        for the current assets version"""
+        globaldb = GlobalDBHandler()
+        cursor = globaldb._conn.cursor()
+        assets_version = _get_setting_value(cursor, ASSETS_VERSION_KEY, 0)
+        if globaldb._ethereum_tokens_cache is not None:
+            cached_version, cached_tokens = globaldb._ethereum_tokens_cache
+            if cached_version == assets_version:
+                return cached_tokens
+
+        underlying_tokens = globaldb._get_all_underlying_tokens(cursor)
+        query = cursor.execute(
             'SELECT A.identifier, B.address, B.decimals, A.name, A.symbol, A.started, '
             'A.swapped_for, A.coingecko, A.cryptocompare, B.protocol '
             'FROM ethereum_tokens as B LEFT OUTER JOIN '
-            'assets AS A on B.address = A.details_reference '
+            'assets AS A on B.address = A.details_reference;',
         )
-        if exceptions is not None or protocol is not None or except_protocols is not None:
-            bindings_list: List[Union[str, ChecksumEthAddress]] = []
-            querystr_additions = []
-            if exceptions is not None:
-                questionmarks = '?' * len(exceptions)
-                querystr_additions.append(f'B.address NOT IN ({",".join(questionmarks)}) ')
-                bindings_list.extend(exceptions)
-            if protocol is not None:
-                querystr_additions.append('B.protocol=? ')
-                bindings_list.append(protocol)
-
-            if except_protocols is not None:
-                questionmarks = '?' * len(except_protocols)
-                querystr_additions.append(f'(B.protocol NOT IN ({",".join(questionmarks)}) OR B.protocol IS NULL) ')  # noqa: E501
-                bindings_list.extend(except_protocols)
-
-            querystr += 'WHERE ' + 'AND '.join(querystr_additions) + ';'
-            bindings = tuple(bindings_list)
-        else:
-            querystr += ';'
-            bindings = ()
-
-        query = cursor.execute(querystr, bindings)
         tokens = []
         for entry in query:
-            underlying_tokens = GlobalDBHandler().fetch_underlying_tokens(entry[1])
             try:
-                token = EthereumToken.deserialize_from_db(entry, underlying_tokens)  # noqa: E501
+                token = EthereumToken.deserialize_from_db(
+                    entry=entry,
+                    underlying_tokens=underlying_tokens.get(entry[1]),
+                )
                 tokens.append(token)
             except UnknownAsset as e:
                 log.error(
@@ -561,8 +629,36 @@ class GlobalDBHandler():
                     f'the DB when deserializing an EthereumToken',
                 )
 
+        globaldb._ethereum_tokens_cache = (assets_version, tokens)
         return tokens
 
+    @staticmethod
+    def get_ethereum_tokens(
+            exceptions: Optional[List[ChecksumEthAddress]] = None,
+            except_protocols: Optional[List[str]] = None,
+            protocol: Optional[str] = None,
+    ) -> List[EthereumToken]:
+        """Gets all ethereum tokens from the DB
+
+        Can also accept filtering parameters.
+        - List of addresses to ignore via exceptions
+        - Protocol for which to return tokens
+        """
+        tokens = GlobalDBHandler()._get_all_ethereum_tokens()
+        exceptions_set = set(exceptions) if exceptions is not None else set()
+        except_protocols_set = set(except_protocols) if except_protocols is not None else set()
+        return [
+            token for token in tokens
+            if token.ethereum_address not in exceptions_set and
+            (protocol is None or token.protocol == protocol) and
+            (token.protocol is None or token.protocol not in except_protocols_set)
+        ]
+
+    @staticmethod
+    def clear_ethereum_tokens_cache() -> None:
+        """Forget the in-memory ethereum tokens list. Must be called when tokens are modified"""
+        GlobalDBHandler()._ethereum_tokens_cache = None
+
     @staticmethod
     def add_ethereum_token_data(entry: EthereumToken) -> None:
         """Adds ethereum token specific information into the global DB
@@ -597,6 +693,8 @@ class GlobalDBHandler():
                 underlying_tokens=entry.underlying_tokens,
             )
 
+        GlobalDBHandler().clear_ethereum_tokens_cache()
+
     @staticmethod
     def edit_ethereum_token(
             entry: EthereumToken,
@@ -659,6 +757,8 @@ class GlobalDBHandler():
             )
 
         connection.commit()
+        GlobalDBHandler().clear_symbol_cache()
+        GlobalDBHandler().clear_ethereum_tokens_cache()
         return rotki_id
 
     @staticmethod
@@ -731,6 +831,8 @@ class GlobalDBHandler():
             )
 
         connection.commit()
+        GlobalDBHandler().clear_symbol_cache()
+        GlobalDBHandler().clear_ethereum_tokens_cache()
         return rotki_id
 
     @staticmethod
@@ -790,6 +892,7 @@ class GlobalDBHandler():
             ) from e
 
         connection.commit()
+        GlobalDBHandler().clear_symbol_cache()
 
     @staticmethod
     def add_common_asset_details(data: Dict[str, Any]) -> None:
@@ -857,13 +960,16 @@ class GlobalDBHandler():
             )
 
         connection.commit()
+        GlobalDBHandler().clear_symbol_cache()
 
     @staticmethod
-    def add_user_owned_assets(assets: List['Asset']) -> None:
+    def add_user_owned_assets(assets: List['Asset']) -> bool:
         """Make sure all assets in the list are included in the user owned assets
 
         These assets are there so that when someone tries to delete assets from the global DB
         they don't delete assets that are owned by any local user.
+
+        Returns False if the assets could not be added.
         """
         connection = GlobalDBHandler()._conn
         cursor = connection.cursor()
@@ -878,9 +984,17 @@ class GlobalDBHandler():
                 f'{",".join([x.identifier for x in assets])}',
             )  # should not ever happen but need to handle with informative log if it does
             connection.rollback()
-            return
+            return False
 
         connection.commit()
+        return True
+
+    @staticmethod
+    def get_user_owned_asset_ids() -> List[str]:
+        """Get the identifiers of all assets owned by any local user"""
+        cursor = GlobalDBHandler()._conn.cursor()
+        query = cursor.execute('SELECT asset_id from user_owned_assets;')
+        return [x[0] for x in query]
 
     @staticmethod
     def delete_asset_by_identifer(identifier: str, asset_type: AssetType) -> None:
@@ -955,6 +1069,37 @@ class GlobalDBHandler():
 
         return assets
 
+    @staticmethod
+    def get_asset_identifiers_with_symbol(
+            symbol: str,
+            asset_type: Optional[AssetType] = None,
+    ) -> Tuple[str, ...]:
+        """Find the identifiers of all assets that have the given symbol
+
+        Results are kept in memory, misses included, until the assets tables get modified
+        so that bulk imports resolving the same symbols over and over don't hit the DB.
+        """
+        globaldb = GlobalDBHandler()
+        cache_key = (symbol.lower(), asset_type)
+        identifiers = globaldb._symbol_cache.get(cache_key)
+        if identifiers is not None:
+            return identifiers
+
+        querystr = 'SELECT identifier FROM assets WHERE symbol=? COLLATE NOCASE'
+        bindings: Tuple[str, ...] = (symbol,)
+        if asset_type is not None:
+            querystr += ' AND type=?'
+            bindings = (symbol, asset_type.serialize_for_db())
+        cursor = globaldb._conn.cursor()
+        identifiers = tuple(entry[0] for entry in cursor.execute(querystr + ';', bindings))
+        globaldb._symbol_cache[cache_key] = identifiers
+        return identifiers
+
+    @staticmethod
+    def clear_symbol_cache() -> None:
+        """Forget all cached symbol lookups. Must be called whenever assets are modified"""
+        GlobalDBHandler()._symbol_cache.clear()
+
     @staticmethod
     def get_historical_price(
             from_asset: 'Asset',
@@ -1024,6 +1169,87 @@ class GlobalDBHandler():
 
         connection.commit()
 
+    @staticmethod
+    def get_current_prices(
+            after_ts: Timestamp,
+    ) -> List[Tuple[str, str, Price, str, Timestamp]]:
+        """Gets the saved current prices found after the given timestamp
+
+        Each entry is a tuple of from asset identifier, to asset identifier, price,
+        oracle and timestamp.
+        """
+        cursor = GlobalDBHandler()._conn.cursor()
+        query = cursor.execute(
+            'SELECT from_asset, to_asset, price, oracle, timestamp FROM current_prices '
+            'WHERE timestamp > ?;',
+            (after_ts,),
+        )
+        return [
+            (from_asset, to_asset, Price(FVal(price)), oracle, Timestamp(timestamp))
+            for from_asset, to_asset, price, oracle, timestamp in query
+        ]
+
+    @staticmethod
+    def add_current_prices(entries: List[Tuple['Asset', 'Asset', Price, str, Timestamp]]) -> None:
+        """Saves the given current prices, replacing any older one of the same pair
+
+        Each entry is a tuple of from asset, to asset, price, oracle and timestamp.
+        """
+        connection = GlobalDBHandler()._conn
+        cursor = connection.cursor()
+        try:
+            cursor.executemany(
+                'INSERT OR REPLACE INTO current_prices('
+                'from_asset, to_asset, price, oracle, timestamp'
+                ') VALUES (?, ?, ?, ?, ?)',
+                [(
+                    from_asset.identifier,
+                    to_asset.identifier,
+                    str(price),
+                    oracle,
+                    timestamp,
+                ) for from_asset, to_asset, price, oracle, timestamp in entries],
+            )
+        except sqlite3.IntegrityError as e:
+            connection.rollback()
+            log.error(f'Failed to save current prices due to {str(e)}')
+            return
+
+        connection.commit()
+
+    @staticmethod
+    def get_nft_collection_floor_prices(queried_after_ts: Timestamp) -> Dict[str, Optional[FVal]]:
+        """Get the cached floor prices of the NFT collections queried after the given ts
+
+        Returns a mapping of collection slug to floor price. None if it has no floor price.
+        """
+        cursor = GlobalDBHandler()._conn.cursor()
+        query = cursor.execute(
+            'SELECT slug, floor_price FROM nft_collection_floor_prices '
+            'WHERE last_queried_ts > ?;',
+            (queried_after_ts,),
+        )
+        return {slug: FVal(price) if price is not None else None for slug, price in query}
+
+    @staticmethod
+    def add_nft_collection_floor_prices(
+            floor_prices: Dict[str, Optional[FVal]],
+            queried_ts: Timestamp,
+    ) -> None:
+        """Caches the given floor prices of NFT collections, by collection slug"""
+        connection = GlobalDBHandler()._conn
+        cursor = connection.cursor()
+        cursor.executemany(
+            'INSERT OR REPLACE INTO nft_collection_floor_prices'
+            '(slug, floor_price, last_queried_ts) VALUES (?, ?, ?)',
+            [(
+                slug,
+                str(price) if price is not None else None,
+                queried_ts,
+            ) for slug, price in floor_prices.items()],
+        )
+        connection.commit()
+
     @staticmethod
     def add_single_historical_price(entry: HistoricalPrice) -> bool:
         """
@@ -1269,6 +1495,8 @@ class GlobalDBHandler():
             cursor.execute('INSERT INTO underlying_tokens_list SELECT * FROM clean_db.underlying_tokens_list;')  # noqa: E501
             cursor.execute('INSERT INTO common_asset_details SELECT * FROM clean_db.common_asset_details;')  # noqa: E501
             cursor.execute('PRAGMA foreign_keys = ON;')
+            # All user DBs need to mirror the assets and their owned assets again
+            GlobalDBHandler().reset_assets_changelog(commit=False)
 
             user_db_cursor.execute('PRAGMA foreign_keys = OFF;')
             user_db_cursor.execute('DELETE FROM assets;')
@@ -1288,6 +1516,8 @@ class GlobalDBHandler():
 
         connection.commit()
         cursor.execute(detach_database)
+        GlobalDBHandler().clear_symbol_cache()
+        GlobalDBHandler().clear_ethereum_tokens_cache()
 
         return True, ''
 
@@ -1345,6 +1575,8 @@ class GlobalDBHandler():
 
         connection.commit()
         cursor.execute(detach_database)
+        GlobalDBHandler().clear_symbol_cache()
+        GlobalDBHandler().clear_ethereum_tokens_cache()
         return True, ''
 
 
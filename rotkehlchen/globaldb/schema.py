@@ -107,6 +107,32 @@ CREATE TABLE IF NOT EXISTS assets (
 );
 """
 
+# Symbol lookups are case insensitive so the index needs to follow the same collation.
+# Not part of the create tables script since v1 assets tables have no symbol column.
+# It's created after any global DB upgrade has run.
+DB_CREATE_ASSETS_SYMBOL_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_assets_symbol ON assets(symbol COLLATE NOCASE);
+"""
+
+# Identifiers added to or renamed in the assets table, so that user DBs can mirror
+# only the changes. Each identifier keeps only its latest change so the table does
+# not grow beyond the number of assets. Not part of the create tables script so
+# that it's only created after any global DB upgrade has run.
+DB_CREATE_ASSETS_CHANGELOG = """
+CREATE TABLE IF NOT EXISTS assets_changelog (
+    change_id INTEGER NOT NULL PRIMARY KEY,
+    identifier TEXT NOT NULL UNIQUE
+);
+CREATE TRIGGER IF NOT EXISTS assets_changelog_insert AFTER INSERT ON assets
+BEGIN
+    INSERT OR REPLACE INTO assets_changelog(identifier) VALUES (NEW.identifier);
+END;
+CREATE TRIGGER IF NOT EXISTS assets_changelog_update AFTER UPDATE OF identifier ON assets
+BEGIN
+    INSERT OR REPLACE INTO assets_changelog(identifier) VALUES (NEW.identifier);
+END;
+"""
+
 DB_CREATE_SETTINGS = """
 CREATE TABLE IF NOT EXISTS settings (
     name VARCHAR[24] NOT NULL PRIMARY KEY,
@@ -150,10 +176,35 @@ CREATE TABLE IF NOT EXISTS price_history (
 );
 """
 
+# The last current price found for each pair, so that it can be used at startup before
+# querying it again. oracle is where the price came from.
+DB_CREATE_CURRENT_PRICES = """
+CREATE TABLE IF NOT EXISTS current_prices (
+    from_asset TEXT NOT NULL COLLATE NOCASE,
+    to_asset TEXT NOT NULL COLLATE NOCASE,
+    price TEXT NOT NULL,
+    oracle TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    FOREIGN KEY(from_asset) REFERENCES assets(identifier) ON UPDATE CASCADE ON DELETE CASCADE,
+    FOREIGN KEY(to_asset) REFERENCES assets(identifier) ON UPDATE CASCADE ON DELETE CASCADE,
+    PRIMARY KEY(from_asset, to_asset)
+);
+"""
+
+# Cache of the opensea floor prices of NFT collections, by collection slug.
+# A null floor_price means the collection has no floor price.
+DB_CREATE_NFT_COLLECTION_FLOOR_PRICES = """
+CREATE TABLE IF NOT EXISTS nft_collection_floor_prices (
+    slug TEXT NOT NULL PRIMARY KEY,
+    floor_price TEXT,
+    last_queried_ts INTEGER NOT NULL
+);
+"""
+
 DB_SCRIPT_CREATE_TABLES = """
 PRAGMA foreign_keys=off;
 BEGIN TRANSACTION;
-{}{}{}{}{}{}{}{}{}
+{}{}{}{}{}{}{}{}{}{}{}
 COMMIT;
 PRAGMA foreign_keys=on;
 """.format(
@@ -166,4 +217,6 @@ PRAGMA foreign_keys=on;
     DB_CREATE_USER_OWNED_ASSETS,
     DB_CREATE_PRICE_HISTORY_SOURCE_TYPES,
     DB_CREATE_PRICE_HISTORY,
+    DB_CREATE_CURRENT_PRICES,
+    DB_CREATE_NFT_COLLECTION_FLOOR_PRICES,
 )
@@ -3,29 +3,43 @@ import logging
 import re
 import sqlite3
 import sys
-from pathlib import Path
-from tempfile import TemporaryDirectory
-from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
 import requests
 from typing_extensions import Literal
 
-from rotkehlchen.assets.asset import Asset, EthereumToken
+from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.resolver import AssetResolver
 from rotkehlchen.assets.typing import AssetData, AssetType
 from rotkehlchen.constants.timing import DEFAULT_TIMEOUT_TUPLE
-from rotkehlchen.errors import DeserializationError, RemoteError, UnknownAsset
+from rotkehlchen.errors import DeserializationError, RemoteError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import deserialize_ethereum_address
 from rotkehlchen.typing import ChecksumEthAddress, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.misc import get_chunks
 
-from .handler import GlobalDBHandler, initialize_globaldb
+from .handler import ASSETS_VERSION_KEY, GlobalDBHandler
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
-ASSETS_VERSION_KEY = 'assets_version'
+# Number of identifiers bound in each query for the local entries of the updated assets
+ASSETS_QUERY_CHUNK_SIZE = 500
+
+
+class LocalAssetEntry(NamedTuple):
+    identifier: str
+    asset_type: AssetType
+    details_reference: Optional[str]
+
+
+class AssetUpdateEntry(NamedTuple):
+    """An entry of an assets update. The action is applied and if it fails the full
+    insert is used to add the asset if it's new or to resolve a conflict"""
+    action: str
+    full_insert: str
+    remote_data: AssetData
 
 
 def executeall(cursor: sqlite3.Cursor, statements: str) -> None:
@@ -40,55 +54,90 @@ def executeall(cursor: sqlite3.Cursor, statements: str) -> None:
         cursor.execute(statement)
 
 
-def _replace_assets_from_db(
-        connection: sqlite3.Connection,
-        sourcedb_path: Path,
+def _query_local_assets(
+        cursor: sqlite3.Cursor,
+        identifiers: Set[str],
+) -> Dict[str, LocalAssetEntry]:
+    """Returns the entries of the given identifiers that exist in the DB, by lowercase
+    identifier since identifiers are case insensitive"""
+    result = {}
+    for chunk in get_chunks(list(identifiers), n=ASSETS_QUERY_CHUNK_SIZE):
+        query = cursor.execute(
+            f'SELECT identifier, type, details_reference FROM assets WHERE identifier IN '
+            f'({",".join("?" * len(chunk))});',
+            chunk,
+        )
+        for identifier, raw_type, details_reference in query:
+            result[identifier.lower()] = LocalAssetEntry(
+                identifier=identifier,
+                asset_type=AssetType.deserialize_from_db(raw_type),
+                details_reference=details_reference,
+            )
+    return result
+
+
+def _force_remote(
+        cursor: sqlite3.Cursor,
+        local_entry: LocalAssetEntry,
+        remote_data: AssetData,
 ) -> None:
-    cursor = connection.cursor()
-    cursor.executescript(f"""
-    ATTACH DATABASE "{sourcedb_path}" AS other_db;
-    PRAGMA foreign_keys = OFF;
-    DELETE FROM assets;
-    DELETE FROM ethereum_tokens;
-    DELETE FROM underlying_tokens_list;
-    DELETE FROM common_asset_details;
-    INSERT INTO assets SELECT * FROM other_db.assets;
-    INSERT INTO ethereum_tokens SELECT * FROM other_db.ethereum_tokens;
-    INSERT INTO underlying_tokens_list SELECT * FROM other_db.underlying_tokens_list;
-    INSERT INTO common_asset_details SELECT * FROM other_db.common_asset_details;
-    INSERT OR REPLACE INTO settings(name, value) VALUES("{ASSETS_VERSION_KEY}",
-    (SELECT value FROM other_db.settings WHERE name="{ASSETS_VERSION_KEY}")
-    );
-    PRAGMA foreign_keys = ON;
-    DETACH DATABASE "other_db";
-    """)
-
-
-def _force_remote(cursor: sqlite3.Cursor, local_asset: Asset, full_insert: str) -> None:
-    """Force the remote entry into the database by deleting old one and doing the full insert.
+    """Overwrites the local entry of an asset with the remote data in place
+
+    The assets row is updated and not deleted so that the price history and the owned
+    status of the asset are kept.
 
     May raise an sqlite3 error if something fails.
     """
-    cursor.executescript('PRAGMA foreign_keys = OFF;')
-    if local_asset.asset_type == AssetType.ETHEREUM_TOKEN:
-        token = EthereumToken.from_asset(local_asset)
+    details_reference = local_entry.identifier
+    if remote_data.asset_type == AssetType.ETHEREUM_TOKEN:
+        if local_entry.asset_type == AssetType.ETHEREUM_TOKEN:
+            details_reference = local_entry.details_reference  # type: ignore  # tokens have it
+        else:
+            cursor.execute(
+                'DELETE FROM common_asset_details WHERE asset_id=?;',
+                (local_entry.identifier,),
+            )
+            details_reference = remote_data.ethereum_address  # type: ignore  # tokens have it
         cursor.execute(
-            'DELETE FROM ethereum_tokens WHERE address=?;',
-            (token.ethereum_address,),  # type: ignore  # token != None
+            'UPDATE ethereum_tokens SET decimals=?, protocol=? WHERE address=?;',
+            (remote_data.decimals, remote_data.protocol, details_reference),
         )
+        if cursor.rowcount == 0:
+            cursor.execute(
+                'INSERT INTO ethereum_tokens(address, decimals, protocol) VALUES(?, ?, ?);',
+                (details_reference, remote_data.decimals, remote_data.protocol),
+            )
     else:
+        if local_entry.asset_type == AssetType.ETHEREUM_TOKEN:
+            cursor.execute(
+                'DELETE FROM ethereum_tokens WHERE address=?;',
+                (local_entry.details_reference,),
+            )
         cursor.execute(
-            'DELETE FROM common_asset_details WHERE asset_id=?;',
-            (local_asset.identifier,),
+            'UPDATE common_asset_details SET forked=? WHERE asset_id=?;',
+            (remote_data.forked, local_entry.identifier),
         )
+        if cursor.rowcount == 0:
+            cursor.execute(
+                'INSERT INTO common_asset_details(asset_id, forked) VALUES(?, ?);',
+                (local_entry.identifier, remote_data.forked),
+            )
+
     cursor.execute(
-        'DELETE FROM assets WHERE identifier=?;',
-        (local_asset.identifier,),
+        'UPDATE assets SET type=?, name=?, symbol=?, started=?, swapped_for=?, coingecko=?, '
+        'cryptocompare=?, details_reference=? WHERE identifier=?;',
+        (
+            remote_data.asset_type.serialize_for_db(),
+            remote_data.name,
+            remote_data.symbol,
+            remote_data.started,
+            remote_data.swapped_for,
+            remote_data.coingecko,
+            remote_data.cryptocompare,
+            details_reference,
+            local_entry.identifier,
+        ),
     )
-    cursor.executescript('PRAGMA foreign_keys = ON;')
-    # Insert new entry. Since identifiers are the same, no foreign key constrains should break
-    executeall(cursor, full_insert)
-    AssetResolver().clean_memory_cache(local_asset.identifier.lower())
 
 
 class ParsedAssetData(NamedTuple):
@@ -280,13 +329,9 @@ class AssetsUpdater():
             protocol=protocol,
         )
 
-    def _apply_single_version_update(
-            self,
-            cursor: sqlite3.Cursor,
-            version: int,
-            text: str,
-            conflicts: Optional[Dict[Asset, Literal['remote', 'local']]],
-    ) -> None:
+    def _parse_update_entries(self, version: int, text: str) -> List[AssetUpdateEntry]:
+        """Parses the lines of an update into entries, skipping those that can't be parsed"""
+        entries = []
         lines = text.splitlines()
         for action, full_insert in zip(*[iter(lines)] * 2):
             if full_insert == '*':
@@ -301,61 +346,134 @@ class AssetsUpdater():
                 )
                 continue
 
-            local_asset: Optional[Asset] = None
-            try:
-                local_asset = Asset(remote_asset_data.identifier)
-            except UnknownAsset:
-                pass
+            entries.append(AssetUpdateEntry(
+                action=action,
+                full_insert=full_insert,
+                remote_data=remote_asset_data,
+            ))
 
-            try:
-                executeall(cursor, action)
-                if local_asset is not None:
-                    AssetResolver().clean_memory_cache(local_asset.identifier.lower())
-            except sqlite3.Error:  # https://docs.python.org/3/library/sqlite3.html#exceptions
-                if local_asset is None:
-                    try:  # if asset is not known then simply do an insertion
-                        executeall(cursor, full_insert)
-                    except sqlite3.Error as e:
-                        self.msg_aggregator.add_warning(
-                            f'Failed to add asset {remote_asset_data.identifier} in the '
-                            f'DB during the v{version} assets update. Skipping entry. '
-                            f'Error: {str(e)}',
-                        )
-                    continue  # fail or succeed continue to next entry
+        return entries
 
+    def _apply_entry(
+            self,
+            cursor: sqlite3.Cursor,
+            version: int,
+            entry: AssetUpdateEntry,
+            local_entries: Dict[str, LocalAssetEntry],
+            resolutions: Dict[str, Literal['remote', 'local']],
+    ) -> None:
+        """Applies a single entry of an update inside a savepoint so that an entry that
+        fails midway leaves nothing behind
+
+        Assets that are not in the local entries are new, so if their action fails the
+        full insert is tried instead. For the others a failing action is a conflict.
+        """
+        identifier = entry.remote_data.identifier
+        local_entry = local_entries.get(identifier.lower())
+        cursor.execute('SAVEPOINT assets_update_entry;')
+        try:
+            executeall(cursor, entry.action)
+        except sqlite3.Error:  # https://docs.python.org/3/library/sqlite3.html#exceptions
+            cursor.execute('ROLLBACK TO assets_update_entry;')
+            if local_entry is None:
+                try:  # if asset is not known then simply do an insertion
+                    executeall(cursor, entry.full_insert)
+                except sqlite3.Error as e:
+                    cursor.execute('ROLLBACK TO assets_update_entry;')
+                    self.msg_aggregator.add_warning(
+                        f'Failed to add asset {identifier} in the '
+                        f'DB during the v{version} assets update. Skipping entry. '
+                        f'Error: {str(e)}',
+                    )
+            else:
                 # otherwise asset is known, so it's a conflict. Check if we can resolve
-                resolution = conflicts.get(local_asset) if conflicts else None
-                if resolution == 'local':
-                    # do nothing, keep local
-                    continue
+                resolution = resolutions.get(identifier.lower())
                 if resolution == 'remote':
                     try:
-                        _force_remote(cursor, local_asset, full_insert)
+                        _force_remote(cursor, local_entry, entry.remote_data)
                     except sqlite3.Error as e:
+                        cursor.execute('ROLLBACK TO assets_update_entry;')
                         self.msg_aggregator.add_warning(
-                            f'Failed to resolve conflict for {remote_asset_data.identifier} in '
+                            f'Failed to resolve conflict for {identifier} in '
                             f'the DB during the v{version} assets update. Skipping entry. '
                             f'Error: {str(e)}',
                         )
-                    continue  # fail or succeed continue to next entry
+                elif resolution is None:  # can't resolve. Mark it for the user to resolve.
+                    local_data = AssetResolver().get_asset_data(local_entry.identifier, False)
+                    self.conflicts.append((local_data, entry.remote_data))
+                # else resolution is local so do nothing, keep local
+
+        cursor.execute('RELEASE assets_update_entry;')
+        if local_entry is None:
+            # the asset may exist from now on for the entries of the next versions
+            query = cursor.execute(
+                'SELECT identifier, type, details_reference FROM assets WHERE identifier=?;',
+                (identifier,),
+            )
+            result = query.fetchone()
+            if result is not None:
+                local_entries[identifier.lower()] = LocalAssetEntry(
+                    identifier=result[0],
+                    asset_type=AssetType.deserialize_from_db(result[1]),
+                    details_reference=result[2],
+                )
+
+    def _apply_updates(
+            self,
+            connection: sqlite3.Connection,
+            updates: List[Tuple[int, List[AssetUpdateEntry]]],
+            conflicts: Optional[Dict[Asset, Literal['remote', 'local']]],
+    ) -> Set[str]:
+        """Applies the parsed entries of the given versions to the DB in one transaction
+
+        The local entries of all the updated assets are queried at once so that conflict
+        candidates are found without resolving each asset. If there are unresolved
+        conflicts everything is rolled back. Returns the identifiers of the updated assets.
+        """
+        cursor = connection.cursor()
+        identifiers = {x.remote_data.identifier for _, entries in updates for x in entries}
+        local_entries = _query_local_assets(cursor, identifiers)
+        resolutions = {k.identifier.lower(): v for k, v in conflicts.items()} if conflicts else {}
+        log.debug(
+            f'Applying {len(updates)} assets updates with {len(identifiers)} assets of '
+            f'which {len(local_entries)} exist locally',
+        )
+
+        cursor.execute('SAVEPOINT assets_update;')
+        for version, entries in updates:
+            for entry in entries:
+                self._apply_entry(
+                    cursor=cursor,
+                    version=version,
+                    entry=entry,
+                    local_entries=local_entries,
+                    resolutions=resolutions,
+                )
 
-                # else can't resolve. Mark it for the user to resolve.
-                local_data = AssetResolver().get_asset_data(local_asset.identifier, False)
-                self.conflicts.append((local_data, remote_asset_data))
+            # special case upgrade that should be temporary, until we make non-asset specific
+            # update lines possible in our update mechanism:
+            # https://github.com/rotki/assets/pull/49
+            if version == 7:
+                cursor.execute(
+                    'UPDATE ethereum_tokens SET decimals=18 WHERE protocol=="balancer";',
+                )
 
-        # special case upgrade that should be temporary, until we make non-asset specific
-        # update lines possible in our update mechanism:
-        # https://github.com/rotki/assets/pull/49
-        if version == 7:
+            # at the very end update the current version in the DB
             cursor.execute(
-                'UPDATE ethereum_tokens SET decimals=18 WHERE protocol=="balancer";',
+                'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
+                (ASSETS_VERSION_KEY, str(version)),
             )
 
-        # at the very end update the current version in the DB
-        cursor.execute(
-            'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
-            (ASSETS_VERSION_KEY, str(version)),
-        )
+        if len(self.conflicts) != 0:
+            # In this case everything should be rolled back
+            cursor.execute('ROLLBACK TO assets_update;')
+            cursor.execute('RELEASE assets_update;')
+            connection.commit()
+            return set()
+
+        cursor.execute('RELEASE assets_update;')
+        connection.commit()
+        return identifiers
 
     def perform_update(
             self,
@@ -367,6 +485,9 @@ class AssetsUpdater():
         If `up_to_version` is given then changes up to and including that version are made.
         If not all possible changes are applied.
 
+        All versions are downloaded and parsed before anything is written. Then they are
+        applied directly on the global DB in a single transaction.
+
         For success returns None. If there is conflicts a list of conflicting
         assets identifiers is going to be returned.
 
@@ -379,47 +500,46 @@ class AssetsUpdater():
         self.conflicts = []  # reset the stored conflicts
         infojson = self._get_remote_info_json()
         local_schema_version = GlobalDBHandler().get_schema_version()
-        data_directory = GlobalDBHandler()._data_directory
-        assert data_directory is not None, 'data directory should be initialized at this point'
-        global_db_path = data_directory / 'global_data' / 'global.db'
-        with TemporaryDirectory() as tmpdirname:
-            tempdbpath = Path(tmpdirname) / 'temp.db'
-            connection = initialize_globaldb(tempdbpath)
-            _replace_assets_from_db(connection, global_db_path)
-            self._perform_update(
-                connection=connection,
-                conflicts=conflicts,
-                local_schema_version=local_schema_version,
-                infojson=infojson,
-                up_to_version=up_to_version,
-            )
-            if len(self.conflicts) != 0:
-                # close the temporary DB and return the conflicts
-                connection.close()
-                return [
-                    {'identifier': x[0].identifier, 'local': x[0].serialize(), 'remote': x[1].serialize()}  # noqa: E501
-                    for x in self.conflicts
-                ]
-
-            # otherwise we are sure the DB will work without conflicts so let's
-            # now move the data to the actual global DB
-            connection.close()
-            connection = GlobalDBHandler()._conn
-            _replace_assets_from_db(connection, tempdbpath)
-            return None
-
-    def _perform_update(
+        updates = self._fetch_updates(
+            local_schema_version=local_schema_version,
+            infojson=infojson,
+            up_to_version=up_to_version,
+        )
+        updated_identifiers = self._apply_updates(
+            connection=GlobalDBHandler()._conn,
+            updates=updates,
+            conflicts=conflicts,
+        )
+        if len(self.conflicts) != 0:
+            return [
+                {'identifier': x[0].identifier, 'local': x[0].serialize(), 'remote': x[1].serialize()}  # noqa: E501
+                for x in self.conflicts
+            ]
+
+        for identifier in updated_identifiers:
+            AssetResolver().clean_memory_cache(identifier)
+        GlobalDBHandler().clear_symbol_cache()
+        GlobalDBHandler().clear_ethereum_tokens_cache()
+        return None
+
+    def _fetch_updates(
             self,
-            connection: sqlite3.Connection,
-            conflicts: Optional[Dict[Asset, Literal['remote', 'local']]],
             local_schema_version: int,
             infojson: Dict[str, Any],
             up_to_version: Optional[int],
-    ) -> None:
+    ) -> List[Tuple[int, List[AssetUpdateEntry]]]:
+        """Downloads and parses the updates to apply, in order of version
+
+        Versions whose schema is older than the local one get no entries so that only the
+        assets version is moved past them.
+
+        May raise:
+            - RemoteError if there is a problem querying Github
+        """
+        updates: List[Tuple[int, List[AssetUpdateEntry]]] = []
         version = self.local_assets_version + 1
         target_version = min(up_to_version, self.last_remote_checked_version) if up_to_version else self.last_remote_checked_version   # type: ignore # noqa: E501
         # type ignore since due to check_for_updates we know last_remote_checked_version exists
-        cursor = connection.cursor()
         while version <= target_version:
             try:
                 min_schema_version = infojson['updates'][str(version)]['min_schema_version']
@@ -439,10 +559,7 @@ class AssetsUpdater():
                         f'You will have to follow an alternative method to '
                         f'obtain the assets of this update. Easiest would be to reset global DB.',
                     )
-                    cursor.execute(
-                        'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
-                        (ASSETS_VERSION_KEY, str(version)),
-                    )
+                    updates.append((version, []))
                     version += 1
                     continue
             except KeyError as e:
@@ -457,27 +574,15 @@ class AssetsUpdater():
                 url = f'https://raw.githubusercontent.com/rotki/assets/{self.branch}/updates/{version}/updates.sql'  # noqa: E501
                 response = requests.get(url=url, timeout=DEFAULT_TIMEOUT_TUPLE)
             except requests.exceptions.RequestException as e:
-                connection.rollback()
                 raise RemoteError(f'Failed to query Github for {url} during assets update: {str(e)}') from e  # noqa: E501
 
             if response.status_code != 200:
-                connection.rollback()
                 raise RemoteError(
                     f'Github query for {url} failed with status code '
                     f'{response.status_code} and text: {response.text}',
                 )
 
-            self._apply_single_version_update(
-                cursor=cursor,
-                version=version,
-                text=response.text,
-                conflicts=conflicts,
-            )
+            updates.append((version, self._parse_update_entries(version, response.text)))
             version += 1
 
-        if self.conflicts == []:
-            connection.commit()
-            return
-
-        # In this case we have conflicts. Everything should also be rolled back
-        connection.rollback()
+        return updates
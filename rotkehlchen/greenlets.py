@@ -6,6 +6,7 @@ import gevent
 
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.metrics import run_timed_task
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -41,9 +42,9 @@ class GreenletManager():
             **kwargs: Any,
     ) -> None:
         if after_seconds is None:
-            greenlet = gevent.spawn(method, **kwargs)
+            greenlet = gevent.spawn(run_timed_task, method, **kwargs)
         else:
-            greenlet = gevent.spawn_later(after_seconds, method, **kwargs)
+            greenlet = gevent.spawn_later(after_seconds, run_timed_task, method, **kwargs)
         self.add(task_name, greenlet, exception_is_error)
 
     def _handle_killed_greenlets(self, greenlet: gevent.Greenlet) -> None:
@@ -16,7 +16,6 @@ from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.exchanges.data_structures import AssetMovement, Loan, MarginPosition, Trade
 from rotkehlchen.exchanges.exchange import ExchangeInterface
 from rotkehlchen.exchanges.manager import ALL_SUPPORTED_EXCHANGES, ExchangeManager
-from rotkehlchen.exchanges.poloniex import process_polo_loans
 from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.typing import (
@@ -555,7 +554,9 @@ class EventsHistorian():
             ledger_actions.extend(result_ledger_actions)
 
             if exchange_specific_data:
-                # This can only be poloniex at the moment
+                # This can only be poloniex at the moment. Its module is only loaded
+                # when a poloniex exchange is set up so import it here
+                from rotkehlchen.exchanges.poloniex import process_polo_loans  # isort:skip  # noqa: E501  # pylint: disable=import-outside-toplevel
                 polo_loans_data = exchange_specific_data
                 loans.extend(process_polo_loans(
                     msg_aggregator=self.msg_aggregator,
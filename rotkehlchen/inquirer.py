@@ -3,7 +3,18 @@ from __future__ import unicode_literals  # isort:skip
 import logging
 import operator
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from rotkehlchen.assets.asset import Asset, EthereumToken
 from rotkehlchen.chain.ethereum.contracts import EthereumContract
@@ -89,12 +100,20 @@ if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.manager import EthereumManager
     from rotkehlchen.externalapis.coingecko import Coingecko
     from rotkehlchen.externalapis.cryptocompare import Cryptocompare
+    from rotkehlchen.greenlets import GreenletManager
 
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 CURRENT_PRICE_CACHE_SECS = 300  # 5 mins
+# Max age of a current price saved in the global DB for it to be used before querying it
+DEFAULT_CURRENT_PRICE_STALENESS = DAY_IN_SECONDS
+# How often the found current prices are written to the global DB
+CURRENT_PRICES_SAVE_SECS = 60
+# Saved as the oracle of current prices not coming from the current price oracles
+BLOCKCHAIN_PRICE_SOURCE = 'blockchain'
+BISQ_PRICE_SOURCE = 'bisq'
 BTC_PER_BSQ = FVal('0.00000100')
 
 ASSETS_UNDERLYING_BTC = (
@@ -225,9 +244,15 @@ class Inquirer():
     __instance: Optional['Inquirer'] = None
     _cached_forex_data: Dict
     _cached_current_price: Dict  # Can't use CacheableMixIn due to Singleton
+    # Prices saved in the global DB that have not been used yet since they were loaded
+    _saved_current_prices: Dict[Tuple[Asset, Asset], CachedPriceEntry]
+    # Found current prices not written to the global DB yet, with their oracle
+    _unsaved_current_prices: Dict[Tuple[Asset, Asset], Tuple[Price, str, Timestamp]]
+    _last_current_prices_save: Timestamp
     _data_directory: Path
     _cryptocompare: 'Cryptocompare'
     _coingecko: 'Coingecko'
+    _greenlet_manager: 'GreenletManager'
     _ethereum: Optional['EthereumManager'] = None
     _oracles: Optional[List[CurrentPriceOracle]] = None
     _oracle_instances: Optional[List[CurrentPriceOracleInstance]] = None
@@ -238,6 +263,7 @@ class Inquirer():
             data_dir: Path = None,
             cryptocompare: 'Cryptocompare' = None,
             coingecko: 'Coingecko' = None,
+            greenlet_manager: 'GreenletManager' = None,
     ) -> 'Inquirer':
         if Inquirer.__instance is not None:
             return Inquirer.__instance
@@ -245,13 +271,18 @@ class Inquirer():
         assert data_dir, 'arguments should be given at the first instantiation'
         assert cryptocompare, 'arguments should be given at the first instantiation'
         assert coingecko, 'arguments should be given at the first instantiation'
+        assert greenlet_manager, 'arguments should be given at the first instantiation'
 
         Inquirer.__instance = object.__new__(cls)
 
         Inquirer.__instance._data_directory = data_dir
         Inquirer._cryptocompare = cryptocompare
         Inquirer._coingecko = coingecko
+        Inquirer._greenlet_manager = greenlet_manager
         Inquirer._cached_current_price = {}
+        Inquirer._saved_current_prices = {}
+        Inquirer._unsaved_current_prices = {}
+        Inquirer._last_current_prices_save = ts_now()
         Inquirer.special_tokens = [
             A_YV1_DAIUSDCTBUSD,
             A_CRVP_DAIUSDCTBUSD,
@@ -298,6 +329,87 @@ class Inquirer():
 
         return cache
 
+    @staticmethod
+    def _set_cached_current_prices(
+            entries: List[Tuple[Tuple[Asset, Asset], Price, Optional[str]]],
+    ) -> None:
+        """Caches the found current prices. Each entry is the cache key, the price
+        and the oracle it came from. Non zero prices are also saved in the global DB,
+        in batches at most every CURRENT_PRICES_SAVE_SECS"""
+        now = ts_now()
+        for cache_key, price, oracle in entries:
+            Inquirer._cached_current_price[cache_key] = CachedPriceEntry(price=price, time=now)
+            if price != ZERO and oracle is not None:
+                Inquirer._unsaved_current_prices[cache_key] = (price, oracle, now)
+
+        if now - Inquirer._last_current_prices_save >= CURRENT_PRICES_SAVE_SECS:
+            Inquirer.save_current_prices()
+
+    @staticmethod
+    def save_current_prices() -> None:
+        """Writes the found current prices that are not saved yet to the global DB.
+        Also to be called when logging out or shutting down"""
+        instance = Inquirer()
+        instance._last_current_prices_save = ts_now()
+        if len(instance._unsaved_current_prices) == 0:
+            return
+
+        to_save = [
+            (cache_key[0], cache_key[1], price, oracle, timestamp)
+            for cache_key, (price, oracle, timestamp) in instance._unsaved_current_prices.items()
+        ]
+        instance._unsaved_current_prices = {}
+        GlobalDBHandler().add_current_prices(to_save)
+
+    @staticmethod
+    def load_saved_current_prices(staleness: int) -> None:
+        """Loads the current prices saved in the global DB that are at most staleness
+        seconds old. Each of them is used once instead of querying the price and is
+        then queried again in the background"""
+        saved_prices = {}
+        for from_id, to_id, price, _, timestamp in GlobalDBHandler().get_current_prices(
+                after_ts=Timestamp(ts_now() - staleness),
+        ):
+            try:
+                cache_key = (Asset(from_id), Asset(to_id))
+            except UnknownAsset:
+                continue
+            saved_prices[cache_key] = CachedPriceEntry(price=price, time=timestamp)
+
+        log.debug(f'Loaded {len(saved_prices)} saved current prices')
+        Inquirer()._saved_current_prices = saved_prices
+
+    @staticmethod
+    def _use_saved_current_price(cache_key: Tuple[Asset, Asset]) -> Optional[Price]:
+        """Returns the loaded saved price of the pair, if any, and caches it until the
+        price is queried again in the background. The caller should start that"""
+        entry = Inquirer()._saved_current_prices.pop(cache_key, None)
+        if entry is None:
+            return None
+
+        Inquirer._cached_current_price[cache_key] = CachedPriceEntry(
+            price=entry.price,
+            time=ts_now(),
+        )
+        return entry.price
+
+    @staticmethod
+    def _revalidate_in_background(method: Callable, *args: Any) -> None:
+        """Queries prices again in a tracked greenlet with the given find method,
+        ignoring caches"""
+        def revalidate() -> None:
+            try:
+                method(*args, ignore_cache=True)
+            except RemoteError as e:
+                log.error(f'Failed to query saved current prices again due to {str(e)}')
+
+        Inquirer()._greenlet_manager.spawn_and_track(
+            after_seconds=None,
+            task_name='Query saved current prices again',
+            exception_is_error=True,
+            method=revalidate,
+        )
+
     @staticmethod
     def set_oracles_order(oracles: List[CurrentPriceOracle]) -> None:
         assert len(oracles) != 0 and len(oracles) == len(set(oracles)), (
@@ -320,6 +432,7 @@ class Inquirer():
             'Inquirer should never be called before the setting the oracles'
         )
         price = Price(ZERO)
+        price_oracle = None
         for oracle, oracle_instance in zip(oracles, oracle_instances):
             if oracle_instance.rate_limited_in_last() is True:
                 continue
@@ -343,11 +456,66 @@ class Inquirer():
                     to_asset=to_asset,
                     price=price,
                 )
+                price_oracle = str(oracle)
                 break
 
-        Inquirer._cached_current_price[cache_key] = CachedPriceEntry(price=price, time=ts_now())
+        instance._set_cached_current_prices([(cache_key, price, price_oracle)])
         return price
 
+    @staticmethod
+    def _query_oracle_instances_multiple(
+            from_assets: List[Asset],
+            to_asset: Asset,
+    ) -> Dict[Asset, Price]:
+        """Queries the oracles in order for the prices of many assets, with one query
+        per oracle for all of them. Only the assets an oracle has no price for are
+        queried from the next one. Assets without a price in any oracle get Price(ZERO)
+        """
+        instance = Inquirer()
+        oracles = instance._oracles
+        oracle_instances = instance._oracle_instances
+        assert isinstance(oracles, list) and isinstance(oracle_instances, list), (
+            'Inquirer should never be called before the setting the oracles'
+        )
+        prices: Dict[Asset, Price] = {}
+        prices_oracle: Dict[Asset, str] = {}
+        remaining_assets = from_assets
+        for oracle, oracle_instance in zip(oracles, oracle_instances):
+            if len(remaining_assets) == 0:
+                break
+            if oracle_instance.rate_limited_in_last() is True:
+                continue
+
+            try:
+                oracle_prices = oracle_instance.query_multiple_current_prices(
+                    from_assets=remaining_assets,
+                    to_asset=to_asset,
+                )
+            except (PriceQueryUnsupportedAsset, RemoteError) as e:
+                log.error(
+                    f'Current price oracle {oracle} failed to request {to_asset.identifier} '
+                    f'prices for {len(remaining_assets)} assets due to: {str(e)}.',
+                )
+                continue
+
+            log.debug(
+                f'Current price oracle {oracle} got {len(oracle_prices)} prices '
+                f'of {len(remaining_assets)} queried',
+                to_asset=to_asset,
+            )
+            for from_asset, price in oracle_prices.items():
+                if price != ZERO:
+                    prices[from_asset] = price
+                    prices_oracle[from_asset] = str(oracle)
+            remaining_assets = [x for x in remaining_assets if x not in prices]
+
+        for from_asset in remaining_assets:
+            prices[from_asset] = Price(ZERO)
+        instance._set_cached_current_prices([
+            ((x, to_asset), prices[x], prices_oracle.get(x)) for x in from_assets
+        ])
+        return prices
+
     @staticmethod
     def find_price(
             from_asset: Asset,
@@ -371,6 +539,11 @@ class Inquirer():
             if cache is not None:
                 return cache.price
 
+            saved_price = instance._use_saved_current_price(cache_key=(from_asset, to_asset))
+            if saved_price is not None:
+                instance._revalidate_in_background(instance.find_price, from_asset, to_asset)
+                return saved_price
+
         oracle_price = instance._query_oracle_instances(from_asset=from_asset, to_asset=to_asset)
         return oracle_price
 
@@ -393,6 +566,11 @@ class Inquirer():
             if cache is not None:
                 return cache.price
 
+            saved_price = instance._use_saved_current_price(cache_key=cache_key)
+            if saved_price is not None:
+                instance._revalidate_in_background(instance.find_usd_price, asset)
+                return saved_price
+
         if asset.is_fiat():
             try:
                 return instance._query_fiat_pair(base=asset, quote=A_USD)
@@ -429,7 +607,7 @@ class Inquirer():
             else:
                 price = Price(usd_price)
 
-            Inquirer._cached_current_price[cache_key] = CachedPriceEntry(price=price, time=ts_now())  # noqa: E501
+            instance._set_cached_current_prices([(cache_key, price, BLOCKCHAIN_PRICE_SOURCE)])
             return price
 
         if is_known_protocol is True or underlying_tokens is not None:
@@ -443,10 +621,7 @@ class Inquirer():
                     )
             else:
                 usd_price = Price(result)
-            Inquirer._cached_current_price[cache_key] = CachedPriceEntry(
-                price=usd_price,
-                time=ts_now(),
-            )
+            instance._set_cached_current_prices([(cache_key, usd_price, BLOCKCHAIN_PRICE_SOURCE)])  # noqa: E501
             return usd_price
 
         # BSQ is a special asset that doesnt have oracle information but its custom API
@@ -455,10 +630,7 @@ class Inquirer():
                 price_in_btc = get_bisq_market_price(asset)
                 btc_price = Inquirer().find_usd_price(A_BTC)
                 usd_price = Price(price_in_btc * btc_price)
-                Inquirer._cached_current_price[cache_key] = CachedPriceEntry(
-                    price=usd_price,
-                    time=ts_now(),
-                )
+                instance._set_cached_current_prices([(cache_key, usd_price, BISQ_PRICE_SOURCE)])  # noqa: E501
                 return usd_price
             except (RemoteError, DeserializationError) as e:
                 msg = f'Could not find price for BSQ. {str(e)}'
@@ -467,6 +639,81 @@ class Inquirer():
                 return Price(BTC_PER_BSQ * price_in_btc)
         return instance._query_oracle_instances(from_asset=asset, to_asset=A_USD)
 
+    @staticmethod
+    def _is_priced_by_oracles(asset: Asset) -> bool:
+        """Whether the current USD price of the asset only comes from the oracles
+
+        Those are the assets that find_usd_price does not price in a special way
+        """
+        if asset == A_USD or asset.is_fiat() or asset == A_BSQ:
+            return False
+
+        if asset in Inquirer().special_tokens:
+            return False
+
+        try:
+            token = EthereumToken.from_asset(asset)
+        except UnknownAsset:
+            return True
+        if token is None:
+            return True
+        if token.protocol is not None and token.protocol in KnownProtocolsAssets:
+            return False
+        return GlobalDBHandler().get_ethereum_token(  # type: ignore
+            token.ethereum_address,
+        ).underlying_tokens is None
+
+    @staticmethod
+    def find_usd_prices(
+            assets: Iterable[Asset],
+            ignore_cache: bool = False,
+    ) -> Dict[Asset, Price]:
+        """Returns the current USD price of each of the given assets
+
+        Works like find_usd_price for each asset, but the assets that are priced only by
+        the oracles are queried from each oracle with a single query for all of them.
+
+        Assets for which all options have been exhausted or whose query failed
+        get Price(ZERO) and errors are logged in the logs
+        """
+        instance = Inquirer()
+        prices: Dict[Asset, Price] = {}
+        oracle_assets = []
+        saved_price_assets = []
+        for asset in set(assets):
+            if ignore_cache is False:
+                cache = instance.get_cached_current_price_entry(cache_key=(asset, A_USD))
+                if cache is not None:
+                    prices[asset] = cache.price
+                    continue
+
+                saved_price = instance._use_saved_current_price(cache_key=(asset, A_USD))
+                if saved_price is not None:
+                    prices[asset] = saved_price
+                    saved_price_assets.append(asset)
+                    continue
+
+            if instance._is_priced_by_oracles(asset):
+                oracle_assets.append(asset)
+                continue
+
+            try:
+                prices[asset] = instance.find_usd_price(asset=asset, ignore_cache=ignore_cache)
+            except RemoteError as e:
+                log.error(f'Failed to find current USD price of {asset} due to {str(e)}')
+                prices[asset] = Price(ZERO)
+
+        if len(oracle_assets) != 0:
+            prices.update(instance._query_oracle_instances_multiple(
+                from_assets=oracle_assets,
+                to_asset=A_USD,
+            ))
+
+        if len(saved_price_assets) != 0:
+            instance._revalidate_in_background(instance.find_usd_prices, saved_price_assets)
+
+        return prices
+
     def find_uniswap_v2_lp_price(
         self,
         token: EthereumToken,
@@ -2,14 +2,40 @@ import argparse
 import logging
 import re
 import sys
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, MutableMapping, Tuple
+from typing import Any, Deque, Dict, MutableMapping, Optional, Sequence, Tuple
 
 import gevent
 
 from rotkehlchen.utils.misc import timestamp_to_date, ts_now
 
 PYWSGI_RE = re.compile(r'\[(.*)\] ')
+# Records waiting to be written after which the logging greenlets write them themselves
+LOG_QUEUE_MAX_SIZE = 10000
+# Records written by the log writer before it lets other greenlets run
+LOG_WRITER_BATCH_SIZE = 100
+
+
+class LazyLogMessage():
+    """A log message that is only put together when the record is written
+
+    The kwargs given to the log call are kept as they are, so an object that is
+    mutated after the log call shows in the log as it was when written.
+    """
+
+    __slots__ = ('greenlet_name', 'msg', 'kwargs')
+
+    def __init__(self, greenlet_name: str, msg: Any, kwargs: Dict[str, Any]) -> None:
+        self.greenlet_name = greenlet_name
+        self.msg = msg
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        return (
+            self.greenlet_name + ': ' + str(self.msg) +
+            ','.join(' {}={}'.format(a[0], a[1]) for a in self.kwargs.items())
+        )
 
 
 class RotkehlchenLogsAdapter(logging.LoggerAdapter):
@@ -17,15 +43,21 @@ class RotkehlchenLogsAdapter(logging.LoggerAdapter):
     def __init__(self, logger: logging.Logger):
         super().__init__(logger, extra={})
 
-    def process(self, given_msg: Any, kwargs: MutableMapping[str, Any]) -> Tuple[str, Dict]:
+    def process(
+            self,
+            given_msg: Any,
+            kwargs: MutableMapping[str, Any],
+    ) -> Tuple[LazyLogMessage, Dict]:
         """
         This is the main post-processing function for rotki logs
 
         This function:
         - appends all kwargs to the final message
         - appends the greenlet id in the log message
+
+        It is only called for enabled levels and the message is only put together
+        when the record is written, outside of the logging greenlet.
         """
-        msg = str(given_msg)
         greenlet = gevent.getcurrent()
         if greenlet.parent is None:
             greenlet_name = 'Main Greenlet'
@@ -35,8 +67,68 @@ class RotkehlchenLogsAdapter(logging.LoggerAdapter):
             except AttributeError:  # means it's a raw greenlet
                 greenlet_name = f'Greenlet with id {id(greenlet)}'
 
-        msg = greenlet_name + ': ' + msg + ','.join(' {}={}'.format(a[0], a[1]) for a in kwargs.items())  # noqa: E501
-        return msg, {}
+        return LazyLogMessage(greenlet_name=greenlet_name, msg=given_msg, kwargs=dict(kwargs)), {}  # noqa: E501
+
+
+class QueuedLogHandler(logging.Handler):
+    """Queues log records to be written by a single writer greenlet with the given handlers
+
+    Logging greenlets only append the record to the queue, so they don't wait for the
+    message to be formatted and written. The writer is spawned when records are queued
+    and exits once the queue is empty. If the queue gets full the logging greenlet writes
+    the queued records itself so that memory stays bounded and no record is lost.
+    """
+
+    def __init__(
+            self,
+            handlers: Sequence[logging.Handler],
+            max_queue_size: int = LOG_QUEUE_MAX_SIZE,
+    ) -> None:
+        super().__init__()
+        self.target_handlers = list(handlers)
+        self.max_queue_size = max_queue_size
+        self.queue: Deque[logging.LogRecord] = deque()
+        self.writer: Optional[gevent.Greenlet] = None
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.queue.append(record)
+        if len(self.queue) >= self.max_queue_size:
+            self.write_queued()
+        elif self.writer is None:
+            self.writer = gevent.spawn(self._run_writer)
+
+    def _write_record(self, record: logging.LogRecord) -> None:
+        for handler in self.target_handlers:
+            if record.levelno >= handler.level:
+                handler.handle(record)
+
+    def write_queued(self, batch_size: Optional[int] = None) -> None:
+        """Writes the queued records, up to batch_size of them if given"""
+        written = 0
+        while len(self.queue) != 0 and (batch_size is None or written < batch_size):
+            record = self.queue.popleft()
+            try:
+                self._write_record(record)
+            except Exception:  # pylint: disable=broad-except
+                self.handleError(record)
+            written += 1
+
+    def _run_writer(self) -> None:
+        try:
+            while len(self.queue) != 0:
+                self.write_queued(batch_size=LOG_WRITER_BATCH_SIZE)
+                gevent.sleep(0)
+        finally:
+            self.writer = None
+
+    def flush(self) -> None:
+        self.write_queued()
+        for handler in self.target_handlers:
+            handler.flush()
+
+    def close(self) -> None:
+        self.flush()
+        super().close()
 
 
 class PywsgiFilter(logging.Filter):
@@ -132,6 +224,17 @@ def configure_logging(args: argparse.Namespace) -> None:
         'handlers': handlers,
         'loggers': loggers,
     })
+    # The format uses none of the caller, thread or process info so don't collect them
+    logging._srcfile = None  # pylint: disable=protected-access
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+    # Route all records through a single queue so that logging does not wait for writes
+    root_logger = logging.getLogger()
+    queued_handler = QueuedLogHandler(handlers=root_logger.handlers)
+    for name in loggers:
+        logger = logging.getLogger(name)
+        logger.handlers = [queued_handler]
 
     if not args.logfromothermodules:
         logging.getLogger('urllib3').setLevel(logging.CRITICAL)
@@ -22,6 +22,7 @@ from rotkehlchen.errors import (
 )
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.typing import B64EncodedBytes, Timestamp
+from rotkehlchen.utils.network import create_session
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 logger = logging.getLogger(__name__)
@@ -131,7 +132,7 @@ class Premium():
 
     def __init__(self, credentials: PremiumCredentials):
         self.status = SubscriptionStatus.UNKNOWN
-        self.session = requests.session()
+        self.session = create_session()
         self.apiversion = '1'
         self.uri = 'https://rotki.com/api/{}/'.format(self.apiversion)
         self.reset_credentials(credentials)
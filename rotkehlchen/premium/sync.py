@@ -56,8 +56,6 @@ class PremiumSyncManager():
         if self.premium is None:
             return SyncCheckResult(can_sync=CanSync.NO, message='', payload=None)
 
-        b64_encoded_data, our_hash = self.data.compress_and_encrypt_db(self.password)
-
         try:
             metadata = self.premium.query_last_data_metadata()
         except RemoteError as e:
@@ -71,6 +69,7 @@ class PremiumSyncManager():
             # If it's not a new account and the db setting for premium syncing is off stop
             return SyncCheckResult(can_sync=CanSync.NO, message='', payload=None)
 
+        our_hash = self.data.get_db_hash()
         log.debug(
             'CAN_PULL',
             ours=our_hash,
@@ -82,14 +81,16 @@ class PremiumSyncManager():
             return SyncCheckResult(can_sync=CanSync.NO, message='', payload=None)
 
         our_last_write_ts = self.data.db.get_last_write_ts()
-        data_bytes_size = len(base64.b64decode(b64_encoded_data))
-
         local_more_recent = our_last_write_ts >= metadata.last_modify_ts
 
         if local_more_recent:
             log.debug('sync from server stopped -- local is newer')
             return SyncCheckResult(can_sync=CanSync.NO, message='', payload=None)
 
+        # only now that we need the size build the payload
+        b64_encoded_data, _ = self.data.compress_and_encrypt_db(self.password)
+        data_bytes_size = len(base64.b64decode(b64_encoded_data))
+
         # else remote is bigger
         return SyncCheckResult(
             can_sync=CanSync.ASK_USER,
@@ -154,8 +155,8 @@ class PremiumSyncManager():
         except RemoteError as e:
             log.debug('upload to server -- fetching metadata error', error=str(e))
             return False
-        b64_encoded_data, our_hash = self.data.compress_and_encrypt_db(self.password)
 
+        our_hash = self.data.get_db_hash()
         log.debug(
             'CAN_PUSH',
             ours=our_hash,
@@ -175,6 +176,7 @@ class PremiumSyncManager():
             )
             return False
 
+        b64_encoded_data, our_hash = self.data.compress_and_encrypt_db(self.password)
         data_bytes_size = len(base64.b64decode(b64_encoded_data))
         if data_bytes_size < metadata.data_size and not force_upload:
             # Let's be conservative.
@@ -16,6 +16,7 @@ from rotkehlchen.accounting.structures import Balance, BalanceType
 from rotkehlchen.api.websockets.notifier import RotkiNotifier
 from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.assets.asset import Asset
+from rotkehlchen.assets.resolver import AssetResolver
 from rotkehlchen.balances.manual import (
     account_for_manually_tracked_asset_balances,
     get_manually_tracked_balances,
@@ -79,7 +80,7 @@ from rotkehlchen.utils.misc import combine_dicts
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.bitcoin.xpub import XpubData
-    from rotkehlchen.exchanges.kraken import KrakenAccountType
+    from rotkehlchen.exchanges.data_structures import KrakenAccountType
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -138,6 +139,7 @@ class Rotkehlchen():
             data_dir=self.data_dir,
             cryptocompare=self.cryptocompare,
             coingecko=self.coingecko,
+            greenlet_manager=self.greenlet_manager,
         )
         self.task_manager: Optional[TaskManager] = None
         self.shutdown_event = gevent.event.Event()
@@ -250,6 +252,7 @@ class Rotkehlchen():
             msg_aggregator=self.msg_aggregator,
             greenlet_manager=self.greenlet_manager,
             connect_at_start=ETHEREUM_NODES_TO_CONNECT_AT_START,
+            hedge_requests=settings.eth_rpc_hedge_requests,
         )
         kusama_manager = SubstrateManager(
             chain=SubstrateChain.KUSAMA,
@@ -280,6 +283,7 @@ class Rotkehlchen():
 
         Inquirer().inject_ethereum(ethereum_manager)
         Inquirer().set_oracles_order(settings.current_price_oracles)
+        Inquirer().load_saved_current_prices(staleness=settings.current_price_staleness)
 
         self.chain_manager = ChainManager(
             blockchain_accounts=self.data.db.get_blockchain_accounts(),
@@ -313,6 +317,12 @@ class Rotkehlchen():
             chain_manager=self.chain_manager,
             exchange_manager=self.exchange_manager,
         )
+        self.greenlet_manager.spawn_and_track(
+            after_seconds=None,
+            task_name='warmup_assets_cache',
+            exception_is_error=False,
+            method=AssetResolver().warmup_cache,
+        )
         self.greenlet_manager.spawn_and_track(
             after_seconds=5,
             task_name='periodically_query_icons_until_all_cached',
@@ -342,6 +352,7 @@ class Rotkehlchen():
         del self.events_historian
         del self.data_importer
 
+        Inquirer().save_current_prices()
         self.data.logout()
         self.password = ''
         self.cryptocompare.unset_database()
@@ -791,12 +802,18 @@ class Rotkehlchen():
             if not result:
                 return False, msg
 
+        if settings.eth_rpc_hedge_requests is not None:
+            self.chain_manager.ethereum.hedge_requests = settings.eth_rpc_hedge_requests
+
         if settings.btc_derivation_gap_limit is not None:
             self.chain_manager.btc_derivation_gap_limit = settings.btc_derivation_gap_limit
 
         if settings.current_price_oracles is not None:
             Inquirer().set_oracles_order(settings.current_price_oracles)
 
+        if settings.current_price_staleness is not None:
+            Inquirer().load_saved_current_prices(staleness=settings.current_price_staleness)
+
         if settings.historical_price_oracles is not None:
             PriceHistorian().set_oracles_order(settings.historical_price_oracles)
         if settings.active_modules is not None:
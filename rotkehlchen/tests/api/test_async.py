@@ -152,3 +152,44 @@ def test_query_async_task_that_died(rotkehlchen_api_server_with_exchanges):
     assert json_data['result']['outcome']['result'] is None
     msg = 'The backend query task died unexpectedly: BOOM!'
     assert json_data['result']['outcome']['message'] == msg
+
+
+@pytest.mark.parametrize('added_exchanges', [(Location.BINANCE,)])
+def test_cancel_async_task(rotkehlchen_api_server_with_exchanges):
+    """Test that a pending async task can be cancelled"""
+    server = rotkehlchen_api_server_with_exchanges
+    rotki = server.rest_api.rotkehlchen
+    binance = try_get_first_exchange(rotki.exchange_manager, Location.BINANCE)
+
+    def mock_binance_slow_return(url, timeout):  # pylint: disable=unused-argument
+        gevent.sleep(30)
+        raise AssertionError('Should have been cancelled')
+
+    binance_patch = patch.object(binance.session, 'get', side_effect=mock_binance_slow_return)
+    with binance_patch:
+        response = requests.get(api_url_for(
+            server,
+            'named_exchanges_balances_resource',
+            location='binance',
+        ), json={'async_query': True})
+        task_id = assert_ok_async_response(response)
+        assert len(rotki.api_task_greenlets) == 1
+
+        response = requests.delete(
+            api_url_for(server, 'specific_async_tasks_resource', task_id=task_id),
+        )
+        assert_proper_response(response)
+        assert response.json() == {'result': True, 'message': ''}
+
+    assert rotki.api_task_greenlets == []
+    response = requests.get(api_url_for(server, 'asynctasksresource'))
+    assert_proper_response(response)
+    assert response.json()['result'] == {'completed': [], 'pending': []}
+    response = requests.delete(
+        api_url_for(server, 'specific_async_tasks_resource', task_id=task_id),
+    )
+    assert_error_response(
+        response=response,
+        contained_in_msg=f'No task with id {task_id} found',
+        status_code=HTTPStatus.NOT_FOUND,
+    )
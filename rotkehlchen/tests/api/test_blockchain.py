@@ -9,6 +9,7 @@ import pytest
 import requests
 from eth_utils import to_checksum_address
 
+from rotkehlchen.chain.ethereum.typing import NodeName
 from rotkehlchen.chain.substrate.typing import KusamaAddress
 from rotkehlchen.constants.assets import A_DAI
 from rotkehlchen.constants.misc import ZERO
@@ -2273,3 +2274,22 @@ def test_remove_avax_blockchain_account(rotkehlchen_api_server):
     # Also make sure it's removed from the DB
     db_accounts = rotki.data.db.get_blockchain_accounts()
     assert db_accounts.avax[0] == AVALANCHE_ACC1_AVAX_ADDR
+
+
+def test_query_ethereum_nodes_stats(rotkehlchen_api_server):
+    """Test that the stats of the queried ethereum nodes are returned"""
+    rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+    rotki.chain_manager.ethereum.nodes_stats[NodeName.ETHERSCAN].record_success(0.5)
+    response = requests.get(
+        api_url_for(rotkehlchen_api_server, 'ethereumnodesstatsresource'),
+    )
+    result = assert_proper_response_with_result(response)
+    assert result['etherscan'] == {
+        'requests': 1,
+        'failures': 0,
+        'error_rate': 0.0,
+        'latency': 0.5,
+        'p90_latency': 0.5,
+        'circuit_open': False,
+        'connected': True,
+    }
@@ -86,7 +86,7 @@ def test_query_history(rotkehlchen_api_server_with_exchanges):
 
     # Simply check that the results got returned here. The actual correctness of
     # accounting results is checked in other tests such as test_simple_accounting
-    assert len(outcome) == 5
+    assert len(outcome) == 4
     assert outcome['events_limit'] == FREE_PNL_EVENTS_LIMIT
     assert outcome['events_processed'] == 27
     assert outcome['first_processed_timestamp'] == 1428994442
@@ -103,12 +103,27 @@ def test_query_history(rotkehlchen_api_server_with_exchanges):
     assert overview["total_profit_loss"] is not None
     assert overview["defi_profit_loss"] is not None
     assert overview["ledger_actions_profit_loss"] is not None
-    all_events = outcome['all_events']
-    assert isinstance(all_events, list)
     # TODO: These events are not actually checked anywhere for correctness
     #       A test should probably be made for their correctness, even though
     #       they are assumed correct if the overview is correct
-    assert len(all_events) == 37
+    response = requests.get(
+        api_url_for(rotkehlchen_api_server_with_exchanges, 'historyeventsresource'),
+    )
+    result = assert_proper_response_with_result(response)
+    assert len(result['entries']) == 37
+    assert result['entries_found'] == 37
+    assert result['entries_total'] == 37
+
+    # also check that the events can be filtered and paginated
+    response = requests.get(
+        api_url_for(rotkehlchen_api_server_with_exchanges, 'historyeventsresource'),
+        json={'limit': 5, 'offset': 0, 'event_types': ['buy', 'sell']},
+    )
+    result = assert_proper_response_with_result(response)
+    assert result['entries_total'] == 37
+    assert 5 < result['entries_found'] < 37
+    assert len(result['entries']) == 5
+    assert all(x['type'] in ('buy', 'sell') for x in result['entries'])
 
     # And now make sure that warnings have also been generated for the query of
     # the unsupported/unknown assets
@@ -218,7 +233,7 @@ def test_query_history_timerange(rotkehlchen_api_server_with_exchanges):
     assert_proper_response(response)
     data = response.json()
     assert data['message'] == ''
-    assert len(data['result']) == 5
+    assert len(data['result']) == 4
     assert data['result']['events_limit'] == FREE_PNL_EVENTS_LIMIT
     assert data['result']['events_processed'] == 25
     assert data['result']['first_processed_timestamp'] == 1428994442
@@ -235,9 +250,11 @@ def test_query_history_timerange(rotkehlchen_api_server_with_exchanges):
     assert overview['total_profit_loss'] is not None
     assert overview['defi_profit_loss'] is not None
     assert overview['ledger_actions_profit_loss'] is not None
-    all_events = data['result']['all_events']
-    assert isinstance(all_events, list)
-    assert len(all_events) == 4
+    response = requests.get(
+        api_url_for(rotkehlchen_api_server_with_exchanges, 'historyeventsresource'),
+    )
+    result = assert_proper_response_with_result(response)
+    assert len(result['entries']) == 4
 
     response = requests.get(
         api_url_for(rotkehlchen_api_server_with_exchanges, 'historystatusresource'),
@@ -348,7 +365,8 @@ def test_query_history_external_exchanges(rotkehlchen_api_server):
         json={'from_timestamp': start_ts, 'to_timestamp': end_ts},
     )
     outcome = assert_proper_response_with_result(response)
-    assert len(outcome['all_events']) == 2
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'historyeventsresource'))
+    assert len(assert_proper_response_with_result(response)['entries']) == 2
     assert FVal(outcome['overview']['total_taxable_profit_loss']) == FVal('5278.03086')
 
 
@@ -619,6 +637,10 @@ def test_history_export_download_csv(
         with zipfile.ZipFile(tempzipfile, 'r') as zip_ref:
             zip_ref.extractall(extractdir)
         assert_csv_export_response(response, profit_currency, extractdir, is_download=True)
+        # the streamed download has the same CSVs as the export
+        assert sorted(os.listdir(extractdir)) == sorted(os.listdir(csv_dir))
+        for name in os.listdir(csv_dir):
+            assert Path(extractdir, name).read_bytes() == Path(csv_dir, name).read_bytes()
 
 
 @pytest.mark.parametrize(
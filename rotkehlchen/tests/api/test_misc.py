@@ -62,6 +62,24 @@ def test_query_ping(rotkehlchen_api_server):
     assert response_json['message'] == expected_message
 
 
+def test_query_metrics(rotkehlchen_api_server):
+    """Test that the metrics endpoint returns the collected metrics in the prometheus format"""
+    response = requests.get(api_url_for(rotkehlchen_api_server, "pingresource"))
+    assert_proper_response(response)
+
+    response = requests.get(api_url_for(rotkehlchen_api_server, "metricsresource"))
+    assert response.status_code == 200
+    assert response.headers['Content-Type'].startswith('text/plain')
+    lines = response.text.splitlines()
+    ping_count = 'rotki_api_request_duration_seconds_count{endpoint="/api/1/ping",method="GET",status="200"}'  # noqa: E501
+    assert any(x.startswith(ping_count) for x in lines)
+    assert '# TYPE rotki_db_query_duration_seconds histogram' in lines
+    assert any(x.startswith('rotki_db_query_duration_seconds_count{db="user",') for x in lines)
+    assert any(x.startswith('rotki_async_tasks{status="pending"}') for x in lines)
+    assert any(x.startswith('rotki_tracked_greenlets ') for x in lines)
+    assert '# TYPE rotki_ethereum_node_requests_total counter' in lines
+
+
 def test_query_version_when_update_required(rotkehlchen_api_server):
     """Test that endpoint to query version works when a new version is available"""
     rotki = rotkehlchen_api_server.rest_api.rotkehlchen
@@ -196,6 +196,33 @@ def test_unset_rpc_endpoint(rotkehlchen_api_server, rpc_setting):
     assert result[rpc_setting] == ''
 
 
+def test_eth_rpc_hedge_requests(rotkehlchen_api_server, username, db_password):
+    """Test that the ethereum manager hedges requests as set, also after logging in again"""
+    rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+    assert rotki.data.db.get_settings().eth_rpc_hedge_requests is False
+
+    response = requests.put(
+        api_url_for(rotkehlchen_api_server, "settingsresource"),
+        json={'settings': {'eth_rpc_hedge_requests': True}},
+    )
+    result = assert_proper_response_with_result(response)
+    assert result['eth_rpc_hedge_requests'] is True
+    assert rotki.chain_manager.ethereum.hedge_requests is True
+
+    # Logout and login again and make sure the new ethereum manager gets the setting
+    response = requests.patch(
+        api_url_for(rotkehlchen_api_server, "usersbynameresource", name=username),
+        json={'action': 'logout'},
+    )
+    assert_proper_response(response)
+    response = requests.patch(
+        api_url_for(rotkehlchen_api_server, "usersbynameresource", name=username),
+        json={'action': 'login', 'password': db_password, 'sync_approval': 'unknown'},
+    )
+    assert_proper_response(response)
+    assert rotki.chain_manager.ethereum.hedge_requests is True
+
+
 def test_disable_taxfree_after_period(rotkehlchen_api_server):
     """Test that providing -1 for the taxfree_after_period setting disables it """
     data = {
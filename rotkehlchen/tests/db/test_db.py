@@ -10,21 +10,27 @@ import pytest
 from rotkehlchen.accounting.ledger_actions import LedgerActionType
 from rotkehlchen.accounting.structures import ActionType, BalanceType
 from rotkehlchen.assets.asset import Asset
+from rotkehlchen.assets.typing import AssetType
 from rotkehlchen.balances.manual import ManuallyTrackedBalance
-from rotkehlchen.constants import YEAR_IN_SECONDS
+from rotkehlchen.constants import EV_BUY, YEAR_IN_SECONDS
 from rotkehlchen.constants.assets import A_1INCH, A_BTC, A_DAI, A_ETH, A_USD
 from rotkehlchen.data_handler import DataHandler
 from rotkehlchen.db.dbhandler import DBINFO_FILENAME, DBHandler, detect_sqlcipher_version
+from rotkehlchen.db.filtering import PnlEventsFilterQuery
 from rotkehlchen.db.queried_addresses import QueriedAddresses
+from rotkehlchen.db.reports import DBReports
 from rotkehlchen.db.settings import (
     DEFAULT_ACCOUNT_FOR_ASSETS_MOVEMENTS,
     DEFAULT_ACTIVE_MODULES,
     DEFAULT_BALANCE_SAVE_FREQUENCY,
     DEFAULT_BTC_DERIVATION_GAP_LIMIT,
     DEFAULT_CALCULATE_PAST_COST_BASIS,
+    DEFAULT_COST_BASIS_FIXED_POINT,
     DEFAULT_CURRENT_PRICE_ORACLES,
+    DEFAULT_CURRENT_PRICE_STALENESS,
     DEFAULT_DATE_DISPLAY_FORMAT,
     DEFAULT_DISPLAY_DATE_IN_LOCALTIME,
+    DEFAULT_ETH_RPC_HEDGE_REQUESTS,
     DEFAULT_HISTORICAL_PRICE_ORACLES,
     DEFAULT_INCLUDE_CRYPTO2CRYPTO,
     DEFAULT_INCLUDE_GAS_COSTS,
@@ -125,7 +131,10 @@ TABLES_AT_INIT = [
     'gitcoin_tx_type',
     'gitcoin_grant_metadata',
     'nfts',
+    'owned_assets_changes',
+    'globaldb_mirror',
 ]
+TRANSIENT_TABLES_AT_INIT = ['pnl_events', 'xpub_derived_addresses']
 
 
 def test_data_init_and_password(data_dir, username):
@@ -253,6 +262,62 @@ def test_export_import_db(data_dir, username):
     assert balances == [starting_balance]
 
 
+def test_sync_data_hash_cache(data_dir, username):
+    """Test that the DB content hash used by premium sync is cached until the next write"""
+    msg_aggregator = MessagesAggregator()
+    data = DataHandler(data_dir, msg_aggregator)
+    data.unlock(username, '123', create_new=True)
+    assert data.db.sync_data_hash is None
+    our_hash = data.get_db_hash()
+    assert data.db.sync_data_hash == our_hash
+    with patch.object(data.db, 'export_unencrypted', side_effect=AssertionError('exported')):
+        assert data.get_db_hash() == our_hash
+
+    data.db.add_manually_tracked_balances([ManuallyTrackedBalance(
+        asset=A_EUR,
+        label='foo',
+        amount=FVal(10),
+        location=Location.BANKS,
+        tags=None,
+        balance_type=BalanceType.ASSET,
+    )])
+    assert data.db.sync_data_hash is None
+    new_hash = data.get_db_hash()
+    assert new_hash != our_hash
+    # building the payload should give the same hash as the cheap hash query
+    data.db.sync_data_hash = None
+    _, payload_hash = data.compress_and_encrypt_db('123')
+    assert payload_hash == new_hash
+
+
+def test_transient_db(data_dir, username):
+    """Test that the PnL report events and the other recomputable data are kept in the
+    transient DB, which is not part of the premium sync payload, and that it can still be
+    opened after a password change"""
+    msg_aggregator = MessagesAggregator()
+    data = DataHandler(data_dir, msg_aggregator)
+    data.unlock(username, '123', create_new=True)
+    cursor = data.db.conn.cursor()
+    cursor.execute("SELECT name FROM transient.sqlite_master WHERE type='table';")
+    assert [result[0] for result in cursor.fetchall()] == TRANSIENT_TABLES_AT_INIT
+
+    dbreports = DBReports(data.db)
+    event = (EV_BUY, Location.KRAKEN, Timestamp(1), {'type': EV_BUY}, FVal(1), FVal(2))
+    dbreports.add_pnl_events([event])
+    our_hash = data.get_db_hash()
+    dbreports.add_pnl_events([event])
+    data.db.sync_data_hash = None
+    assert data.get_db_hash() == our_hash
+
+    assert data.db.change_password('456') is True
+    del data
+    data = DataHandler(data_dir, msg_aggregator)
+    data.unlock(username, '456', create_new=False)
+    events, entries_found = DBReports(data.db).get_pnl_events(PnlEventsFilterQuery.make())
+    assert events == [{'type': EV_BUY}, {'type': EV_BUY}]
+    assert entries_found == 2
+
+
 def test_writing_fetching_data(data_dir, username):
     msg_aggregator = MessagesAggregator()
     data = DataHandler(data_dir, msg_aggregator)
@@ -350,6 +415,9 @@ def test_writing_fetching_data(data_dir, username):
         'pnl_csv_with_formulas': DEFAULT_PNL_CSV_WITH_FORMULAS,
         'pnl_csv_have_summary': DEFAULT_PNL_CSV_HAVE_SUMMARY,
         'ssf_0graph_multiplier': DEFAULT_SSF_0GRAPH_MULTIPLIER,
+        'current_price_staleness': DEFAULT_CURRENT_PRICE_STALENESS,
+        'eth_rpc_hedge_requests': DEFAULT_ETH_RPC_HEDGE_REQUESTS,
+        'cost_basis_fixed_point': DEFAULT_COST_BASIS_FIXED_POINT,
     }
     assert len(expected_dict) == len(DBSettings()), 'One or more settings are missing'
 
@@ -705,6 +773,61 @@ def test_query_owned_assets(data_dir, username):
     assert len(warnings) == 0
 
 
+def test_owned_assets_mirrored_incrementally(data_dir, username, globaldb):
+    """Test that at login only the owned assets and the asset ids that changed since
+    the last login are mirrored between the user DB and the global DB"""
+    msg_aggregator = MessagesAggregator()
+    data = DataHandler(data_dir, msg_aggregator)
+    data.unlock(username, '123', create_new=True)
+    cursor = data.db.conn.cursor()
+    assert cursor.execute('SELECT COUNT(*) FROM owned_assets_changes').fetchone()[0] == 0
+    mirror_id = globaldb.get_assets_mirror_id()
+    assert data.db._get_globaldb_mirror_state('owned_assets') == mirror_id
+
+    data.db.add_multiple_balances([DBAssetBalance(
+        category=BalanceType.ASSET,
+        time=Timestamp(1488326400),
+        asset=A_XMR,
+        amount='1',
+        usd_value='100',
+    ), DBAssetBalance(
+        category=BalanceType.LIABILITY,
+        time=Timestamp(1488326400),
+        asset=A_SDC,
+        amount='1',
+        usd_value='1',
+    )])
+    data.db.conn.commit()
+    changes = cursor.execute('SELECT identifier FROM owned_assets_changes').fetchall()
+    assert changes == [(A_XMR.identifier,)]
+
+    with patch.object(data.db, 'query_owned_assets', side_effect=AssertionError('full scan')):
+        data.db.update_owned_assets_in_globaldb()
+    assert A_XMR.identifier in globaldb.get_user_owned_asset_ids()
+    assert A_SDC.identifier not in globaldb.get_user_owned_asset_ids()
+    assert cursor.execute('SELECT COUNT(*) FROM owned_assets_changes').fetchone()[0] == 0
+
+    # a new asset in the global DB is mirrored in the user DB without re-adding all
+    last_change_id, _ = globaldb.get_asset_identifiers_changes(None)
+    globaldb.add_asset(
+        asset_id='MIRRORTEST',
+        asset_type=AssetType.OWN_CHAIN,
+        data={'name': 'Mirror test', 'symbol': 'MRT', 'started': 0},
+    )
+    assert globaldb.get_asset_identifiers_changes(last_change_id)[1] == ['MIRRORTEST']
+    with patch.object(data.db, 'add_asset_identifiers', wraps=data.db.add_asset_identifiers) as add_ids:  # noqa: E501
+        data.db.add_globaldb_assetids()
+    add_ids.assert_called_once_with(['MIRRORTEST'])
+    assert cursor.execute('SELECT COUNT(*) FROM assets WHERE identifier="MIRRORTEST"').fetchone()[0] == 1  # noqa: E501
+
+    # with a new global DB changelog everything is mirrored again
+    globaldb.reset_assets_changelog()
+    assert globaldb.get_assets_mirror_id() != mirror_id
+    with patch.object(data.db, 'query_owned_assets', wraps=data.db.query_owned_assets) as query:
+        data.db.update_owned_assets_in_globaldb()
+    assert query.call_count == 1
+
+
 def test_get_latest_location_value_distribution(data_dir, username):
     msg_aggregator = MessagesAggregator()
     data = DataHandler(data_dir, msg_aggregator)
@@ -152,6 +152,27 @@ def test_delete_bitcoin_xpub(setup_db_for_xpub_tests):
     assert len(result.fetchall()) == 0
 
 
+def test_xpub_derived_addresses_cache(setup_db_for_xpub_tests):
+    """Test that derived addresses are cached per xpub and derivation path and that
+    the cache is deleted along with the xpub"""
+    db, xpub1, xpub2, xpub3, _ = setup_db_for_xpub_tests
+    assert db.get_xpub_derived_addresses(xpub1) == {}
+
+    addr1 = '1LZypJUwJJRdfdndwvDmtAjrVYaHko136r'
+    addr2 = '1MKSdDCtBSXiE49vik8xUG2pTgTGGh5pqe'
+    addr3 = 'bc1qc3qcxs025ka9l6qn0q5cyvmnpwrqw2z49qwrx5'
+    db.add_xpub_derived_addresses(xpub1, [(0, 0, addr1), (0, 1, addr2), (1, 0, addr3)])
+    db.add_xpub_derived_addresses(xpub1, [(0, 1, addr2)])  # adding again does nothing
+    db.add_xpub_derived_addresses(xpub3, [(0, 0, addr2)])
+    assert db.get_xpub_derived_addresses(xpub1) == {0: {0: addr1, 1: addr2}, 1: {0: addr3}}
+    assert db.get_xpub_derived_addresses(xpub2) == {}
+    assert db.get_xpub_derived_addresses(xpub3) == {0: {0: addr2}}
+
+    db.delete_bitcoin_xpub(xpub1)
+    assert db.get_xpub_derived_addresses(xpub1) == {}
+    assert db.get_xpub_derived_addresses(xpub3) == {0: {0: addr2}}
+
+
 def test_get_bitcoin_xpub_data(setup_db_for_xpub_tests):
     """Test that retrieving bitcoin xpub data also returns all properly mapped tags"""
     db, xpub1, xpub2, xpub3, _ = setup_db_for_xpub_tests
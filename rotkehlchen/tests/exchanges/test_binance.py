@@ -18,6 +18,7 @@ from rotkehlchen.errors import RemoteError, UnknownAsset, UnsupportedAsset
 from rotkehlchen.exchanges.binance import (
     API_TIME_INTERVAL_CONSTRAINT_TS,
     BINANCE_LAUNCH_TS,
+    BINANCE_METHOD_WEIGHTS,
     RETRY_AFTER_LIMIT,
     Binance,
     trade_from_binance,
@@ -41,6 +42,7 @@ from rotkehlchen.tests.utils.mock import MockResponse
 from rotkehlchen.typing import ApiKey, ApiSecret, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import ts_now_in_ms
+from rotkehlchen.utils.rate_limit import rate_limiter
 
 
 def test_name():
@@ -872,6 +874,23 @@ def test_api_query_retry_on_status_code_429(function_scope_binance):
     assert binance_mock_get.call_args_list == expected_calls
 
 
+def test_api_query_acquires_method_weight(function_scope_binance):
+    """Test that each query takes the request weight of its method from the rate limit"""
+    binance = function_scope_binance
+    key = binance._rate_limit_key('api')
+
+    def mock_response(url, timeout):  # pylint: disable=unused-argument
+        return MockResponse(200, '[]')
+
+    with patch.object(binance.session, 'get', side_effect=mock_response):
+        weight_before = rate_limiter.stats(key)[key]['weight']
+        binance.api_query(api_type='api', method='myTrades', options={'symbol': 'BUSDUSDT'})
+        binance.api_query(api_type='api', method='time')
+
+    weight = rate_limiter.stats(key)[key]['weight'] - weight_before
+    assert weight == BINANCE_METHOD_WEIGHTS['myTrades'] + 1
+
+
 def test_binance_query_trade_history_custom_markets(function_scope_binance, user_data_dir):
     """Test that custom pairs are queried correctly"""
     msg_aggregator = MessagesAggregator()
@@ -123,7 +123,6 @@ def test_querying_rate_limit_exhaustion(function_scope_kraken, database):
     """
     kraken = function_scope_kraken
     kraken.use_original_kraken = True
-    kraken.reduction_every_secs = 0.05
 
     count = 0
 
@@ -22,6 +22,7 @@ from rotkehlchen.constants.assets import (
     A_USDT,
 )
 from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.errors import RemoteError
 from rotkehlchen.externalapis.cryptocompare import (
     A_COMP,
     CRYPTOCOMPARE_HOURQUERYLIMIT,
@@ -387,3 +388,25 @@ def test_cryptocompare_query_with_api_key(cryptocompare):
     # call to endpoint with args
     price = cryptocompare.query_current_price(A_ETH, A_USD)
     assert price is not None
+
+
+def test_cryptocompare_multiple_current_prices_special_case_remote_error(cryptocompare):
+    """Test that a remote error for a special case asset does not fail the whole query"""
+    def mock_api_query(path):
+        assert path.startswith('pricemulti?fsyms=')
+        return {'ETH': {'USD': 2000}, 'BTC': {'USD': 50000}}
+
+    special_case_patch = patch.object(
+        cryptocompare,
+        'query_current_price',
+        side_effect=RemoteError('boom'),
+    )
+    api_query_patch = patch.object(cryptocompare, '_api_query', side_effect=mock_api_query)
+    with special_case_patch as special_case_mock, api_query_patch:
+        prices = cryptocompare.query_multiple_current_prices(
+            from_assets=[A_ETH, Asset('ADADOWN'), A_BTC],
+            to_asset=A_USD,
+        )
+
+    assert special_case_mock.call_count == 1
+    assert prices == {A_ETH: FVal(2000), A_BTC: FVal(50000)}
@@ -28,6 +28,7 @@ from rotkehlchen.tests.fixtures.greenlets import *
 from rotkehlchen.tests.fixtures.history import *
 from rotkehlchen.tests.fixtures.messages import *
 from rotkehlchen.tests.fixtures.pylint import *
+from rotkehlchen.tests.fixtures.rate_limit import *
 from rotkehlchen.tests.fixtures.rotkehlchen import *
 from rotkehlchen.tests.fixtures.variables import *
 from rotkehlchen.tests.fixtures.websockets import *
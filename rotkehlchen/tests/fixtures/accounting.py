@@ -11,8 +11,10 @@ from rotkehlchen.config import default_data_directory
 from rotkehlchen.externalapis.coingecko import Coingecko
 from rotkehlchen.externalapis.cryptocompare import Cryptocompare
 from rotkehlchen.fval import FVal
+from rotkehlchen.greenlets import GreenletManager
 from rotkehlchen.inquirer import DEFAULT_CURRENT_PRICE_ORACLES_ORDER, Inquirer
 from rotkehlchen.premium.premium import Premium
+from rotkehlchen.user_messages import MessagesAggregator
 
 
 @pytest.fixture(name='use_clean_caching_directory')
@@ -179,6 +181,7 @@ def create_inquirer(
         data_dir=data_directory,
         cryptocompare=cryptocompare,
         coingecko=gecko,
+        greenlet_manager=GreenletManager(msg_aggregator=MessagesAggregator()),
     )
     inquirer.set_oracles_order(current_price_oracles_order)
 
@@ -214,6 +217,11 @@ def create_inquirer(
         inquirer.find_price = mock_some_prices  # type: ignore
         inquirer.find_usd_price = mock_some_usd_prices  # type: ignore
 
+    def mock_find_usd_prices(assets, ignore_cache: bool = False):
+        return {x: inquirer.find_usd_price(x, ignore_cache) for x in assets}
+
+    inquirer.find_usd_prices = mock_find_usd_prices  # type: ignore
+
     def mock_query_fiat_pair(base, quote):  # pylint: disable=unused-argument
         return FVal(1)
 
@@ -0,0 +1,9 @@
+import pytest
+
+from rotkehlchen.utils.rate_limit import rate_limiter
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limiter():
+    """Start each test with full buckets so the requests of earlier tests don't delay it"""
+    rate_limiter.reset()
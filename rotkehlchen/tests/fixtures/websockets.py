@@ -18,8 +18,9 @@ class WebsocketReader():
         while self.should_read:
             msg = self.ws.recv()
             if msg not in ('', '{}'):
-                data = json.loads(msg)
-                self.messages.appendleft(data)
+                # each frame is a list of all messages sent in one tick
+                for data in json.loads(msg):
+                    self.messages.appendleft(data)
             gevent.sleep(0.5)
 
         # cleanup
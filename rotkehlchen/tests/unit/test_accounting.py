@@ -1,12 +1,22 @@
 import pytest
 
-from rotkehlchen.accounting.structures import AssetBalance, Balance, DefiEvent, DefiEventType
+from rotkehlchen.accounting.structures import (
+    ActionType,
+    AssetBalance,
+    Balance,
+    DefiEvent,
+    DefiEventType,
+)
 from rotkehlchen.chain.ethereum.structures import AaveInterestEvent
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_BCH, A_BSV, A_BTC, A_ETH, A_WBTC
-from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition
+from rotkehlchen.exchanges.data_structures import (
+    AssetMovement,
+    MarginPosition,
+    trades_from_dictlist,
+)
 from rotkehlchen.fval import FVal
-from rotkehlchen.tests.utils.accounting import accounting_history_process
+from rotkehlchen.tests.utils.accounting import accounting_history_process, get_pnl_events
 from rotkehlchen.tests.utils.constants import A_DASH
 from rotkehlchen.tests.utils.history import prices
 from rotkehlchen.typing import AssetMovementCategory, EthereumTransaction, Fee, Location, Timestamp
@@ -351,7 +361,7 @@ def test_nocrypto2crypto(accountant):
     accounting_history_process(accountant, 1436979735, 1519693374, history5)
     # Expected = 3 trades + the creation of ETC, BCH and BSV after fork times
     msg = 'The crypto to crypto trades should not appear in the list at all'
-    assert len(accountant.csvexporter.all_events) == 6, msg
+    assert len(get_pnl_events(accountant)) == 6, msg
 
     assert accountant.general_trade_pl.is_close('264693.43364282')
     assert accountant.taxable_trade_pl.is_close('0')
@@ -496,6 +506,39 @@ def test_ignored_assets(accountant):
     }]
     result = accounting_history_process(accountant, 1436979735, 1519693374, history)
     assert FVal(result['overview']['total_taxable_profit_loss']).is_close('558.253654902574637500')
+    # the ignored actions are dropped before processing
+    assert result['events_processed'] == len(history1)
+    assert set(accountant.last_run_timings.keys()) == {
+        'snapshot',
+        'sort',
+        'filter',
+        'replay',
+        'summary',
+    }
+
+
+@pytest.mark.parametrize('mocked_price_queries', [prices])
+def test_ignored_action_ids(accountant):
+    """Test that actions the user asked to ignore are dropped before processing"""
+    trades = trades_from_dictlist(
+        given_trades=history1,
+        start_ts=Timestamp(0),
+        end_ts=Timestamp(1519693374),
+        location='test_ignored_action_ids',
+        msg_aggregator=accountant.msg_aggregator,
+    )
+    accountant.db.add_to_ignored_action_ids(
+        action_type=ActionType.TRADE,
+        identifiers=[trades[0].identifier, trades[1].identifier],
+    )
+    context = accountant._create_processing_context()
+    assert context.ignored_actionids_mapping == {
+        ActionType.TRADE: frozenset([trades[0].identifier, trades[1].identifier]),
+    }
+    assert accountant._filter_ignored_actions(actions=trades, context=context) == trades[2:]
+
+    result = accounting_history_process(accountant, 1436979735, 1519693374, history1)
+    assert result['events_processed'] == len(history1) - 2
 
 
 @pytest.mark.parametrize('mocked_price_queries', [prices])
@@ -774,7 +817,7 @@ def test_defi_event_zero_amount(accountant):
         count_spent_got_cost_basis=True,
         tx_hash='0x49c67445d26679623f9b7d56a8be260a275cb6744a1c1ae5a8d6883a5a5c03de',
     )]
-    result = accounting_history_process(
+    accounting_history_process(
         accountant=accountant,
         start_ts=1466979735,
         end_ts=1519693374,
@@ -782,19 +825,19 @@ def test_defi_event_zero_amount(accountant):
         defi_events_list=defi_events,
     )
 
-    assert result['all_events'][0] == {
+    assert get_pnl_events(accountant)[0] == {
         'cost_basis': None,
         'is_virtual': False,
         'location': 'blockchain',
-        'net_profit_or_loss': ZERO,
+        'net_profit_or_loss': '0',
         'paid_asset': '_ceth_0x2260FAC5E5542a773Aa44fBCfeDf7C193bc2C599',
-        'paid_in_asset': ZERO,
-        'paid_in_profit_currency': ZERO,
+        'paid_in_asset': '0',
+        'paid_in_profit_currency': '0',
         'received_asset': '',
-        'received_in_asset': ZERO,
-        'taxable_amount': ZERO,
-        'taxable_bought_cost_in_profit_currency': ZERO,
-        'taxable_received_in_profit_currency': ZERO,
+        'received_in_asset': '0',
+        'taxable_amount': '0',
+        'taxable_bought_cost_in_profit_currency': '0',
+        'taxable_received_in_profit_currency': '0',
         'time': 1467279735,
         'type': 'defi_event',
         'link': 'https://etherscan.io/tx/0x49c67445d26679623f9b7d56a8be260a275cb6744a1c1ae5a8d6883a5a5c03de',  # noqa: E501
@@ -474,3 +474,28 @@ def test_get_or_create_ethereum_token(globaldb, database):
         ethereum_address='0xdAC17F958D2ee523a2206206994597C13D831ec7',
     )
     assert cursor.execute('SELECT COUNT(*) from assets;').fetchone()[0] == assets_num + 2
+
+
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+def test_assets_cache_warmup(globaldb):
+    """Test that warming up the resolver cache also loads forked and swapped for assets"""
+    AssetResolver().clean_memory_cache()
+    GlobalDBHandler().add_user_owned_assets([Asset('BCH'), A_DAI])
+    AssetResolver().clean_memory_cache()
+    AssetResolver().warmup_cache()
+
+    cache = AssetResolver().assets_cache
+    assert {'bch', 'btc', A_DAI.identifier.lower()} <= set(cache.keys())
+    assert cache['bch'] == globaldb.get_asset_data('BCH', form_with_incomplete_data=False)
+    assert cache['btc'] == globaldb.get_asset_data('BTC', form_with_incomplete_data=False)
+    assert cache[A_DAI.identifier.lower()] == globaldb.get_asset_data(
+        A_DAI.identifier,
+        form_with_incomplete_data=False,
+    )
+    assert AssetResolver.last_warmup_duration is not None
+
+    # unknown identifiers are simply skipped
+    old_adx_id = '_ceth_0x4470BB87d77b963A013DB939BE332f927f2b992e'
+    AssetResolver().warmup_cache(['jsakdjsladjsakdj', old_adx_id])
+    assert 'jsakdjsladjsakdj' not in cache
+    assert cache[old_adx_id.lower()].swapped_for.lower() in cache
@@ -0,0 +1,80 @@
+import gevent
+
+from rotkehlchen.api.tasks import AsyncTasksRegistry
+
+
+def _add_task(registry, greenlets, result):
+    task_id = registry.new_task_id()
+    greenlet = gevent.spawn(registry.set_result, task_id, result)
+    registry.add(task_id=task_id, command='query_something', greenlet=greenlet)
+    assert greenlet in greenlets
+    greenlet.join()
+    return task_id
+
+
+def test_task_result_is_returned_once():
+    greenlets = []
+    registry = AsyncTasksRegistry(greenlets=greenlets)
+    task_id = _add_task(registry, greenlets, {'result': {'a': 1}, 'message': '', 'status_code': 409})  # noqa: E501
+    assert greenlets == []
+    assert registry.list_tasks() == ([], [task_id])
+    metrics = registry.metrics()
+    assert metrics['tasks'][0]['result_size'] == metrics['results_memory_bytes'] > 0
+
+    assert registry.pop_result(task_id) == ('completed', {'result': {'a': 1}, 'message': ''}, 409)
+    assert registry.pop_result(task_id) == ('not-found', None, None)
+    assert registry.metrics()['results_memory_bytes'] == 0
+
+
+def test_task_results_expire_and_get_evicted():
+    greenlets = []
+    registry = AsyncTasksRegistry(greenlets=greenlets, max_memory_bytes=100)
+    big_result = {'result': 'x' * 60, 'message': ''}
+    first_id = _add_task(registry, greenlets, big_result)
+    second_id = _add_task(registry, greenlets, big_result)
+    # the older result is evicted so that the newer fits the memory budget
+    assert registry.list_tasks() == ([], [second_id])
+    assert registry.pop_result(first_id)[0] == 'not-found'
+    assert registry.evicted_num == 1
+
+    registry.ttl_secs = 0
+    third_id = _add_task(registry, greenlets, {'result': True, 'message': ''})
+    gevent.sleep(0.01)
+    assert registry.pop_result(third_id)[0] == 'not-found'
+    assert registry.list_tasks() == ([], [])
+    assert registry.expired_num == 2
+
+
+def test_task_results_spill_to_disk():
+    greenlets = []
+    registry = AsyncTasksRegistry(greenlets=greenlets, spill_to_disk=True, spill_threshold_bytes=50)  # noqa: E501
+    big_result = {'result': 'x' * 60, 'message': ''}
+    task_id = _add_task(registry, greenlets, big_result)
+    assert registry.metrics()['results_memory_bytes'] == 0
+    spilled_path = registry.tasks[task_id].result_path
+    assert spilled_path.exists()
+    assert registry.pop_result(task_id) == ('completed', big_result, None)
+    assert not spilled_path.exists()
+
+    task_id = _add_task(registry, greenlets, big_result)
+    spill_dir = registry.spill_dir
+    registry.clear()
+    assert not spill_dir.exists()
+    assert registry.list_tasks() == ([], [])
+
+
+def test_cancel_pending_task():
+    greenlets = []
+    registry = AsyncTasksRegistry(greenlets=greenlets)
+    task_id = registry.new_task_id()
+    greenlet = gevent.spawn(gevent.sleep, 10)
+    registry.add(task_id=task_id, command='query_something', greenlet=greenlet)
+    assert registry.pop_result(task_id) == ('pending', None, None)
+    assert registry.metrics()['tasks'][0]['status'] == 'pending'
+
+    assert registry.cancel(task_id) is True
+    gevent.sleep(0)
+    assert greenlet.dead
+    assert greenlets == []
+    assert registry.cancel(task_id) is False
+    assert registry.pop_result(task_id) == ('not-found', None, None)
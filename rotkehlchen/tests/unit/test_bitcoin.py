@@ -1,5 +1,8 @@
+import time
+
 import pytest
 
+from rotkehlchen.chain.bitcoin import BlockstreamStatsCache, get_bitcoin_addresses_balances
 from rotkehlchen.chain.bitcoin.hdkey import HDKey, XpubType
 from rotkehlchen.chain.bitcoin.utils import (
     is_valid_btc_address,
@@ -10,8 +13,11 @@ from rotkehlchen.chain.bitcoin.utils import (
     scriptpubkey_to_p2pkh_address,
     scriptpubkey_to_p2sh_address,
 )
-from rotkehlchen.chain.bitcoin.xpub import XpubData
+from rotkehlchen.chain.bitcoin.xpub import XpubChainDeriver, XpubData
+from rotkehlchen.constants.misc import ZERO
 from rotkehlchen.errors import XPUBError
+from rotkehlchen.fval import FVal
+from rotkehlchen.tests.utils.blockchain import mock_bitcoin_balances_query
 from rotkehlchen.tests.utils.ens import ENS_BRUNO_BTC_ADDR, ENS_BRUNO_BTC_BYTES
 from rotkehlchen.tests.utils.factories import (
     UNIT_BTC_ADDRESS1,
@@ -19,6 +25,9 @@ from rotkehlchen.tests.utils.factories import (
     UNIT_BTC_ADDRESS3,
 )
 
+# Seconds deriving 10k xpub addresses may take
+DERIVE_10K_ADDRESSES_TIME_BUDGET = 10
+
 
 def test_is_valid_btc_address():
     """Test cases for Bech32 addresses taken from here:
@@ -222,6 +231,57 @@ def test_zpub_to_addresses():
         assert child.address() == expected_addresses[i]
 
 
+def test_derive_child_address():
+    """Test that deriving just the address of a child gives the same address as
+    deriving the child node, for all xpub types"""
+    for xpub in (
+        'xpub68V4ZQQ62mea7ZUKn2urQu47Bdn2Wr7SxrBxBDDwE3kjytj361YBGSKDT4WoBrE5htrSB8eAMe59NPnKrcAbiv2veN5GQUmfdjRddD1Hxrk',  # noqa: E501
+        'ypub6WkRUvNhspMCJLiLgeP7oL1pzrJ6wA2tpwsKtXnbmpdAGmHHcC6FeZeF4VurGU14dSjGpF2xLavPhgvCQeXd6JxYgSfbaD1wSUi2XmEsx33',  # noqa: E501
+        'zpub6quTRdxqWmerHdiWVKZdLMp9FY641F1F171gfT2RS4D1FyHnutwFSMiab58Nbsdu4fXBaFwpy5xyGnKZ8d6xn2j4r4yNmQ3Yp3yDDxQUo3q',  # noqa: E501
+    ):
+        root = HDKey.from_xpub(xpub=xpub, path='m').derive_child(0)
+        for i in range(5):
+            assert root.derive_child_address(i) == root.derive_child(i).address()
+
+
+def test_xpub_chain_deriver():
+    """Test that the chain deriver uses the cached addresses and keeps the new ones"""
+    xpub = 'xpub68V4ZQQ62mea7ZUKn2urQu47Bdn2Wr7SxrBxBDDwE3kjytj361YBGSKDT4WoBrE5htrSB8eAMe59NPnKrcAbiv2veN5GQUmfdjRddD1Hxrk'  # noqa: E501
+    root = HDKey.from_xpub(xpub=xpub, path='m').derive_child(0)
+    deriver = XpubChainDeriver(
+        root=root,
+        account_index=0,
+        cached_addresses={0: '1K3WM7WNiyZCkH31eMoEDwEcmnGNvQfZVA', 1: 'cached'},
+    )
+    assert deriver.derive(0, 3) == [
+        (0, '1K3WM7WNiyZCkH31eMoEDwEcmnGNvQfZVA'),
+        (1, 'cached'),
+        (2, '16zNpyv8KxChtjXnE5nYcPqcXcrSQXX2JW'),
+    ]
+    assert deriver.new_addresses == [(0, 2, '16zNpyv8KxChtjXnE5nYcPqcXcrSQXX2JW')]
+    deriver.derive(2, 3)
+    assert len(deriver.new_addresses) == 1
+
+
+def test_derive_addresses_benchmark():
+    """Derive 10k addresses and check that it stays within a time budget. Kept
+    generous so that it only catches big regressions and not slow CI machines."""
+    xpub = 'zpub6quTRdxqWmerHdiWVKZdLMp9FY641F1F171gfT2RS4D1FyHnutwFSMiab58Nbsdu4fXBaFwpy5xyGnKZ8d6xn2j4r4yNmQ3Yp3yDDxQUo3q'  # noqa: E501
+    deriver = XpubChainDeriver(
+        root=HDKey.from_xpub(xpub=xpub, path='m').derive_child(0),
+        account_index=0,
+    )
+    start = time.monotonic()
+    addresses = deriver.derive(0, 10000)
+    elapsed = time.monotonic() - start
+    assert len(addresses) == len(deriver.new_addresses) == 10000
+    assert addresses[0][1] == 'bc1qc3qcxs025ka9l6qn0q5cyvmnpwrqw2z49qwrx5'
+    assert elapsed < DERIVE_10K_ADDRESSES_TIME_BUDGET, (
+        f'Deriving 10k addresses took {elapsed:.2f} seconds which is over '
+        f'the {DERIVE_10K_ADDRESSES_TIME_BUDGET} seconds budget'
+    )
+
+
 def test_from_bad_xpub():
     with pytest.raises(XPUBError):
         HDKey.from_xpub('ddodod')
@@ -342,3 +402,55 @@ def test_scriptpubkey_to_p2sh_address():
 def test_scriptpubkey_to_bech32_address(scriptpubkey, expected_address):
     address = scriptpubkey_to_bech32_address(bytes.fromhex(scriptpubkey))
     assert address == expected_address
+
+
+def test_bitcoin_balances_routing_and_cache():
+    """Test that only bech32 addresses are queried from blockstream, each at most
+    once while cached, and the rest in a batch from blockchain.info"""
+    bech32_addresses = [
+        'bc1qc3qcxs025ka9l6qn0q5cyvmnpwrqw2z49qwrx5',
+        'bc1qnus7355ecckmeyrmvv56mlm42lxvwa4wuq5aev',
+    ]
+    legacy_addresses = [UNIT_BTC_ADDRESS1, UNIT_BTC_ADDRESS2]
+    btc_map = {
+        bech32_addresses[0]: '100000000',
+        bech32_addresses[1]: '0',
+        UNIT_BTC_ADDRESS1: '50000000',
+        UNIT_BTC_ADDRESS2: '0',
+    }
+    bitcoin_patch = mock_bitcoin_balances_query(btc_map=btc_map)
+    stats_cache = BlockstreamStatsCache()
+    with bitcoin_patch as request_mock:
+        balances = get_bitcoin_addresses_balances(
+            accounts=bech32_addresses + legacy_addresses,
+            stats_cache=stats_cache,
+        )
+        urls = [x[1]['url'] for x in request_mock.call_args_list]
+        assert len(urls) == 3
+        assert sorted(x for x in urls if 'blockstream.info' in x) == sorted(
+            f'https://blockstream.info/api/address/{x}' for x in bech32_addresses
+        )
+        assert [x for x in urls if 'blockchain.info' in x] == [
+            f'https://blockchain.info/multiaddr?active={UNIT_BTC_ADDRESS1}|{UNIT_BTC_ADDRESS2}',
+        ]
+        assert balances == {
+            bech32_addresses[0]: FVal(1),
+            bech32_addresses[1]: ZERO,
+            UNIT_BTC_ADDRESS1: FVal('0.5'),
+            UNIT_BTC_ADDRESS2: ZERO,
+        }
+
+        # querying again uses the cache for the bech32 addresses
+        assert get_bitcoin_addresses_balances(
+            accounts=bech32_addresses + legacy_addresses,
+            stats_cache=stats_cache,
+        ) == balances
+        assert request_mock.call_count == 4
+
+        # forced refreshes clear the cache so the bech32 addresses are queried again
+        stats_cache.clear()
+        assert get_bitcoin_addresses_balances(
+            accounts=bech32_addresses + legacy_addresses,
+            stats_cache=stats_cache,
+        ) == balances
+        assert request_mock.call_count == 7
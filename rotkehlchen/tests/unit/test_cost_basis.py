@@ -1,9 +1,13 @@
+import random
+from decimal import Decimal
+
 import pytest
 
-from rotkehlchen.accounting.cost_basis import AssetAcquisitionEvent
-from rotkehlchen.constants.assets import A_BTC, A_ETH, A_WETH
+from rotkehlchen.accounting.cost_basis import AssetAcquisitionEvent, CostBasisCalculator
+from rotkehlchen.constants.assets import A_BTC, A_ETH, A_EUR, A_WETH
 from rotkehlchen.constants.misc import ZERO
-from rotkehlchen.fval import FVal
+from rotkehlchen.db.settings import ModifiableDBSettings
+from rotkehlchen.fval import FIXED_POINT_DECIMALS, FVal
 from rotkehlchen.typing import Location
 
 
@@ -433,3 +437,85 @@ def test_reduce_asset_amount_more_that_bought(accountant):
     assert not accountant.events.cost_basis.reduce_asset_amount(A_WETH, FVal(3))
     acquisitions_num = len(asset_events.acquisitions)
     assert acquisitions_num == 0, 'all buys should be used'
+
+
+def _random_fval(max_value: int) -> FVal:
+    """A random value with up to FIXED_POINT_DECIMALS decimals"""
+    decimals = random.randint(0, FIXED_POINT_DECIMALS)
+    scaled = random.randint(1, max_value * 10 ** decimals)
+    return FVal(Decimal(scaled).scaleb(-decimals))
+
+
+@pytest.mark.parametrize('taxfree_after_period', [None, 86400 * 365])
+def test_fixed_point_cost_basis_same_as_decimal(accountant, taxfree_after_period):
+    """Test that the fixed point cost basis calculation gives the same results as the
+    FVal one, up to the declared precision, for random acquisitions and spends"""
+    random.seed(42)
+    calculators = [
+        CostBasisCalculator(
+            csv_exporter=accountant.csvexporter,
+            profit_currency=A_EUR,
+            msg_aggregator=accountant.msg_aggregator,
+            fixed_point=fixed_point,
+        ) for fixed_point in (False, True)
+    ]
+    for calculator in calculators:
+        calculator.taxfree_after_period = taxfree_after_period
+
+    timestamp = 1446979735
+    max_diff = '1e-12'
+    for _ in range(2000):
+        timestamp += random.randint(1, 86400 * 7)
+        asset = random.choice((A_BTC, A_ETH))
+        amount = _random_fval(100)
+        action = random.random()
+        if action < 0.5:
+            rate, fee = _random_fval(1000), _random_fval(1)
+            for calculator in calculators:
+                calculator.obtain_asset(
+                    location=Location.EXTERNAL,
+                    timestamp=timestamp,
+                    description='trade',
+                    asset=asset,
+                    amount=amount,
+                    rate=rate,
+                    fee_in_profit_currency=fee,
+                )
+        elif action < 0.9:
+            decimal_info, fixed_info = [
+                calculator.calculate_spend_cost_basis(
+                    spending_amount=amount,
+                    spending_asset=asset,
+                    timestamp=timestamp,
+                ) for calculator in calculators
+            ]
+            assert fixed_info.is_complete == decimal_info.is_complete
+            assert fixed_info.taxable_amount.is_close(decimal_info.taxable_amount, max_diff)
+            assert fixed_info.taxable_bought_cost.is_close(decimal_info.taxable_bought_cost, max_diff)  # noqa: E501
+            assert fixed_info.taxfree_bought_cost.is_close(decimal_info.taxfree_bought_cost, max_diff)  # noqa: E501
+            assert len(fixed_info.matched_acquisitions) == len(decimal_info.matched_acquisitions)
+            for fixed_matched, decimal_matched in zip(
+                    fixed_info.matched_acquisitions,
+                    decimal_info.matched_acquisitions,
+            ):
+                assert fixed_matched.amount == decimal_matched.amount
+                assert fixed_matched.event == decimal_matched.event
+        else:
+            results = [calculator.reduce_asset_amount(asset, amount) for calculator in calculators]
+            assert results[0] == results[1]
+
+        for asset in (A_BTC, A_ETH):
+            decimal_amount, fixed_amount = [
+                x.get_calculated_asset_amount(asset) for x in calculators
+            ]
+            assert fixed_amount == decimal_amount
+
+
+def test_fixed_point_cost_basis_setting(accountant):
+    """Test that the accountant calculates the cost basis in fixed point as set"""
+    accountant._customize(accountant.db.get_settings())
+    assert accountant.events.cost_basis.fixed_point is False
+
+    accountant.db.set_settings(ModifiableDBSettings(cost_basis_fixed_point=True))
+    accountant._customize(accountant.db.get_settings())
+    assert accountant.events.cost_basis.fixed_point is True
@@ -0,0 +1,112 @@
+import io
+from pathlib import Path
+from typing import Dict
+from zipfile import ZipFile
+
+import gevent
+import pytest
+
+from rotkehlchen.csv_exporter import (
+    FILENAME_ALL_CSV,
+    FILENAME_TRADES_CSV,
+    CSVStream,
+    _ZipStreamBuffer,
+)
+from rotkehlchen.tests.unit.test_accounting import history1
+from rotkehlchen.tests.utils.accounting import accounting_history_process
+from rotkehlchen.tests.utils.history import prices
+
+
+def _unzip(data: bytes) -> Dict[str, bytes]:
+    with ZipFile(io.BytesIO(data)) as csv_zip:
+        assert csv_zip.testzip() is None
+        return {name: csv_zip.read(name) for name in csv_zip.namelist()}
+
+
+def test_csv_stream(tmpdir):
+    path = Path(tmpdir) / 'test.csv'
+    csv_stream = CSVStream(path)
+    assert not path.exists(), 'the file should only be created with the first row'
+
+    csv_stream.append({'a': 1, 'b': lambda row: f'=A{row}*2'})
+    csv_stream.append({'a': 2, 'b': lambda row: f'=A{row}*2'})
+    csv_stream.flush()
+    assert path.read_bytes() == b'a,b\r\n1,=A2*2\r\n2,=A3*2\r\n'
+    assert csv_stream.rows_num == 2
+
+    # a row with a key not in the header is not written and the error is kept
+    csv_stream.append({'a': 3, 'c': 4})
+    csv_stream.close()
+    assert csv_stream.rows_num == 2
+    assert 'test.csv' in str(csv_stream.error)
+    assert path.read_bytes() == b'a,b\r\n1,=A2*2\r\n2,=A3*2\r\n'
+
+
+def test_zip_stream_buffer():
+    """Test that a zip written in the buffer can be streamed as it's being written"""
+    buffer = _ZipStreamBuffer()
+    assert buffer.seekable() is False
+    chunks = []
+    with ZipFile(buffer, 'w') as csv_zip:
+        for name in ('a.csv', 'b.csv'):
+            with csv_zip.open(name, 'w') as dest:
+                dest.write(name.encode() * 1000)
+                chunks.append(buffer.pop())
+    chunks.append(buffer.pop())
+
+    assert buffer.pop() == b''
+    assert _unzip(b''.join(chunks)) == {'a.csv': b'a.csv' * 1000, 'b.csv': b'b.csv' * 1000}
+
+
+@pytest.mark.parametrize('mocked_price_queries', [prices])
+def test_stream_zip_same_as_files(accountant, tmpdir):
+    """Test that the streamed zip has the same CSVs as the ones exported to a directory,
+    also when a previous stream was abandoned halfway"""
+    accounting_history_process(accountant, 1436979735, 1495751688, history1)
+    csvexporter = accountant.csvexporter
+    dirpath = Path(tmpdir) / 'csvs'
+    assert csvexporter.create_files(dirpath) == (True, '')
+    expected_files = {x.name: x.read_bytes() for x in dirpath.iterdir()}
+    assert FILENAME_TRADES_CSV in expected_files
+    assert FILENAME_ALL_CSV in expected_files
+
+    zip_stream = csvexporter.create_zip()
+    assert zip_stream is not None
+    chunks = list(zip_stream)
+    assert len(chunks) > 2, 'the zip should be streamed in chunks'
+    assert _unzip(b''.join(chunks)) == expected_files
+
+    # abandon streams halfway, as when the download is cancelled, and stream again
+    for abandon_after in (1, len(chunks) - 2):
+        zip_stream = csvexporter.create_zip()
+        assert zip_stream is not None
+        for _ in range(abandon_after):
+            next(zip_stream)
+        zip_stream.close()
+
+        zip_stream = csvexporter.create_zip()
+        assert zip_stream is not None
+        assert _unzip(b''.join(zip_stream)) == expected_files
+
+
+@pytest.mark.parametrize('mocked_price_queries', [prices])
+def test_pnl_run_waits_for_zip_stream(accountant):
+    """Test that a PnL run does not reset the report while its zip is being streamed"""
+    accounting_history_process(accountant, 1436979735, 1495751688, history1)
+    zip_stream = accountant.csvexporter.create_zip()
+    assert zip_stream is not None
+    chunks = [next(zip_stream)]
+
+    greenlet = gevent.spawn(
+        accounting_history_process,
+        accountant,
+        1436979735,
+        1495751688,
+        history1,
+    )
+    gevent.sleep(0.1)
+    assert not greenlet.ready(), 'the PnL run should wait for the stream'
+    chunks.extend(zip_stream)
+    assert FILENAME_ALL_CSV in _unzip(b''.join(chunks))
+    greenlet.join(timeout=30)
+    assert greenlet.successful()
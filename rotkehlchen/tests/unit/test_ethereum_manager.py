@@ -1,5 +1,7 @@
 import os
+import time
 
+import gevent
 import pytest
 
 from rotkehlchen.chain.ethereum.manager import (
@@ -8,6 +10,13 @@ from rotkehlchen.chain.ethereum.manager import (
     OPEN_NODES_WEIGHT_MAP,
     NodeName,
 )
+from rotkehlchen.chain.ethereum.node_stats import (
+    CIRCUIT_BREAKER_FAILURES,
+    HEDGE_DEFAULT_DELAY_SECS,
+    HEDGE_MIN_SAMPLES,
+    NodeStats,
+    order_nodes_by_score,
+)
 from rotkehlchen.chain.ethereum.structures import EthereumTxReceipt, EthereumTxReceiptLog
 from rotkehlchen.constants.ethereum import (
     ATOKEN_ABI,
@@ -17,6 +26,7 @@ from rotkehlchen.constants.ethereum import (
 )
 from rotkehlchen.constants.misc import ONE, ZERO
 from rotkehlchen.db.ethtx import DBEthTx
+from rotkehlchen.errors import RemoteError
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.checks import assert_serialized_dicts_equal
 from rotkehlchen.tests.utils.ethereum import (
@@ -302,6 +312,127 @@ def test_nodes_sets():
     assert set(OPEN_NODES_WEIGHT_MAP.keys()) - set({NodeName.ETHERSCAN}) == set(ETHEREUM_NODES_TO_CONNECT_AT_START) - set({NodeName.OWN})  # noqa: E501
 
 
+def test_node_stats():
+    """Test latency and error rate averages and that the circuit opens after too many
+    consecutive failures and closes with a success"""
+    stats = NodeStats()
+    assert stats.hedge_delay() == HEDGE_DEFAULT_DELAY_SECS
+    for latency in (1, 1, 1, 1, 3):
+        stats.record_success(latency)
+    assert stats.latency == pytest.approx(1.6)
+    assert stats.latency_percentile(0.9) == 3
+    assert len(stats.latency_samples) == HEDGE_MIN_SAMPLES
+    assert stats.hedge_delay() == 3
+
+    for _ in range(CIRCUIT_BREAKER_FAILURES - 1):
+        stats.record_failure()
+        assert stats.circuit_open() is False
+    stats.record_failure()
+    assert stats.circuit_open() is True
+    assert stats.error_rate == pytest.approx(0.488)
+    serialized = stats.serialize()
+    assert serialized['requests'] == 5 + CIRCUIT_BREAKER_FAILURES
+    assert serialized['failures'] == CIRCUIT_BREAKER_FAILURES
+    assert serialized['circuit_open'] is True
+
+    stats.record_success(1)
+    assert stats.circuit_open() is False
+    assert stats.consecutive_failures == 0
+
+
+def test_order_nodes_by_score():
+    """Test that all nodes are returned, that nodes with an open circuit go last
+    and that slow and failing nodes are less likely to be queried first"""
+    nodes = (NodeName.MYCRYPTO, NodeName.BLOCKSCOUT, NodeName.AVADO_POOL)
+    weights = {x: 1 for x in nodes}
+    nodes_stats = {x: NodeStats() for x in nodes}
+    for _ in range(CIRCUIT_BREAKER_FAILURES):
+        nodes_stats[NodeName.AVADO_POOL].record_failure()
+    nodes_stats[NodeName.MYCRYPTO].record_success(0.1)
+    nodes_stats[NodeName.BLOCKSCOUT].record_success(10)
+
+    first_nodes = []
+    for _ in range(100):
+        result = order_nodes_by_score(nodes=nodes, weights=weights, nodes_stats=nodes_stats)
+        assert set(result) == set(nodes)
+        assert result[-1] == NodeName.AVADO_POOL
+        first_nodes.append(result[0])
+    assert first_nodes.count(NodeName.MYCRYPTO) > first_nodes.count(NodeName.BLOCKSCOUT)
+
+
+def test_query_nodes_health(ethereum_manager):
+    """Test that queries record the stats of each node and that a node which keeps
+    failing is moved at the end of the call order"""
+    ethereum_manager.web3_mapping[NodeName.MYCRYPTO] = NodeName.MYCRYPTO
+    ethereum_manager.web3_mapping[NodeName.BLOCKSCOUT] = NodeName.BLOCKSCOUT
+    queried_nodes = []
+
+    def method(web3, value):
+        queried_nodes.append(web3)
+        if web3 == NodeName.MYCRYPTO:
+            raise RemoteError('boom')
+        return value
+
+    call_order = (NodeName.MYCRYPTO, NodeName.BLOCKSCOUT)
+    for idx in range(CIRCUIT_BREAKER_FAILURES):
+        assert ethereum_manager.query(method, call_order=call_order, value=idx) == idx
+    assert queried_nodes == list(call_order) * CIRCUIT_BREAKER_FAILURES
+
+    queried_nodes = []
+    assert ethereum_manager.query(method, call_order=call_order, value=42) == 42
+    assert queried_nodes == [NodeName.BLOCKSCOUT]
+
+    stats = ethereum_manager.get_nodes_stats()
+    assert stats[str(NodeName.MYCRYPTO)]['failures'] == CIRCUIT_BREAKER_FAILURES
+    assert stats[str(NodeName.MYCRYPTO)]['circuit_open'] is True
+    assert stats[str(NodeName.BLOCKSCOUT)]['requests'] == CIRCUIT_BREAKER_FAILURES + 1
+    assert stats[str(NodeName.BLOCKSCOUT)]['failures'] == 0
+    assert stats[str(NodeName.BLOCKSCOUT)]['connected'] is True
+
+    with pytest.raises(RemoteError):
+        ethereum_manager.query(method, call_order=(NodeName.MYCRYPTO,), value=1)
+
+
+def test_query_hedged(ethereum_manager):
+    """Test that in hedged requests mode a node slower than usual does not hold the
+    query back and that the slow request is killed"""
+    ethereum_manager.hedge_requests = True
+    ethereum_manager.web3_mapping[NodeName.MYCRYPTO] = NodeName.MYCRYPTO
+    ethereum_manager.web3_mapping[NodeName.BLOCKSCOUT] = NodeName.BLOCKSCOUT
+    for _ in range(HEDGE_MIN_SAMPLES):
+        ethereum_manager.nodes_stats[NodeName.MYCRYPTO].record_success(0.05)
+    finished_nodes = []
+
+    def method(web3):
+        if web3 == NodeName.MYCRYPTO:
+            gevent.sleep(10)
+        finished_nodes.append(web3)
+        return web3
+
+    start = time.monotonic()
+    result = ethereum_manager.query(
+        method,
+        call_order=(NodeName.MYCRYPTO, NodeName.BLOCKSCOUT),
+    )
+    assert result == NodeName.BLOCKSCOUT
+    assert time.monotonic() - start < 2
+    gevent.sleep(0.1)
+    assert finished_nodes == [NodeName.BLOCKSCOUT]
+
+    # a failure of the first node goes straight to the next one
+    def failing_method(web3):
+        if web3 == NodeName.MYCRYPTO:
+            raise RemoteError('boom')
+        return web3
+
+    assert ethereum_manager.query(
+        failing_method,
+        call_order=(NodeName.MYCRYPTO, NodeName.BLOCKSCOUT),
+    ) == NodeName.BLOCKSCOUT
+    with pytest.raises(RemoteError):
+        ethereum_manager.query(failing_method, call_order=(NodeName.MYCRYPTO,))
+
+
 @pytest.mark.skipif(
     'CI' in os.environ,
     reason='This test is only for us to figure out the speed of the open nodes',
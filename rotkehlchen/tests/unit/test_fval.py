@@ -153,3 +153,25 @@ def test_initialize_with_bool_fails():
     with pytest.raises(ValueError):
         FVal(True)
         FVal(False)
+
+
+def test_fixed_point_conversion():
+    assert FVal('5').to_fixed_point() == 5 * 10 ** 18
+    assert FVal('-2.25').to_fixed_point() == -225 * 10 ** 16
+    assert FVal('1234567890.123456789012345678').to_fixed_point() == 1234567890123456789012345678  # noqa: E501
+    assert FVal('12.345').to_fixed_point(decimals=2) == 1234
+    assert FVal('12.355').to_fixed_point(decimals=2) == 1236
+    assert FVal('-12.345').to_fixed_point(decimals=2) == -1234
+    assert FVal('1E-20').to_fixed_point() == 0
+
+    for value in ('5', '0.5', '-2.25', '50', '1000', '0', '1234567890.123456789012345678'):
+        fval = FVal(value)
+        converted = FVal.from_fixed_point(fval.to_fixed_point())
+        assert converted == fval
+        assert str(converted) == value
+    assert str(FVal.from_fixed_point(125 * 10 ** 17)) == '12.5'
+    assert str(FVal.from_fixed_point(5 * 10 ** 36, decimals=36)) == '5'
+    # more digits than the default decimal context precision are kept
+    value = 123456789012345678901234567890123456789
+    assert FVal.from_fixed_point(value, decimals=36) == FVal('123.456789012345678901234567890123456789')  # noqa: E501
+    assert FVal.from_fixed_point(-value, decimals=36).to_fixed_point(decimals=36) == -value
@@ -63,6 +63,53 @@ def test_get_ethereum_token_identifier(globaldb):
     assert token_0_id == ethaddress_to_identifier(INITIAL_TOKENS[0].ethereum_address)
 
 
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+@pytest.mark.parametrize('custom_ethereum_tokens', [INITIAL_TOKENS])
+def test_get_ethereum_tokens_cache(globaldb):
+    """Test that the ethereum tokens list is built once and invalidated on token edits"""
+    tokens = globaldb.get_ethereum_tokens()
+    token_map = {x.ethereum_address: x for x in tokens}
+    custom1 = token_map[INITIAL_TOKENS[0].ethereum_address]
+    assert custom1.underlying_tokens == INITIAL_TOKENS[0].underlying_tokens
+    assert token_map[INITIAL_TOKENS[1].ethereum_address].underlying_tokens is None
+    # a second call should be served from memory
+    assert globaldb.get_ethereum_tokens() == tokens
+    assert globaldb._ethereum_tokens_cache[1] is globaldb._get_all_ethereum_tokens()
+
+    # filters should behave as in the DB query
+    uniswap_tokens = globaldb.get_ethereum_tokens(protocol='uniswap')
+    assert [x.ethereum_address for x in uniswap_tokens] == [INITIAL_TOKENS[0].ethereum_address]
+    non_uniswap = globaldb.get_ethereum_tokens(
+        exceptions=[INITIAL_TOKENS[1].ethereum_address],
+        except_protocols=['uniswap'],
+    )
+    non_uniswap_addresses = {x.ethereum_address for x in non_uniswap}
+    assert INITIAL_TOKENS[0].ethereum_address not in non_uniswap_addresses
+    assert INITIAL_TOKENS[1].ethereum_address not in non_uniswap_addresses
+    uniswap_num = len([x for x in tokens if x.protocol == 'uniswap'])
+    assert len(non_uniswap) == len(tokens) - uniswap_num - 1
+
+    # editing a token should invalidate the cache
+    edited_token = EthereumToken.initialize(
+        address=INITIAL_TOKENS[1].ethereum_address,
+        decimals=18,
+        name='Custom 2 edited',
+        symbol='CST2',
+        protocol='uniswap',
+    )
+    globaldb.edit_ethereum_token(edited_token)
+    assert globaldb._ethereum_tokens_cache is None
+    uniswap_tokens = globaldb.get_ethereum_tokens(protocol='uniswap')
+    assert {x.ethereum_address for x in uniswap_tokens} == {
+        INITIAL_TOKENS[0].ethereum_address,
+        INITIAL_TOKENS[1].ethereum_address,
+    }
+
+    # and so should deleting one
+    globaldb.delete_ethereum_token(INITIAL_TOKENS[1].ethereum_address)
+    assert len(globaldb.get_ethereum_tokens()) == len(tokens) - 1
+
+
 def test_open_new_globaldb_with_old_rotki(tmpdir_factory):
     """Test for https://github.com/rotki/rotki/issues/2781"""
     # clean the previous resolver memory cache, as it
@@ -262,6 +309,49 @@ def test_get_asset_with_symbol(globaldb):
         assert globaldb.get_assets_with_symbol(*x) == expected_renbtc
 
 
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+def test_get_asset_identifiers_with_symbol_cache(globaldb):
+    """Test that symbol lookups are cached, including misses, and invalidated on asset edits"""
+    cursor = globaldb._conn.cursor()
+    index_names = [x[0] for x in cursor.execute(
+        'SELECT name FROM sqlite_master WHERE type="index" AND tbl_name="assets";',
+    )]
+    assert 'idx_assets_symbol' in index_names
+
+    assert set(globaldb.get_asset_identifiers_with_symbol('KEY')) == {
+        selfkey_id,
+        ethaddress_to_identifier(string_to_ethereum_address('0x4Cd988AfBad37289BAAf53C13e98E2BD46aAEa8c')),  # noqa: E501
+        'KEY-3',
+    }
+    assert globaldb.get_asset_identifiers_with_symbol('key', AssetType.OWN_CHAIN) == ('KEY-3',)
+    assert globaldb.get_asset_identifiers_with_symbol('LOLZSYMBOL') == ()
+    assert ('lolzsymbol', None) in globaldb._symbol_cache
+    assert ('key', AssetType.OWN_CHAIN) in globaldb._symbol_cache
+
+    # adding a new asset makes the cached miss stale so the cache should be cleared
+    globaldb.add_asset(
+        asset_id='LOLZID',
+        asset_type=AssetType.OWN_CHAIN,
+        data={'name': 'Lolz coin', 'symbol': 'LOLZSYMBOL', 'started': 0},
+    )
+    assert globaldb._symbol_cache == {}
+    assert globaldb.get_asset_identifiers_with_symbol('LoLzSyMbOl') == ('LOLZID',)
+    assert symbol_to_asset_or_token('LOLZSYMBOL') == Asset('LOLZID')
+
+    # editing the symbol should also invalidate the lookup
+    globaldb.edit_custom_asset({
+        'identifier': 'LOLZID',
+        'asset_type': AssetType.OWN_CHAIN,
+        'name': 'Lolz coin',
+        'symbol': 'LOLZ2SYMBOL',
+        'started': 0,
+    })
+    assert globaldb.get_asset_identifiers_with_symbol('LOLZSYMBOL') == ()
+    assert globaldb.get_asset_identifiers_with_symbol('LOLZ2SYMBOL') == ('LOLZID',)
+    globaldb.delete_custom_asset('LOLZID')
+    assert globaldb.get_asset_identifiers_with_symbol('LOLZ2SYMBOL') == ()
+
+
 @pytest.mark.parametrize('enum_class, table_name', [
     (AssetType, 'asset_types'),
     (HistoricalPriceOracle, 'price_history_source_types'),
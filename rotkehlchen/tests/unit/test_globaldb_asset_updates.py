@@ -1,9 +1,10 @@
 import pytest
 
+from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.typing import AssetData, AssetType
 from rotkehlchen.chain.ethereum.typing import string_to_ethereum_address
 from rotkehlchen.errors import DeserializationError
-from rotkehlchen.globaldb.updates import AssetsUpdater
+from rotkehlchen.globaldb.updates import ASSETS_VERSION_KEY, AssetsUpdater
 from rotkehlchen.typing import Timestamp
 
 
@@ -170,3 +171,49 @@ def test_parse_full_insert(assets_updater, text, expected_data, error_msg):
             assets_updater._parse_full_insert(text)
 
         assert error_msg in str(excinfo.value)
+
+
+def test_apply_updates_in_place(assets_updater, globaldb):
+    """Test that updates are applied on the global DB in one go, that unresolved conflicts
+    roll everything back and that resolving to remote keeps the asset's related data"""
+    dai_id = '_ceth_0x6B175474E89094C44Da98b954EedeAC495271d0F'
+    text = """INSERT INTO assets(identifier,type,name,symbol,started, swapped_for, coingecko, cryptocompare, details_reference) VALUES("121-ada-FADS-as", "F","A name","SYMBOL",NULL, NULL,"", "", "121-ada-FADS-as");INSERT INTO common_asset_details(asset_id, forked) VALUES("121-ada-FADS-as", "BTC");
+*
+INSERT INTO ethereum_tokens(address, decimals, protocol) VALUES("0x6B175474E89094C44Da98b954EedeAC495271d0F", 8, "maker");INSERT INTO assets(identifier,type, name, symbol,started, swapped_for, coingecko, cryptocompare, details_reference) VALUES("_ceth_0x6B175474E89094C44Da98b954EedeAC495271d0F", "C", "New Multi Collateral DAI", "NDAI", 1573672677, NULL, "dai", NULL, "0x6B175474E89094C44Da98b954EedeAC495271d0F");
+*
+"""  # noqa: E501
+    connection = globaldb._conn
+    cursor = connection.cursor()
+    cursor.execute(
+        'INSERT INTO price_history(from_asset, to_asset, source_type, timestamp, price) '
+        'VALUES(?, "USD", "A", 1, "1")',
+        (dai_id,),
+    )
+    connection.commit()
+    updates = [(999999991, assets_updater._parse_update_entries(999999991, text))]
+    assert len(updates[0][1]) == 2
+
+    assert assets_updater._apply_updates(connection, updates, conflicts=None) == set()
+    assert [x[0].identifier for x in assets_updater.conflicts] == [dai_id]
+    assert cursor.execute('SELECT COUNT(*) FROM assets WHERE identifier="121-ada-FADS-as"').fetchone()[0] == 0  # noqa: E501
+    assert globaldb.get_setting_value(ASSETS_VERSION_KEY, 0) != 999999991
+
+    assets_updater.conflicts = []
+    updated = assets_updater._apply_updates(
+        connection,
+        updates,
+        conflicts={Asset(dai_id): 'remote'},
+    )
+    assert updated == {'121-ada-FADS-as', dai_id}
+    assert assets_updater.conflicts == []
+    assert globaldb.get_setting_value(ASSETS_VERSION_KEY, 0) == 999999991
+    assert cursor.execute('SELECT COUNT(*) FROM assets WHERE identifier="121-ada-FADS-as"').fetchone()[0] == 1  # noqa: E501
+    assert cursor.execute(
+        'SELECT name, symbol FROM assets WHERE identifier=?', (dai_id,),
+    ).fetchone() == ('New Multi Collateral DAI', 'NDAI')
+    assert cursor.execute(
+        'SELECT decimals, protocol FROM ethereum_tokens WHERE address=?', (dai_id[6:],),
+    ).fetchone() == (8, 'maker')
+    assert cursor.execute(
+        'SELECT COUNT(*) FROM price_history WHERE from_asset=?', (dai_id,),
+    ).fetchone()[0] == 1
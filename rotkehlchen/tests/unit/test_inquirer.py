@@ -2,6 +2,7 @@ import os
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
+import gevent
 import pytest
 import requests
 
@@ -10,6 +11,7 @@ from rotkehlchen.assets.typing import AssetType
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_AAVE, A_BTC, A_CRV, A_ETH, A_EUR, A_LINK, A_USD
 from rotkehlchen.constants.resolver import ethaddress_to_identifier
+from rotkehlchen.constants.timing import DAY_IN_SECONDS
 from rotkehlchen.errors import RemoteError
 from rotkehlchen.externalapis.coingecko import Coingecko
 from rotkehlchen.externalapis.cryptocompare import Cryptocompare
@@ -19,6 +21,7 @@ from rotkehlchen.history.typing import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.inquirer import (
     CURRENT_PRICE_CACHE_SECS,
     DEFAULT_CURRENT_PRICE_ORACLES_ORDER,
+    DEFAULT_CURRENT_PRICE_STALENESS,
     CurrentPriceOracle,
     _query_currency_converterapi,
 )
@@ -69,7 +72,11 @@ def test_switching_to_backup_api(inquirer):
             return MockResponse(501, '{"msg": "some error")')
         return original_get(url)
 
-    with patch('requests.get', side_effect=mock_xratescom_fail):
+    session_patch = patch(
+        'rotkehlchen.utils.network._default_session.get',
+        side_effect=mock_xratescom_fail,
+    )
+    with patch('requests.get', side_effect=mock_xratescom_fail), session_patch:
         result = inquirer._query_fiat_pair(A_USD, A_EUR)
         assert result and isinstance(result, FVal)
         assert count > 1, 'requests.get should have been called more than once'
@@ -114,7 +121,11 @@ def test_fallback_to_cached_values_within_a_month(inquirer):  # pylint: disable=
     )]
     GlobalDBHandler().add_historical_prices(cache_data)
 
-    with patch('requests.get', side_effect=mock_api_remote_fail):
+    session_patch = patch(
+        'rotkehlchen.utils.network._default_session.get',
+        side_effect=mock_api_remote_fail,
+    )
+    with patch('requests.get', side_effect=mock_api_remote_fail), session_patch:
         # We fail to find a response but then go back 15 days and find the cached response
         result = inquirer._query_fiat_pair(A_EUR, A_JPY)
         assert result == eurjpy_val
@@ -205,6 +216,50 @@ def test_find_usd_price_cache(inquirer, freezer):  # pylint: disable=unused-argu
         assert price == Price(FVal('2'))
 
 
+@pytest.mark.parametrize('should_mock_current_price_queries', [False])
+def test_saved_current_prices_used_and_queried_again(inquirer, globaldb):
+    """Test that prices saved in a previous run within the staleness window are used
+    right away and queried again in the background"""
+    oracle_prices = {'ETH': Price(FVal('2')), 'BTC': Price(FVal('20000'))}
+
+    def mock_query_price(from_asset, to_asset):
+        assert to_asset == A_USD
+        return oracle_prices[from_asset.identifier]
+
+    now = ts_now()
+    globaldb.add_current_prices([
+        (A_ETH, A_USD, Price(FVal('1')), 'cryptocompare', Timestamp(now - 100)),
+        (A_BTC, A_USD, Price(FVal('10000')), 'coingecko', Timestamp(now - 3 * DAY_IN_SECONDS)),
+    ])
+    inquirer.load_saved_current_prices(staleness=DEFAULT_CURRENT_PRICE_STALENESS)
+    inquirer.set_oracles_order(oracles=[CurrentPriceOracle.CRYPTOCOMPARE])
+    cc_patch = patch.object(
+        inquirer._cryptocompare,
+        'query_current_price',
+        wraps=mock_query_price,
+    )
+    with cc_patch as cc:
+        assert inquirer.find_usd_price(A_ETH) == Price(FVal('1'))
+        assert cc.call_count == 0
+        gevent.sleep(0.1)  # let the price be queried again
+        assert cc.call_count == 1
+        assert inquirer.find_usd_price(A_ETH) == Price(FVal('2'))
+        assert cc.call_count == 1
+
+        # the saved BTC price is older than the staleness window
+        assert inquirer.find_usd_price(A_BTC) == Price(FVal('20000'))
+        assert cc.call_count == 2
+
+    # found prices are saved in batches
+    assert globaldb.get_current_prices(after_ts=Timestamp(now - 50)) == []
+    inquirer.save_current_prices()
+    saved_prices = {x[0]: x[2:4] for x in globaldb.get_current_prices(after_ts=Timestamp(0))}
+    assert saved_prices == {
+        'ETH': (Price(FVal('2')), 'cryptocompare'),
+        'BTC': (Price(FVal('20000')), 'cryptocompare'),
+    }
+
+
 def test_all_common_methods_implemented():
     """Test all current price oracles implement the expected methods.
     """
@@ -224,6 +279,8 @@ def test_all_common_methods_implemented():
         # Check 'query_historical_price' method exists
         assert hasattr(instance, 'query_current_price')
         assert callable(instance.query_current_price)
+        assert hasattr(instance, 'query_multiple_current_prices')
+        assert callable(instance.query_multiple_current_prices)
 
 
 def test_set_oracles_order(inquirer):
@@ -289,6 +346,47 @@ def test_find_usd_price_via_second_oracle(inquirer):
         assert oracle_instance.query_current_price.call_count == 1
 
 
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+@pytest.mark.parametrize('should_mock_current_price_queries', [False])
+def test_find_usd_prices_queries_only_misses_in_next_oracle(inquirer):
+    """Test that the oracles are queried once for many assets and that only the
+    assets without a price are queried from the next oracle"""
+    inquirer._oracle_instances = [MagicMock() for _ in inquirer._oracles]
+    for oracle_instance in inquirer._oracle_instances:
+        oracle_instance.rate_limited_in_last.return_value = False
+    inquirer._oracle_instances[0].query_multiple_current_prices.return_value = {
+        A_BTC: Price(FVal('30000')),
+        A_ETH: Price(ZERO),
+    }
+    inquirer._oracle_instances[1].query_multiple_current_prices.return_value = {
+        A_ETH: Price(FVal('2000')),
+    }
+
+    prices = inquirer.find_usd_prices([A_BTC, A_ETH, A_CRV, A_USD])
+    assert prices == {
+        A_BTC: Price(FVal('30000')),
+        A_ETH: Price(FVal('2000')),
+        A_CRV: Price(ZERO),
+        A_USD: Price(FVal(1)),
+    }
+    first_call = inquirer._oracle_instances[0].query_multiple_current_prices.call_args
+    assert set(first_call.kwargs['from_assets']) == {A_BTC, A_ETH, A_CRV}
+    second_call = inquirer._oracle_instances[1].query_multiple_current_prices.call_args
+    assert set(second_call.kwargs['from_assets']) == {A_ETH, A_CRV}
+    for oracle_instance in inquirer._oracle_instances:
+        assert oracle_instance.query_current_price.call_count == 0
+
+    # All prices are now cached, including the ones not found
+    assert inquirer.find_usd_prices([A_BTC, A_ETH, A_CRV]) == {
+        A_BTC: Price(FVal('30000')),
+        A_ETH: Price(FVal('2000')),
+        A_CRV: Price(ZERO),
+    }
+    assert inquirer.find_usd_price(A_ETH) == Price(FVal('2000'))
+    for oracle_instance in inquirer._oracle_instances[:2]:
+        assert oracle_instance.query_multiple_current_prices.call_count == 1
+
+
 @pytest.mark.parametrize('use_clean_caching_directory', [True])
 @pytest.mark.parametrize('should_mock_current_price_queries', [True])
 @pytest.mark.parametrize('mocked_current_prices', [UNDERLYING_ASSET_PRICES])
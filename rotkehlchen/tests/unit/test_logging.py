@@ -0,0 +1,91 @@
+import logging
+from typing import List
+
+import gevent
+
+from rotkehlchen.logging import QueuedLogHandler, RotkehlchenLogsAdapter
+
+
+class ListHandler(logging.Handler):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(self.format(record))
+
+
+class StrCounter():
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def __str__(self) -> str:
+        self.calls += 1
+        return 'counted'
+
+
+def _make_logger(name: str, handler: logging.Handler, level: int) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(level)
+    return logger
+
+
+def test_messages_formatted_lazily():
+    target = ListHandler()
+    queued = QueuedLogHandler(handlers=[target])
+    log = RotkehlchenLogsAdapter(_make_logger('test_lazy_logging', queued, logging.INFO))
+    counter = StrCounter()
+
+    log.debug('below the level', value=counter)
+    log.info('above the level', value=counter, other=1)
+    assert counter.calls == 0
+    assert target.messages == []
+
+    queued.flush()
+    assert counter.calls == 1
+    assert target.messages == ['Main Greenlet: above the level value=counted, other=1']
+    queued.flush()
+    assert target.messages == ['Main Greenlet: above the level value=counted, other=1']
+
+
+def test_queued_records_written_in_order_by_writer():
+    target = ListHandler()
+    queued = QueuedLogHandler(handlers=[target])
+    log = RotkehlchenLogsAdapter(_make_logger('test_queued_logging', queued, logging.DEBUG))
+
+    def log_many(prefix: str) -> None:
+        for idx in range(3):
+            log.debug(f'{prefix}{idx}')
+            gevent.sleep(0)
+
+    greenlet = gevent.spawn(log_many, 'a')
+    greenlet.name = 'Logging greenlet'
+    log.debug('first')
+    assert target.messages == []
+    greenlet.join()
+    gevent.sleep(0)  # let the writer finish
+    assert queued.writer is None
+    assert target.messages == [
+        'Main Greenlet: first',
+        'Logging greenlet: a0',
+        'Logging greenlet: a1',
+        'Logging greenlet: a2',
+    ]
+
+
+def test_full_queue_is_written_by_logging_greenlet():
+    target = ListHandler()
+    target.setLevel(logging.INFO)
+    queued = QueuedLogHandler(handlers=[target], max_queue_size=3)
+    log = RotkehlchenLogsAdapter(_make_logger('test_full_queue_logging', queued, logging.DEBUG))
+
+    log.info('one')
+    log.debug('not for the target')
+    assert target.messages == []
+    log.info('three')
+    assert target.messages == ['Main Greenlet: one', 'Main Greenlet: three']
+    assert len(queued.queue) == 0
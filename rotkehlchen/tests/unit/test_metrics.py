@@ -0,0 +1,128 @@
+import sqlite3
+
+import gevent
+import pytest
+
+from rotkehlchen.greenlets import GreenletManager
+from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.metrics import (
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    TimedConnectionMixin,
+    TimedCursorMixin,
+    metrics_registry,
+)
+
+
+def _sample(text: str, prefix: str) -> float:
+    """Value of the only sample of the rendered text that starts with prefix"""
+    values = [x.rsplit(' ', 1)[1] for x in text.splitlines() if x.startswith(prefix)]
+    assert len(values) == 1
+    return float(values[0])
+
+
+def test_render_prometheus_format():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter('test_events_total', 'Events', ('kind',)))
+    counter.inc(kind='a')
+    counter.inc(2, kind='a')
+    counter.inc(kind='with "quotes"')
+    gauge = Gauge('test_queued', 'Queued items')
+    gauge.set(1.5)
+
+    assert registry.render(extra_metrics=[gauge]) == (
+        '# HELP test_events_total Events\n'
+        '# TYPE test_events_total counter\n'
+        'test_events_total{kind="a"} 3\n'
+        'test_events_total{kind="with \\"quotes\\""} 1\n'
+        '# HELP test_queued Queued items\n'
+        '# TYPE test_queued gauge\n'
+        'test_queued 1.5\n'
+    )
+
+
+def test_histogram_buckets():
+    histogram = Histogram('test_duration_seconds', 'Durations', ('op',), buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 2, 3):
+        histogram.observe(value, op='query')
+
+    assert histogram.render()[2:] == [
+        'test_duration_seconds_bucket{op="query",le="0.1"} 2',
+        'test_duration_seconds_bucket{op="query",le="1.0"} 3',
+        'test_duration_seconds_bucket{op="query",le="+Inf"} 5',
+        'test_duration_seconds_sum{op="query"} 5.65',
+        'test_duration_seconds_count{op="query"} 5',
+    ]
+
+
+class _TestCursor(TimedCursorMixin, sqlite3.Cursor):
+    db_name = 'test_metrics'
+
+
+class _TestConnection(TimedConnectionMixin, sqlite3.Connection):
+    cursor_class = _TestCursor
+
+
+def test_timed_db_statements():
+    """Test that statements are timed both via cursors and via the connection shortcuts"""
+    conn = sqlite3.connect(':memory:', factory=_TestConnection)
+    conn.executescript('CREATE TABLE a(x INTEGER);')
+    conn.executemany('INSERT INTO a VALUES(?)', [(1,), (2,)])
+    cursor = conn.cursor()
+    assert isinstance(cursor, _TestCursor)
+    assert cursor.execute('  select SUM(x) FROM a').fetchone() == (3,)
+    assert conn.execute('SELECT x FROM a WHERE x=?', (2,)).fetchall() == [(2,)]
+    conn.close()
+
+    text = metrics_registry.render()
+    prefix = 'rotki_db_query_duration_seconds_count{db="test_metrics",statement='
+    assert _sample(text, prefix + '"SCRIPT"}') == 1
+    assert _sample(text, prefix + '"INSERT"}') == 1
+    assert _sample(text, prefix + '"SELECT"}') == 2
+
+
+def _succeeding_task(value: int) -> int:
+    return value
+
+
+def _failing_task() -> None:
+    raise ValueError('boom')
+
+
+def _sleeping_task() -> None:
+    gevent.sleep(10)
+
+
+def test_greenlet_tasks_are_timed():
+    manager = GreenletManager(msg_aggregator=MessagesAggregator())
+    manager.spawn_and_track(
+        after_seconds=None,
+        task_name='succeed',
+        exception_is_error=True,
+        method=_succeeding_task,
+        value=1,
+    )
+    manager.spawn_and_track(
+        after_seconds=None,
+        task_name='fail',
+        exception_is_error=False,
+        method=_failing_task,
+    )
+    manager.spawn_and_track(
+        after_seconds=None,
+        task_name='sleep',
+        exception_is_error=False,
+        method=_sleeping_task,
+    )
+    gevent.joinall(manager.greenlets[:2])
+    assert manager.greenlets[0].value == 1
+    manager.clear()
+
+    text = metrics_registry.render()
+    prefix = 'rotki_greenlet_task_duration_seconds_count{task='
+    assert _sample(text, prefix + '"_succeeding_task",outcome="success"}') == 1
+    assert _sample(text, prefix + '"_failing_task",outcome="error"}') == 1
+    assert _sample(text, prefix + '"_sleeping_task",outcome="killed"}') == 1
+    assert _sample(text, 'rotki_greenlet_task_duration_seconds_sum{task="_sleeping_task"') == pytest.approx(0, abs=1)  # noqa: E501
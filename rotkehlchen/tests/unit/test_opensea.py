@@ -0,0 +1,155 @@
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+
+import gevent
+
+from rotkehlchen.chain.ethereum.modules.nfts import FREE_NFT_LIMIT, Nfts
+from rotkehlchen.errors import RemoteError
+from rotkehlchen.externalapis.opensea import NFT, Opensea
+from rotkehlchen.fval import FVal
+from rotkehlchen.tests.utils.factories import make_ethereum_address
+
+FLOOR_PRICES = {'slug-a': '1.5', 'slug-b': None, 'slug-c': '0.25'}
+
+
+def _make_collection(name: str, slug: str) -> Dict[str, Any]:
+    return {
+        'name': name,
+        'slug': slug,
+        'primary_asset_contracts': [{'address': make_ethereum_address()}],
+        'banner_image_url': None,
+        'description': None,
+        'large_image_url': None,
+    }
+
+
+class MockOpensea():
+
+    def __init__(self, account_collections: Dict[str, List[Dict[str, Any]]]) -> None:
+        self.account_collections = account_collections
+        self.stats_queries: List[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.failing_slugs: List[str] = []
+
+    def query(self, endpoint: str, options: Optional[Dict[str, Any]] = None, **kwargs: Any):
+        assert options is not None
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        gevent.sleep(0.01)
+        self.in_flight -= 1
+        if endpoint == 'collections':
+            return self.account_collections[options['asset_owner']]
+        # else collectionstats
+        self.stats_queries.append(options['name'])
+        if options['name'] in self.failing_slugs:
+            raise RemoteError('collectionstats query failed')
+        return {'stats': {'floor_price': FLOOR_PRICES[options['name']]}}
+
+
+def test_floor_prices_queried_concurrently_and_cached(
+        database,
+        globaldb,  # pylint: disable=unused-argument
+        function_scope_messages_aggregator,
+):
+    account1, account2 = make_ethereum_address(), make_ethereum_address()
+    mock = MockOpensea(account_collections={
+        account1: [_make_collection('A', 'slug-a'), _make_collection('B', 'slug-b')],
+        account2: [_make_collection('B', 'slug-b'), _make_collection('C', 'slug-c')],
+    })
+    opensea = Opensea(database=database, msg_aggregator=function_scope_messages_aggregator)
+    with patch.object(opensea, '_query', side_effect=mock.query):
+        opensea.gather_collections(accounts=[account1, account2])
+
+    assert sorted(mock.stats_queries) == ['slug-a', 'slug-b', 'slug-c']
+    assert mock.max_in_flight > 1
+    assert opensea.collections['A'].floor_price == FVal('1.5')
+    assert opensea.collections['B'].floor_price is None
+    assert opensea.collections['C'].floor_price == FVal('0.25')
+
+    # a new instance takes the floor prices from the global DB cache
+    mock.stats_queries = []
+    opensea = Opensea(database=database, msg_aggregator=function_scope_messages_aggregator)
+    with patch.object(opensea, '_query', side_effect=mock.query):
+        opensea.gather_account_collections(account=account2)
+
+    assert mock.stats_queries == []
+    assert opensea.collections['B'].floor_price is None
+    assert opensea.collections['C'].floor_price == FVal('0.25')
+
+    # and queries them again after the cache TTL
+    with patch('rotkehlchen.externalapis.opensea.OPENSEA_FLOOR_PRICE_CACHE_TTL_SECS', new=-1):
+        opensea = Opensea(database=database, msg_aggregator=function_scope_messages_aggregator)
+        with patch.object(opensea, '_query', side_effect=mock.query):
+            opensea.gather_account_collections(account=account1)
+
+    assert sorted(mock.stats_queries) == ['slug-a', 'slug-b']
+
+
+def test_failed_floor_price_query_not_cached(
+        database,
+        globaldb,  # pylint: disable=unused-argument
+        function_scope_messages_aggregator,
+):
+    account = make_ethereum_address()
+    mock = MockOpensea(account_collections={
+        account: [_make_collection('A', 'slug-a'), _make_collection('C', 'slug-c')],
+    })
+    mock.failing_slugs = ['slug-a']
+    opensea = Opensea(database=database, msg_aggregator=function_scope_messages_aggregator)
+    with patch.object(opensea, '_query', side_effect=mock.query):
+        opensea.gather_account_collections(account=account)
+
+    assert sorted(mock.stats_queries) == ['slug-a', 'slug-c']
+    assert opensea.collections['A'].floor_price is None
+    assert opensea.collections['C'].floor_price == FVal('0.25')
+
+    # only the failed floor price is queried again
+    mock.stats_queries = []
+    mock.failing_slugs = []
+    opensea = Opensea(database=database, msg_aggregator=function_scope_messages_aggregator)
+    with patch.object(opensea, '_query', side_effect=mock.query):
+        opensea.gather_account_collections(account=account)
+
+    assert mock.stats_queries == ['slug-a']
+    assert opensea.collections['A'].floor_price == FVal('1.5')
+
+
+def _make_nfts(owner: str, number: int) -> List[NFT]:
+    return [NFT(
+        token_identifier=f'_nft_{owner}_{idx}',
+        background_color=None,
+        image_url=None,
+        name=None,
+        external_link=None,
+        permalink=None,
+        price_eth=FVal(1),
+        price_usd=FVal(1),
+        collection=None,
+    ) for idx in range(number)]
+
+
+def test_free_limit_stops_querying_accounts(database, function_scope_messages_aggregator):
+    accounts = [make_ethereum_address() for _ in range(4)]
+    account_nfts = {
+        accounts[0]: _make_nfts(accounts[0], FREE_NFT_LIMIT - 3),
+        accounts[1]: [],
+        accounts[2]: _make_nfts(accounts[2], 5),
+        accounts[3]: _make_nfts(accounts[3], 1),
+    }
+    nfts = Nfts(
+        ethereum_manager=None,
+        database=database,
+        premium=None,
+        msg_aggregator=function_scope_messages_aggregator,
+    )
+    get_patch = patch.object(nfts.opensea, 'get_account_nfts', side_effect=account_nfts.get)
+    with get_patch as get_mock:
+        result = nfts.get_all_info(addresses=accounts, ignore_cache=True)
+
+    assert [x.args[0] for x in get_mock.call_args_list] == accounts[:3]
+    assert result.entries_found == FREE_NFT_LIMIT
+    assert result.addresses == {
+        accounts[0]: account_nfts[accounts[0]],
+        accounts[2]: account_nfts[accounts[2]][:3],
+    }
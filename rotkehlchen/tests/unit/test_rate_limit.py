@@ -0,0 +1,133 @@
+from typing import List
+
+import gevent
+import pytest
+
+from rotkehlchen.utils.rate_limit import RateLimiter, api_key_limiter_key
+
+
+class FakeClock():
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.sleeps: List[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture(name='clock')
+def fixture_clock():
+    return FakeClock()
+
+
+@pytest.fixture(name='limiter')
+def fixture_limiter(clock):
+    limiter = RateLimiter(now_fn=clock.time, sleep=clock.sleep)
+    limiter.configure(key='api.example.com', rate=2, capacity=4)
+    return limiter
+
+
+def test_burst_then_pace(limiter, clock):
+    """Test that the burst capacity is served at once and then requests are paced"""
+    for _ in range(4):
+        assert limiter.acquire('api.example.com') == 0
+    assert clock.sleeps == []
+
+    assert limiter.acquire('api.example.com') == pytest.approx(0.5)
+    assert limiter.acquire('api.example.com') == pytest.approx(0.5)
+    # after being idle the bucket refills but not above its capacity
+    clock.now += 100
+    for _ in range(4):
+        assert limiter.acquire('api.example.com') == 0
+    assert limiter.acquire('api.example.com', weight=3) == pytest.approx(1.5)
+
+    stats = limiter.stats('api.example.com')['api.example.com']
+    assert stats['requests'] == 11
+    assert stats['weight'] == 13
+    assert stats['throttled'] == 3
+    assert stats['waited_secs'] == pytest.approx(2.5)
+    assert stats['penalties'] == 0
+
+
+def test_try_acquire(limiter, clock):
+    for _ in range(4):
+        assert limiter.try_acquire('api.example.com') is True
+    assert limiter.try_acquire('api.example.com') is False
+    clock.now += 0.5
+    assert limiter.try_acquire('api.example.com') is True
+    assert limiter.try_acquire('api.example.com') is False
+    assert clock.sleeps == []
+    assert limiter.stats('api.example.com')['api.example.com']['requests'] == 5
+
+
+def test_penalize(limiter, clock):
+    """Test that after the server rate limits us nothing goes out until the backoff passes"""
+    limiter.acquire('api.example.com')
+    limiter.penalize('api.example.com', seconds=10)
+    assert limiter.try_acquire('api.example.com') is False
+    assert limiter.acquire('api.example.com') == pytest.approx(10.5)
+    assert limiter.acquire('api.example.com') == pytest.approx(0.5)
+    assert limiter.stats()['api.example.com']['penalties'] == 1
+
+
+def test_unconfigured_and_reconfigured_keys(limiter, clock):
+    for _ in range(10):
+        assert limiter.acquire('other.example.com') == 0
+    limiter.penalize('other.example.com', seconds=10)
+    assert limiter.try_acquire('other.example.com') is True
+    assert limiter.stats('other.example.com') == {}
+    assert list(limiter.stats().keys()) == ['api.example.com']
+
+    limiter.configure(key='api.example.com', rate=1, capacity=1)
+    assert limiter.acquire('api.example.com') == 0
+    assert limiter.acquire('api.example.com') == pytest.approx(1)
+    assert limiter.stats()['api.example.com']['requests'] == 2
+    limiter.remove('api.example.com')
+    assert limiter.stats() == {}
+
+
+def test_reset(limiter, clock):
+    """Test that resetting refills the buckets and clears the counters but keeps the keys"""
+    for _ in range(6):
+        limiter.acquire('api.example.com')
+    limiter.penalize('api.example.com', seconds=10)
+    limiter.reset()
+    stats = limiter.stats()['api.example.com']
+    assert (stats['rate'], stats['capacity']) == (2, 4)
+    assert stats['requests'] == stats['throttled'] == stats['penalties'] == 0
+    for _ in range(4):
+        assert limiter.try_acquire('api.example.com') is True
+    assert limiter.try_acquire('api.example.com') is False
+
+
+def test_greenlets_are_served_in_order(clock):
+    """Test that greenlets waiting on the same key are paced and served in order
+    and that they don't block greenlets of other keys"""
+    limiter = RateLimiter(now_fn=clock.time, sleep=gevent.sleep)
+    limiter.configure(key='slow', rate=20, capacity=1)
+    served = []
+
+    def query(key: str, idx: int) -> None:
+        limiter.acquire(key)
+        served.append((key, idx))
+
+    greenlets = [gevent.spawn(query, 'slow', idx) for idx in range(3)]
+    greenlets.append(gevent.spawn(query, 'fast', 0))
+    gevent.joinall(greenlets, timeout=5, raise_error=True)
+    assert served == [('slow', 0), ('fast', 0), ('slow', 1), ('slow', 2)]
+    stats = limiter.stats('slow')['slow']
+    assert stats['throttled'] == 2
+    assert stats['waited_secs'] == pytest.approx(0.05 + 0.1)
+
+
+def test_api_key_limiter_key():
+    key = api_key_limiter_key('api.kraken.com', 'secretkey')
+    assert key.startswith('api.kraken.com:')
+    assert 'secretkey' not in key
+    assert key == api_key_limiter_key('api.kraken.com', 'secretkey')
+    assert key != api_key_limiter_key('api.kraken.com', 'otherkey')
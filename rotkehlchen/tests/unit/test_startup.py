@@ -0,0 +1,69 @@
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+# Seconds the backend server module may take to import. Kept generous so that it only
+# catches big regressions and not slow CI machines.
+BACKEND_IMPORT_TIME_BUDGET = 10
+
+# Modules that should only be imported when an exchange is set up or a module activated
+LAZILY_IMPORTED_MODULES = (
+    'rotkehlchen.exchanges.binance',
+    'rotkehlchen.exchanges.bitmex',
+    'rotkehlchen.exchanges.bitstamp',
+    'rotkehlchen.exchanges.bittrex',
+    'rotkehlchen.exchanges.coinbase',
+    'rotkehlchen.exchanges.coinbasepro',
+    'rotkehlchen.exchanges.ftx',
+    'rotkehlchen.exchanges.gemini',
+    'rotkehlchen.exchanges.kraken',
+    'rotkehlchen.exchanges.kucoin',
+    'rotkehlchen.exchanges.poloniex',
+    'rotkehlchen.chain.ethereum.modules.l2.loopring',
+    'rotkehlchen.chain.ethereum.modules.yearn.vaultsv2',
+)
+
+
+def _get_import_times(module: str) -> Dict[str, int]:
+    """Imports the given module in a fresh interpreter with -X importtime
+
+    Returns a mapping of each imported module to its cumulative import time in microseconds
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            cumulative_us = int(parts[1])
+        except ValueError:  # the header line
+            continue
+        import_times[parts[2].strip()] = cumulative_us
+
+    return import_times
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='-X importtime requires python 3.7')
+def test_backend_import_time():
+    """Test that importing the backend stays within budget and does not import
+    exchange and ethereum modules that should be lazily loaded"""
+    import_times = _get_import_times('rotkehlchen.server')
+    assert 'rotkehlchen.server' in import_times
+    import_seconds = import_times['rotkehlchen.server'] / 1000000
+    assert import_seconds < BACKEND_IMPORT_TIME_BUDGET, (
+        f'Importing the backend took {import_seconds:.2f} seconds which is over '
+        f'the {BACKEND_IMPORT_TIME_BUDGET} seconds budget'
+    )
+    eagerly_imported = [x for x in LAZILY_IMPORTED_MODULES if x in import_times]
+    assert eagerly_imported == [], f'Modules {eagerly_imported} were imported at startup'
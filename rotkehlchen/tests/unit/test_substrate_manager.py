@@ -101,9 +101,65 @@ def test_get_account_balance_calculation(kusama_manager):
     assert balance == FVal(111.004701754251)  # (free + reserved)/10**12
 
 
+def test_get_accounts_balance_multi_query(kusama_manager):
+    """Test `_get_accounts_balance()` requests the balances of all the accounts
+    with a single storage query and that accounts without storage entry have
+    zero balance.
+    """
+    account_info = {
+        'nonce': 617,
+        'refcount': 1,
+        'data': {
+            'free': 92949368426409,
+            'reserved': 18055333327842,
+            'miscFrozen': 50000000000000,
+            'feeFrozen': 1000000000000,
+        },
+    }
+    mock_node_interface = MagicMock()
+    mock_node_interface.get_chain_head.return_value = '0xhead'
+    mock_node_interface.get_metadata_storage_function.return_value.get_params_type_string.return_value = ['AccountId']  # noqa: E501
+    mock_node_interface.convert_storage_parameter.side_effect = lambda _, account: account
+    mock_node_interface.runtime_config.create_scale_object.return_value.encode.side_effect = lambda x: x  # noqa: E501
+    mock_node_interface.generate_storage_hash.side_effect = lambda **kwargs: f'0x{kwargs["params"][0]}'  # noqa: E501
+    mock_node_interface.rpc_request.return_value = {
+        'jsonrpc': '2.0',
+        'result': [{
+            'block': '0xhead',
+            'changes': [
+                [f'0x{SUBSTRATE_ACC1_KSM_ADDR}', '0xdata'],
+                [f'0x{SUBSTRATE_ACC2_KSM_ADDR}', None],
+            ],
+        }],
+    }
+    mock_node_interface.decode_scale.return_value = account_info
+
+    balances = kusama_manager._get_accounts_balance(
+        accounts=[SUBSTRATE_ACC1_KSM_ADDR, SUBSTRATE_ACC2_KSM_ADDR],
+        node_interface=mock_node_interface,
+    )
+    assert balances == {
+        SUBSTRATE_ACC1_KSM_ADDR: FVal(111.004701754251),  # (free + reserved)/10**12
+        SUBSTRATE_ACC2_KSM_ADDR: ZERO,
+    }
+    assert mock_node_interface.rpc_request.call_count == 1
+    assert mock_node_interface.rpc_request.call_args[1]['params'] == [
+        [f'0x{SUBSTRATE_ACC1_KSM_ADDR}', f'0x{SUBSTRATE_ACC2_KSM_ADDR}'],
+        '0xhead',
+    ]
+
+    mock_node_interface.rpc_request.return_value = {'error': {'message': 'boom'}}
+    with pytest.raises(RemoteError):
+        kusama_manager._get_accounts_balance(
+            accounts=[SUBSTRATE_ACC1_KSM_ADDR],
+            node_interface=mock_node_interface,
+        )
+
+
 def test_set_available_nodes_call_order(kusama_manager):
     """Test `_set_available_nodes_call_order()` sets the available nodes sorted
-    by preference; currently own node first and then by the highest 'weight_block'.
+    by preference; currently own node first, then the nodes without measured
+    latency by the highest 'weight_block' and then the rest by lowest latency.
     """
     # Due to `available_node_attributes_map` is a dict we must fake a key for
     # testing purposes as currently KusamaNodeName only has PARITY
@@ -135,6 +191,7 @@ def test_set_available_nodes_call_order(kusama_manager):
         node_attrs_item_1,
     ])
     kusama_manager.available_node_attributes_map = available_node_attributes_map
+    kusama_manager.node_latencies = {}
     kusama_manager._set_available_nodes_call_order()
 
     assert kusama_manager.available_nodes_call_order == [
@@ -143,6 +200,28 @@ def test_set_available_nodes_call_order(kusama_manager):
         node_attrs_item_2,
     ]
 
+    # Nodes with a measured latency go after the rest, from the fastest to the slowest
+    kusama_manager.record_node_latency(KusamaNodeName.PARITY, 0.5)
+    assert kusama_manager.available_nodes_call_order == [
+        node_attrs_item_1,
+        node_attrs_item_2,
+        node_attrs_item_3,
+    ]
+    kusama_manager.record_node_latency(fake_kusama_node_name, 2)
+    assert kusama_manager.available_nodes_call_order == [
+        node_attrs_item_1,
+        node_attrs_item_3,
+        node_attrs_item_2,
+    ]
+    # A failed request of the fastest node makes it slower than the rest
+    kusama_manager.record_node_latency(KusamaNodeName.PARITY, 10)
+    assert kusama_manager.node_latencies[KusamaNodeName.PARITY] == pytest.approx(3.35)
+    assert kusama_manager.available_nodes_call_order == [
+        node_attrs_item_1,
+        node_attrs_item_2,
+        node_attrs_item_3,
+    ]
+
 
 @pytest.mark.parametrize('endpoint, formatted_endpoint', [
     ('', 'http://'),
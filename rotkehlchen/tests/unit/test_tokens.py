@@ -3,9 +3,10 @@ from unittest.mock import patch
 import pytest
 import requests
 
-from rotkehlchen.chain.ethereum.tokens import EthTokens
+from rotkehlchen.chain.ethereum.tokens import EthTokens, _pack_addresses_batches
 from rotkehlchen.chain.ethereum.utils import token_normalized_value
-from rotkehlchen.constants.assets import A_BAT, A_MKR
+from rotkehlchen.constants.assets import A_BAT, A_DAI, A_MKR, A_USDC
+from rotkehlchen.errors import RemoteError
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.blockchain import mock_etherscan_query
 from rotkehlchen.tests.utils.constants import A_GNO
@@ -68,15 +69,16 @@ def test_detected_tokens_cache(ethtokens, inquirer):  # pylint: disable=unused-a
         result1, _ = ethtokens.query_tokens_for_addresses([addr1, addr2], False)
         initial_call_count = etherscan_mock.call_count
 
-        # Then in second call autodetect queries should not have been made, and DB cache used
+        # Then in second call autodetect queries should not have been made, and DB cache used.
+        # The balances of both addresses are queried in one call
         result2, _ = ethtokens.query_tokens_for_addresses([addr1, addr2], False)
         call_count = etherscan_mock.call_count
-        assert call_count == initial_call_count + 2
+        assert call_count == initial_call_count + 1
 
         # In the third call force re-detection
         result3, _ = ethtokens.query_tokens_for_addresses([addr1, addr2], True)
         call_count = etherscan_mock.call_count
-        assert call_count == initial_call_count + 2 + initial_call_count
+        assert call_count == initial_call_count + 1 + initial_call_count
 
         assert result1 == result2 == result3
         assert len(result1) == len(eth_map)
@@ -110,3 +112,60 @@ def test_ignored_tokens_in_query(ethtokens, inquirer):  # pylint: disable=unused
         assert len(result[addr1]) == 1
         assert result[addr1][A_MKR] == FVal('4E-15')
         assert len(result[addr2]) == 1
+
+
+def test_pack_addresses_batches():
+    """Test that addresses with known tokens are packed in batches within the call limits"""
+    addr1, addr2, addr3, addr4 = [make_ethereum_address() for _ in range(4)]
+    address_tokens = [
+        (addr1, [A_GNO, A_MKR]),
+        (addr2, [A_MKR]),
+        (addr3, [A_DAI, A_USDC, A_BAT]),
+        (addr4, [A_DAI, A_USDC, A_BAT, A_GNO, A_MKR]),
+    ]
+    batches = _pack_addresses_batches(
+        address_tokens=address_tokens,
+        max_arguments=5,
+        max_balance_queries=10,
+    )
+    assert batches == [
+        ([addr1, addr2], [A_GNO, A_MKR]),
+        ([addr3], [A_DAI, A_USDC, A_BAT]),
+        # does not fit in any batch so it gets one by itself
+        ([addr4], [A_DAI, A_USDC, A_BAT, A_GNO, A_MKR]),
+    ]
+    batches = _pack_addresses_batches(
+        address_tokens=address_tokens,
+        max_arguments=100,
+        max_balance_queries=100,
+    )
+    assert batches == [
+        ([addr1, addr2, addr3, addr4], [A_GNO, A_MKR, A_DAI, A_USDC, A_BAT]),
+    ]
+
+
+def test_multiaccount_query_splits_on_failure(ethtokens, inquirer):  # pylint: disable=unused-argument  # noqa: E501
+    """Test that a failing multi account token balances call is retried with fewer accounts
+    and that the given block number is passed to all the calls"""
+    addresses = [make_ethereum_address() for _ in range(4)]
+    calls = []
+
+    def mock_call_contract(method_name, arguments, block_identifier, **kwargs):  # pylint: disable=unused-argument  # noqa: E501
+        assert method_name == 'tokensBalances'
+        calls.append((len(arguments[0]), block_identifier))
+        if len(arguments[0]) > 1:
+            raise RemoteError('out of gas')
+        return [[5 * 10**18] for _ in arguments[0]]
+
+    result = {}
+    with patch.object(ethtokens.ethereum, 'call_contract', side_effect=mock_call_contract):
+        ethtokens._get_addresses_tokens_balance(
+            addresses=addresses,
+            tokens=[A_MKR],
+            result=result,
+            max_arguments=100,
+            block_identifier=42,
+        )
+
+    assert calls == [(4, 42), (2, 42), (1, 42), (1, 42), (2, 42), (1, 42), (1, 42)]
+    assert result == {x: {A_MKR: FVal(5)} for x in addresses}
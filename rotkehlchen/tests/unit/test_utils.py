@@ -9,6 +9,7 @@ from eth_utils import to_checksum_address
 from hexbytes import HexBytes
 
 from rotkehlchen.chain.ethereum.utils import generate_address_via_create2
+from rotkehlchen.crypto import decrypt, encrypt_stream
 from rotkehlchen.errors import ConversionError
 from rotkehlchen.fval import FVal
 from rotkehlchen.serialization.deserialize import deserialize_timestamp_from_date
@@ -365,3 +366,16 @@ def test_jsonloads_list():
     with pytest.raises(JSONDecodeError) as e:
         jsonloads_list('{"foo": 1, "boo": "value"}')
     assert 'Returned json is not a list' in str(e.value)
+
+
+@pytest.mark.parametrize('chunk_sizes', [[], [0], [1], [16], [5, 11, 33, 2], [1000, 7, 4096]])
+def test_encrypt_stream(chunk_sizes):
+    """Test that data encrypted in chunks can be decrypted as a whole"""
+    source = bytes(i % 256 for i in range(sum(chunk_sizes)))
+    chunks, idx = [], 0
+    for size in chunk_sizes:
+        chunks.append(source[idx:idx + size])
+        idx += size
+
+    encrypted = b''.join(encrypt_stream(b'123', chunks))
+    assert decrypt(b'123', encrypted.decode()) == source
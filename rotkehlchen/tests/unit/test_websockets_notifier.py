@@ -0,0 +1,119 @@
+import json
+from typing import Any, Dict, List
+
+import gevent
+from geventwebsocket.exceptions import WebSocketError
+
+from rotkehlchen.api.websockets.notifier import (
+    WS_FRAME_MAX_MESSAGES,
+    WS_QUEUE_MAX_SIZE,
+    WS_SEND_TICK_SECS,
+    RotkiNotifier,
+)
+from rotkehlchen.api.websockets.typedefs import WSMessageType
+from rotkehlchen.greenlets import GreenletManager
+from rotkehlchen.user_messages import MESSAGES_MAX_NUM, MessagesAggregator
+
+
+class MockWebsocket():
+
+    def __init__(self, fail: bool = False) -> None:
+        self.closed = False
+        self.fail = fail
+        self.frames: List[List[Dict[str, Any]]] = []
+
+    def send(self, frame: str) -> None:
+        if self.fail:
+            raise WebSocketError('Socket is dead')
+        self.frames.append(json.loads(frame))
+
+    def messages(self):
+        return [message for frame in self.frames for message in frame]
+
+
+def _make_notifier():
+    msg_aggregator = MessagesAggregator()
+    notifier = RotkiNotifier(greenlet_manager=GreenletManager(msg_aggregator=msg_aggregator))
+    msg_aggregator.rotki_notifier = notifier
+    return notifier, msg_aggregator
+
+
+def _wait_until_sent(notifier):
+    with gevent.Timeout(10):
+        while notifier.stats()['queued'] != 0:
+            gevent.sleep(WS_SEND_TICK_SECS)
+    gevent.sleep(0)
+
+
+def test_broadcast_burst_is_batched_and_coalesced():
+    """Stress test that a burst of messages is sent in few frames by a single sender
+    loop per websocket, identical messages are coalesced and the excess is dropped
+    and given to the failure callback"""
+    notifier, msg_aggregator = _make_notifier()
+    websockets = [MockWebsocket(), MockWebsocket()]
+    for websocket in websockets:
+        notifier.subscribe(websocket)
+
+    distinct_num = WS_QUEUE_MAX_SIZE + 500
+    for idx in range(distinct_num):
+        msg_aggregator.add_warning(f'warning {idx}')
+        msg_aggregator.add_warning(f'warning {idx}')  # identical, gets coalesced
+    # only the sender loops are spawned no matter how many messages are broadcasted
+    assert len(notifier.greenlet_manager.greenlets) == len(websockets)
+    # the dropped messages are kept by the failure callback of the aggregator
+    warnings = msg_aggregator.consume_warnings()
+    assert len(warnings) == MESSAGES_MAX_NUM
+    assert warnings[-1] == f'warning {distinct_num - 1}'
+
+    _wait_until_sent(notifier)
+    for websocket in websockets:
+        messages = websocket.messages()
+        assert len(messages) == WS_QUEUE_MAX_SIZE
+        assert messages[0] == {'type': 'legacy', 'data': {'verbosity': 'warning', 'value': 'warning 0'}}  # noqa: E501
+        assert messages[-1]['data']['value'] == f'warning {WS_QUEUE_MAX_SIZE - 1}'
+        assert len(websocket.frames) == WS_QUEUE_MAX_SIZE // WS_FRAME_MAX_MESSAGES
+
+    stats = notifier.stats()
+    assert stats['sent'] == 2 * WS_QUEUE_MAX_SIZE
+    assert stats['dropped'] == 4 * (distinct_num - WS_QUEUE_MAX_SIZE)
+    assert stats['coalesced'] == 2 * WS_QUEUE_MAX_SIZE
+
+    # once the queue is drained new messages go through again
+    msg_aggregator.add_error('an error')
+    _wait_until_sent(notifier)
+    for websocket in websockets:
+        assert websocket.frames[-1] == [{'type': 'legacy', 'data': {'verbosity': 'error', 'value': 'an error'}}]  # noqa: E501
+
+
+def test_broadcast_failure_falls_back_to_bounded_aggregator():
+    """Test that messages that can't be sent end up in the bounded aggregator queues"""
+    notifier, msg_aggregator = _make_notifier()
+    websocket = MockWebsocket(fail=True)
+    notifier.subscribe(websocket)
+    notifier.broadcast(
+        message_type=WSMessageType.BALANCE_SNAPSHOT_ERROR,
+        to_send_data={'location': 'binance', 'error': 'booboo'},
+    )
+    msg_aggregator.add_warning('a warning')
+    _wait_until_sent(notifier)
+    assert msg_aggregator.consume_warnings() == ['a warning']
+
+    # closed websockets are unsubscribed and with no subscribers messages are kept
+    websocket.closed = True
+    for idx in range(MESSAGES_MAX_NUM + 10):
+        msg_aggregator.add_error(f'error {idx}')
+    assert notifier.subscribers == []
+    errors = msg_aggregator.consume_errors()
+    assert len(errors) == MESSAGES_MAX_NUM
+    assert errors[0] == 'error 10'
+
+
+def test_sender_restarts_after_greenlets_are_cleared():
+    """Test that the sender loop is restarted if it's killed, like at logout"""
+    notifier, msg_aggregator = _make_notifier()
+    websocket = MockWebsocket()
+    notifier.subscribe(websocket)
+    notifier.greenlet_manager.clear()
+    msg_aggregator.add_warning('a warning')
+    _wait_until_sent(notifier)
+    assert websocket.messages() == [{'type': 'legacy', 'data': {'verbosity': 'warning', 'value': 'a warning'}}]  # noqa: E501
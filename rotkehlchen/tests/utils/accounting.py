@@ -2,6 +2,8 @@ from typing import Any, Dict, List, Sequence, Union
 
 from rotkehlchen.accounting.ledger_actions import LedgerAction
 from rotkehlchen.accounting.structures import DefiEvent
+from rotkehlchen.db.filtering import PnlEventsFilterQuery
+from rotkehlchen.db.reports import DBReports
 from rotkehlchen.exchanges.data_structures import (
     AssetMovement,
     MarginPosition,
@@ -74,3 +76,9 @@ def accounting_history_process(
         ledger_actions=ledger_actions,
     )
     return result
+
+
+def get_pnl_events(accountant) -> List[Dict[str, Any]]:
+    """Returns all the events of the last PnL report, as returned by the API"""
+    events, _ = DBReports(accountant.db).get_pnl_events(PnlEventsFilterQuery.make())
+    return events
@@ -20,6 +20,7 @@ from rotkehlchen.tests.utils.eth_tokens import CONTRACT_ADDRESS_TO_TOKEN
 from rotkehlchen.tests.utils.mock import MockResponse
 from rotkehlchen.typing import BTCAddress, ChecksumEthAddress
 from rotkehlchen.utils.misc import from_wei, satoshis_to_btc
+from rotkehlchen.utils.network import request_get_dict
 
 
 def assert_btc_balances_result(
@@ -462,12 +463,9 @@ def mock_etherscan_query(
     return patch.object(etherscan.session, 'get', wraps=mock_requests_get)
 
 
-def mock_bitcoin_balances_query(
-        btc_map: Dict[BTCAddress, str],
-        original_requests_get,
-):
+def mock_bitcoin_balances_query(btc_map: Dict[BTCAddress, str]):
 
-    def mock_requests_get(url, *args, **kwargs):
+    def mock_request_get_dict(url, *args, **kwargs):
         if 'blockchain.info' in url:
             addresses = url.split('multiaddr?active=')[1].split('|')
             response = '{"addresses":['
@@ -485,11 +483,12 @@ def mock_bitcoin_balances_query(
             balance = btc_map.get(address, '0')
             response = f"""{{"address":"{address}","chain_stats":{{"funded_txo_count":1,"funded_txo_sum":{balance},"spent_txo_count":0,"spent_txo_sum":0,"tx_count":1}},"mempool_stats":{{"funded_txo_count":0,"funded_txo_sum":0,"spent_txo_count":0,"spent_txo_sum":0,"tx_count":0}}}}"""  # noqa: E501
         else:
-            return original_requests_get(url, *args, **kwargs)
+            return request_get_dict(url, *args, **kwargs)
 
-        return MockResponse(200, response)
+        return json.loads(response)
 
-    return patch('rotkehlchen.utils.network.requests.get', wraps=mock_requests_get)
+    # blockstream is queried through its own session so patch at the level of the request
+    return patch('rotkehlchen.chain.bitcoin.request_get_dict', wraps=mock_request_get_dict)
 
 
 def compare_account_data(expected: List[Dict], got: List[Dict]) -> None:
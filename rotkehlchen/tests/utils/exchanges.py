@@ -6,14 +6,9 @@ from unittest.mock import patch
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants.assets import A_ETH, A_EUR
-from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.constants.misc import BINANCE_BASE_URL, BINANCEUS_BASE_URL, ZERO
 from rotkehlchen.db.dbhandler import DBHandler
-from rotkehlchen.exchanges.binance import (
-    BINANCE_BASE_URL,
-    BINANCEUS_BASE_URL,
-    Binance,
-    create_binance_symbols_to_pair,
-)
+from rotkehlchen.exchanges.binance import Binance, create_binance_symbols_to_pair
 from rotkehlchen.exchanges.bitcoinde import Bitcoinde
 from rotkehlchen.exchanges.bitfinex import Bitfinex
 from rotkehlchen.exchanges.bitmex import Bitmex
@@ -186,10 +186,7 @@ def setup_balances(
         new=800,
     )
 
-    bitcoin_patch = mock_bitcoin_balances_query(
-        btc_map=btc_map,
-        original_requests_get=requests.get,
-    )
+    bitcoin_patch = mock_bitcoin_balances_query(btc_map=btc_map)
     # Taken from BINANCE_BALANCES_RESPONSE from tests.utils.exchanges
     binance_balances = {A_ETH: FVal('4763368.68006011'), A_BTC: FVal('4723846.89208129')}
     # Taken from POLONIEX_BALANCES_RESPONSE from tests.utils.exchanges
@@ -13,6 +13,9 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Maximum number of warnings and errors kept until they are consumed. Older ones are dropped.
+MESSAGES_MAX_NUM = 1000
+
 
 class MessagesAggregator():
     """
@@ -20,8 +23,8 @@ class MessagesAggregator():
     """
 
     def __init__(self) -> None:
-        self.warnings: Deque = deque()
-        self.errors: Deque = deque()
+        self.warnings: Deque = deque(maxlen=MESSAGES_MAX_NUM)
+        self.errors: Deque = deque(maxlen=MESSAGES_MAX_NUM)
         self.rotki_notifier: Optional['RotkiNotifier'] = None
 
     def _append_warning(self, msg: str) -> None:
@@ -0,0 +1,278 @@
+import time
+from abc import ABCMeta, abstractmethod
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+
+import gevent
+import requests
+
+# Upper bounds in seconds of the buckets of the duration histograms
+DEFAULT_DURATION_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0,
+)
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if len(names) == 0:
+        return ''
+    labels = ','.join(f'{n}="{_escape_label_value(v)}"' for n, v in zip(names, values))
+    return '{' + labels + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+class Metric(metaclass=ABCMeta):
+    """A metric in the Prometheus text exposition format with a series per label values"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels[x]) for x in self.labelnames)
+
+    @abstractmethod
+    def samples(self) -> Iterator[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """Yields the name suffix, label names, label values and value of each sample"""
+        ...
+
+    def render(self) -> List[str]:
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        for suffix, names, values, value in self.samples():
+            lines.append(
+                f'{self.name}{suffix}{_format_labels(names, values)} {_format_value(value)}',
+            )
+        return lines
+
+
+class Counter(Metric):
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name=name, documentation=documentation, labelnames=labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> Iterator[Tuple[str, Sequence[str], Sequence[str], float]]:
+        for key, value in self.values.items():
+            yield '', self.labelnames, key, value
+
+
+class Gauge(Metric):
+    """A value that can go up and down. Used for values that are read when rendering"""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name=name, documentation=documentation, labelnames=labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        self.values[self._key(labels)] = value
+
+    def samples(self) -> Iterator[Tuple[str, Sequence[str], Sequence[str], float]]:
+        for key, value in self.values.items():
+            yield '', self.labelnames, key, value
+
+
+class Histogram(Metric):
+
+    kind = 'histogram'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_DURATION_BUCKETS,
+    ) -> None:
+        super().__init__(name=name, documentation=documentation, labelnames=labelnames)
+        self.buckets = tuple(sorted(float(x) for x in buckets))
+        # Per label values the non cumulative count of each bucket plus the +Inf one,
+        # and the sum of the observed values
+        self.counts: Dict[Tuple[str, ...], List[int]] = {}
+        self.sums: Dict[Tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        counts = self.counts.get(key)
+        if counts is None:
+            counts = self.counts[key] = [0] * (len(self.buckets) + 1)
+            self.sums[key] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self.sums[key] += value
+
+    def samples(self) -> Iterator[Tuple[str, Sequence[str], Sequence[str], float]]:
+        bucket_labelnames = self.labelnames + ('le',)
+        for key, counts in self.counts.items():
+            cumulative = 0
+            for upper_bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield '_bucket', bucket_labelnames, key + (_format_value(upper_bound),), cumulative  # noqa: E501
+            yield '_sum', self.labelnames, key, self.sums[key]
+            yield '_count', self.labelnames, key, cumulative
+
+
+class MetricsRegistry():
+    """The metrics the backend collects while running"""
+
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Any:
+        """Registers a metric and returns it. A metric with the same name is replaced"""
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self, extra_metrics: Optional[Iterable[Metric]] = None) -> str:
+        """Returns all metrics and the given extra ones in the Prometheus text format"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        for metric in extra_metrics or ():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+metrics_registry = MetricsRegistry()
+API_REQUEST_DURATION: Histogram = metrics_registry.register(Histogram(
+    name='rotki_api_request_duration_seconds',
+    documentation='Duration of the REST API requests',
+    labelnames=('endpoint', 'method', 'status'),
+))
+GREENLET_TASK_DURATION: Histogram = metrics_registry.register(Histogram(
+    name='rotki_greenlet_task_duration_seconds',
+    documentation='Runtime of the tasks spawned in tracked greenlets',
+    labelnames=('task', 'outcome'),
+))
+OUTGOING_REQUEST_DURATION: Histogram = metrics_registry.register(Histogram(
+    name='rotki_outgoing_request_duration_seconds',
+    documentation='Duration of the requests to remote hosts until their response headers',
+    labelnames=('host', 'method'),
+))
+DB_QUERY_DURATION: Histogram = metrics_registry.register(Histogram(
+    name='rotki_db_query_duration_seconds',
+    documentation='Duration of the DB statements by DB and statement type',
+    labelnames=('db', 'statement'),
+))
+
+
+def record_outgoing_request(  # pylint: disable=unused-argument
+        response: requests.Response,
+        *args: Any,
+        **kwargs: Any,
+) -> None:
+    """Requests response hook that records the duration of the request per host"""
+    OUTGOING_REQUEST_DURATION.observe(
+        response.elapsed.total_seconds(),
+        host=urlparse(response.url).hostname or 'unknown',
+        method=response.request.method or 'unknown',
+    )
+
+
+def run_timed_task(method: Callable, *args: Any, **kwargs: Any) -> Any:
+    """Runs a task and records its runtime and outcome
+
+    Task names can contain things like addresses so the metric is per method.
+    """
+    outcome = 'error'
+    start = time.monotonic()
+    try:
+        result = method(*args, **kwargs)
+        outcome = 'success'
+        return result
+    except gevent.GreenletExit:
+        outcome = 'killed'
+        raise
+    finally:
+        GREENLET_TASK_DURATION.observe(
+            time.monotonic() - start,
+            task=getattr(method, '__qualname__', 'unknown'),
+            outcome=outcome,
+        )
+
+
+def _statement_type(sql: str) -> str:
+    statement = sql.lstrip()[:10].split(None, 1)
+    return statement[0].upper() if len(statement) != 0 else 'unknown'
+
+
+class TimedCursorMixin():
+    """Times the statements executed by a DB cursor. To be mixed with the cursor class
+    of the DB driver, with db_name set to the name of the DB in the metrics."""
+
+    db_name = 'unknown'
+
+    def execute(self, sql: str, *args: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, *args)  # type: ignore  # mixed with a cursor
+        finally:
+            DB_QUERY_DURATION.observe(
+                time.perf_counter() - start,
+                db=self.db_name,
+                statement=_statement_type(sql),
+            )
+
+    def executemany(self, sql: str, *args: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, *args)  # type: ignore  # mixed with a cursor
+        finally:
+            DB_QUERY_DURATION.observe(
+                time.perf_counter() - start,
+                db=self.db_name,
+                statement=_statement_type(sql),
+            )
+
+    def executescript(self, sql_script: str) -> Any:
+        start = time.perf_counter()
+        try:
+            return super().executescript(sql_script)  # type: ignore  # mixed with a cursor
+        finally:
+            DB_QUERY_DURATION.observe(
+                time.perf_counter() - start,
+                db=self.db_name,
+                statement='SCRIPT',
+            )
+
+
+class TimedConnectionMixin():
+    """Makes a DB connection create cursors of cursor_class, also for the execute
+    shortcuts of the connection. To be mixed with the connection class of the DB driver
+    and given as the factory when connecting."""
+
+    cursor_class: Any = None
+
+    def cursor(self, factory: Any = None) -> Any:
+        return super().cursor(factory or self.cursor_class)  # type: ignore  # mixed with a connection  # noqa: E501
+
+    def execute(self, sql: str, *args: Any) -> Any:
+        return self.cursor().execute(sql, *args)
+
+    def executemany(self, sql: str, *args: Any) -> Any:
+        return self.cursor().executemany(sql, *args)
+
+    def executescript(self, sql_script: str) -> Any:
+        return self.cursor().executescript(sql_script)
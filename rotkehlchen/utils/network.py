@@ -1,7 +1,7 @@
 import json
 import logging
 from http import HTTPStatus
-from typing import Any, Callable, Dict, List, Union
+from typing import Any, Callable, Dict, List, Optional, Union
 
 import gevent
 import requests
@@ -10,18 +10,34 @@ from rotkehlchen.constants import GLOBAL_REQUESTS_TIMEOUT
 from rotkehlchen.constants.timing import QUERY_RETRY_TIMES
 from rotkehlchen.errors import RemoteError, UnableToDecryptRemoteData
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.utils.metrics import record_outgoing_request
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 
+def create_session() -> requests.Session:
+    """Creates a requests session that records the duration of its requests per host"""
+    session = requests.session()
+    session.hooks['response'].append(record_outgoing_request)
+    return session
+
+
+# Used by request_get when no session is given
+_default_session = create_session()
+
+
 def request_get(
         url: str,
         timeout: int = GLOBAL_REQUESTS_TIMEOUT,
         handle_429: bool = False,
         backoff_in_seconds: Union[int, float] = 0,
+        session: Optional[requests.Session] = None,
 ) -> Union[Dict, List]:
     """
+    If a session is given the request is made through it so that its connections
+    are reused. Otherwise a module wide session is used.
+
     May raise:
     - UnableToDecryptRemoteData from request_get
     - Remote error if the get request fails
@@ -35,7 +51,7 @@ def request_get(
         handle_429=handle_429,
         backoff_in_seconds=backoff_in_seconds,
         method_name=url,
-        function=requests.get,
+        function=_default_session.get if session is None else session.get,
         # function's arguments
         url=url,
         timeout=timeout,
@@ -54,6 +70,7 @@ def request_get_dict(
         timeout: int = GLOBAL_REQUESTS_TIMEOUT,
         handle_429: bool = False,
         backoff_in_seconds: Union[int, float] = 0,
+        session: Optional[requests.Session] = None,
 ) -> Dict:
     """Like request_get, but the endpoint only returns a dict
 
@@ -61,7 +78,7 @@ def request_get_dict(
     - UnableToDecryptRemoteData from request_get
     - Remote error if the get request fails
     """
-    response = request_get(url, timeout, handle_429, backoff_in_seconds)
+    response = request_get(url, timeout, handle_429, backoff_in_seconds, session)
     assert isinstance(response, Dict)  # pylint: disable=isinstance-second-argument-not-valid-type  # noqa: E501
     return response
 
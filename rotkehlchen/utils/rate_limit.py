@@ -0,0 +1,161 @@
+import hashlib
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+import gevent
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+
+class TokenBucket():
+    """A bucket of up to capacity tokens that refills at rate tokens per second
+
+    Tokens are reserved as soon as they are asked for, so the bucket can go negative.
+    That way greenlets asking for tokens of the same bucket are served in order.
+    The time the bucket was last refilled can be in the future if the server told us
+    to back off, in which case no tokens are added until then.
+    """
+
+    def __init__(self, rate: float, capacity: float, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.refilled_at = now
+        self.requests = 0
+        self.weight = 0.0
+        self.throttled = 0
+        self.waited_secs = 0.0
+        self.penalties = 0
+
+    def refill(self, now: float) -> None:
+        if now > self.refilled_at:
+            self.tokens = min(self.capacity, self.tokens + (now - self.refilled_at) * self.rate)
+            self.refilled_at = now
+
+    def reserve(self, weight: float, now: float) -> float:
+        """Takes weight tokens and returns the seconds to wait before they can be used"""
+        self.refill(now)
+        self.tokens -= weight
+        wait = max(0.0, self.refilled_at - now)
+        if self.tokens < 0:
+            wait += -self.tokens / self.rate
+        self.requests += 1
+        self.weight += weight
+        if wait > 0:
+            self.throttled += 1
+            self.waited_secs += wait
+        return wait
+
+    def penalize(self, seconds: float, now: float) -> None:
+        """Empties the bucket and stops refilling it for the given seconds"""
+        self.refill(now)
+        self.tokens = min(self.tokens, 0)
+        self.refilled_at = max(self.refilled_at, now + seconds)
+        self.penalties += 1
+
+    def serialize(self) -> Dict[str, Any]:
+        return {
+            'rate': self.rate,
+            'capacity': self.capacity,
+            'requests': self.requests,
+            'weight': self.weight,
+            'throttled': self.throttled,
+            'waited_secs': round(self.waited_secs, 3),
+            'penalties': self.penalties,
+        }
+
+
+class RateLimiter():
+    """Paces the requests made to remote services with a token bucket per key
+
+    The key is the host of the service, or for services that limit per API key a
+    key made by api_key_limiter_key(). Keys that were never configured are not limited.
+    Waiting happens with the given sleep function so only the waiting greenlet blocks.
+    Nothing between reading and updating a bucket yields, so no lock is needed.
+    """
+
+    def __init__(
+            self,
+            now_fn: Callable[[], float] = time.monotonic,
+            sleep: Callable[[float], Any] = gevent.sleep,
+    ) -> None:
+        self.now_fn = now_fn
+        self.sleep = sleep
+        self.buckets: Dict[str, TokenBucket] = {}
+
+    def configure(self, key: str, rate: float, capacity: float) -> None:
+        """Sets the rate in tokens per second and the burst capacity of a key
+
+        Reconfiguring a key keeps its counters and its tokens up to the new capacity.
+        """
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            self.buckets[key] = TokenBucket(rate=rate, capacity=capacity, now=self.now_fn())
+            return
+
+        bucket.refill(self.now_fn())
+        bucket.rate = rate
+        bucket.capacity = capacity
+        bucket.tokens = min(bucket.tokens, capacity)
+
+    def remove(self, key: str) -> None:
+        self.buckets.pop(key, None)
+
+    def reset(self) -> None:
+        """Refills all buckets and clears their counters. Keeps how each key is configured"""
+        now = self.now_fn()
+        self.buckets = {
+            key: TokenBucket(rate=bucket.rate, capacity=bucket.capacity, now=now)
+            for key, bucket in self.buckets.items()
+        }
+
+    def acquire(self, key: str, weight: float = 1) -> float:
+        """Waits until a request of the given weight can be made. Returns the seconds waited"""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return 0.0
+
+        wait = bucket.reserve(weight=weight, now=self.now_fn())
+        if wait > 0:
+            log.debug(f'Rate limiting requests to {key}. Waiting for {wait:.2f} seconds')
+            self.sleep(wait)
+        return wait
+
+    def try_acquire(self, key: str, weight: float = 1) -> bool:
+        """Takes the tokens for a request of the given weight only if no wait is needed"""
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            return True
+
+        now = self.now_fn()
+        bucket.refill(now)
+        if bucket.refilled_at > now or bucket.tokens < weight:
+            return False
+        bucket.reserve(weight=weight, now=now)
+        return True
+
+    def penalize(self, key: str, seconds: float) -> None:
+        """Backs off from a key for the given seconds after the server rate limited us"""
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            bucket.penalize(seconds=seconds, now=self.now_fn())
+
+    def stats(self, key: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Counters of all keys or of the given key if it's configured"""
+        if key is not None:
+            bucket = self.buckets.get(key)
+            return {} if bucket is None else {key: bucket.serialize()}
+        return {k: v.serialize() for k, v in self.buckets.items()}
+
+
+def api_key_limiter_key(host: str, api_key: str) -> str:
+    """Key of a service that limits per API key, without the key itself showing in the stats"""
+    return f'{host}:{hashlib.sha256(api_key.encode()).hexdigest()[:12]}'
+
+
+# Limiter shared by all the clients of remote services
+rate_limiter = RateLimiter()
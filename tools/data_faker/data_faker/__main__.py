@@ -3,6 +3,7 @@ monkey.patch_all()  # isort:skip # noqa
 import logging
 
 from data_faker.args import data_faker_args
+from data_faker.benchmark import run_benchmark
 from data_faker.faker import DataFaker
 from data_faker.mock_apis.api import APIServer, RestAPI
 from data_faker.statistics import StatisticsFaker
@@ -13,6 +14,9 @@ logger = logging.getLogger(__name__)
 def main() -> None:
     arg_parser = data_faker_args()
     args = arg_parser.parse_args()
+    if args.command in ('mockall', 'statistics') and args.user_password is None:
+        arg_parser.error(f'--user-password is required for {args.command}')
+
     if args.command == 'mockall':
         faker = DataFaker(args)
 
@@ -30,6 +34,8 @@ def main() -> None:
     elif args.command == 'statistics':
         stats_faker = StatisticsFaker(args)
         stats_faker.create_fake_data(args)
+    elif args.command == 'benchmark':
+        run_benchmark(args)
     else:
         raise AssertionError(f'Should not happen. Unexpected command {args.command} given')
 
@@ -15,8 +15,7 @@ def data_faker_args() -> argparse.ArgumentParser:
     )
     p.add_argument(
         '--user-password',
-        help='The password for the new (or existing) user',
-        required=True,
+        help='The password for the new (or existing) user. Required unless benchmarking',
     )
     p.add_argument(
         '--trades-number',
@@ -39,7 +38,7 @@ def data_faker_args() -> argparse.ArgumentParser:
     p.add_argument(
         '--command',
         type=str,
-        choices=['mockall', 'statistics'],
+        choices=['mockall', 'statistics', 'benchmark'],
         help='The type of operation data faken should do',
     )
     p.add_argument(
@@ -94,4 +93,37 @@ def data_faker_args() -> argparse.ArgumentParser:
         default='0.5',
         help='Number between 0 and 1.0 indicating probability that at each step number will go up',
     )
+    p.add_argument(
+        '--seed',
+        type=int,
+        default=0,
+        help='The seed of the random data generated by the benchmark',
+    )
+    p.add_argument(
+        '--snapshots-number',
+        type=int,
+        default=365,
+        help='The number of balance snapshots the benchmark writes in the DB',
+    )
+    p.add_argument(
+        '--benchmark-output',
+        type=str,
+        required=False,
+        help='Path of a JSON file to write the benchmark results to',
+    )
+    p.add_argument(
+        '--benchmark-baseline',
+        type=str,
+        required=False,
+        help='Path of the JSON results of an earlier benchmark run to compare with',
+    )
+    p.add_argument(
+        '--regression-threshold',
+        type=float,
+        default=0.2,
+        help=(
+            'Fraction by which a benchmark stage can be slower than the baseline '
+            'before it counts as a regression. Default 0.2'
+        ),
+    )
     return p
@@ -0,0 +1,414 @@
+import argparse
+import json
+import logging
+import math
+import random
+import shutil
+import sys
+import time
+from contextlib import ExitStack
+from pathlib import Path
+from tempfile import mkdtemp
+from typing import Any, Dict, List, Optional
+from unittest.mock import patch
+from urllib.parse import parse_qs
+
+import requests
+from data_faker.fake_binance import FakeBinance
+from data_faker.fake_kraken import FakeKraken
+from data_faker.mock_apis.api import RestAPI
+from data_faker.utils import MockResponse, make_random_b64bytes
+
+from rotkehlchen.accounting.structures import BalanceType
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.constants import KRAKEN_BASE_URL
+from rotkehlchen.constants.assets import A_BTC, A_ETH, A_EUR, A_LTC, A_USD
+from rotkehlchen.constants.misc import ZERO
+from rotkehlchen.db.utils import DBAssetBalance, LocationData
+from rotkehlchen.exchanges.data_structures import Trade, TradeType
+from rotkehlchen.fval import FVal
+from rotkehlchen.history.price import PriceHistorian
+from rotkehlchen.inquirer import Inquirer
+from rotkehlchen.rotkehlchen import Rotkehlchen
+from rotkehlchen.typing import ApiKey, ApiSecret, AssetAmount, Fee, Location, Price, Timestamp
+from rotkehlchen.utils.misc import get_system_spec
+from rotkehlchen.utils.rate_limit import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_RESULTS_VERSION = 1
+BENCHMARK_START_TS = Timestamp(1483228800)  # 01/01/2017
+DAY_IN_SECONDS = 86400
+BENCHMARK_USER = 'benchmark'
+BENCHMARK_PASSWORD = 'benchmark'
+# USD prices around which the fake prices of the traded assets move
+BENCHMARK_BASE_PRICES = {A_BTC: 10000.0, A_ETH: 500.0, A_LTC: 100.0}
+EUR_USD_RATE = 1.1
+STARTING_EUR = 100000
+KRAKEN_FEE_RATE = FVal('0.0026')
+# Stages a run is timed by, in the order they run
+BENCHMARK_STAGES = (
+    'history_query',
+    'process_history',
+    'csv_export',
+    'db_writes',
+    'balance_aggregation',
+)
+# Stages slower than the baseline by more than this fraction are regressions
+DEFAULT_REGRESSION_THRESHOLD = 0.2
+
+
+def fake_usd_price(asset: Asset, timestamp: Timestamp) -> float:
+    """A made up but deterministic USD price of the asset at the timestamp
+
+    Each asset oscillates around its base price with its own period so that
+    trades end up both in profit and in loss. Unknown assets have no price.
+    """
+    if asset == A_USD:
+        return 1.0
+    if asset == A_EUR:
+        return EUR_USD_RATE
+    base_price = BENCHMARK_BASE_PRICES.get(asset)
+    if base_price is None:
+        return 0.0
+    period = 30 * DAY_IN_SECONDS * (2 + len(asset.identifier))
+    return base_price * (1 + 0.5 * math.sin(2 * math.pi * timestamp / period))
+
+
+def fake_price(from_asset: Asset, to_asset: Asset, timestamp: Timestamp) -> Price:
+    to_usd = fake_usd_price(to_asset, timestamp)
+    if to_usd == 0:
+        return Price(ZERO)
+    return Price(FVal(round(fake_usd_price(from_asset, timestamp) / to_usd, 8)))
+
+
+class Benchmark():
+    """Times the main operations of rotki over a generated history, offline
+
+    A new user is created in a temporary data directory. Its history is generated
+    from the given seed in the fake kraken, whose API is served in process by the
+    mock APIs, so the same seed and sizes always produce the same history. All
+    other network requests are blocked and prices come from fake_price().
+    """
+
+    def __init__(self, args: argparse.Namespace) -> None:
+        self.seed = args.seed
+        self.trades_number = args.trades_number
+        self.snapshots_number = args.snapshots_number
+        self.keep_data_dir = args.data_dir is not None
+        if args.data_dir is None:
+            args.data_dir = mkdtemp(prefix='rotki_benchmark_')
+        self.data_dir = Path(args.data_dir)
+        args.logfile = str(self.data_dir / 'benchmark.log')
+        self.end_ts = BENCHMARK_START_TS
+        self.fake_kraken = FakeKraken()
+        self.rest_api = RestAPI(fake_kraken=self.fake_kraken, fake_binance=FakeBinance())
+        self.patches = ExitStack()
+        self._go_offline()
+        self.rotki = Rotkehlchen(args)
+
+    def _go_offline(self) -> None:
+        self.patches.enter_context(patch.object(
+            requests.Session,
+            'request',
+            new=lambda session, method, url, **kwargs: self._mock_request(url, **kwargs),
+        ))
+        self.patches.enter_context(patch.object(
+            PriceHistorian,
+            'query_historical_price',
+            new=staticmethod(fake_price),
+        ))
+        self.patches.enter_context(patch.object(
+            Inquirer,
+            'find_price',
+            new=staticmethod(
+                lambda from_asset, to_asset, ignore_cache=False: fake_price(from_asset, to_asset, self.end_ts),  # noqa: E501
+            ),
+        ))
+        self.patches.enter_context(patch.object(
+            Inquirer,
+            'find_usd_price',
+            new=staticmethod(
+                lambda asset, ignore_cache=False: fake_price(asset, A_USD, self.end_ts),
+            ),
+        ))
+        self.patches.enter_context(patch.object(
+            Inquirer,
+            'get_fiat_usd_exchange_rates',
+            new=staticmethod(
+                lambda currencies: {x: fake_price(x, A_USD, self.end_ts) for x in [A_USD, *currencies]},  # noqa: E501
+            ),
+        ))
+
+    def _mock_request(  # pylint: disable=unused-argument
+            self,
+            url: str,
+            data: Any = None,
+            **kwargs: Any,
+    ) -> MockResponse:
+        """Serves the kraken queries from the fake kraken and blocks everything else"""
+        if not url.startswith(KRAKEN_BASE_URL):
+            raise requests.exceptions.ConnectionError(f'Benchmark runs offline. Blocked {url}')
+
+        method = url.rsplit('/', maxsplit=1)[-1]
+        if isinstance(data, bytes):
+            options = {k: v[0] for k, v in parse_qs(data.decode()).items()}
+        else:
+            options = data or {}
+        result: Dict[str, Any]
+        if method == 'Balance':
+            result = self.rest_api.kraken_balances()
+        elif method == 'TradesHistory':
+            result = self.rest_api.kraken_trade_history()
+        elif method == 'Ledgers' and options.get('type') in ('deposit', 'withdrawal'):
+            result = self.rest_api.kraken_ledgers(options['type'])
+        elif method == 'Ledgers':
+            result = {'result': {'ledger': {}, 'count': 0}, 'error': []}
+        elif method == 'AssetPairs':
+            result = self.rest_api.kraken_asset_pairs()
+        elif method == 'Ticker':
+            result = self.rest_api.kraken_ticker()
+        else:
+            result = {'result': {}, 'error': [f'EGeneral:Unknown method {method}']}
+        return MockResponse(200, json.dumps(result), url=url)
+
+    def _setup_user(self) -> None:
+        self.rotki.unlock_user(
+            user=BENCHMARK_USER,
+            password=BENCHMARK_PASSWORD,
+            create_new=True,
+            sync_approval='no',
+            premium_credentials=None,
+        )
+        success, msg = self.rotki.setup_exchange(
+            name='kraken',
+            location=Location.KRAKEN,
+            api_key=ApiKey(str(make_random_b64bytes(128))),
+            api_secret=ApiSecret(make_random_b64bytes(128)),
+        )
+        assert success, f'Could not setup the fake kraken: {msg}'
+        # The fake kraken is not rate limited
+        kraken = self.rotki.exchange_manager.get_exchange(name='kraken', location=Location.KRAKEN)
+        rate_limiter.remove(kraken.rate_limit_key)  # type: ignore  # it was just set up
+
+    def _get_balance(self, asset: Asset) -> FVal:
+        balance = self.fake_kraken.get_balance(asset)
+        return ZERO if balance is None else balance
+
+    def generate_history(self) -> None:
+        """Fills the fake kraken with a deposit and the given number of trades"""
+        ts = BENCHMARK_START_TS
+        self.fake_kraken.deposit(asset=A_EUR, amount=FVal(STARTING_EUR), time=ts)
+        assets = list(BENCHMARK_BASE_PRICES)
+        for _ in range(self.trades_number):
+            ts = Timestamp(ts + random.randint(DAY_IN_SECONDS // 24, DAY_IN_SECONDS))
+            base = random.choice(assets)
+            rate = fake_price(base, A_EUR, ts)
+            base_balance = self._get_balance(base)
+            eur_balance = self._get_balance(A_EUR)
+            can_sell = base_balance * rate > 1
+            if not can_sell or (eur_balance > 1000 and random.random() < 0.6):
+                trade_type = TradeType.BUY
+                cost = FVal(round(random.uniform(0.01, 0.05), 4)) * eur_balance
+                amount = cost / rate
+            else:
+                trade_type = TradeType.SELL
+                amount = FVal(round(random.uniform(0.1, 0.5), 4)) * base_balance
+                cost = amount * rate
+
+            fee = cost * KRAKEN_FEE_RATE
+            if trade_type == TradeType.BUY:
+                self.fake_kraken.increase_asset(base, amount)
+                self.fake_kraken.decrease_asset(A_EUR, cost + fee)
+            else:
+                self.fake_kraken.decrease_asset(base, amount)
+                self.fake_kraken.increase_asset(A_EUR, cost - fee)
+            self.fake_kraken.append_trade(Trade(
+                timestamp=ts,
+                location=Location.KRAKEN,
+                base_asset=base,
+                quote_asset=A_EUR,
+                trade_type=trade_type,
+                amount=AssetAmount(amount),
+                rate=rate,
+                fee=Fee(fee),
+                fee_currency=A_EUR,
+                link='',
+            ))
+
+        self.end_ts = Timestamp(ts + DAY_IN_SECONDS)
+
+    def _write_snapshots(self) -> None:
+        """Writes balance snapshots, one per day, like the balance saving would"""
+        assets = list(BENCHMARK_BASE_PRICES)
+        for idx in range(self.snapshots_number):
+            ts = Timestamp(BENCHMARK_START_TS + idx * DAY_IN_SECONDS)
+            balances = []
+            for asset in assets:
+                amount = FVal(round(random.uniform(0.1, 10), 8))
+                balances.append(DBAssetBalance(
+                    category=BalanceType.ASSET,
+                    time=ts,
+                    asset=asset,
+                    amount=str(amount),
+                    usd_value=str(amount * fake_price(asset, A_USD, ts)),
+                ))
+            self.rotki.data.db.add_multiple_balances(balances)
+            total_usd_value = sum((FVal(x.usd_value) for x in balances), ZERO)
+            self.rotki.data.db.add_multiple_location_data([
+                LocationData(
+                    time=ts,
+                    location=Location.KRAKEN.serialize_for_db(),
+                    usd_value=str(total_usd_value),
+                ),
+                LocationData(
+                    time=ts,
+                    location=Location.TOTAL.serialize_for_db(),  # pylint: disable=no-member
+                    usd_value=str(total_usd_value),
+                ),
+            ])
+
+    def run(self) -> Dict[str, Any]:
+        """Runs all stages and returns the results"""
+        random.seed(self.seed)
+        timings: Dict[str, float] = {}
+        counts: Dict[str, int] = {}
+        overview: Dict[str, str] = {}
+        process_history_stages: Dict[str, float] = {}
+        try:
+            self._setup_user()
+            self.generate_history()
+
+            start = time.perf_counter()
+            (
+                error_or_empty,
+                history,
+                loan_history,
+                asset_movements,
+                eth_transactions,
+                defi_events,
+                ledger_actions,
+            ) = self.rotki.events_historian.get_history(
+                start_ts=Timestamp(0),
+                end_ts=self.end_ts,
+                has_premium=False,
+            )
+            timings['history_query'] = time.perf_counter() - start
+            if error_or_empty != '':
+                logger.error(f'Benchmark history query had errors: {error_or_empty}')
+            counts['trades'] = len(history)
+            counts['asset_movements'] = len(asset_movements)
+
+            start = time.perf_counter()
+            report = self.rotki.accountant.process_history(
+                start_ts=Timestamp(0),
+                end_ts=self.end_ts,
+                trade_history=history,
+                loan_history=loan_history,
+                asset_movements=asset_movements,
+                eth_transactions=eth_transactions,
+                defi_events=defi_events,
+                ledger_actions=ledger_actions,
+            )
+            timings['process_history'] = time.perf_counter() - start
+            counts['processed_events'] = report['events_processed']
+            # Same parameters should give the same report, so this is kept in the results
+            overview = report['overview']
+            process_history_stages = dict(self.rotki.accountant.last_run_timings)
+
+            start = time.perf_counter()
+            success, msg = self.rotki.accountant.csvexporter.create_files(self.data_dir / 'csv')
+            timings['csv_export'] = time.perf_counter() - start
+            assert success, f'CSV export failed: {msg}'
+
+            start = time.perf_counter()
+            self._write_snapshots()
+            timings['db_writes'] = time.perf_counter() - start
+            counts['snapshots'] = self.snapshots_number
+
+            start = time.perf_counter()
+            self.rotki.query_balances(requested_save_data=True, ignore_cache=True)
+            timings['balance_aggregation'] = time.perf_counter() - start
+        finally:
+            self.rotki.logout()
+            self.rotki.shutdown()
+            self.patches.close()
+            if not self.keep_data_dir:
+                shutil.rmtree(self.data_dir, ignore_errors=True)
+
+        return {
+            'version': BENCHMARK_RESULTS_VERSION,
+            'system': get_system_spec(),
+            'parameters': {
+                'seed': self.seed,
+                'trades_number': self.trades_number,
+                'snapshots_number': self.snapshots_number,
+            },
+            'counts': counts,
+            'overview': overview,
+            'timings': {k: round(v, 4) for k, v in timings.items()},
+            'process_history_stages': {k: round(v, 4) for k, v in process_history_stages.items()},
+        }
+
+
+def find_regressions(
+        results: Dict[str, Any],
+        baseline: Dict[str, Any],
+        threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+) -> List[str]:
+    """Returns a description of each stage that got slower than the baseline by more than
+    the threshold. Results of runs with different parameters can't be compared."""
+    if results['parameters'] != baseline['parameters']:
+        raise ValueError(
+            f'Can not compare benchmark with parameters {results["parameters"]} to a '
+            f'baseline with parameters {baseline["parameters"]}',
+        )
+
+    regressions = []
+    if results['overview'] != baseline['overview']:
+        logger.warning('Benchmark PnL report differs from the baseline one')
+    for stage, seconds in results['timings'].items():
+        baseline_seconds = baseline['timings'].get(stage)
+        if baseline_seconds is None or baseline_seconds == 0:
+            continue
+        change = seconds / baseline_seconds - 1
+        if change > threshold:
+            regressions.append(
+                f'{stage} took {seconds:.3f} seconds, {change:.0%} more than '
+                f'the {baseline_seconds:.3f} seconds of the baseline',
+            )
+
+    return regressions
+
+
+def print_results(results: Dict[str, Any], baseline: Optional[Dict[str, Any]]) -> None:
+    for stage in (x for x in BENCHMARK_STAGES if x in results['timings']):
+        line = f'{stage:<20} {results["timings"][stage]:>10.3f}s'
+        if baseline is not None and baseline['timings'].get(stage):
+            baseline_seconds = baseline['timings'][stage]
+            line += f' {results["timings"][stage] / baseline_seconds - 1:>+8.0%} vs baseline'
+        print(line)
+    for name, count in results['counts'].items():
+        print(f'{name:<20} {count:>10}')
+
+
+def run_benchmark(args: argparse.Namespace) -> None:
+    """Runs the benchmark, writes its results and exits with 1 if anything regressed"""
+    baseline = None
+    if args.benchmark_baseline is not None:
+        with open(args.benchmark_baseline, 'r') as f:
+            baseline = json.load(f)
+
+    results = Benchmark(args).run()
+    print_results(results, baseline)
+    if args.benchmark_output is not None:
+        with open(args.benchmark_output, 'w') as f:
+            json.dump(results, f, indent=4)
+
+    if baseline is None:
+        return
+    regressions = find_regressions(results, baseline, args.regression_threshold)
+    for regression in regressions:
+        print(f'REGRESSION: {regression}')
+    if len(regressions) != 0:
+        sys.exit(1)
@@ -116,22 +116,22 @@ class FakeKraken():
         self.trades_dict[kraken_trade['ordertxid']] = kraken_trade
 
     # From here and on it's the exchange's API
-    def query_asset_pairs(self):
+    def query_asset_pairs(self) -> Dict[str, Any]:
         return self.asset_pairs
 
-    def query_ticker(self):
+    def query_ticker(self) -> Dict[str, Any]:
         return self.ticker
 
-    def query_balances(self):
+    def query_balances(self) -> Dict[str, Any]:
         response = {'result': self.balances_dict, 'error': []}
         return process_result(response)
 
-    def query_trade_history(self):
+    def query_trade_history(self) -> Dict[str, Any]:
         trades_length = len(self.trades_dict)
         response = {'result': {'trades': self.trades_dict, 'count': trades_length}, 'error': []}
         return process_result(response)
 
-    def query_ledgers(self, ledger_type: str):
+    def query_ledgers(self, ledger_type: str) -> Dict[str, Any]:
         if ledger_type == 'all':
             result_list = self.deposits_ledger
             result_list.extend(self.withdrawals_ledger)
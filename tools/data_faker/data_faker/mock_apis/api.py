@@ -1,8 +1,10 @@
 import json
 import logging
 from http import HTTPStatus
-from typing import Optional
+from typing import Any, Dict, Optional
 
+from data_faker.fake_binance import FakeBinance
+from data_faker.fake_kraken import FakeKraken
 from data_faker.mock_apis.resources import (
     BinanceAccountResource,
     BinanceExchangeInfoResource,
@@ -107,23 +109,23 @@ class APIServer():
 
 
 class RestAPI():
-    def __init__(self, fake_kraken, fake_binance) -> None:
+    def __init__(self, fake_kraken: FakeKraken, fake_binance: FakeBinance) -> None:
         self.kraken = fake_kraken
         self.binance = fake_binance
 
-    def kraken_ticker(self):
+    def kraken_ticker(self) -> Dict[str, Any]:
         return self.kraken.query_ticker()
 
-    def kraken_asset_pairs(self):
+    def kraken_asset_pairs(self) -> Dict[str, Any]:
         return self.kraken.query_asset_pairs()
 
-    def kraken_balances(self):
+    def kraken_balances(self) -> Dict[str, Any]:
         return self.kraken.query_balances()
 
-    def kraken_trade_history(self):
+    def kraken_trade_history(self) -> Dict[str, Any]:
         return self.kraken.query_trade_history()
 
-    def kraken_ledgers(self, ledger_type):
+    def kraken_ledgers(self, ledger_type: str) -> Dict[str, Any]:
         return self.kraken.query_ledgers(ledger_type)
 
     def binance_exchange_info(self):
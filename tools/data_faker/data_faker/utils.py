@@ -1,4 +1,7 @@
-from typing import Callable
+import base64
+import json
+import random
+from typing import Any, Callable, Dict
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants import ZERO
@@ -26,3 +29,21 @@ def assets_exist_at_time(
         return False
 
     return True
+
+
+def make_random_b64bytes(size: int) -> bytes:
+    return base64.b64encode(bytes(bytearray(random.getrandbits(8) for _ in range(size))))
+
+
+class MockResponse():
+    """The parts of a requests response that rotki reads, for the faked APIs"""
+
+    def __init__(self, status_code: int, text: str, url: str) -> None:
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode()
+        self.url = url
+        self.headers: Dict[str, Any] = {}
+
+    def json(self) -> Dict[str, Any]:
+        return json.loads(self.text)